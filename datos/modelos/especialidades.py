@@ -0,0 +1,140 @@
+"""
+Catálogo de especialidades hospitalarias.
+Capa: DATOS
+Responsabilidad: Orden canónico de especialidades, su codificación como
+máscara de bits y las especialidades que exige cada tipo de incidente.
+
+Cada especialidad ocupa un bit, en el mismo orden que especialidades_list.pkl
+(el orden con que se entrenó K-means):
+
+    cardiologia=1, trauma=2, pediatria=4, ortopedia=8,
+    neurologia=16, quemados=32, toxicologia=64, general=128
+"""
+
+from typing import Dict, Iterable, List, Tuple
+
+
+ESPECIALIDADES: List[str] = [
+    'cardiologia', 'trauma', 'pediatria', 'ortopedia',
+    'neurologia', 'quemados', 'toxicologia', 'general'
+]
+
+BIT_ESPECIALIDAD: Dict[str, int] = {
+    especialidad: 1 << i for i, especialidad in enumerate(ESPECIALIDADES)
+}
+
+# Tipo de incidente → (especialidades requeridas, especialidades preferidas)
+# La primera requerida es la especialidad principal del incidente.
+ESPECIALIDADES_POR_INCIDENTE: Dict[str, Tuple[List[str], List[str]]] = {
+    'problema_cardiaco': (['cardiologia'], ['general']),
+    'problema_respiratorio': (['general'], ['cardiologia']),
+    'quemadura': (['quemados'], ['trauma', 'general']),
+    'fractura': (['ortopedia'], ['trauma']),
+    'alergia_severa': (['general'], ['toxicologia']),
+    'dolor_abdominal': (['general'], []),
+    'caida': (['ortopedia'], ['trauma', 'neurologia']),
+    'herida_punzante': (['trauma'], ['general']),
+    'accidente_auto': (['trauma'], ['ortopedia', 'neurologia']),
+    'intoxicacion': (['toxicologia'], ['general'])
+}
+
+# Especialidad principal de cada tipo de incidente (K-means)
+ESPECIALIDAD_PRINCIPAL: Dict[str, str] = {
+    tipo: requeridas[0]
+    for tipo, (requeridas, _) in ESPECIALIDADES_POR_INCIDENTE.items()
+}
+
+
+def codificar_especialidades(especialidades: Dict[str, int]) -> int:
+    """
+    Convierte el dict {especialidad: 0/1} de un hospital en máscara de bits.
+
+    Args:
+        especialidades: Dict con especialidades {nombre: 1/0}
+
+    Returns:
+        Entero con un bit encendido por especialidad
+
+    Example:
+        >>> codificar_especialidades({'cardiologia': 1, 'trauma': 1, 'general': 0})
+        3
+    """
+    mascara = 0
+    for especialidad, tiene in especialidades.items():
+        if tiene == 1 and especialidad in BIT_ESPECIALIDAD:
+            mascara |= BIT_ESPECIALIDAD[especialidad]
+    return mascara
+
+
+def mascara_de(nombres: Iterable[str]) -> int:
+    """
+    Construye la máscara de un conjunto de especialidades.
+
+    Args:
+        nombres: Nombres de especialidades
+
+    Returns:
+        Máscara de bits (nombres desconocidos se ignoran)
+
+    Example:
+        >>> mascara_de(['quemados', 'trauma'])
+        34
+    """
+    mascara = 0
+    for nombre in nombres:
+        mascara |= BIT_ESPECIALIDAD.get(nombre, 0)
+    return mascara
+
+
+def decodificar_especialidades(mascara: int) -> Dict[str, int]:
+    """
+    Convierte una máscara de bits en el dict {especialidad: 0/1}.
+
+    Args:
+        mascara: Máscara de especialidades
+
+    Returns:
+        Dict con las 8 especialidades en orden canónico
+
+    Example:
+        >>> decodificar_especialidades(3)['trauma']
+        1
+    """
+    return {
+        especialidad: 1 if mascara & bit else 0
+        for especialidad, bit in BIT_ESPECIALIDAD.items()
+    }
+
+
+def mascaras_incidente(
+    tipos_incidente: Iterable[str],
+    adicionales: Iterable[str] = ()
+) -> Tuple[int, int]:
+    """
+    Calcula las máscaras requerida y preferida para uno o más incidentes.
+
+    Permite combinar casos reales (ej: quemadura + accidente_auto en un
+    auto incendiado) o pedir especialidades extra de forma explícita.
+    Tipos desconocidos requieren 'general'.
+
+    Args:
+        tipos_incidente: Tipos de incidente del paciente
+        adicionales: Especialidades requeridas adicionales
+
+    Returns:
+        Tupla (mascara_requerida, mascara_preferida); la preferida no
+        repite bits de la requerida
+
+    Example:
+        >>> mascaras_incidente(['quemadura', 'accidente_auto'])
+        (34, 152)
+    """
+    requerida = mascara_de(adicionales)
+    preferida = 0
+    for tipo in tipos_incidente:
+        requeridas, preferidas = ESPECIALIDADES_POR_INCIDENTE.get(
+            tipo, (['general'], [])
+        )
+        requerida |= mascara_de(requeridas)
+        preferida |= mascara_de(preferidas)
+    return requerida, preferida & ~requerida
@@ -0,0 +1,84 @@
+"""
+Esquemas tipados de las tablas de entrenamiento (Parquet).
+Capa: DATOS
+Responsabilidad: Fijar columnas y tipos de emergencia_pacientes y hospitales,
+iguales vengan del CSV o de MongoDB.
+Estándares: PEP 8, Type hints, Docstrings
+
+Los tipos siguen a PacienteSchema / HospitalSchema. Las columnas de pocos
+valores distintos (sexo, tipo_incidente, severidad, ...) son diccionarios:
+en pandas llegan como category.
+"""
+
+from typing import Dict
+import pyarrow as pa
+
+
+_CATEGORIA = pa.dictionary(pa.int8(), pa.string())
+
+ESQUEMA_PACIENTES = pa.schema([
+    pa.field('paciente_id', pa.string(), nullable=False),
+    ('edad', pa.int16()),
+    ('sexo', _CATEGORIA),
+    ('presion_sistolica', pa.float64()),
+    ('presion_diastolica', pa.float64()),
+    ('frecuencia_cardiaca', pa.int16()),
+    ('frecuencia_respiratoria', pa.int16()),
+    ('temperatura', pa.float64()),
+    ('saturacion_oxigeno', pa.float64()),
+    ('tipo_incidente', _CATEGORIA),
+    ('nivel_dolor', pa.int8()),
+    ('tiempo_desde_incidente', pa.int32()),
+    ('tiene_seguro', pa.bool_()),
+    ('timestamp', pa.timestamp('us')),
+    ('severidad', _CATEGORIA),      # Etiqueta (solo en el CSV histórico)
+    ('decision', _CATEGORIA),       # Etiqueta (solo en el CSV histórico)
+])
+
+ESQUEMA_HOSPITALES = pa.schema([
+    pa.field('hospital_id', pa.string(), nullable=False),
+    ('nombre', pa.string()),
+    ('latitud', pa.float64()),
+    ('longitud', pa.float64()),
+    ('capacidad_actual', pa.int32()),
+    ('capacidad_maxima', pa.int32()),
+    ('tiempo_atencion_promedio', pa.float64()),
+    ('tasa_exito', pa.float64()),
+    ('nivel', _CATEGORIA),
+    ('especialidades', pa.string()),   # "general,trauma,..." como en el CSV
+])
+
+# Nombre de tabla (= nombre del CSV sin extensión) → esquema
+ESQUEMAS: Dict[str, pa.Schema] = {
+    'emergencia_pacientes': ESQUEMA_PACIENTES,
+    'hospitales': ESQUEMA_HOSPITALES,
+}
+
+# Colección de MongoDB de cada tabla
+COLECCIONES: Dict[str, str] = {
+    'emergencia_pacientes': 'pacientes',
+    'hospitales': 'hospitales',
+}
+
+
+def esquema_plano(esquema: pa.Schema) -> pa.Schema:
+    """
+    Mismo esquema con los diccionarios reemplazados por su tipo de valor.
+
+    Es el que se usa al leer CSV o armar la tabla desde documentos; después
+    se hace cast al esquema final.
+
+    Args:
+        esquema: Esquema de ESQUEMAS
+
+    Returns:
+        Esquema sin columnas diccionario
+    """
+    return pa.schema([
+        pa.field(
+            campo.name,
+            campo.type.value_type if pa.types.is_dictionary(campo.type) else campo.type,
+            nullable=campo.nullable
+        )
+        for campo in esquema
+    ])
@@ -28,7 +28,8 @@ class PacienteSchema:
         tipo_incidente: str,
         nivel_dolor: int,
         tiene_seguro: bool,
-        timestamp: Optional[datetime] = None
+        timestamp: Optional[datetime] = None,
+        tiempo_desde_incidente: Optional[int] = None
     ) -> Dict[str, Any]:
         """Crea documento de paciente."""
         return {
@@ -48,12 +49,38 @@ class PacienteSchema:
             },
             "incidente": {
                 "tipo": tipo_incidente,
-                "nivel_dolor": nivel_dolor
+                "nivel_dolor": nivel_dolor,
+                "tiempo_desde_incidente": tiempo_desde_incidente
             },
             "tiene_seguro": tiene_seguro,
             "timestamp": timestamp or datetime.now()
         }
 
+    @staticmethod
+    def a_datos_prediccion(documento: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Aplana un documento de paciente al formato de PredictorSeveridad.
+
+        Los campos ausentes quedan en None (documentos cargados antes de
+        guardar tiempo_desde_incidente, por ejemplo).
+        """
+        signos = documento.get("signos_vitales") or {}
+        incidente = documento.get("incidente") or {}
+        return {
+            "paciente_id": documento.get("paciente_id"),
+            "edad": documento.get("edad"),
+            "sexo": documento.get("sexo"),
+            "presion_sistolica": signos.get("presion_sistolica"),
+            "presion_diastolica": signos.get("presion_diastolica"),
+            "frecuencia_cardiaca": signos.get("frecuencia_cardiaca"),
+            "frecuencia_respiratoria": signos.get("frecuencia_respiratoria"),
+            "temperatura": signos.get("temperatura"),
+            "saturacion_oxigeno": signos.get("saturacion_oxigeno"),
+            "tipo_incidente": incidente.get("tipo"),
+            "nivel_dolor": incidente.get("nivel_dolor"),
+            "tiempo_desde_incidente": incidente.get("tiempo_desde_incidente")
+        }
+
 
 class HospitalSchema:
     """Schema para colección de hospitales."""
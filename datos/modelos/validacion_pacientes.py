@@ -0,0 +1,273 @@
+"""
+Validación y limpieza de datos de pacientes.
+Capa: DATOS
+Responsabilidad: Rangos fisiológicos por campo, coerción de tipos y
+normalización de categorías, iguales para la carga, el entrenamiento y el
+servicio.
+Estándares: PEP 8, Type hints, Docstrings
+
+Dos variantes con las mismas reglas:
+- validar_lote: un DataFrame completo, columna por columna en NumPy
+- validar_registro: un dict (entradas GraphQL), sin pandas
+
+Políticas para valores fuera de rango:
+- 'marcar': el registro queda inválido con el motivo
+- 'recortar': el valor se lleva al límite más cercano y el registro sigue
+  siendo válido (queda indicado en recortados)
+
+Faltantes, valores no numéricos y categorías desconocidas invalidan el
+registro con cualquier política.
+"""
+
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+import numpy as np
+import pandas as pd
+
+from datos.modelos.especialidades import ESPECIALIDADES_POR_INCIDENTE
+
+
+POLITICAS = ('marcar', 'recortar')
+
+
+class RangoCampo(NamedTuple):
+    """Rango válido de un campo numérico y su política por defecto."""
+    minimo: float
+    maximo: float
+    entero: bool
+    politica: str = 'marcar'
+
+
+# Rangos fisiológicamente posibles. Saturación y dolor son escalas acotadas:
+# un 105% de saturación es un error del oxímetro, no un paciente imposible.
+RANGOS: Dict[str, RangoCampo] = {
+    'edad': RangoCampo(0, 120, entero=True),
+    'presion_sistolica': RangoCampo(0, 300, entero=False),
+    'presion_diastolica': RangoCampo(0, 200, entero=False),
+    'frecuencia_cardiaca': RangoCampo(0, 300, entero=True),
+    'frecuencia_respiratoria': RangoCampo(0, 80, entero=True),
+    'temperatura': RangoCampo(25, 45, entero=False),
+    'saturacion_oxigeno': RangoCampo(0, 100, entero=False, politica='recortar'),
+    'nivel_dolor': RangoCampo(0, 10, entero=True, politica='recortar'),
+    'tiempo_desde_incidente': RangoCampo(0, 7 * 24 * 60, entero=True),  # Minutos
+}
+
+# Valores admitidos de los campos categóricos (ya normalizados)
+DOMINIOS: Dict[str, Iterable[str]] = {
+    'sexo': ('F', 'M'),
+    'tipo_incidente': tuple(ESPECIALIDADES_POR_INCIDENTE),
+}
+
+# Método de str aplicado antes de comparar con el dominio
+_NORMALIZAR = {
+    'sexo': 'upper',
+    'tipo_incidente': 'lower',
+}
+
+# Códigos de problema por campo (matriz de validar_lote)
+_OK, _FALTA, _TIPO, _FUERA, _DESCONOCIDO = range(5)
+
+
+class ResultadoValidacion(NamedTuple):
+    """
+    Resultado de validar_lote.
+
+    Attributes:
+        datos: Copia de la entrada con los campos validados limpios
+            (enteros como Int64, categorías normalizadas como string)
+        validos: Máscara (N,) de registros utilizables
+        recortados: Máscara (N,) de registros con algún valor recortado
+        errores: Motivo por registro (None si es válido)
+    """
+    datos: pd.DataFrame
+    validos: np.ndarray
+    recortados: np.ndarray
+    errores: pd.Series
+
+
+def _comprobar_politica(politica: Optional[str]) -> None:
+    """Rechaza la política antes de validar, haya o no valores fuera de rango."""
+    if politica is not None and politica not in POLITICAS:
+        raise ValueError(f"Política inválida: {politica} (opciones: {POLITICAS})")
+
+
+def _politica(campo: str, politica: Optional[str]) -> str:
+    """Política efectiva de un campo (la del llamador o la del campo)."""
+    return RANGOS[campo].politica if politica is None else politica
+
+
+def _mensaje(campo: str, codigo: int, valor: Any) -> str:
+    """Texto de un problema, el mismo en ambas variantes."""
+    if codigo == _FALTA:
+        return f"falta {campo}"
+    if codigo == _TIPO:
+        return f"{campo} no es numérico: {valor!r}"
+    if codigo == _FUERA:
+        # Como número: en un lote la columna puede venir como float (430.0)
+        rango = RANGOS[campo]
+        return (f"{campo} fuera de rango [{rango.minimo:g}, {rango.maximo:g}]: "
+                f"{float(valor):.10g}")
+    return f"{campo} desconocido: {valor!r}"
+
+
+def validar_lote(
+    df: pd.DataFrame,
+    politica: Optional[str] = None,
+    dominios: Optional[Dict[str, Iterable[str]]] = None
+) -> ResultadoValidacion:
+    """
+    Valida y limpia un lote de pacientes con operaciones por columna.
+
+    Args:
+        df: Una fila por paciente (las columnas extra se conservan)
+        politica: 'marcar' o 'recortar' para todos los campos; None usa la
+            de cada campo en RANGOS
+        dominios: Valores admitidos de sexo / tipo_incidente (default:
+            DOMINIOS; el predictor pasa las clases de sus encoders)
+
+    Returns:
+        ResultadoValidacion
+
+    Example:
+        >>> resultado = validar_lote(pd.read_csv('archivos_csv/emergencia_pacientes.csv'))
+        >>> int(resultado.recortados.sum())   # saturaciones > 100
+        185
+        >>> entrenamiento = resultado.datos[resultado.validos]
+    """
+    _comprobar_politica(politica)
+    dominios = {**DOMINIOS, **(dominios or {})}
+    campos = list(RANGOS) + list(dominios)
+    n = len(df)
+
+    datos = df.copy()
+    problemas = np.zeros((n, len(campos)), dtype=np.int8)
+    recortados = np.zeros(n, dtype=bool)
+
+    for j, (campo, rango) in enumerate(RANGOS.items()):
+        if campo not in df.columns:
+            problemas[:, j] = _FALTA
+            continue
+
+        original = df[campo]
+        valores = pd.to_numeric(original, errors='coerce').to_numpy(
+            dtype=np.float64, na_value=np.nan
+        )
+        faltante = original.isna().to_numpy()
+        problemas[faltante, j] = _FALTA
+        problemas[np.isnan(valores) & ~faltante, j] = _TIPO
+
+        if rango.entero:
+            valores = np.round(valores)
+        fuera = (valores < rango.minimo) | (valores > rango.maximo)
+
+        if _politica(campo, politica) == 'recortar':
+            valores = np.clip(valores, rango.minimo, rango.maximo)
+            recortados |= fuera
+        else:
+            problemas[fuera, j] = _FUERA
+
+        datos[campo] = pd.array(valores, dtype='Int64') if rango.entero else valores
+
+    for j, campo in enumerate(dominios, start=len(RANGOS)):
+        if campo not in df.columns:
+            problemas[:, j] = _FALTA
+            continue
+
+        valores = df[campo].astype('string').str.strip()
+        if campo in _NORMALIZAR:
+            valores = getattr(valores.str, _NORMALIZAR[campo])()
+
+        faltante = valores.isna().to_numpy()
+        desconocido = ~valores.isin(list(dominios[campo])).to_numpy() & ~faltante
+        problemas[faltante, j] = _FALTA
+        problemas[desconocido, j] = _DESCONOCIDO
+        datos[campo] = valores
+
+    validos = ~problemas.any(axis=1)
+
+    # Solo los registros inválidos arman texto
+    errores = pd.Series(None, index=df.index, dtype=object)
+    for i in np.flatnonzero(~validos):
+        errores.iloc[i] = "; ".join(
+            _mensaje(campos[j], problemas[i, j],
+                     df[campos[j]].iloc[i] if campos[j] in df.columns else None)
+            for j in np.flatnonzero(problemas[i])
+        )
+
+    return ResultadoValidacion(datos, validos, recortados & validos, errores)
+
+
+def validar_registro(
+    datos: Dict[str, Any],
+    politica: Optional[str] = None,
+    dominios: Optional[Dict[str, Iterable[str]]] = None
+) -> Dict[str, Any]:
+    """
+    Valida y limpia un paciente (mismas reglas que validar_lote).
+
+    Args:
+        datos: Datos del paciente (los campos extra se conservan)
+        politica: 'marcar' o 'recortar'; None usa la de cada campo
+        dominios: Valores admitidos de sexo / tipo_incidente
+
+    Returns:
+        Copia de datos con números coercionados (int / float), valores
+        recortados según la política y categorías normalizadas
+
+    Raises:
+        ValueError: Con todos los problemas encontrados
+
+    Example:
+        >>> validar_registro({..., 'saturacion_oxigeno': 101, 'sexo': ' m '})
+        {..., 'saturacion_oxigeno': 100.0, 'sexo': 'M'}
+        >>> validar_registro({..., 'edad': 430})
+        ValueError: Datos de paciente inválidos: edad fuera de rango [0, 120]: 430
+    """
+    _comprobar_politica(politica)
+    dominios = {**DOMINIOS, **(dominios or {})} if dominios else DOMINIOS
+    limpio = dict(datos)
+    problemas: List[str] = []
+
+    for campo, rango in RANGOS.items():
+        valor = datos.get(campo)
+        if valor is None:
+            problemas.append(_mensaje(campo, _FALTA, valor))
+            continue
+        try:
+            numero = float(valor)
+        except (TypeError, ValueError):
+            problemas.append(_mensaje(campo, _TIPO, valor))
+            continue
+        if numero != numero:
+            problemas.append(_mensaje(campo, _FALTA, valor))
+            continue
+
+        if rango.entero:
+            numero = float(round(numero))
+        if not rango.minimo <= numero <= rango.maximo:
+            if _politica(campo, politica) == 'recortar':
+                numero = float(min(max(numero, rango.minimo), rango.maximo))
+            else:
+                problemas.append(_mensaje(campo, _FUERA, valor))
+                continue
+
+        limpio[campo] = int(numero) if rango.entero else numero
+
+    for campo, admitidos in dominios.items():
+        valor = datos.get(campo)
+        if valor is None:
+            problemas.append(_mensaje(campo, _FALTA, valor))
+            continue
+
+        texto = str(valor).strip()
+        if campo in _NORMALIZAR:
+            texto = getattr(texto, _NORMALIZAR[campo])()
+        if texto not in admitidos:
+            problemas.append(_mensaje(campo, _DESCONOCIDO, valor))
+            continue
+
+        limpio[campo] = texto
+
+    if problemas:
+        raise ValueError(f"Datos de paciente inválidos: {'; '.join(problemas)}")
+
+    return limpio
@@ -0,0 +1,238 @@
+"""
+Dataset de imágenes de la CNN: split determinista y almacén de shards.
+Capa: DATOS
+Responsabilidad: Listar las imágenes de entrenamiento con un split estable y
+leer el almacén preprocesado (tensores 224x224 uint8 en shards .npy).
+Estándares: PEP 8, Type hints, Docstrings, SOLID
+
+Formato del almacén (lo escribe datos/scripts/preprocesar_imagenes.py):
+    directorio/
+        manifiesto.json          clases, tamaño, subsets, shards, rutas y
+                                 omitidas (imágenes que no se decodificaron)
+        etiquetas.npy            (N,) int64, índice de clase por imagen
+        shard_00000.npy          (imagenes_por_shard, 224, 224, 3) uint8
+        shard_00001.npy          ...
+
+    La imagen i está en el shard i // imagenes_por_shard, fila
+    i % imagenes_por_shard. Las imágenes de entrenamiento van primero y las
+    de validación después, así cada subset es un rango contiguo.
+
+No requiere TensorFlow ni PIL.
+"""
+
+from typing import Dict, Iterator, List, Optional, Tuple
+from pathlib import Path
+import hashlib
+import json
+import numpy as np
+
+
+ruta_raiz = Path(__file__).parent.parent.parent
+
+DATA_DIR = ruta_raiz / 'datos' / 'imagenes_entrenamiento'
+DIRECTORIO_ALMACEN = ruta_raiz / 'datos' / 'imagenes_preprocesadas'
+
+# Mismo split que ImageDataGenerator(validation_split=0.2)
+VALIDATION_SPLIT = 0.2
+EXTENSIONES = ('.jpg', '.jpeg', '.png', '.bmp')
+
+VERSION_ALMACEN = 1
+
+Split = List[Tuple[Path, int]]
+
+
+def listar_clases(data_dir: Path = DATA_DIR) -> List[str]:
+    """
+    Lista las clases en orden alfabético.
+
+    Ese orden es el índice de salida de la red (igual que flow_from_directory).
+
+    Args:
+        data_dir: Directorio con una subcarpeta por clase
+
+    Returns:
+        Nombres de clase ordenados
+    """
+    return sorted(d.name for d in data_dir.iterdir() if d.is_dir())
+
+
+def listar_split(data_dir: Path = DATA_DIR) -> Tuple[Split, Split]:
+    """
+    Reproduce el split de flow_from_directory de forma determinista.
+
+    Dentro de cada clase toma el primer 20% de los archivos ordenados por
+    nombre como validación; no depende de semillas ni del orden del sistema
+    de archivos.
+
+    Args:
+        data_dir: Directorio con una subcarpeta por clase
+
+    Returns:
+        Tupla (entrenamiento, validacion) con pares (ruta, indice_clase)
+    """
+    entrenamiento, validacion = [], []
+
+    for indice, clase in enumerate(listar_clases(data_dir)):
+        archivos = sorted(
+            p for p in (data_dir / clase).iterdir()
+            if p.suffix.lower() in EXTENSIONES
+        )
+        corte = int(VALIDATION_SPLIT * len(archivos))
+        validacion += [(p, indice) for p in archivos[:corte]]
+        entrenamiento += [(p, indice) for p in archivos[corte:]]
+
+    return entrenamiento, validacion
+
+
+def huella_split(pares: Split) -> str:
+    """
+    Resume un split (rutas, etiquetas, tamaños y mtimes) en un hash corto.
+
+    Sirve para nombrar cachés derivadas: si cambia una imagen o el split,
+    cambia la huella y la caché vieja deja de usarse.
+
+    Args:
+        pares: Split de listar_split()
+
+    Returns:
+        Hash hexadecimal de 12 caracteres
+    """
+    resumen = hashlib.blake2b(digest_size=6)
+    for ruta, indice in pares:
+        info = ruta.stat()
+        resumen.update(f"{ruta.name}|{indice}|{info.st_size}|{info.st_mtime_ns}\n".encode())
+    return resumen.hexdigest()
+
+
+class AlmacenImagenes:
+    """
+    Lector del almacén de imágenes preprocesadas.
+
+    Los shards se abren mapeados a memoria: leer un lote no decodifica
+    nada y solo toca las páginas de disco de esas filas.
+
+    Principios SOLID:
+    - SRP: Solo lee tensores y etiquetas del almacén
+    - OCP: Los consumidores (tf.data, NumPy) iteran lotes sin conocer el formato
+    """
+
+    def __init__(self, directorio: Path = DIRECTORIO_ALMACEN):
+        """
+        Abre el almacén.
+
+        Args:
+            directorio: Directorio con manifiesto.json
+
+        Raises:
+            FileNotFoundError: Si no existe el manifiesto
+            ValueError: Si la versión del formato no es compatible
+        """
+        self.directorio = Path(directorio)
+        self.manifiesto: Dict = json.loads(
+            (self.directorio / 'manifiesto.json').read_text(encoding='utf-8')
+        )
+        if self.manifiesto['version'] != VERSION_ALMACEN:
+            raise ValueError(
+                f"Versión de almacén {self.manifiesto['version']} no soportada "
+                f"(esperada {VERSION_ALMACEN})"
+            )
+
+        self.clases: List[str] = self.manifiesto['clases']
+        self.imagenes_por_shard: int = self.manifiesto['imagenes_por_shard']
+        self.etiquetas: np.ndarray = np.load(self.directorio / 'etiquetas.npy')
+        self._shards: List[Optional[np.ndarray]] = [None] * len(self.manifiesto['shards'])
+
+    def __len__(self) -> int:
+        """Cantidad total de imágenes."""
+        return self.manifiesto['total']
+
+    @property
+    def rutas(self) -> List[str]:
+        """Ruta de origen de cada imagen, relativa a data_dir."""
+        return self.manifiesto['rutas']
+
+    def rango(self, subset: str) -> Tuple[int, int]:
+        """
+        Rango [inicio, fin) de un subset.
+
+        Args:
+            subset: 'entrenamiento' o 'validacion'
+
+        Returns:
+            Tupla (inicio, fin)
+        """
+        inicio, fin = self.manifiesto['subsets'][subset]
+        return inicio, fin
+
+    def _shard(self, numero: int) -> np.ndarray:
+        """Abre (una vez) el shard mapeado a memoria."""
+        shard = self._shards[numero]
+        if shard is None:
+            shard = np.load(
+                self.directorio / self.manifiesto['shards'][numero],
+                mmap_mode='r'
+            )
+            self._shards[numero] = shard
+        return shard
+
+    def obtener(self, indice: int) -> Tuple[np.ndarray, int]:
+        """
+        Obtiene una imagen y su etiqueta.
+
+        Args:
+            indice: Índice global de la imagen
+
+        Returns:
+            Tupla (imagen (224, 224, 3) uint8, indice_clase)
+        """
+        numero, fila = divmod(indice, self.imagenes_por_shard)
+        return self._shard(numero)[fila], int(self.etiquetas[indice])
+
+    def leer(self, indices: np.ndarray) -> np.ndarray:
+        """
+        Lee varias imágenes en un array contiguo.
+
+        Args:
+            indices: Índices globales (cualquier orden)
+
+        Returns:
+            Array (len(indices), 224, 224, 3) uint8
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        salida = np.empty((len(indices), *self.manifiesto['forma_imagen']), dtype=np.uint8)
+        numeros, filas = np.divmod(indices, self.imagenes_por_shard)
+        # Agrupar por shard: una lectura con fancy indexing por shard
+        for numero in np.unique(numeros):
+            mascara = numeros == numero
+            salida[mascara] = self._shard(int(numero))[filas[mascara]]
+        return salida
+
+    def iterar_lotes(
+        self,
+        subset: str,
+        batch_size: int = 32,
+        barajar: bool = False,
+        semilla: int = 42
+    ) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Recorre un subset en lotes.
+
+        Sin barajar, los lotes son lecturas secuenciales de los shards.
+
+        Args:
+            subset: 'entrenamiento' o 'validacion'
+            batch_size: Imágenes por lote
+            barajar: Orden aleatorio
+            semilla: Semilla del orden aleatorio (p.ej. semilla base + época)
+
+        Yields:
+            Tuplas (imagenes (n, 224, 224, 3) uint8, etiquetas (n,) int64)
+        """
+        inicio, fin = self.rango(subset)
+        indices = np.arange(inicio, fin)
+        if barajar:
+            np.random.default_rng(semilla).shuffle(indices)
+
+        for desde in range(0, len(indices), batch_size):
+            lote = indices[desde:desde + batch_size]
+            yield self.leer(lote), self.etiquetas[lote]
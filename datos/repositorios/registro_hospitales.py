@@ -0,0 +1,304 @@
+"""
+Registro columnar de hospitales en memoria.
+Capa: DATOS
+Responsabilidad: Mantener una copia compacta de la colección hospitales
+como arrays NumPy (una columna por atributo) para filtrar, medir distancias
+y elegir el TOP N sin recorrer documentos dict por dict.
+Estándares: PEP 8, Type hints, Docstrings, SOLID
+
+Solo los hospitales ganadores se materializan de nuevo como dict.
+"""
+
+from typing import Dict, List, Optional, Any
+import os
+import threading
+import time
+import numpy as np
+
+from datos.modelos.especialidades import (
+    codificar_especialidades,
+    decodificar_especialidades,
+)
+from datos.repositorios.repositorio_hospitales import RepositorioHospitales
+
+
+# Valor de la columna cluster para hospitales sin cluster asignado
+SIN_CLUSTER = -1
+
+
+class ColumnasHospitales:
+    """
+    Instantánea inmutable de todos los hospitales en formato columnar.
+
+    La fila i de cada array corresponde al mismo hospital; indice traduce
+    hospital_id → fila.
+    """
+
+    __slots__ = (
+        'hospital_id', 'nombre', 'nivel',
+        'latitud', 'longitud',
+        'capacidad_actual', 'capacidad_maxima',
+        'tiempo_atencion_promedio', 'tasa_exito',
+        'cluster', 'especialidades', 'indice', 'indice_especialidades'
+    )
+
+    def __init__(self, documentos: List[Dict[str, Any]]):
+        """
+        Construye las columnas a partir de documentos de MongoDB.
+
+        Args:
+            documentos: Hospitales con el formato de HospitalSchema
+        """
+        self.hospital_id = np.array(
+            [d['hospital_id'] for d in documentos], dtype=object
+        )
+        self.nombre = np.array([d['nombre'] for d in documentos], dtype=object)
+        self.nivel = np.array([d['nivel'] for d in documentos], dtype=object)
+
+        self.latitud = np.array(
+            [d['ubicacion']['latitud'] for d in documentos], dtype=np.float64
+        )
+        self.longitud = np.array(
+            [d['ubicacion']['longitud'] for d in documentos], dtype=np.float64
+        )
+
+        self.capacidad_actual = np.array(
+            [d['capacidad']['actual'] for d in documentos], dtype=np.int32
+        )
+        self.capacidad_maxima = np.array(
+            [d['capacidad']['maxima'] for d in documentos], dtype=np.int32
+        )
+
+        # float64: materializar() devuelve los mismos valores que MongoDB
+        # (en float32, una tasa de 0.9 vuelve como 0.8999999761581421)
+        metricas = [d.get('metricas', {}) for d in documentos]
+        self.tiempo_atencion_promedio = np.array(
+            [m.get('tiempo_atencion_promedio', np.nan) for m in metricas],
+            dtype=np.float64
+        )
+        self.tasa_exito = np.array(
+            [m.get('tasa_exito', np.nan) for m in metricas], dtype=np.float64
+        )
+
+        self.cluster = np.array([
+            SIN_CLUSTER if d.get('cluster') is None else d['cluster']
+            for d in documentos
+        ], dtype=np.int16)
+        self.especialidades = np.array([
+            codificar_especialidades(d.get('especialidades', {}))
+            for d in documentos
+        ], dtype=np.uint16)
+
+        self.indice: Dict[str, int] = {
+            hospital_id: fila for fila, hospital_id in enumerate(self.hospital_id)
+        }
+
+        # Índice invertido: combinación exacta de especialidades → filas.
+        # Hay a lo sumo 2^8 combinaciones, muchas menos que hospitales.
+        mascaras, inverso = np.unique(self.especialidades, return_inverse=True)
+        self.indice_especialidades: Dict[int, np.ndarray] = {
+            int(mascara): np.nonzero(inverso == i)[0]
+            for i, mascara in enumerate(mascaras)
+        }
+
+        for columna in self.__slots__[:-2]:
+            getattr(self, columna).flags.writeable = False
+
+    def __len__(self) -> int:
+        """Cantidad de hospitales en la instantánea."""
+        return len(self.hospital_id)
+
+    @property
+    def coordenadas(self) -> np.ndarray:
+        """Array (H, 2) con [latitud, longitud]."""
+        return np.column_stack([self.latitud, self.longitud])
+
+    @property
+    def camas_libres(self) -> np.ndarray:
+        """Array (H,) con capacidad.maxima - capacidad.actual."""
+        return self.capacidad_maxima - self.capacidad_actual
+
+    def disponibles(self) -> np.ndarray:
+        """Máscara booleana de hospitales con capacidad disponible."""
+        return self.capacidad_actual < self.capacidad_maxima
+
+    def cumplen_especialidades(self, requerida: int) -> np.ndarray:
+        """
+        Máscara booleana de hospitales que tienen todas las especialidades.
+
+        Args:
+            requerida: Máscara de especialidades requeridas
+
+        Returns:
+            Array (H,) booleano
+
+        Example:
+            >>> tabla.cumplen_especialidades(mascara_de(['quemados', 'trauma']))
+            array([False, True, ...])
+        """
+        return (self.especialidades & requerida) == requerida
+
+    def filas_con_especialidades(self, requerida: int) -> np.ndarray:
+        """
+        Filas de hospitales con todas las especialidades, vía índice invertido.
+
+        Args:
+            requerida: Máscara de especialidades requeridas
+
+        Returns:
+            Array ordenado de filas
+        """
+        partes = [
+            filas for mascara, filas in self.indice_especialidades.items()
+            if mascara & requerida == requerida
+        ]
+        if not partes:
+            return np.empty(0, dtype=np.int64)
+        return np.sort(np.concatenate(partes))
+
+    def coincidencias_preferidas(self, preferida: int) -> np.ndarray:
+        """
+        Cantidad de especialidades preferidas que tiene cada hospital.
+
+        Args:
+            preferida: Máscara de especialidades preferidas
+
+        Returns:
+            Array (H,) con el conteo de bits en común
+        """
+        return np.bitwise_count(self.especialidades & preferida)
+
+    def disponibilidad_porcentaje(self, filas: np.ndarray) -> np.ndarray:
+        """
+        Porcentaje de camas libres de las filas indicadas.
+
+        Args:
+            filas: Índices de fila
+
+        Returns:
+            Array con la disponibilidad redondeada a un decimal
+        """
+        maxima = self.capacidad_maxima[filas].astype(np.float64)
+        libres = maxima - self.capacidad_actual[filas]
+        return np.round(libres / maxima * 100, 1)
+
+    def materializar(self, fila: int, **extra: Any) -> Dict[str, Any]:
+        """
+        Reconstruye el documento dict de un hospital.
+
+        Args:
+            fila: Fila del hospital
+            **extra: Campos calculados a agregar (ej: distancia_km)
+
+        Returns:
+            Dict con el mismo formato que HospitalSchema más los extras
+
+        Example:
+            >>> tabla.materializar(0, distancia_km=2.3)['hospital_id']
+            'HOSP001'
+        """
+        cluster = int(self.cluster[fila])
+        return {
+            'hospital_id': self.hospital_id[fila],
+            'nombre': self.nombre[fila],
+            'ubicacion': {
+                'latitud': float(self.latitud[fila]),
+                'longitud': float(self.longitud[fila])
+            },
+            'capacidad': {
+                'actual': int(self.capacidad_actual[fila]),
+                'maxima': int(self.capacidad_maxima[fila])
+            },
+            'metricas': {
+                'tiempo_atencion_promedio': float(
+                    self.tiempo_atencion_promedio[fila]
+                ),
+                'tasa_exito': float(self.tasa_exito[fila])
+            },
+            'nivel': self.nivel[fila],
+            'especialidades': decodificar_especialidades(
+                int(self.especialidades[fila])
+            ),
+            'cluster': None if cluster == SIN_CLUSTER else cluster,
+            **extra
+        }
+
+
+class RegistroHospitales:
+    """
+    Caché en memoria de la colección hospitales en formato columnar.
+
+    La instantánea se recarga desde MongoDB cuando vence su TTL o cuando
+    se invalida explícitamente (ej: tras actualizar clusters). El reemplazo
+    es atómico: quien ya obtuvo una instantánea la sigue usando completa.
+
+    Principios SOLID:
+    - SRP: Solo mantiene la copia columnar de hospitales
+    - DIP: Depende de RepositorioHospitales, no de MongoDB directamente
+    """
+
+    def __init__(
+        self,
+        repositorio: RepositorioHospitales,
+        ttl_segundos: Optional[float] = None
+    ):
+        """
+        Inicializa el registro (la primera carga es perezosa).
+
+        Args:
+            repositorio: Repositorio de hospitales
+            ttl_segundos: Vigencia de la instantánea
+                (default: REGISTRO_HOSPITALES_TTL o 10 segundos)
+        """
+        self.repositorio = repositorio
+        if ttl_segundos is None:
+            ttl_segundos = float(os.getenv('REGISTRO_HOSPITALES_TTL', 10))
+        self.ttl_segundos = ttl_segundos
+
+        self._tabla: Optional[ColumnasHospitales] = None
+        self._cargado_en = float('-inf')
+        self._lock = threading.Lock()
+
+    def obtener(self) -> ColumnasHospitales:
+        """
+        Obtiene la instantánea vigente, recargándola si venció.
+
+        Returns:
+            ColumnasHospitales
+
+        Example:
+            >>> tabla = registro.obtener()
+            >>> len(tabla)
+            30
+        """
+        if self._vigente():
+            return self._tabla
+
+        with self._lock:
+            # Otro hilo pudo recargar mientras esperábamos
+            if not self._vigente():
+                self.recargar()
+            return self._tabla
+
+    def recargar(self) -> ColumnasHospitales:
+        """
+        Lee todos los hospitales de MongoDB y reemplaza la instantánea.
+
+        Returns:
+            La nueva instantánea
+        """
+        tabla = ColumnasHospitales(self.repositorio.obtener_todos())
+        self._tabla = tabla
+        self._cargado_en = time.monotonic()
+        return tabla
+
+    def invalidar(self) -> None:
+        """Fuerza la recarga en la próxima llamada a obtener()."""
+        self._cargado_en = float('-inf')
+
+    def _vigente(self) -> bool:
+        """True si hay instantánea y no venció su TTL."""
+        return (
+            self._tabla is not None
+            and time.monotonic() - self._cargado_en < self.ttl_segundos
+        )
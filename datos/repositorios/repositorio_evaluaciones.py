@@ -0,0 +1,86 @@
+"""
+Repositorio para evaluaciones progresivas en MongoDB.
+Capa: DATOS
+Responsabilidad: Persistir y consultar evaluaciones por evaluacion_id.
+Estándares: PEP 8, Type hints, Docstrings, SOLID
+"""
+
+from typing import Dict, Optional, Any
+from pymongo.database import Database
+from pymongo.collection import Collection
+
+
+class RepositorioEvaluaciones:
+    """
+    Repositorio para operaciones de evaluaciones en MongoDB.
+
+    Cada documento guarda el resultado preliminar (signos vitales) y,
+    cuando llega, el final (fusión con la CNN).
+
+    Principios SOLID:
+    - SRP: Solo maneja datos de evaluaciones
+    - DIP: Depende de abstracción Database
+    """
+
+    def __init__(self, base_datos: Database):
+        """
+        Inicializa repositorio con conexión a MongoDB.
+
+        Args:
+            base_datos: Instancia de MongoDB Database
+        """
+        self.db: Database = base_datos
+        self.coleccion: Collection = self.db["evaluaciones"]
+
+    def crear_indices(self) -> None:
+        """Crea el índice único por evaluacion_id (idempotente)."""
+        self.coleccion.create_index("evaluacion_id", unique=True)
+
+    def guardar(self, evaluacion: Dict[str, Any]) -> None:
+        """
+        Inserta o reemplaza una evaluación completa.
+
+        Args:
+            evaluacion: Documento con evaluacion_id
+        """
+        self.coleccion.replace_one(
+            {"evaluacion_id": evaluacion["evaluacion_id"]},
+            evaluacion,
+            upsert=True
+        )
+
+    def completar(self, evaluacion_id: str, campos: Dict[str, Any]) -> None:
+        """
+        Actualiza solo los campos de cierre de una evaluación.
+
+        El resto del documento (preliminar, datos_paciente, creado_en) no se
+        toca, aunque quien completa ya no lo tenga en memoria.
+
+        Args:
+            evaluacion_id: ID de la evaluación
+            campos: Campos a fijar (estado, completado_en, resultado)
+        """
+        self.coleccion.update_one(
+            {"evaluacion_id": evaluacion_id},
+            {"$set": campos},
+            upsert=True
+        )
+
+    def obtener_por_id(self, evaluacion_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Obtiene una evaluación por su ID.
+
+        Args:
+            evaluacion_id: ID devuelto al iniciar la evaluación
+
+        Returns:
+            Documento de la evaluación o None si no existe
+
+        Example:
+            >>> repo.obtener_por_id("9f2c...")['estado']
+            'completa'
+        """
+        return self.coleccion.find_one(
+            {"evaluacion_id": evaluacion_id},
+            {"_id": 0}
+        )
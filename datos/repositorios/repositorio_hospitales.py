@@ -6,6 +6,7 @@ Estándares: PEP 8, Type hints, Docstrings, SOLID
 """
 
 from typing import List, Dict, Optional, Any
+from pymongo import UpdateOne
 from pymongo.database import Database
 from pymongo.collection import Collection
 
@@ -161,11 +162,30 @@ class RepositorioHospitales:
             >>> actualizados
             2
         """
-        actualizados = 0
-        for hospital_id, cluster in clusters_map.items():
-            if self.actualizar_cluster(hospital_id, cluster):
-                actualizados += 1
-        return actualizados
+        if not clusters_map:
+            return 0
+
+        # Una sola ida y vuelta a MongoDB para todo el lote
+        operaciones = [
+            UpdateOne({"hospital_id": hospital_id}, {"$set": {"cluster": cluster}})
+            for hospital_id, cluster in clusters_map.items()
+        ]
+        resultado = self.coleccion.bulk_write(operaciones, ordered=False)
+        return resultado.modified_count
+
+    def obtener_sin_cluster(self) -> List[Dict[str, Any]]:
+        """
+        Obtiene hospitales que todavía no tienen cluster asignado.
+
+        Returns:
+            Lista de hospitales con cluster None o sin el campo
+
+        Example:
+            >>> pendientes = repo.obtener_sin_cluster()
+            >>> all(h.get('cluster') is None for h in pendientes)
+            True
+        """
+        return list(self.coleccion.find({"cluster": None}, {"_id": 0}))
 
     def contar_por_cluster(self) -> Dict[int, int]:
         """
@@ -0,0 +1,248 @@
+"""
+Repositorio de tablas de entrenamiento en Parquet.
+Capa: DATOS
+Responsabilidad: Leer emergencia_pacientes y hospitales con tipos fijos y
+proyección de columnas, y generarlas desde los CSV o desde MongoDB.
+Estándares: PEP 8, Type hints, Docstrings, SOLID
+
+Cada tabla es archivos_parquet/<nombre>.parquet. Si el CSV de
+archivos_csv/ es más nuevo que el Parquet, el Parquet no existe o no salió
+de un CSV (metadato origen), leer() lo regenera antes de leer: el CSV sigue
+siendo la fuente editable.
+
+Las exportaciones de MongoDB van a <nombre>_mongo.parquet y nunca
+reemplazan a la tabla de entrenamiento: los pacientes de MongoDB no tienen
+etiquetas.
+"""
+
+from typing import Any, Dict, List, Optional
+from pathlib import Path
+from datetime import datetime, timezone
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+from pymongo.database import Database
+
+from datos.modelos.esquemas_tablas import COLECCIONES, ESQUEMAS, esquema_plano
+from datos.modelos.schemas import PacienteSchema
+
+
+ruta_raiz = Path(__file__).parent.parent.parent
+
+DIRECTORIO_CSV = ruta_raiz / 'archivos_csv'
+DIRECTORIO_PARQUET = ruta_raiz / 'archivos_parquet'
+
+
+def _fila_paciente(documento: Dict[str, Any]) -> Dict[str, Any]:
+    """Documento de pacientes → fila de emergencia_pacientes (sin etiquetas)."""
+    return {
+        **PacienteSchema.a_datos_prediccion(documento),
+        'tiene_seguro': documento.get('tiene_seguro'),
+        'timestamp': documento.get('timestamp'),
+        'severidad': None,
+        'decision': None
+    }
+
+
+def _fila_hospital(documento: Dict[str, Any]) -> Dict[str, Any]:
+    """Documento de hospitales → fila de hospitales (formato del CSV)."""
+    ubicacion = documento.get('ubicacion') or {}
+    capacidad = documento.get('capacidad') or {}
+    metricas = documento.get('metricas') or {}
+    especialidades = documento.get('especialidades') or {}
+    return {
+        'hospital_id': documento.get('hospital_id'),
+        'nombre': documento.get('nombre'),
+        'latitud': ubicacion.get('latitud'),
+        'longitud': ubicacion.get('longitud'),
+        'capacidad_actual': capacidad.get('actual'),
+        'capacidad_maxima': capacidad.get('maxima'),
+        'tiempo_atencion_promedio': metricas.get('tiempo_atencion_promedio'),
+        'tasa_exito': metricas.get('tasa_exito'),
+        'nivel': documento.get('nivel'),
+        'especialidades': ','.join(
+            nombre for nombre, tiene in especialidades.items() if tiene
+        )
+    }
+
+
+_CONVERTIDORES_MONGO = {
+    'emergencia_pacientes': _fila_paciente,
+    'hospitales': _fila_hospital,
+}
+
+
+class RepositorioTablas:
+    """
+    Repositorio de tablas tipadas en Parquet.
+
+    Principios SOLID:
+    - SRP: Solo lee y genera las tablas de entrenamiento
+    - OCP: Una tabla nueva es un esquema más en ESQUEMAS
+    """
+
+    def __init__(
+        self,
+        directorio: Path = DIRECTORIO_PARQUET,
+        directorio_csv: Path = DIRECTORIO_CSV
+    ):
+        """
+        Inicializa el repositorio.
+
+        Args:
+            directorio: Directorio de los .parquet
+            directorio_csv: Directorio de los CSV de origen
+        """
+        self.directorio = Path(directorio)
+        self.directorio_csv = Path(directorio_csv)
+
+    def ruta(self, nombre: str) -> Path:
+        """
+        Ruta del Parquet de una tabla.
+
+        Raises:
+            ValueError: Si la tabla no tiene esquema
+        """
+        if nombre not in ESQUEMAS:
+            raise ValueError(f"Tabla desconocida: {nombre} (opciones: {list(ESQUEMAS)})")
+        return self.directorio / f"{nombre}.parquet"
+
+    def ruta_mongo(self, nombre: str) -> Path:
+        """
+        Ruta de la exportación desde MongoDB de una tabla.
+
+        Raises:
+            ValueError: Si la tabla no tiene esquema
+        """
+        return self.ruta(nombre).with_name(f"{nombre}_mongo.parquet")
+
+    def leer(
+        self,
+        nombre: str,
+        columnas: Optional[List[str]] = None,
+        filtros: Optional[List[tuple]] = None
+    ) -> pd.DataFrame:
+        """
+        Lee una tabla, solo con las columnas pedidas.
+
+        Args:
+            nombre: 'emergencia_pacientes' o 'hospitales'
+            columnas: Columnas a leer (None = todas); las demás ni se
+                descomprimen
+            filtros: Filtros de pyarrow, p.ej. [('severidad', '==', 'critico')]
+
+        Returns:
+            DataFrame con los tipos del esquema (diccionarios como category)
+
+        Raises:
+            FileNotFoundError: Si no hay Parquet ni CSV de la tabla
+
+        Example:
+            >>> tablas = RepositorioTablas()
+            >>> df = tablas.leer('emergencia_pacientes', columnas=['edad', 'severidad'])
+            >>> df.dtypes.tolist()
+            [dtype('int16'), CategoricalDtype(categories=['alto', 'bajo', ...])]
+        """
+        ruta = self.ruta(nombre)
+        ruta_csv = self.directorio_csv / f"{nombre}.csv"
+
+        desactualizado = ruta_csv.exists() and (
+            not ruta.exists()
+            or ruta_csv.stat().st_mtime_ns > ruta.stat().st_mtime_ns
+            or not self.origen(ruta).startswith('csv:')
+        )
+        if desactualizado:
+            self.desde_csv(nombre)
+        elif not ruta.exists():
+            raise FileNotFoundError(f"No existe {ruta} ni {ruta_csv}")
+
+        return pq.read_table(ruta, columns=columnas, filters=filtros).to_pandas()
+
+    @staticmethod
+    def origen(ruta: Path) -> str:
+        """
+        Origen registrado en un Parquet ('csv:<archivo>', 'mongo:<colección>').
+
+        Args:
+            ruta: Parquet escrito por este repositorio
+
+        Returns:
+            Origen, o '' si el archivo no lo tiene
+        """
+        metadatos = pq.read_schema(ruta).metadata or {}
+        return metadatos.get(b'origen', b'').decode()
+
+    def desde_csv(self, nombre: str, ruta_csv: Optional[Path] = None) -> Path:
+        """
+        Convierte el CSV de una tabla a Parquet con su esquema.
+
+        Args:
+            nombre: Nombre de la tabla
+            ruta_csv: CSV de origen (default: archivos_csv/<nombre>.csv)
+
+        Returns:
+            Ruta del Parquet escrito
+
+        Raises:
+            pyarrow.ArrowInvalid: Si algún valor no respeta el esquema
+        """
+        esquema = ESQUEMAS[nombre]
+        ruta_csv = Path(ruta_csv or self.directorio_csv / f"{nombre}.csv")
+        plano = esquema_plano(esquema)
+
+        tabla = pa_csv.read_csv(
+            ruta_csv,
+            convert_options=pa_csv.ConvertOptions(
+                column_types=dict(zip(plano.names, plano.types)),
+                include_columns=plano.names,
+                # Celda vacía = nulo, como en pandas.read_csv (una etiqueta
+                # faltante no debe llegar como la categoría '')
+                strings_can_be_null=True
+            )
+        )
+        return self._escribir(
+            self.ruta(nombre), tabla.cast(esquema), f"csv:{ruta_csv.name}"
+        )
+
+    def desde_mongo(self, nombre: str, base_datos: Database, lote: int = 10000) -> Path:
+        """
+        Exporta la colección de una tabla a Parquet con su esquema.
+
+        Los campos que la colección no tiene (las etiquetas severidad y
+        decision de los pacientes) quedan nulos, por eso se escribe en
+        ruta_mongo() y no en la tabla que lee leer().
+
+        Args:
+            nombre: Nombre de la tabla
+            base_datos: Instancia de MongoDB Database
+            lote: Documentos por lote del cursor
+
+        Returns:
+            Ruta del Parquet escrito (<nombre>_mongo.parquet)
+        """
+        esquema = ESQUEMAS[nombre]
+        convertir = _CONVERTIDORES_MONGO[nombre]
+        plano = esquema_plano(esquema)
+
+        cursor = base_datos[COLECCIONES[nombre]].find({}, {'_id': 0}).batch_size(lote)
+        tabla = pa.Table.from_pylist([convertir(d) for d in cursor], schema=plano)
+        return self._escribir(
+            self.ruta_mongo(nombre), tabla.cast(esquema), f"mongo:{COLECCIONES[nombre]}"
+        )
+
+    def _escribir(self, ruta: Path, tabla: pa.Table, origen: str) -> Path:
+        """Escribe la tabla (zstd) reemplazando el archivo de una vez."""
+        ruta.parent.mkdir(parents=True, exist_ok=True)
+        tabla = tabla.replace_schema_metadata({
+            **(tabla.schema.metadata or {}),
+            b'origen': origen.encode(),
+            b'convertido_en': datetime.now(timezone.utc).isoformat().encode()
+        })
+
+        temporal = ruta.with_name(f".{ruta.name}.tmp")
+        pq.write_table(tabla, temporal, compression='zstd')
+        os.replace(temporal, ruta)
+        return ruta
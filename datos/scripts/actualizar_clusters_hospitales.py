@@ -49,7 +49,11 @@ def actualizar_clusters() -> None:
         print("   Ejecuta el notebook entrenar_kmeans.ipynb primero.")
         return
 
-    df = pd.read_csv(ruta_csv)
+    df = pd.read_csv(
+        ruta_csv,
+        usecols=['hospital_id', 'cluster'],
+        dtype={'hospital_id': 'string', 'cluster': 'int64'}
+    )
     print(f"   # Leidos {len(df)} hospitales")
 
     # 3. Preparar mapeo hospital_id -> cluster
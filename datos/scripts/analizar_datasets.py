@@ -1,41 +1,187 @@
 """
 Script para analizar los datasets descargados.
 Muestra estadísticas y estructura de ambos datasets.
+
+Las estadísticas salen de un manifiesto persistente (una fila por imagen:
+ruta, tamaño, mtime, hash, etiqueta y severidad). Cada corrida recorre los
+directorios con os.scandir en paralelo y solo vuelve a leer (hash y .txt)
+las imágenes cuyo tamaño o mtime cambió; el resto se calcula con pandas.
+
+Uso:
+    python datos/scripts/analizar_datasets.py
+    python datos/scripts/analizar_datasets.py --forzar   # rehacer manifiesto
+
+Outputs:
+    - datos/imagenes_raw/manifiesto_datasets.csv
 """
 
+import sys
+import os
+import time
+import argparse
 from pathlib import Path
-from collections import Counter
-
-def analizar_skin_burn():
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+
+# Agregar ruta raíz al path
+ruta_raiz = Path(__file__).parent.parent.parent
+sys.path.append(str(ruta_raiz))
+
+import numpy as np
+import pandas as pd
+
+from datos.scripts.organizar_imagenes import (
+    DIRECTORIO_RAW,
+    MAPEO_SKIN_BURN,
+    MAPEO_WOUND,
+    SEVERIDADES,
+    leer_clase_skin_burn,
+)
+from datos.scripts.utilidades_archivos import escanear_arbol, hash_archivo
+
+
+RUTA_MANIFIESTO = DIRECTORIO_RAW / 'manifiesto_datasets.csv'
+EXTENSIONES_IMAGEN = ('.jpg', '.jpeg', '.png', '.bmp')
+
+COLUMNAS = [
+    'ruta', 'dataset', 'categoria', 'tamano', 'mtime_ns',
+    'mtime_etiqueta_ns', 'hash', 'clase', 'severidad'
+]
+
+
+def _leer_imagen(ruta: Path, con_etiqueta: bool) -> Tuple[str, Optional[int]]:
+    """Hash de contenido y clase del .txt (si corresponde) de una imagen."""
+    clase = leer_clase_skin_burn(ruta) if con_etiqueta else None
+    return hash_archivo(ruta), clase
+
+
+def actualizar_manifiesto(
+    origen: Path = DIRECTORIO_RAW,
+    ruta_manifiesto: Path = RUTA_MANIFIESTO,
+    hilos: Optional[int] = None,
+    forzar: bool = False
+) -> pd.DataFrame:
+    """
+    Escanea los datasets y actualiza el manifiesto de forma incremental.
+
+    Una imagen se vuelve a leer solo si es nueva o cambió su tamaño, su
+    mtime o el mtime de su .txt; las demás conservan hash y clase.
+
+    Args:
+        origen: Directorio de datasets raw
+        ruta_manifiesto: Archivo CSV del manifiesto
+        hilos: Hilos de E/S (default: 4 por CPU, máx. 32)
+        forzar: Ignorar el manifiesto anterior
+
+    Returns:
+        DataFrame con una fila por imagen (columnas de COLUMNAS)
+
+    Example:
+        >>> manifiesto = actualizar_manifiesto()
+        >>> manifiesto.groupby('severidad').size()['critico']
+        885
+    """
+    hilos = hilos or min(32, 4 * (os.cpu_count() or 1))
+
+    archivos = pd.DataFrame(
+        escanear_arbol(origen, EXTENSIONES_IMAGEN + ('.txt',), hilos),
+        columns=['ruta', 'tamano', 'mtime_ns']
+    )
+    extension = archivos['ruta'].str.extract(r'(\.[^./]+)$', expand=False).str.lower()
+    sin_extension = archivos['ruta'].str.replace(r'\.[^./]+$', '', regex=True)
+
+    es_txt = extension == '.txt'
+    mtime_txt = pd.Series(
+        archivos.loc[es_txt, 'mtime_ns'].to_numpy(), index=sin_extension[es_txt],
+        dtype='Int64'
+    )
+
+    manifiesto = archivos[~es_txt].copy()
+    partes = manifiesto['ruta'].str.split('/')
+    manifiesto['dataset'] = partes.str[0]
+    manifiesto['categoria'] = np.where(
+        manifiesto['dataset'] == 'skin_burn', 'skin_burn', partes.str[-2]
+    )
+    # Solo Skin Burn tiene etiqueta .txt
+    manifiesto['mtime_etiqueta_ns'] = sin_extension[~es_txt].map(mtime_txt).where(
+        manifiesto['dataset'] == 'skin_burn'
+    )
+
+    # Reutilizar hash y clase de lo que no cambió
+    previo = None
+    if ruta_manifiesto.exists() and not forzar:
+        previo = pd.read_csv(
+            ruta_manifiesto,
+            usecols=['ruta', 'tamano', 'mtime_ns', 'mtime_etiqueta_ns', 'hash', 'clase'],
+            dtype={'mtime_etiqueta_ns': 'Int64', 'clase': 'Int64'}
+        )
+    if previo is not None:
+        manifiesto = manifiesto.merge(
+            previo, on='ruta', how='left', suffixes=('', '_previo')
+        )
+        sin_cambios = (
+            (manifiesto['tamano'] == manifiesto['tamano_previo'])
+            & (manifiesto['mtime_ns'] == manifiesto['mtime_ns_previo'])
+            & (manifiesto['mtime_etiqueta_ns'].fillna(-1)
+               == manifiesto['mtime_etiqueta_ns_previo'].fillna(-1))
+        ).fillna(False).astype(bool)
+        manifiesto = manifiesto.drop(columns=[
+            'tamano_previo', 'mtime_ns_previo', 'mtime_etiqueta_ns_previo'
+        ])
+    else:
+        sin_cambios = pd.Series(False, index=manifiesto.index)
+        manifiesto['hash'] = None
+        manifiesto['clase'] = pd.array([pd.NA] * len(manifiesto), dtype='Int64')
+
+    a_leer = manifiesto.index[~sin_cambios]
+    if len(a_leer):
+        rutas = [origen / r for r in manifiesto.loc[a_leer, 'ruta']]
+        con_etiqueta = (manifiesto.loc[a_leer, 'dataset'] == 'skin_burn').tolist()
+        with ThreadPoolExecutor(max_workers=hilos) as ejecutor:
+            leidos = list(ejecutor.map(_leer_imagen, rutas, con_etiqueta))
+        manifiesto['hash'] = manifiesto['hash'].astype(object)
+        manifiesto.loc[a_leer, 'hash'] = [h for h, _ in leidos]
+        manifiesto.loc[a_leer, 'clase'] = pd.array(
+            [c for _, c in leidos], dtype='Int64'
+        )
+
+    manifiesto['severidad'] = np.where(
+        manifiesto['dataset'] == 'skin_burn',
+        manifiesto['clase'].map(MAPEO_SKIN_BURN),
+        manifiesto['categoria'].map(MAPEO_WOUND)
+    )
+    manifiesto = manifiesto[COLUMNAS].reset_index(drop=True)
+
+    temporal = ruta_manifiesto.with_name(f".{ruta_manifiesto.name}.tmp")
+    manifiesto.to_csv(temporal, index=False)
+    os.replace(temporal, ruta_manifiesto)
+
+    print(f"Manifiesto: {len(manifiesto)} imágenes, {len(a_leer)} leídas "
+          f"({len(manifiesto) - len(a_leer)} sin cambios)")
+
+    return manifiesto
+
+
+def analizar_skin_burn(manifiesto: pd.DataFrame) -> Dict[int, int]:
     """Analiza el dataset de quemaduras."""
     print("=" * 60)
     print("SKIN BURN DATASET")
     print("=" * 60)
 
-    skin_burn_path = Path('datos/imagenes_raw/skin_burn')
-
-    # Contar imágenes
-    imagenes = list(skin_burn_path.glob('*.jpg'))
-    print(f"\nTotal de imágenes: {len(imagenes)}")
+    skin_burn = manifiesto[manifiesto['dataset'] == 'skin_burn']
+    print(f"\nTotal de imágenes: {len(skin_burn)}")
 
-    # Leer etiquetas de los archivos .txt
-    clases = []
-    for img_path in imagenes:
-        txt_path = img_path.with_suffix('.txt')
-        if txt_path.exists():
-            content = txt_path.read_text().strip()
-            if content:
-                # El primer número es la clase (0=1er grado, 1=2do grado, 2=3er grado)
-                clase = int(content.split()[0])
-                clases.append(clase)
-
-    # Contar clases
-    conteo_clases = Counter(clases)
+    # Contar clases (0=1er grado, 1=2do grado, 2=3er grado)
+    conteo_clases = {
+        int(clase): int(n)
+        for clase, n in skin_burn['clase'].value_counts().items()
+    }
 
     print("\nDistribución por grado de quemadura:")
     print(f"  Clase 0 (1er grado): {conteo_clases.get(0, 0)} imágenes")
     print(f"  Clase 1 (2do grado): {conteo_clases.get(1, 0)} imágenes")
     print(f"  Clase 2 (3er grado): {conteo_clases.get(2, 0)} imágenes")
+    print(f"  Sin etiqueta:        {int(skin_burn['clase'].isna().sum())} imágenes")
 
     print("\nMapeo a severidad:")
     print(f"  MEDIO/BAJO:  {conteo_clases.get(0, 0)} (1er grado)")
@@ -45,98 +191,113 @@ def analizar_skin_burn():
     return conteo_clases
 
 
-def analizar_wound_classification():
+def analizar_wound_classification(manifiesto: pd.DataFrame) -> Dict[str, int]:
     """Analiza el dataset de clasificación de heridas."""
     print("\n" + "=" * 60)
     print("WOUND CLASSIFICATION DATASET")
     print("=" * 60)
 
-    wound_path = Path('datos/imagenes_raw/wound_classification/Wound_dataset copy')
-
-    categorias = {}
-    total = 0
+    wound = manifiesto[manifiesto['dataset'] == 'wound_classification']
+    categorias = wound.groupby('categoria').size().astype(int).to_dict()
 
-    for category_dir in sorted(wound_path.iterdir()):
-        if category_dir.is_dir():
-            imgs = list(category_dir.glob('*.jpg')) + list(category_dir.glob('*.png'))
-            cantidad = len(imgs)
-            categorias[category_dir.name] = cantidad
-            total += cantidad
-            print(f"\n  {category_dir.name}: {cantidad} imágenes")
+    for categoria, cantidad in sorted(categorias.items()):
+        print(f"\n  {categoria}: {cantidad} imágenes")
 
-    print(f"\n  TOTAL: {total} imágenes")
+    print(f"\n  TOTAL: {len(wound)} imágenes")
 
     print("\nMapeo sugerido a severidad:")
-    print("  CRÍTICO:")
-    print(f"    - Burns (graves):        {categorias.get('Burns', 0)}")
-    print(f"    - Diabetic Wounds:       {categorias.get('Diabetic Wounds', 0)}")
-    print(f"    - Laseration:            {categorias.get('Laseration', 0)}")
+    for severidad in SEVERIDADES:
+        print(f"  {severidad.upper()}:")
+        for categoria, destino in MAPEO_WOUND.items():
+            if destino == severidad:
+                print(f"    - {categoria + ':':23s}{categorias.get(categoria, 0)}")
 
-    print("  ALTO:")
-    print(f"    - Cut:                   {categorias.get('Cut', 0)}")
-    print(f"    - Pressure Wounds:       {categorias.get('Pressure Wounds', 0)}")
-    print(f"    - Surgical Wounds:       {categorias.get('Surgical Wounds', 0)}")
-
-    print("  MEDIO:")
-    print(f"    - Abrasions:             {categorias.get('Abrasions', 0)}")
-    print(f"    - Venous Wounds:         {categorias.get('Venous Wounds', 0)}")
+    return categorias
 
-    print("  BAJO:")
-    print(f"    - Bruises:               {categorias.get('Bruises', 0)}")
-    print(f"    - Normal:                {categorias.get('Normal', 0)}")
 
-    return categorias
+def analizar_archivos(manifiesto: pd.DataFrame) -> pd.DataFrame:
+    """
+    Muestra tamaños y duplicados por contenido.
 
+    Returns:
+        DataFrame por dataset con cantidad, MB, KB mediano y duplicados
+    """
+    print("\n" + "=" * 60)
+    print("ARCHIVOS Y DUPLICADOS")
+    print("=" * 60)
 
-def resumen_final(skin_burn_clases, wound_categorias):
+    duplicada = manifiesto['hash'].duplicated(keep='first')
+    # Hashes presentes en más de un dataset
+    datasets_por_hash = manifiesto.groupby('hash')['dataset'].nunique()
+    entre_datasets = int((datasets_por_hash > 1).sum())
+    # Duplicados cuya severidad no coincide con la de su primera aparición
+    severidad_primera = manifiesto.groupby('hash')['severidad'].transform('first')
+    conflictos = int(
+        (duplicada & (manifiesto['severidad'] != severidad_primera)).sum()
+    )
+
+    resumen = manifiesto.assign(duplicada=duplicada).groupby('dataset').agg(
+        imagenes=('ruta', 'size'),
+        mb=('tamano', lambda t: t.sum() / 1e6),
+        kb_mediana=('tamano', lambda t: t.median() / 1e3),
+        duplicadas=('duplicada', 'sum')
+    )
+    print("\n" + resumen.round(1).to_string())
+    print(f"\n  Duplicadas (mismo contenido):  {int(duplicada.sum())}")
+    print(f"  Presentes en ambos datasets:   {entre_datasets}")
+    print(f"  Con severidad distinta:        {conflictos}")
+
+    return resumen
+
+
+def resumen_final(manifiesto: pd.DataFrame) -> pd.Series:
     """Muestra resumen final combinado."""
     print("\n" + "=" * 60)
     print("RESUMEN FINAL - DATASET COMBINADO")
     print("=" * 60)
 
-    # Calcular totales por severidad
-    critico = skin_burn_clases.get(2, 0) + \
-              wound_categorias.get('Burns', 0) + \
-              wound_categorias.get('Diabetic Wounds', 0) + \
-              wound_categorias.get('Laseration', 0)
-
-    alto = skin_burn_clases.get(1, 0) + \
-           wound_categorias.get('Cut', 0) + \
-           wound_categorias.get('Pressure Wounds', 0) + \
-           wound_categorias.get('Surgical Wounds', 0)
-
-    medio = skin_burn_clases.get(0, 0) + \
-            wound_categorias.get('Abrasions', 0) + \
-            wound_categorias.get('Venous Wounds', 0)
-
-    bajo = wound_categorias.get('Bruises', 0) + \
-           wound_categorias.get('Normal', 0)
-
-    total = critico + alto + medio + bajo
+    # Totales por severidad (sin contar dos veces las imágenes duplicadas)
+    unicas = manifiesto.dropna(subset=['severidad']).drop_duplicates('hash')
+    conteo = unicas.groupby('severidad').size().reindex(SEVERIDADES, fill_value=0)
+    total = int(conteo.sum())
 
     print(f"\nImágenes totales disponibles: {total}")
     print(f"\nDistribución por severidad:")
-    print(f"  CRÍTICO: {critico:4d} imágenes ({critico/total*100:5.1f}%)")
-    print(f"  ALTO:    {alto:4d} imágenes ({alto/total*100:5.1f}%)")
-    print(f"  MEDIO:   {medio:4d} imágenes ({medio/total*100:5.1f}%)")
-    print(f"  BAJO:    {bajo:4d} imágenes ({bajo/total*100:5.1f}%)")
+    for severidad, cantidad in conteo.items():
+        etiqueta = 'CRÍTICO' if severidad == 'critico' else severidad.upper()
+        print(f"  {etiqueta + ':':8s} {cantidad:4d} imágenes ({cantidad/total*100:5.1f}%)")
 
     print(f"\nCon Data Augmentation (x5):")
-    print(f"  CRÍTICO: {critico*5:5d} imágenes")
-    print(f"  ALTO:    {alto*5:5d} imágenes")
-    print(f"  MEDIO:   {medio*5:5d} imágenes")
-    print(f"  BAJO:    {bajo*5:5d} imágenes")
+    for severidad, cantidad in conteo.items():
+        etiqueta = 'CRÍTICO' if severidad == 'critico' else severidad.upper()
+        print(f"  {etiqueta + ':':8s} {cantidad*5:5d} imágenes")
     print(f"  TOTAL:   {total*5:5d} imágenes")
 
     print("\n" + "=" * 60)
     print("ANÁLISIS COMPLETADO")
     print("=" * 60)
 
+    return conteo
+
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Analizar datasets de imágenes")
+    parser.add_argument('--origen', type=Path, default=DIRECTORIO_RAW)
+    parser.add_argument('--hilos', type=int, default=None)
+    parser.add_argument('--forzar', action='store_true',
+                        help='Rehacer el manifiesto leyendo todas las imágenes')
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    manifiesto = actualizar_manifiesto(
+        args.origen, args.origen / RUTA_MANIFIESTO.name, args.hilos, args.forzar
+    )
+
     # Analizar ambos datasets
-    skin_burn_clases = analizar_skin_burn()
-    wound_categorias = analizar_wound_classification()
+    analizar_skin_burn(manifiesto)
+    analizar_wound_classification(manifiesto)
+    analizar_archivos(manifiesto)
 
     # Resumen final
-    resumen_final(skin_burn_clases, wound_categorias)
+    resumen_final(manifiesto)
+    print(f"\nTiempo total: {time.perf_counter() - inicio:.2f} s")
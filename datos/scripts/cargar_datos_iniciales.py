@@ -2,6 +2,9 @@
 Script para cargar datos desde CSVs a MongoDB.
 Capa: DATOS
 Responsabilidad: Poblar base de datos con información inicial.
+
+Los CSV se leen a través de RepositorioTablas (Parquet tipado, regenerado
+si el CSV cambió), pidiendo solo las columnas que se insertan.
 """
 
 import sys
@@ -11,24 +14,48 @@ from pathlib import Path
 ruta_raiz = Path(__file__).parent.parent.parent
 sys.path.append(str(ruta_raiz))
 
-import pandas as pd
 from datos.configuracion.conexion_mongodb import ConexionMongoDB
 from datos.modelos.schemas import PacienteSchema, HospitalSchema
-
-def cargar_pacientes(ruta_csv: str) -> int:
+from datos.modelos.validacion_pacientes import validar_lote
+from datos.repositorios.repositorio_tablas import RepositorioTablas
+from negocio.ml.clustering_hospitales import ClusteringHospitales
+
+# Columnas que se insertan (el resto de la tabla no se lee)
+COLUMNAS_PACIENTES = [
+    "paciente_id", "edad", "sexo", "presion_sistolica", "presion_diastolica",
+    "frecuencia_cardiaca", "frecuencia_respiratoria", "temperatura",
+    "saturacion_oxigeno", "tipo_incidente", "nivel_dolor",
+    "tiempo_desde_incidente", "tiene_seguro"
+]
+COLUMNAS_HOSPITALES = [
+    "hospital_id", "nombre", "latitud", "longitud", "capacidad_actual",
+    "capacidad_maxima", "tiempo_atencion_promedio", "tasa_exito", "nivel",
+    "especialidades"
+]
+
+def cargar_pacientes(tablas: RepositorioTablas) -> int:
     """
     Carga pacientes desde CSV a MongoDB.
 
     Args:
-        ruta_csv: Ruta al archivo emergencia_pacientes.csv
+        tablas: Repositorio de la tabla emergencia_pacientes
 
     Returns:
         int: Cantidad de pacientes insertados
     """
     print("[1/2] Cargando pacientes desde CSV...")
 
-    # Leer CSV
-    df = pd.read_csv(ruta_csv)
+    # Leer tabla (solo columnas insertadas)
+    df = tablas.leer("emergencia_pacientes", columnas=COLUMNAS_PACIENTES)
+
+    # Validar: se descartan valores imposibles, se recortan escalas acotadas
+    resultado = validar_lote(df)
+    descartados = resultado.errores[~resultado.validos]
+    print(f">> {len(descartados)} descartados, "
+          f"{int(resultado.recortados.sum())} con valores recortados")
+    for paciente_id, error in zip(df["paciente_id"][~resultado.validos][:5], descartados):
+        print(f"   - {paciente_id}: {error}")
+    df = resultado.datos[resultado.validos]
 
     # Obtener base de datos
     conexion = ConexionMongoDB()
@@ -56,7 +83,8 @@ def cargar_pacientes(ruta_csv: str) -> int:
             saturacion_oxigeno=float(fila["saturacion_oxigeno"]),
             tipo_incidente=str(fila["tipo_incidente"]),
             nivel_dolor=int(fila["nivel_dolor"]),
-            tiene_seguro=bool(fila["tiene_seguro"])
+            tiene_seguro=bool(fila["tiene_seguro"]),
+            tiempo_desde_incidente=int(fila["tiempo_desde_incidente"])
         )
         documentos.append(doc)
 
@@ -66,20 +94,20 @@ def cargar_pacientes(ruta_csv: str) -> int:
     return len(resultado.inserted_ids)
 
 
-def cargar_hospitales(ruta_csv: str) -> int:
+def cargar_hospitales(tablas: RepositorioTablas) -> int:
     """
     Carga hospitales desde CSV a MongoDB.
 
     Args:
-        ruta_csv: Ruta al archivo hospitales.csv
+        tablas: Repositorio de la tabla hospitales
 
     Returns:
         int: Cantidad de hospitales insertados
     """
     print("[2/2] Cargando hospitales desde CSV...")
 
-    # Leer CSV
-    df = pd.read_csv(ruta_csv)
+    # Leer tabla (solo columnas insertadas)
+    df = tablas.leer("hospitales", columnas=COLUMNAS_HOSPITALES)
 
     # Obtener base de datos
     conexion = ConexionMongoDB()
@@ -89,9 +117,17 @@ def cargar_hospitales(ruta_csv: str) -> int:
     # Limpiar colección existente
     coleccion.delete_many({})
 
+    # Asignar clusters a todo el registro en una sola predicción
+    try:
+        clusters, _ = ClusteringHospitales().predecir_clusters_lote(df)
+        clusters = [int(c) for c in clusters]
+    except FileNotFoundError:
+        print(">> Modelo K-means no encontrado, clusters sin asignar")
+        clusters = [None] * len(df)
+
     # Insertar documentos
     documentos = []
-    for _, fila in df.iterrows():
+    for (_, fila), cluster in zip(df.iterrows(), clusters):
         # Procesar especialidades (vienen como string)
         especialidades_str = str(fila["especialidades"])
         lista_especialidades = [e.strip() for e in especialidades_str.split(",")]
@@ -113,7 +149,7 @@ def cargar_hospitales(ruta_csv: str) -> int:
             tasa_exito=float(fila["tasa_exito"]),
             nivel=str(fila["nivel"]),
             especialidades=especialidades,
-            cluster=None  # Se asignará después del K-means
+            cluster=cluster
         )
         documentos.append(doc)
 
@@ -127,17 +163,15 @@ def main():
     """Función principal para cargar todos los datos."""
     print(">> Iniciando carga de datos a MongoDB...")
 
-    # Rutas a los CSVs
-    ruta_base = ruta_raiz / "archivos_csv"
-    ruta_pacientes = ruta_base / "emergencia_pacientes.csv"
-    ruta_hospitales = ruta_base / "hospitales.csv"
+    # Tablas de archivos_csv/ (vía archivos_parquet/)
+    tablas = RepositorioTablas()
 
     try:
         # Cargar pacientes
-        total_pacientes = cargar_pacientes(str(ruta_pacientes))
+        total_pacientes = cargar_pacientes(tablas)
 
         # Cargar hospitales
-        total_hospitales = cargar_hospitales(str(ruta_hospitales))
+        total_hospitales = cargar_hospitales(tablas)
 
         print("\n>> RESUMEN:")
         print(f"  - Pacientes: {total_pacientes}")
@@ -0,0 +1,62 @@
+"""
+Script para generar las tablas Parquet de entrenamiento.
+Capa: DATOS
+Responsabilidad: Convertir emergencia_pacientes y hospitales a Parquet tipado
+desde archivos_csv/ o desde las colecciones de MongoDB.
+
+RepositorioTablas.leer() ya regenera desde el CSV cuando hace falta; este
+script sirve para forzarlo o para exportar lo que hay en MongoDB. La
+exportación de MongoDB se escribe en <tabla>_mongo.parquet (los pacientes de
+MongoDB no tienen severidad ni decision: quedan nulas) y no reemplaza a la
+tabla de entrenamiento.
+
+Uso:
+    python datos/scripts/convertir_a_parquet.py
+    python datos/scripts/convertir_a_parquet.py --desde mongo --tablas hospitales
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+# Agregar ruta raíz al path
+ruta_raiz = Path(__file__).parent.parent.parent
+sys.path.append(str(ruta_raiz))
+
+import pyarrow.parquet as pq
+
+from datos.modelos.esquemas_tablas import ESQUEMAS
+from datos.repositorios.repositorio_tablas import DIRECTORIO_PARQUET, RepositorioTablas
+
+
+def main():
+    """Convierte las tablas pedidas e imprime un resumen."""
+    parser = argparse.ArgumentParser(description="Genera las tablas Parquet tipadas")
+    parser.add_argument('--desde', choices=['csv', 'mongo'], default='csv')
+    parser.add_argument('--tablas', nargs='+', choices=list(ESQUEMAS), default=list(ESQUEMAS))
+    parser.add_argument('--destino', type=Path, default=DIRECTORIO_PARQUET)
+    args = parser.parse_args()
+
+    tablas = RepositorioTablas(directorio=args.destino)
+
+    db = None
+    if args.desde == 'mongo':
+        from datos.configuracion.conexion_mongodb import ConexionMongoDB
+        db = ConexionMongoDB().conectar()
+
+    print(f">> Convirtiendo desde {args.desde} a {args.destino}")
+    for nombre in args.tablas:
+        if db is not None:
+            ruta = tablas.desde_mongo(nombre, db)
+        else:
+            ruta = tablas.desde_csv(nombre)
+
+        metadatos = pq.read_metadata(ruta)
+        print(f"  - {nombre}: {metadatos.num_rows} filas, "
+              f"{metadatos.num_columns} columnas, {ruta.stat().st_size / 1e3:.1f} KB")
+
+    print(">> Conversión completada")
+
+
+if __name__ == "__main__":
+    main()
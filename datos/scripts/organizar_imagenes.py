@@ -3,133 +3,418 @@ Script para organizar imágenes en carpetas por severidad.
 Copia las imágenes de los datasets raw a carpetas de entrenamiento.
 
 NO MODIFICA ARQUITECTURA - Solo organiza datos de entrenamiento.
+
+Etapas (cada una con un pool de hilos para la E/S):
+    1. Inspección: etiqueta, tamaño, mtime y hash de contenido de cada
+       imagen. Las que no cambiaron desde la última corrida reutilizan el
+       hash y la etiqueta del manifiesto.
+    2. Deduplicación: la misma imagen (mismo hash) en skin_burn y
+       wound_classification se materializa una sola vez. Los choques de
+       nombre se resuelven agregando parte del hash.
+    3. Materialización: copia, hardlink o reflink de lo que falta. El
+       manifiesto se guarda cada pocos cientos de archivos, así una corrida
+       interrumpida retoma donde quedó.
+
+Uso:
+    python datos/scripts/organizar_imagenes.py
+    python datos/scripts/organizar_imagenes.py --modo hardlink --hilos 16
+    python datos/scripts/organizar_imagenes.py --podar
+
+Outputs:
+    - datos/imagenes_entrenamiento/{critico,alto,medio,bajo}/
+    - datos/imagenes_entrenamiento/manifiesto_organizacion.json (origen → destino
+      y destinos huérfanos pendientes de --podar)
 """
 
+import sys
+import os
+import json
+import time
+import argparse
 from pathlib import Path
-import shutil
-from tqdm import tqdm
+from datetime import datetime, timezone
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, List, NamedTuple, Optional
 
+# Agregar ruta raíz al path
+ruta_raiz = Path(__file__).parent.parent.parent
+sys.path.append(str(ruta_raiz))
 
-def organizar_skin_burn():
-    """
-    Organiza imágenes del Skin Burn Dataset.
+from tqdm import tqdm
 
-    Mapeo:
-    - Clase 0 (1er grado) → medio
-    - Clase 1 (2do grado) → alto
-    - Clase 2 (3er grado) → critico
+from datos.scripts.utilidades_archivos import (
+    MODOS_MATERIALIZACION,
+    escribir_json_atomico,
+    hash_archivo,
+    listar_archivos,
+    materializar,
+)
+
+
+DIRECTORIO_RAW = ruta_raiz / 'datos' / 'imagenes_raw'
+DIRECTORIO_DESTINO = ruta_raiz / 'datos' / 'imagenes_entrenamiento'
+NOMBRE_MANIFIESTO = 'manifiesto_organizacion.json'
+VERSION_MANIFIESTO = 1
+
+SEVERIDADES = ['critico', 'alto', 'medio', 'bajo']
+
+# Skin Burn: clase del .txt (0=1er grado, 1=2do grado, 2=3er grado)
+MAPEO_SKIN_BURN = {
+    0: 'medio',
+    1: 'alto',
+    2: 'critico'
+}
+
+# Wound Classification: carpeta de categoría
+MAPEO_WOUND = {
+    'Burns': 'critico',
+    'Diabetic Wounds': 'critico',
+    'Laseration': 'critico',
+    'Cut': 'alto',
+    'Pressure Wounds': 'alto',
+    'Surgical Wounds': 'alto',
+    'Abrasions': 'medio',
+    'Venous Wounds': 'medio',
+    'Bruises': 'bajo',
+    'Normal': 'bajo'
+}
+
+CARPETA_WOUND = Path('wound_classification') / 'Wound_dataset copy'
+
+# Cada cuántos archivos materializados se guarda el manifiesto
+INTERVALO_CHECKPOINT = 500
+
+
+class Candidato(NamedTuple):
+    """Imagen de origen a organizar."""
+    clave: str                  # Ruta relativa a DIRECTORIO_RAW (id estable)
+    ruta: Path
+    dataset: str
+    prefijo: str                # Prefijo del nombre de destino
+    severidad: Optional[str]    # None = se lee de la etiqueta .txt
+
+
+def leer_clase_skin_burn(img_path: Path) -> Optional[int]:
     """
-    print("\n[1/2] Organizando Skin Burn Dataset...")
+    Lee la clase (grado de quemadura) de una imagen de Skin Burn.
 
-    source_path = Path('datos/imagenes_raw/skin_burn')
-    dest_base = Path('datos/imagenes_entrenamiento')
+    Args:
+        img_path: Imagen .jpg del dataset
 
-    # Mapeo de clases
-    mapeo = {
-        0: 'medio',
-        1: 'alto',
-        2: 'critico'
-    }
+    Returns:
+        Clase 0, 1 o 2, o None si no hay etiqueta
+    """
+    txt_path = img_path.with_suffix('.txt')
+    if not txt_path.exists():
+        return None
+    content = txt_path.read_text().strip()
+    if not content:
+        return None
+    # El primer número es la clase
+    return int(content.split()[0])
 
-    # Obtener todas las imágenes
-    imagenes = list(source_path.glob('*.jpg'))
 
-    copiadas = {'critico': 0, 'alto': 0, 'medio': 0}
+def leer_severidad_skin_burn(img_path: Path) -> Optional[str]:
+    """
+    Lee la severidad de una imagen de Skin Burn desde su .txt.
 
-    for img_path in tqdm(imagenes, desc="  Copiando"):
-        # Leer etiqueta del archivo .txt
-        txt_path = img_path.with_suffix('.txt')
-        if txt_path.exists():
-            content = txt_path.read_text().strip()
-            if content:
-                clase = int(content.split()[0])
-                severidad = mapeo[clase]
+    Args:
+        img_path: Imagen .jpg del dataset
 
-                # Copiar imagen
-                dest_dir = dest_base / severidad
-                dest_file = dest_dir / f"burn_{img_path.name}"
-                shutil.copy2(img_path, dest_file)
+    Returns:
+        Severidad mapeada o None si no hay etiqueta
+    """
+    return MAPEO_SKIN_BURN.get(leer_clase_skin_burn(img_path))
 
-                copiadas[severidad] += 1
 
-    print(f"  ✓ Crítico: {copiadas['critico']} imágenes")
-    print(f"  ✓ Alto:    {copiadas['alto']} imágenes")
-    print(f"  ✓ Medio:   {copiadas['medio']} imágenes")
+def listar_candidatos(origen: Path = DIRECTORIO_RAW) -> List[Candidato]:
+    """
+    Lista las imágenes de ambos datasets en orden determinista.
 
-    return copiadas
+    Skin Burn va primero: ante duplicados entre datasets, su etiqueta (por
+    grado de quemadura) es la que se conserva.
 
+    Args:
+        origen: Directorio de datasets raw
 
-def organizar_wound_classification():
+    Returns:
+        Candidatos a organizar
     """
-    Organiza imágenes del Wound Classification Dataset.
+    candidatos = []
+
+    skin_burn = origen / 'skin_burn'
+    if skin_burn.exists():
+        for entrada in listar_archivos(skin_burn, ('.jpg',)):
+            candidatos.append(Candidato(
+                f"skin_burn/{entrada.name}", Path(entrada.path),
+                'skin_burn', 'burn', None
+            ))
+
+    for categoria, severidad in MAPEO_WOUND.items():
+        source_dir = origen / CARPETA_WOUND / categoria
+        if not source_dir.exists():
+            continue
+        prefijo = categoria.replace(' ', '_').lower()
+        for entrada in listar_archivos(source_dir, ('.jpg', '.png')):
+            candidatos.append(Candidato(
+                (CARPETA_WOUND / categoria / entrada.name).as_posix(),
+                Path(entrada.path), 'wound_classification', prefijo, severidad
+            ))
+
+    return candidatos
+
 
-    Mapeo:
-    - Burns, Diabetic Wounds, Laseration → critico
-    - Cut, Pressure Wounds, Surgical Wounds → alto
-    - Abrasions, Venous Wounds → medio
-    - Bruises, Normal → bajo
+def inspeccionar(
+    candidato: Candidato,
+    previo: Optional[Dict[str, Any]]
+) -> Optional[Dict[str, Any]]:
     """
-    print("\n[2/2] Organizando Wound Classification Dataset...")
-
-    source_base = Path('datos/imagenes_raw/wound_classification/Wound_dataset copy')
-    dest_base = Path('datos/imagenes_entrenamiento')
-
-    # Mapeo de categorías a severidad
-    mapeo = {
-        'Burns': 'critico',
-        'Diabetic Wounds': 'critico',
-        'Laseration': 'critico',
-        'Cut': 'alto',
-        'Pressure Wounds': 'alto',
-        'Surgical Wounds': 'alto',
-        'Abrasions': 'medio',
-        'Venous Wounds': 'medio',
-        'Bruises': 'bajo',
-        'Normal': 'bajo'
-    }
+    Obtiene etiqueta, tamaño, mtime y hash de una imagen.
 
-    copiadas = {'critico': 0, 'alto': 0, 'medio': 0, 'bajo': 0}
+    Si el tamaño y mtime (de la imagen y de su .txt) coinciden con la
+    entrada previa del manifiesto, no se vuelve a leer el contenido.
 
-    for categoria, severidad in mapeo.items():
-        source_dir = source_base / categoria
-        if not source_dir.exists():
-            continue
+    Args:
+        candidato: Imagen a inspeccionar
+        previo: Entrada de la corrida anterior (o None)
 
-        # Obtener imágenes
-        imagenes = list(source_dir.glob('*.jpg')) + list(source_dir.glob('*.png'))
+    Returns:
+        Ficha de la imagen o None si no tiene etiqueta
+    """
+    info = candidato.ruta.stat()
+    txt_path = candidato.ruta.with_suffix('.txt')
+    mtime_etiqueta = None
+    if candidato.severidad is None and txt_path.exists():
+        mtime_etiqueta = txt_path.stat().st_mtime_ns
+
+    sin_cambios = (
+        previo is not None
+        and previo['tamano'] == info.st_size
+        and previo['mtime_ns'] == info.st_mtime_ns
+        and previo.get('mtime_etiqueta_ns') == mtime_etiqueta
+    )
+
+    if sin_cambios:
+        severidad, hash_contenido = previo['severidad'], previo['hash']
+    else:
+        severidad = candidato.severidad or leer_severidad_skin_burn(candidato.ruta)
+        if severidad is None:
+            return None
+        hash_contenido = hash_archivo(candidato.ruta)
+
+    return {
+        'dataset': candidato.dataset,
+        'severidad': severidad,
+        'hash': hash_contenido,
+        'tamano': info.st_size,
+        'mtime_ns': info.st_mtime_ns,
+        'mtime_etiqueta_ns': mtime_etiqueta,
+        'destino': None,
+        'duplicado_de': None
+    }
 
-        print(f"\n  Procesando {categoria} → {severidad.upper()}")
 
-        for img_path in tqdm(imagenes, desc=f"    Copiando"):
-            # Crear nombre único
-            nombre_limpio = categoria.replace(' ', '_').lower()
-            dest_file = dest_base / severidad / f"{nombre_limpio}_{img_path.name}"
+def _con_sufijo(destino: str, hash_contenido: str) -> str:
+    """Agrega parte del hash al nombre: alto/cut_1.jpg → alto/cut_1_3f9c0a12.jpg"""
+    base, extension = os.path.splitext(destino)
+    return f"{base}_{hash_contenido[:8]}{extension}"
 
-            # Copiar imagen
-            shutil.copy2(img_path, dest_file)
-            copiadas[severidad] += 1
 
-    print(f"\n  ✓ Crítico: {copiadas['critico']} imágenes")
-    print(f"  ✓ Alto:    {copiadas['alto']} imágenes")
-    print(f"  ✓ Medio:   {copiadas['medio']} imágenes")
-    print(f"  ✓ Bajo:    {copiadas['bajo']} imágenes")
+def organizar(
+    modo: str = 'reflink',
+    hilos: Optional[int] = None,
+    origen: Path = DIRECTORIO_RAW,
+    destino: Path = DIRECTORIO_DESTINO,
+    podar: bool = False
+) -> Dict[str, Any]:
+    """
+    Organiza (deduplicando) las imágenes raw en carpetas por severidad.
+
+    Args:
+        modo: 'copiar', 'hardlink' o 'reflink' (si no es posible, copia)
+        hilos: Hilos de E/S (default: 4 por CPU, máx. 32)
+        origen: Directorio de datasets raw
+        destino: Directorio de entrenamiento
+        podar: Borrar destinos de corridas anteriores que ya no corresponden
+            (origen eliminado o ahora duplicado). Sin podar quedan anotados
+            en el manifiesto para una corrida posterior con podar
+
+    Returns:
+        Estadísticas de la corrida
+
+    Example:
+        >>> organizar(modo='hardlink')['materializadas']
+        4161
+    """
+    inicio = time.perf_counter()
+    hilos = hilos or min(32, 4 * (os.cpu_count() or 1))
+    ruta_manifiesto = destino / NOMBRE_MANIFIESTO
+
+    anterior: Dict[str, Dict[str, Any]] = {}
+    huerfanos_previos: List[str] = []
+    if ruta_manifiesto.exists():
+        manifiesto = json.loads(ruta_manifiesto.read_text(encoding='utf-8'))
+        if manifiesto.get('version') == VERSION_MANIFIESTO:
+            anterior = manifiesto['archivos']
+            huerfanos_previos = manifiesto.get('huerfanos', [])
+
+    candidatos = listar_candidatos(origen)
+
+    # 1. Inspección en paralelo
+    print(f"\n[1/3] Inspeccionando {len(candidatos)} imágenes...")
+    with ThreadPoolExecutor(max_workers=hilos) as ejecutor:
+        fichas = list(tqdm(
+            ejecutor.map(lambda c: inspeccionar(c, anterior.get(c.clave)), candidatos),
+            total=len(candidatos), desc="  Inspeccionando"
+        ))
+
+    # 2. Deduplicación y destinos (secuencial: el resultado no depende de hilos)
+    print("\n[2/3] Deduplicando por contenido...")
+    archivos: Dict[str, Dict[str, Any]] = {}
+    primero_por_hash: Dict[str, str] = {}
+    ocupados: Dict[str, str] = {}
+    sin_etiqueta = 0
+    conflictos = []
+
+    for candidato, ficha in zip(candidatos, fichas):
+        if ficha is None:
+            sin_etiqueta += 1
+            continue
 
-    return copiadas
+        primero = primero_por_hash.get(ficha['hash'])
+        if primero is not None:
+            ficha['duplicado_de'] = primero
+            if archivos[primero]['severidad'] != ficha['severidad']:
+                conflictos.append((candidato.clave, primero))
+            archivos[candidato.clave] = ficha
+            continue
+        primero_por_hash[ficha['hash']] = candidato.clave
+
+        # Conservar el destino anterior si la imagen es la misma
+        previo = anterior.get(candidato.clave)
+        if (previo and previo['hash'] == ficha['hash'] and previo['destino']
+                and previo['destino'] not in ocupados):
+            relativo = previo['destino']
+        else:
+            relativo = f"{ficha['severidad']}/{candidato.prefijo}_{candidato.ruta.name}"
+            if relativo in ocupados:
+                relativo = _con_sufijo(relativo, ficha['hash'])
+
+        ficha['destino'] = relativo
+        ocupados[relativo] = ficha['hash']
+        archivos[candidato.clave] = ficha
+
+    duplicadas = sum(1 for f in archivos.values() if f['duplicado_de'])
+    print(f"  ✓ Únicas: {len(archivos) - duplicadas}, duplicadas: {duplicadas}")
+    if conflictos:
+        print(f"  ⚠ {len(conflictos)} duplicadas con severidad distinta "
+              f"(se conserva la primera), p.ej. {conflictos[0][0]} = {conflictos[0][1]}")
+
+    # Destinos de corridas anteriores que ya no corresponden. Quedan en el
+    # manifiesto (también en los checkpoints) hasta que una corrida con
+    # podar los borre
+    vigentes = {f['destino'] for f in archivos.values() if f['destino']}
+    huerfanos = sorted({
+        f['destino'] for f in anterior.values() if f.get('destino')
+    }.union(huerfanos_previos) - vigentes)
+
+    # 3. Materialización de lo que falta, con checkpoints del manifiesto
+    def guardar_manifiesto(entradas: Dict[str, Dict[str, Any]]) -> None:
+        escribir_json_atomico(ruta_manifiesto, {
+            'version': VERSION_MANIFIESTO,
+            'actualizado_en': datetime.now(timezone.utc).isoformat(),
+            'modo': modo,
+            'archivos': entradas,
+            'huerfanos': huerfanos
+        })
+
+    hechos: Dict[str, Dict[str, Any]] = {}
+    pendientes: List[str] = []
+    for clave, ficha in archivos.items():
+        previo = anterior.get(clave)
+        al_dia = (
+            ficha['destino'] is None
+            or (previo is not None and previo['hash'] == ficha['hash']
+                and previo['destino'] == ficha['destino']
+                and (destino / ficha['destino']).exists())
+        )
+        if al_dia:
+            hechos[clave] = ficha
+        else:
+            pendientes.append(clave)
+
+    def materializar_uno(clave: str) -> str:
+        ficha = archivos[clave]
+        ruta_destino = destino / ficha['destino']
+        # Archivo de una corrida sin manifiesto: se adopta si es idéntico
+        if ruta_destino.exists() and hash_archivo(ruta_destino) == ficha['hash']:
+            return 'adoptado'
+        return materializar(origen / clave, ruta_destino, modo)
+
+    print(f"\n[3/3] Materializando {len(pendientes)} imágenes ({modo}, "
+          f"{len(hechos)} ya al día)...")
+    for severidad in SEVERIDADES:
+        (destino / severidad).mkdir(parents=True, exist_ok=True)
+
+    modos_usados: Counter = Counter()
+    with ThreadPoolExecutor(max_workers=hilos) as ejecutor:
+        futuros = {ejecutor.submit(materializar_uno, clave): clave for clave in pendientes}
+        for numero, futuro in enumerate(
+            tqdm(as_completed(futuros), total=len(futuros), desc="  Materializando"), 1
+        ):
+            clave = futuros[futuro]
+            modos_usados[futuro.result()] += 1
+            hechos[clave] = archivos[clave]
+            if numero % INTERVALO_CHECKPOINT == 0:
+                guardar_manifiesto(hechos)
+
+    encontrados = len(huerfanos)
+    if podar:
+        for relativo in huerfanos:
+            (destino / relativo).unlink(missing_ok=True)
+        huerfanos = []
+
+    guardar_manifiesto(archivos)
+
+    por_severidad = Counter(
+        f['severidad'] for f in archivos.values() if f['destino']
+    )
+    segundos = time.perf_counter() - inicio
+
+    for severidad in SEVERIDADES:
+        print(f"  ✓ {severidad.capitalize() + ':':9s}{por_severidad[severidad]} imágenes")
+    if sin_etiqueta:
+        print(f"  ⚠ {sin_etiqueta} imágenes sin etiqueta (omitidas)")
+    if encontrados:
+        accion = "borrados" if podar else "sin borrar (usar --podar)"
+        print(f"  ⚠ {encontrados} destinos anteriores huérfanos, {accion}")
+    print(f"  ✓ {segundos:.1f} s, modos: {dict(modos_usados) or 'nada que hacer'}")
+
+    return {
+        'candidatas': len(candidatos),
+        'sin_etiqueta': sin_etiqueta,
+        'duplicadas': duplicadas,
+        'conflictos': len(conflictos),
+        'materializadas': len(pendientes),
+        'al_dia': len(archivos) - len(pendientes),
+        'modos': dict(modos_usados),
+        'por_severidad': dict(por_severidad),
+        'huerfanos': encontrados,
+        'segundos': round(segundos, 2)
+    }
 
 
-def verificar_organizacion():
+def verificar_organizacion(destino: Path = DIRECTORIO_DESTINO):
     """Verifica que las imágenes se organizaron correctamente."""
     print("\n" + "="*60)
     print("VERIFICACIÓN FINAL")
     print("="*60)
 
-    base_path = Path('datos/imagenes_entrenamiento')
-
     total = 0
-    for severidad in ['critico', 'alto', 'medio', 'bajo']:
-        dir_path = base_path / severidad
-        imagenes = list(dir_path.glob('*.jpg')) + list(dir_path.glob('*.png'))
-        cantidad = len(imagenes)
+    for severidad in SEVERIDADES:
+        dir_path = destino / severidad
+        cantidad = len(listar_archivos(dir_path, ('.jpg', '.png')))
         total += cantidad
         print(f"\n  {severidad.upper():8s}: {cantidad:4d} imágenes")
 
@@ -145,17 +430,26 @@ def verificar_organizacion():
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Organizar imágenes por severidad")
+    parser.add_argument('--modo', choices=MODOS_MATERIALIZACION, default='reflink',
+                        help='Cómo crear cada destino (default: reflink, '
+                             'con copia si el sistema de archivos no lo soporta)')
+    parser.add_argument('--hilos', type=int, default=None)
+    parser.add_argument('--origen', type=Path, default=DIRECTORIO_RAW)
+    parser.add_argument('--destino', type=Path, default=DIRECTORIO_DESTINO)
+    parser.add_argument('--podar', action='store_true',
+                        help='Borrar destinos anteriores que ya no corresponden')
+    args = parser.parse_args()
+
     print("="*60)
     print("ORGANIZANDO IMÁGENES PARA ENTRENAMIENTO CNN")
     print("="*60)
     print("\nNOTA: Este script NO modifica la arquitectura del proyecto.")
     print("Solo organiza imágenes en carpetas para entrenamiento.\n")
 
-    # Organizar ambos datasets
-    skin_burn_stats = organizar_skin_burn()
-    wound_stats = organizar_wound_classification()
+    organizar(args.modo, args.hilos, args.origen, args.destino, args.podar)
 
     # Verificar resultado
-    verificar_organizacion()
+    verificar_organizacion(args.destino)
 
     print("\n🎯 Siguiente paso: Entrenar CNN con estas imágenes")
@@ -0,0 +1,263 @@
+"""
+Script para preprocesar las imágenes de entrenamiento a un almacén de shards.
+Capa: DATOS
+Responsabilidad: Decodificar una sola vez cada imagen a 224x224 uint8 (mismo
+decodificador que el servicio) y guardarla en shards .npy con manifiesto.
+
+Entrenamiento, extracción de embeddings y evaluación leen después de
+AlmacenImagenes sin volver a listar directorios ni decodificar JPEG/PNG.
+
+Las imágenes que no se pueden decodificar se omiten (quedan listadas en
+manifiesto['omitidas']); con --estricto, una sola aborta todo el almacén.
+
+Uso:
+    python datos/scripts/preprocesar_imagenes.py
+    python datos/scripts/preprocesar_imagenes.py --imagenes-por-shard 512 --forzar
+"""
+
+import sys
+import os
+import json
+import time
+import shutil
+import argparse
+from pathlib import Path
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+# Agregar ruta raíz al path
+ruta_raiz = Path(__file__).parent.parent.parent
+sys.path.append(str(ruta_raiz))
+
+import numpy as np
+from tqdm import tqdm
+
+from datos.repositorios.almacen_imagenes import (
+    DATA_DIR,
+    DIRECTORIO_ALMACEN,
+    VERSION_ALMACEN,
+    huella_split,
+    listar_clases,
+    listar_split,
+)
+from negocio.ml.decodificacion_imagenes import TAMANO_ENTRADA, decodificar_imagen
+
+
+def preprocesar(
+    data_dir: Path = DATA_DIR,
+    destino: Path = DIRECTORIO_ALMACEN,
+    imagenes_por_shard: int = 1024,
+    hilos: Optional[int] = None,
+    forzar: bool = False,
+    estricto: bool = False
+) -> Dict[str, Any]:
+    """
+    Escribe el almacén de shards de data_dir en destino.
+
+    Si el manifiesto existente tiene la misma huella (mismas imágenes, mismo
+    split) no se hace nada. El almacén se arma en un directorio temporal y
+    reemplaza al anterior al terminar. Las imágenes que no se decodifican
+    quedan fuera de shards, etiquetas y rutas, y se listan en 'omitidas'.
+
+    Args:
+        data_dir: Directorio con una subcarpeta por clase
+        destino: Directorio del almacén
+        imagenes_por_shard: Imágenes por archivo shard (el último puede
+            tener menos)
+        hilos: Hilos de decodificación (default: cantidad de CPUs)
+        forzar: Reescribir aunque la huella coincida
+        estricto: Abortar (sin tocar el almacén anterior) si alguna imagen
+            no puede decodificarse
+
+    Returns:
+        Manifiesto del almacén
+
+    Raises:
+        ValueError: Con estricto, si alguna imagen no puede decodificarse
+    """
+    entrenamiento, validacion = listar_split(data_dir)
+    pares = entrenamiento + validacion
+    huella = f"{huella_split(entrenamiento)}-{huella_split(validacion)}"
+
+    ruta_manifiesto = destino / 'manifiesto.json'
+    if ruta_manifiesto.exists() and not forzar:
+        manifiesto = json.loads(ruta_manifiesto.read_text(encoding='utf-8'))
+        if manifiesto.get('huella') == huella and manifiesto.get('version') == VERSION_ALMACEN:
+            print(f"  ✓ Almacén al día ({manifiesto['total']} imágenes), nada que hacer")
+            return manifiesto
+
+    temporal = destino.with_name(destino.name + '.tmp')
+    if temporal.exists():
+        shutil.rmtree(temporal)
+    temporal.mkdir(parents=True)
+
+    ancho, alto = TAMANO_ENTRADA
+    total = len(pares)
+    shards: List[str] = []
+    errores: Dict[int, str] = {}
+    inicio = time.perf_counter()
+
+    def decodificar(destino_fila: np.ndarray, ruta: Path) -> Optional[str]:
+        try:
+            decodificar_imagen(ruta.read_bytes(), destino=destino_fila)
+        except (ValueError, OSError) as e:
+            return str(e)
+        return None
+
+    # PIL libera el GIL al decodificar: los hilos escalan con los núcleos
+    with ThreadPoolExecutor(max_workers=hilos or os.cpu_count()) as ejecutor, \
+            tqdm(total=total, desc="  Decodificando") as progreso:
+        for numero, desde in enumerate(range(0, total, imagenes_por_shard)):
+            lote = pares[desde:desde + imagenes_por_shard]
+            nombre = f"shard_{numero:05d}.npy"
+            shard = np.lib.format.open_memmap(
+                temporal / nombre, mode='w+', dtype=np.uint8,
+                shape=(len(lote), alto, ancho, 3)
+            )
+            for indice, error in enumerate(ejecutor.map(
+                decodificar, shard, [ruta for ruta, _ in lote]
+            ), start=desde):
+                if error:
+                    errores[indice] = error
+                progreso.update(1)
+            shard.flush()
+            del shard
+            shards.append(nombre)
+
+    omitidas = [
+        {'ruta': pares[i][0].relative_to(data_dir).as_posix(), 'error': error}
+        for i, error in sorted(errores.items())
+    ]
+    if omitidas and estricto:
+        shutil.rmtree(temporal)
+        raise ValueError(
+            f"{len(omitidas)} imágenes no pudieron decodificarse:\n  "
+            + "\n  ".join(f"{o['ruta']}: {o['error']}" for o in omitidas[:20])
+        )
+
+    if omitidas:
+        validas = np.array([i for i in range(total) if i not in errores], dtype=np.int64)
+        shards = _compactar(temporal, shards, validas, imagenes_por_shard)
+        n_entrenamiento = int((validas < len(entrenamiento)).sum())
+        pares = [pares[i] for i in validas]
+        total = len(pares)
+        print(f"  ⚠ {len(omitidas)} imágenes omitidas (ver manifiesto['omitidas']):")
+        for omitida in omitidas[:5]:
+            print(f"    - {omitida['ruta']}: {omitida['error']}")
+    else:
+        n_entrenamiento = len(entrenamiento)
+
+    np.save(temporal / 'etiquetas.npy', np.array([i for _, i in pares], dtype=np.int64))
+
+    segundos = time.perf_counter() - inicio
+    manifiesto = {
+        'version': VERSION_ALMACEN,
+        'huella': huella,
+        'creado_en': datetime.now(timezone.utc).isoformat(),
+        'origen': str(data_dir),
+        'clases': listar_clases(data_dir),
+        'forma_imagen': [alto, ancho, 3],
+        'imagenes_por_shard': imagenes_por_shard,
+        'total': total,
+        'subsets': {
+            'entrenamiento': [0, n_entrenamiento],
+            'validacion': [n_entrenamiento, total]
+        },
+        'shards': shards,
+        'rutas': [ruta.relative_to(data_dir).as_posix() for ruta, _ in pares],
+        'omitidas': omitidas,
+        'segundos_preprocesado': round(segundos, 2)
+    }
+    (temporal / 'manifiesto.json').write_text(
+        json.dumps(manifiesto, indent=1, ensure_ascii=False), encoding='utf-8'
+    )
+
+    if destino.exists():
+        shutil.rmtree(destino)
+    os.replace(temporal, destino)
+
+    tamano_mb = sum(f.stat().st_size for f in destino.iterdir()) / 1e6
+    print(f"  ✓ {total} imágenes en {len(shards)} shards ({tamano_mb:.0f} MB)")
+    print(f"  ✓ {segundos:.1f} s ({total / segundos:.0f} img/s)")
+
+    return manifiesto
+
+
+def _compactar(
+    directorio: Path,
+    shards: List[str],
+    validas: np.ndarray,
+    imagenes_por_shard: int
+) -> List[str]:
+    """
+    Reescribe los shards dejando solo las filas válidas, en orden.
+
+    Solo corre si hubo imágenes omitidas: copia tensores ya decodificados
+    (sin volver a decodificar) para que la imagen i siga estando en el shard
+    i // imagenes_por_shard.
+
+    Args:
+        directorio: Directorio temporal del almacén
+        shards: Nombres de los shards escritos
+        validas: Índices globales de las imágenes que se conservan
+        imagenes_por_shard: Imágenes por shard
+
+    Returns:
+        Nombres de los shards nuevos
+    """
+    originales = [np.load(directorio / nombre, mmap_mode='r') for nombre in shards]
+    nuevos: List[str] = []
+
+    for numero, desde in enumerate(range(0, len(validas), imagenes_por_shard)):
+        indices = validas[desde:desde + imagenes_por_shard]
+        nombre = f"compacto_{numero:05d}.npy"
+        shard = np.lib.format.open_memmap(
+            directorio / nombre, mode='w+', dtype=np.uint8,
+            shape=(len(indices), *originales[0].shape[1:])
+        )
+        numeros, filas = np.divmod(indices, imagenes_por_shard)
+        for origen in np.unique(numeros):
+            mascara = numeros == origen
+            shard[mascara] = originales[int(origen)][filas[mascara]]
+        shard.flush()
+        del shard
+        nuevos.append(nombre)
+
+    del originales
+    for nombre in shards:
+        (directorio / nombre).unlink()
+
+    finales = [f"shard_{numero:05d}.npy" for numero in range(len(nuevos))]
+    for nuevo, final in zip(nuevos, finales):
+        os.replace(directorio / nuevo, directorio / final)
+    return finales
+
+
+def main():
+    """Función principal."""
+    parser = argparse.ArgumentParser(description="Preprocesar imágenes a shards")
+    parser.add_argument('--origen', type=Path, default=DATA_DIR)
+    parser.add_argument('--destino', type=Path, default=DIRECTORIO_ALMACEN)
+    parser.add_argument('--imagenes-por-shard', type=int, default=1024)
+    parser.add_argument('--hilos', type=int, default=None)
+    parser.add_argument('--forzar', action='store_true',
+                        help='Reescribir aunque el almacén esté al día')
+    parser.add_argument('--estricto', action='store_true',
+                        help='Abortar si alguna imagen no puede decodificarse')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("PREPROCESANDO IMÁGENES A ALMACÉN DE SHARDS")
+    print("=" * 60)
+    print(f"\nOrigen:  {args.origen}")
+    print(f"Destino: {args.destino}\n")
+
+    preprocesar(
+        args.origen, args.destino, args.imagenes_por_shard,
+        args.hilos, args.forzar, args.estricto
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,471 @@
+"""
+Script de puntuación por lotes (re-scoring) de imágenes y pacientes.
+Capa: DATOS
+Responsabilidad: Volver a evaluar archivos históricos cuando cambia un
+modelo: fotos de disco con ClasificadorImagenes y documentos de la colección
+pacientes con PredictorSeveridad.
+
+Funcionamiento:
+    - Las entradas se leen en bloques (listado de disco o cursor de MongoDB
+      ordenado por _id), sin cargar todo en memoria.
+    - Un pool de hilos puntúa varios bloques a la vez (decodificación +
+      inferencia por lotes); los resultados se escriben en orden.
+    - Cada bloque va a un archivo Parquet o a MongoDB con bulk_write, y
+      después se guarda el checkpoint. Una corrida interrumpida retoma desde
+      el último bloque escrito; si cambió el modelo, empieza de nuevo.
+
+Uso:
+    python datos/scripts/puntuar_lote.py imagenes
+    python datos/scripts/puntuar_lote.py imagenes --origen /ruta/fotos --backend tflite
+    python datos/scripts/puntuar_lote.py pacientes --destino mongo
+    python datos/scripts/puntuar_lote.py pacientes --reiniciar
+
+Outputs:
+    - datos/puntuaciones/<tipo>/parte_00000.parquet, ... (destino parquet)
+    - colección puntuaciones_imagenes o campo 'puntuacion' de cada paciente
+      (destino mongo)
+    - datos/puntuaciones/<tipo>/_checkpoint.json (pyarrow lo ignora al leer el directorio)
+"""
+
+import sys
+import time
+import argparse
+from bisect import bisect_right
+from collections import deque
+from pathlib import Path
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+# Agregar ruta raíz al path
+ruta_raiz = Path(__file__).parent.parent.parent
+sys.path.append(str(ruta_raiz))
+
+import numpy as np
+import pandas as pd
+from bson import json_util
+from pymongo import UpdateOne
+from pymongo.collection import Collection
+from tqdm import tqdm
+
+from datos.modelos.schemas import PacienteSchema
+from datos.modelos.validacion_pacientes import validar_lote
+from datos.scripts.utilidades_archivos import escanear_arbol
+
+
+DIRECTORIO_PUNTUACIONES = ruta_raiz / 'datos' / 'puntuaciones'
+DIRECTORIO_IMAGENES = ruta_raiz / 'datos' / 'imagenes_entrenamiento'
+EXTENSIONES_IMAGEN = ('.jpg', '.jpeg', '.png', '.bmp')
+
+
+def procesar_en_orden(
+    lotes: Iterable[Any],
+    funcion: Callable[[Any], pd.DataFrame],
+    hilos: int
+) -> Iterator[pd.DataFrame]:
+    """
+    Aplica funcion a cada lote en un pool de hilos, entregando en orden.
+
+    Hay como máximo 2 * hilos lotes en vuelo: la lectura de entradas no se
+    adelanta sin límite a la inferencia.
+
+    Args:
+        lotes: Iterable de lotes de entrada
+        funcion: Puntuación de un lote
+        hilos: Lotes puntuados en paralelo
+
+    Yields:
+        Resultado de cada lote, en el orden de entrada
+    """
+    with ThreadPoolExecutor(max_workers=hilos, thread_name_prefix="puntuacion") as ejecutor:
+        en_vuelo: deque = deque()
+        for lote in lotes:
+            en_vuelo.append(ejecutor.submit(funcion, lote))
+            if len(en_vuelo) >= 2 * hilos:
+                yield en_vuelo.popleft().result()
+        while en_vuelo:
+            yield en_vuelo.popleft().result()
+
+
+class Checkpoint:
+    """
+    Progreso de una corrida: última clave escrita y contadores.
+
+    Principios SOLID:
+    - SRP: Solo persiste el punto de reanudación
+    """
+
+    def __init__(self, ruta: Path, version_modelo: str, reiniciar: bool = False):
+        """
+        Carga el checkpoint o empieza uno nuevo.
+
+        Se empieza de cero si se pide reiniciar o si el checkpoint es de
+        otra versión del modelo.
+
+        Args:
+            ruta: Archivo _checkpoint.json
+            version_modelo: Versión del modelo que puntúa
+            reiniciar: Ignorar el progreso guardado
+        """
+        self.ruta = ruta
+        self.estado: Optional[Dict[str, Any]] = None
+        if ruta.exists() and not reiniciar:
+            estado = json_util.loads(ruta.read_text(encoding='utf-8'))
+            if estado.get('version_modelo') == version_modelo:
+                self.estado = estado
+            else:
+                print(f"  ⚠ Checkpoint de otro modelo ({estado.get('version_modelo')}), "
+                      f"se empieza de nuevo")
+
+        self.reanudado = self.estado is not None
+        if self.estado is None:
+            self.estado = {
+                'version_modelo': version_modelo,
+                'ultimo': None,
+                'procesados': 0,
+                'errores': 0,
+                'partes': 0,
+                'iniciado_en': datetime.now(timezone.utc).isoformat()
+            }
+
+    @property
+    def ultimo(self) -> Any:
+        """Clave del último elemento escrito (None si no hay progreso)."""
+        return self.estado['ultimo']
+
+    def avanzar(self, ultimo: Any, procesados: int, errores: int) -> None:
+        """
+        Registra un bloque ya escrito en la salida.
+
+        Args:
+            ultimo: Clave del último elemento del bloque
+            procesados: Elementos del bloque
+            errores: Elementos que no pudieron puntuarse
+        """
+        self.estado.update(
+            ultimo=ultimo,
+            procesados=self.estado['procesados'] + procesados,
+            errores=self.estado['errores'] + errores,
+            partes=self.estado['partes'] + 1,
+            actualizado_en=datetime.now(timezone.utc).isoformat()
+        )
+        # json_util conserva tipos de MongoDB (ObjectId) en la clave
+        self.ruta.parent.mkdir(parents=True, exist_ok=True)
+        temporal = self.ruta.with_name(f".{self.ruta.name}.tmp")
+        temporal.write_text(json_util.dumps(self.estado, indent=1), encoding='utf-8')
+        temporal.replace(self.ruta)
+
+
+class SalidaParquet:
+    """Escribe cada bloque como parte_NNNNN.parquet."""
+
+    def __init__(self, directorio: Path, limpiar: bool):
+        """
+        Args:
+            directorio: Directorio de salida
+            limpiar: Borrar partes de una corrida anterior
+        """
+        self.directorio = directorio
+        self.directorio.mkdir(parents=True, exist_ok=True)
+        if limpiar:
+            for parte in self.directorio.glob('parte_*.parquet'):
+                parte.unlink()
+
+    def escribir(self, resultados: pd.DataFrame, numero: int) -> None:
+        """Escribe (o reescribe, al reanudar) la parte numero."""
+        ruta = self.directorio / f"parte_{numero:05d}.parquet"
+        temporal = ruta.with_name(f".{ruta.name}.tmp")
+        # _id de MongoDB no es un tipo Parquet: la clave es paciente_id / ruta
+        resultados.drop(columns=['_id'], errors='ignore').to_parquet(temporal, index=False)
+        temporal.replace(ruta)
+
+
+class SalidaMongo:
+    """Escribe cada bloque con un bulk_write de upserts."""
+
+    def __init__(self, coleccion: Collection, clave: str, campo: Optional[str] = None):
+        """
+        Args:
+            coleccion: Colección destino
+            clave: Columna que identifica el documento (filtro del upsert)
+            campo: Subdocumento donde guardar el resultado (None = raíz)
+        """
+        self.coleccion = coleccion
+        self.clave = clave
+        self.campo = campo
+
+    def escribir(self, resultados: pd.DataFrame, numero: int) -> None:
+        """Upsert de cada fila (idempotente: reanudar no duplica)."""
+        operaciones = []
+        for fila in resultados.astype(object).where(resultados.notna(), None).to_dict('records'):
+            valor_clave = fila.pop(self.clave)
+            operaciones.append(UpdateOne(
+                {self.clave: valor_clave},
+                {'$set': {self.campo: fila} if self.campo else fila},
+                upsert=self.campo is None
+            ))
+        if operaciones:
+            self.coleccion.bulk_write(operaciones, ordered=False)
+
+
+def _agregar_probabilidades(
+    resultados: pd.DataFrame,
+    clases: List[str],
+    probabilidades: np.ndarray,
+    validas: np.ndarray,
+    version_modelo: str
+) -> pd.DataFrame:
+    """Agrega severidad, prob_<clase>, modelo y fecha a los resultados."""
+    indices = np.argmax(np.nan_to_num(probabilidades, nan=-1), axis=1)
+    severidades = np.asarray(clases, dtype=object)[indices]
+    resultados['severidad'] = np.where(validas, severidades, None)
+    for i, clase in enumerate(clases):
+        resultados[f"prob_{clase}"] = probabilidades[:, i]
+    resultados['version_modelo'] = version_modelo
+    resultados['puntuado_en'] = datetime.now(timezone.utc)
+    return resultados
+
+
+def lotes_imagenes(origen: Path, tamano: int, ultimo: Optional[str]) -> Iterator[List[str]]:
+    """
+    Lista las imágenes de origen (recursivo) y las entrega en bloques.
+
+    Args:
+        origen: Directorio de imágenes
+        tamano: Imágenes por bloque
+        ultimo: Última ruta ya escrita (se continúa después de ella)
+
+    Yields:
+        Rutas relativas a origen, en orden
+    """
+    rutas = [ruta for ruta, _, _ in escanear_arbol(origen, EXTENSIONES_IMAGEN)]
+    if ultimo is not None:
+        rutas = rutas[bisect_right(rutas, ultimo):]
+    print(f"  ✓ {len(rutas)} imágenes pendientes")
+    for desde in range(0, len(rutas), tamano):
+        yield rutas[desde:desde + tamano]
+
+
+def puntuar_imagenes(
+    clasificador,
+    origen: Path,
+    rutas: List[str],
+    batch_size: int
+) -> pd.DataFrame:
+    """
+    Decodifica y puntúa un bloque de imágenes.
+
+    Args:
+        clasificador: ClasificadorImagenes cargado
+        origen: Directorio de las rutas
+        rutas: Rutas relativas del bloque
+        batch_size: Imágenes por llamada a la red
+
+    Returns:
+        DataFrame: ruta, error, severidad, prob_<clase>, version_modelo, puntuado_en
+    """
+    from negocio.ml.decodificacion_imagenes import TAMANO_ENTRADA, decodificar_imagen
+
+    ancho, alto = TAMANO_ENTRADA
+    imagenes = np.empty((len(rutas), alto, ancho, 3), dtype=np.uint8)
+    indices_validos: List[int] = []
+    errores: List[Optional[str]] = [None] * len(rutas)
+
+    for i, ruta in enumerate(rutas):
+        try:
+            decodificar_imagen(
+                (origen / ruta).read_bytes(), destino=imagenes[len(indices_validos)]
+            )
+            indices_validos.append(i)
+        except (ValueError, OSError) as e:
+            errores[i] = str(e)
+
+    probabilidades = np.full(
+        (len(rutas), len(clasificador.clases)), np.nan, dtype=np.float32
+    )
+    for desde in range(0, len(indices_validos), batch_size):
+        hasta = min(desde + batch_size, len(indices_validos))
+        probabilidades[indices_validos[desde:hasta]] = (
+            clasificador.predecir_lote(imagenes[desde:hasta])
+        )
+
+    validas = np.zeros(len(rutas), dtype=bool)
+    validas[indices_validos] = True
+    resultados = pd.DataFrame({'ruta': rutas, 'error': errores})
+    return _agregar_probabilidades(
+        resultados, clasificador.clases, probabilidades, validas, clasificador.version_modelo
+    )
+
+
+def lotes_pacientes(
+    coleccion: Collection,
+    tamano: int,
+    ultimo: Any
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Recorre la colección pacientes por _id con un cursor, en bloques.
+
+    Args:
+        coleccion: Colección pacientes
+        tamano: Documentos por bloque
+        ultimo: Último _id ya escrito (se continúa después de él)
+
+    Yields:
+        Documentos del bloque
+    """
+    filtro = {'_id': {'$gt': ultimo}} if ultimo is not None else {}
+    print(f"  ✓ {coleccion.count_documents(filtro)} pacientes pendientes")
+    cursor = coleccion.find(
+        filtro, {'puntuacion': 0, 'nombre': 0, 'apellido': 0, 'ci': 0}
+    ).sort('_id', 1).batch_size(tamano)
+
+    lote: List[Dict[str, Any]] = []
+    for documento in cursor:
+        lote.append(documento)
+        if len(lote) == tamano:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+def puntuar_pacientes(predictor, documentos: List[Dict[str, Any]]) -> pd.DataFrame:
+    """
+    Puntúa un bloque de documentos de pacientes.
+
+    Los pacientes que no pasan validar_lote (campos faltantes, valores
+    imposibles o categorías que el modelo no conoce) quedan con error en
+    vez de abortar el bloque.
+
+    Args:
+        predictor: PredictorSeveridad cargado
+        documentos: Documentos de la colección pacientes
+
+    Returns:
+        DataFrame: _id, paciente_id, error, severidad, prob_<clase>,
+        version_modelo, puntuado_en
+    """
+    datos = pd.DataFrame([PacienteSchema.a_datos_prediccion(d) for d in documentos])
+    resultado = validar_lote(datos, dominios=predictor.dominios)
+    validas = resultado.validos
+
+    clases = list(predictor.modelo.classes_)
+    probabilidades = np.full((len(datos), len(clases)), np.nan)
+    if validas.any():
+        _, probabilidades[validas] = predictor.predecir_dataframe(resultado.datos[validas])
+
+    resultados = pd.DataFrame({
+        '_id': [d['_id'] for d in documentos],
+        'paciente_id': datos['paciente_id'],
+        'error': resultado.errores
+    })
+    return _agregar_probabilidades(
+        resultados, clases, probabilidades, validas, predictor.version_modelo
+    )
+
+
+def ejecutar(
+    lotes: Iterable[Any],
+    funcion: Callable[[Any], pd.DataFrame],
+    salida,
+    checkpoint: Checkpoint,
+    clave: str,
+    hilos: int
+) -> Dict[str, Any]:
+    """
+    Puntúa todos los bloques, escribe cada uno y avanza el checkpoint.
+
+    El checkpoint se guarda después de escribir: si se corta entre ambos,
+    el bloque se vuelve a escribir al reanudar (las salidas son
+    idempotentes).
+
+    Returns:
+        Estado final del checkpoint más segundos de la corrida
+    """
+    inicio = time.perf_counter()
+    procesados = 0
+    with tqdm(desc="  Puntuando", unit="item") as progreso:
+        for resultados in procesar_en_orden(lotes, funcion, hilos):
+            salida.escribir(resultados, checkpoint.estado['partes'])
+            errores = int(resultados['error'].notna().sum())
+            checkpoint.avanzar(resultados[clave].iloc[-1], len(resultados), errores)
+            procesados += len(resultados)
+            progreso.update(len(resultados))
+
+    segundos = time.perf_counter() - inicio
+    print(f"\n  ✓ {procesados} puntuados en esta corrida ({segundos:.1f} s, "
+          f"{procesados / max(segundos, 1e-9):.0f}/s)")
+    print(f"  ✓ Total: {checkpoint.estado['procesados']}, "
+          f"con error: {checkpoint.estado['errores']}")
+    return {**checkpoint.estado, 'segundos': round(segundos, 2)}
+
+
+def main():
+    """Función principal."""
+    parser = argparse.ArgumentParser(description="Puntuar imágenes o pacientes por lotes")
+    subparsers = parser.add_subparsers(dest='tipo', required=True)
+
+    for tipo, bloque in (('imagenes', 256), ('pacientes', 5000)):
+        sub = subparsers.add_parser(tipo)
+        sub.add_argument('--destino', choices=['parquet', 'mongo'], default='parquet')
+        sub.add_argument('--salida', type=Path, default=DIRECTORIO_PUNTUACIONES / tipo,
+                         help='Directorio de partes Parquet y checkpoint')
+        sub.add_argument('--bloque', type=int, default=bloque,
+                         help=f'Elementos por bloque/checkpoint (default: {bloque})')
+        sub.add_argument('--hilos', type=int, default=4,
+                         help='Bloques puntuados en paralelo (default: 4)')
+        sub.add_argument('--reiniciar', action='store_true',
+                         help='Ignorar el checkpoint y empezar de cero')
+        if tipo == 'imagenes':
+            sub.add_argument('--origen', type=Path, default=DIRECTORIO_IMAGENES)
+            sub.add_argument('--backend', choices=['keras', 'tflite'], default=None)
+            sub.add_argument('--batch-size', type=int, default=32,
+                             help='Imágenes por llamada a la red (default: 32)')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"PUNTUACIÓN POR LOTES: {args.tipo.upper()}")
+    print("=" * 60)
+
+    db = None
+    if args.destino == 'mongo' or args.tipo == 'pacientes':
+        from datos.configuracion.conexion_mongodb import ConexionMongoDB
+        db = ConexionMongoDB().conectar()
+
+    if args.tipo == 'imagenes':
+        from negocio.ml.clasificador_imagenes import ClasificadorImagenes
+
+        modelo = ClasificadorImagenes(backend=args.backend)
+        clave = 'ruta'
+        checkpoint = Checkpoint(
+            args.salida / '_checkpoint.json', modelo.version_modelo, args.reiniciar
+        )
+        lotes = lotes_imagenes(args.origen, args.bloque, checkpoint.ultimo)
+        funcion = lambda rutas: puntuar_imagenes(modelo, args.origen, rutas, args.batch_size)
+        salida_mongo = lambda: SalidaMongo(db['puntuaciones_imagenes'], 'ruta')
+    else:
+        from negocio.ml.prediccion_severidad import PredictorSeveridad
+
+        modelo = PredictorSeveridad()
+        clave = '_id'
+        checkpoint = Checkpoint(
+            args.salida / '_checkpoint.json', modelo.version_modelo, args.reiniciar
+        )
+        lotes = lotes_pacientes(db['pacientes'], args.bloque, checkpoint.ultimo)
+        funcion = lambda documentos: puntuar_pacientes(modelo, documentos)
+        salida_mongo = lambda: SalidaMongo(db['pacientes'], '_id', campo='puntuacion')
+
+    print(f"\nModelo: {modelo.version_modelo}")
+    if checkpoint.reanudado:
+        print(f"Reanudando: {checkpoint.estado['procesados']} ya puntuados")
+
+    if args.destino == 'mongo':
+        salida = salida_mongo()
+    else:
+        salida = SalidaParquet(args.salida, limpiar=not checkpoint.reanudado)
+
+    ejecutar(lotes, funcion, salida, checkpoint, clave, args.hilos)
+
+
+if __name__ == "__main__":
+    main()
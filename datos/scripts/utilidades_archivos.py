@@ -0,0 +1,196 @@
+"""
+Utilidades de archivos para los scripts de datasets.
+Capa: DATOS
+Responsabilidad: Listar, hashear y materializar archivos (copia, hardlink o
+reflink) de forma segura ante interrupciones, y guardar manifiestos JSON.
+Estándares: PEP 8, Type hints, Docstrings
+"""
+
+from typing import Any, Iterable, List, Optional, Tuple
+from pathlib import Path
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import hashlib
+import json
+import os
+import shutil
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin reflink
+    fcntl = None
+
+
+# ioctl de Linux para clonar un archivo (Btrfs, XFS, etc.)
+FICLONE = 0x40049409
+
+MODOS_MATERIALIZACION = ('copiar', 'hardlink', 'reflink')
+
+
+def listar_archivos(directorio: Path, extensiones: Iterable[str]) -> List[os.DirEntry]:
+    """
+    Lista los archivos de un directorio (sin recursión) por extensión.
+
+    Usa os.scandir: el tipo de entrada viene del propio listado y no hace
+    falta un stat por archivo para filtrar.
+
+    Args:
+        directorio: Directorio a listar
+        extensiones: Extensiones aceptadas en minúsculas (p.ej. '.jpg')
+
+    Returns:
+        Entradas ordenadas por nombre
+    """
+    extensiones = tuple(extensiones)
+    with os.scandir(directorio) as entradas:
+        archivos = [
+            e for e in entradas
+            if e.is_file() and os.path.splitext(e.name)[1].lower() in extensiones
+        ]
+    return sorted(archivos, key=lambda e: e.name)
+
+
+def escanear_arbol(
+    directorio: Path,
+    extensiones: Iterable[str],
+    hilos: Optional[int] = None
+) -> List[Tuple[str, int, int]]:
+    """
+    Recorre un árbol de directorios en paralelo y obtiene tamaño y mtime.
+
+    Cada subdirectorio es una tarea del pool: en discos de red o con muchas
+    carpetas, los os.scandir y stat se solapan en vez de ir uno por uno.
+
+    Args:
+        directorio: Raíz del recorrido
+        extensiones: Extensiones aceptadas en minúsculas (p.ej. '.jpg')
+        hilos: Hilos de E/S (default: 4 por CPU, máx. 32)
+
+    Returns:
+        Tuplas (ruta relativa posix, tamaño, mtime_ns) ordenadas por ruta
+
+    Example:
+        >>> escanear_arbol(Path('datos/imagenes_raw'), ('.jpg',))[0]
+        ('skin_burn/img0.jpg', 7516, 1792373530915259094)
+    """
+    extensiones = tuple(extensiones)
+    raiz = str(directorio)
+    inicio_relativo = len(raiz) + 1
+
+    def escanear(carpeta: str) -> Tuple[List[Tuple[str, int, int]], List[str]]:
+        archivos, subcarpetas = [], []
+        with os.scandir(carpeta) as entradas:
+            for entrada in entradas:
+                if entrada.is_dir(follow_symlinks=False):
+                    subcarpetas.append(entrada.path)
+                elif os.path.splitext(entrada.name)[1].lower() in extensiones:
+                    info = entrada.stat()
+                    relativa = entrada.path[inicio_relativo:].replace(os.sep, '/')
+                    archivos.append((relativa, info.st_size, info.st_mtime_ns))
+        return archivos, subcarpetas
+
+    resultado: List[Tuple[str, int, int]] = []
+    with ThreadPoolExecutor(max_workers=hilos or min(32, 4 * (os.cpu_count() or 1))) as ejecutor:
+        pendientes = {ejecutor.submit(escanear, raiz)}
+        while pendientes:
+            terminadas, pendientes = wait(pendientes, return_when=FIRST_COMPLETED)
+            for futuro in terminadas:
+                archivos, subcarpetas = futuro.result()
+                resultado.extend(archivos)
+                pendientes.update(ejecutor.submit(escanear, c) for c in subcarpetas)
+
+    return sorted(resultado)
+
+
+def hash_archivo(ruta: Path, tamano_bloque: int = 1 << 20) -> str:
+    """
+    Calcula el hash de contenido de un archivo.
+
+    Args:
+        ruta: Archivo a leer
+        tamano_bloque: Bytes por lectura
+
+    Returns:
+        BLAKE2b de 16 bytes en hexadecimal
+
+    Example:
+        >>> hash_archivo(Path('img1.jpg'))
+        '3f9c0a...'
+    """
+    resumen = hashlib.blake2b(digest_size=16)
+    with open(ruta, 'rb') as archivo:
+        while bloque := archivo.read(tamano_bloque):
+            resumen.update(bloque)
+    return resumen.hexdigest()
+
+
+def _clonar(origen: Path, destino: Path) -> None:
+    """Reflink (copy-on-write) de origen en destino; OSError si no se puede."""
+    if fcntl is None:
+        raise OSError("reflink no soportado en esta plataforma")
+    with open(origen, 'rb') as fuente, open(destino, 'wb') as salida:
+        fcntl.ioctl(salida.fileno(), FICLONE, fuente.fileno())
+    shutil.copystat(origen, destino)
+
+
+def materializar(origen: Path, destino: Path, modo: str = 'copiar') -> str:
+    """
+    Crea destino con el contenido de origen.
+
+    Se escribe con un nombre temporal y se renombra al final: si el proceso
+    se corta, nunca queda un destino a medio copiar. Si el modo pedido no es
+    posible (otro sistema de archivos, sin soporte de reflink) se copia.
+
+    Args:
+        origen: Archivo existente
+        destino: Ruta a crear (se reemplaza si existe)
+        modo: 'copiar', 'hardlink' (mismo inodo, sin usar espacio) o
+            'reflink' (copy-on-write, solo Btrfs/XFS/APFS...)
+
+    Returns:
+        Modo realmente usado
+
+    Raises:
+        ValueError: Si el modo no existe
+    """
+    if modo not in MODOS_MATERIALIZACION:
+        raise ValueError(f"Modo inválido: {modo} (opciones: {MODOS_MATERIALIZACION})")
+
+    temporal = destino.with_name(f".{destino.name}.tmp")
+    temporal.unlink(missing_ok=True)
+
+    usado = modo
+    try:
+        if modo == 'hardlink':
+            os.link(origen, temporal)
+        elif modo == 'reflink':
+            _clonar(origen, temporal)
+        else:
+            shutil.copy2(origen, temporal)
+    except OSError:
+        if modo == 'copiar':
+            raise
+        temporal.unlink(missing_ok=True)
+        shutil.copy2(origen, temporal)
+        usado = 'copiar'
+
+    os.replace(temporal, destino)
+    return usado
+
+
+def escribir_json_atomico(ruta: Path, datos: Any) -> None:
+    """
+    Escribe un JSON reemplazando el archivo de una vez.
+
+    Un lector (u otra corrida interrumpida) ve el archivo anterior completo
+    o el nuevo completo, nunca uno truncado.
+
+    Args:
+        ruta: Archivo destino
+        datos: Objeto serializable
+    """
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    temporal = ruta.with_name(f".{ruta.name}.tmp")
+    temporal.write_text(
+        json.dumps(datos, indent=1, ensure_ascii=False), encoding='utf-8'
+    )
+    os.replace(temporal, ruta)
@@ -0,0 +1,149 @@
+"""
+Caché de predicciones CNN por contenido de imagen.
+Capa: NEGOCIO / ML
+Responsabilidad: Evitar reejecutar la red cuando llega una foto ya evaluada
+(reintentos, reevaluaciones con signos vitales actualizados).
+Estándares: PEP 8, Type hints, Docstrings, SOLID
+
+Funcionamiento:
+    - La clave es (versión del modelo, hash BLAKE2b de los bytes crudos):
+      un acierto se resuelve antes de decodificar la imagen.
+    - Solo se guarda el vector de probabilidades de la CNN; el Random
+      Forest y la fusión se calculan siempre con los signos vitales nuevos.
+    - LRU acotado por cantidad de entradas (CNN_CACHE_ENTRADAS, 0 = apagado).
+"""
+
+from typing import Dict, Any, Optional, Tuple
+from collections import OrderedDict
+import hashlib
+import os
+import threading
+import numpy as np
+
+
+class CachePredicciones:
+    """
+    Caché LRU thread-safe de vectores de probabilidad por imagen.
+
+    Principios SOLID:
+    - SRP: Solo guarda y recupera predicciones por contenido
+    - OCP: La versión del modelo forma parte de la clave; un modelo nuevo
+      nunca ve predicciones del anterior
+    """
+
+    def __init__(
+        self,
+        version_modelo: str,
+        max_entradas: Optional[int] = None
+    ):
+        """
+        Inicializa la caché vacía.
+
+        Args:
+            version_modelo: Identificador del modelo que produce las predicciones
+            max_entradas: Máximo de imágenes recordadas
+                (default: CNN_CACHE_ENTRADAS o 2048)
+        """
+        if max_entradas is None:
+            max_entradas = int(os.getenv('CNN_CACHE_ENTRADAS', 2048))
+
+        self.version_modelo = version_modelo
+        self.max_entradas = max(0, max_entradas)
+
+        self._entradas: "OrderedDict[Tuple[str, bytes], np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._aciertos = 0
+        self._fallos = 0
+        self._desalojos = 0
+
+    @property
+    def habilitada(self) -> bool:
+        """Indica si la caché guarda algo (max_entradas > 0)."""
+        return self.max_entradas > 0
+
+    def clave(self, datos: bytes) -> Tuple[str, bytes]:
+        """
+        Calcula la clave de una imagen.
+
+        BLAKE2b con digest de 16 bytes procesa ~1 GB/s: una foto de 4 MB
+        cuesta unos milisegundos, contra decenas de decodificar + inferir.
+
+        Args:
+            datos: Bytes crudos del archivo de imagen
+
+        Returns:
+            Tupla (version_modelo, digest)
+        """
+        return self.version_modelo, hashlib.blake2b(datos, digest_size=16).digest()
+
+    def obtener(self, clave: Tuple[str, bytes]) -> Optional[np.ndarray]:
+        """
+        Busca la predicción de una imagen y la marca como reciente.
+
+        Args:
+            clave: Resultado de clave()
+
+        Returns:
+            Array (4,) de probabilidades (solo lectura) o None si no está
+        """
+        with self._lock:
+            prediccion = self._entradas.get(clave)
+            if prediccion is None:
+                self._fallos += 1
+                return None
+            self._entradas.move_to_end(clave)
+            self._aciertos += 1
+            return prediccion
+
+    def guardar(self, clave: Tuple[str, bytes], prediccion: np.ndarray) -> None:
+        """
+        Guarda la predicción de una imagen, desalojando la menos reciente.
+
+        Args:
+            clave: Resultado de clave()
+            prediccion: Array (4,) de probabilidades de la CNN
+        """
+        if not self.habilitada:
+            return
+
+        # Copia propia e inmutable: la fila original puede ser una vista
+        # del lote de salida de la red
+        copia = np.array(prediccion, dtype=np.float32)
+        copia.flags.writeable = False
+
+        with self._lock:
+            self._entradas[clave] = copia
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+                self._desalojos += 1
+
+    def limpiar(self) -> None:
+        """Vacía la caché (los contadores se conservan)."""
+        with self._lock:
+            self._entradas.clear()
+
+    def obtener_estadisticas(self) -> Dict[str, Any]:
+        """
+        Obtiene métricas de uso de la caché.
+
+        Returns:
+            Dict con entradas, aciertos, fallos, tasa de aciertos y desalojos
+
+        Example:
+            >>> cache.obtener_estadisticas()['tasa_aciertos']
+            0.37
+        """
+        with self._lock:
+            consultas = self._aciertos + self._fallos
+            return {
+                'version_modelo': self.version_modelo,
+                'entradas': len(self._entradas),
+                'max_entradas': self.max_entradas,
+                'aciertos': self._aciertos,
+                'fallos': self._fallos,
+                'tasa_aciertos': round(self._aciertos / consultas, 4)
+                if consultas else 0.0,
+                'desalojos': self._desalojos
+            }
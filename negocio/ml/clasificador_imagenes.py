@@ -9,26 +9,57 @@ Arquitectura CNN:
 - Capas personalizadas para 4 clases (crítico, alto, medio, bajo)
 - Input: Imagen 224x224x3 RGB
 - Output: Probabilidades para cada clase de severidad
+
+TensorFlow se importa recién al construir el clasificador: importar este
+módulo es barato y el servicio puede atender signos vitales mientras la
+CNN se carga en segundo plano.
 """
 
-from typing import Dict, Tuple, Any
+from typing import Dict, Tuple, Any, Optional
 import numpy as np
 from pathlib import Path
-import base64
-from io import BytesIO
-
-# Importaciones condicionales para evitar errores si TensorFlow no está instalado
-try:
-    from tensorflow import keras
-    from tensorflow.keras.applications import MobileNetV2
-    from tensorflow.keras.models import Model, load_model
-    from tensorflow.keras.layers import Dense, GlobalAveragePooling2D, Dropout
-    from tensorflow.keras.preprocessing.image import img_to_array
-    from PIL import Image
-    TENSORFLOW_AVAILABLE = True
-except ImportError:
-    TENSORFLOW_AVAILABLE = False
-    print("WARNING: TensorFlow no disponible. Clasificador de imágenes deshabilitado.")
+import os
+import threading
+import time
+
+from negocio.ml.decodificacion_imagenes import decodificar_imagen, decodificar_base64
+from negocio.ml.cache_predicciones import CachePredicciones
+
+# Se asignan en _importar_tensorflow()
+tf = None
+keras = None
+
+
+# Backends de inferencia soportados (variable de entorno CNN_BACKEND)
+BACKENDS = ('keras', 'tflite')
+
+
+def _importar_tensorflow() -> float:
+    """
+    Importa TensorFlow una sola vez por proceso.
+
+    Returns:
+        Milisegundos que tomó el import (0 si ya estaba importado)
+
+    Raises:
+        ImportError: Si TensorFlow no está instalado
+    """
+    global tf, keras
+    if tf is not None:
+        return 0.0
+
+    inicio = time.perf_counter()
+    try:
+        import tensorflow
+    except ImportError as e:
+        raise ImportError(
+            "TensorFlow no está instalado. "
+            "Instala con: pip install tensorflow==2.20.0"
+        ) from e
+
+    keras = tensorflow.keras
+    tf = tensorflow
+    return (time.perf_counter() - inicio) * 1000
 
 
 class ClasificadorImagenes:
@@ -49,29 +80,86 @@ class ClasificadorImagenes:
         img_size: Tamaño de entrada (224, 224)
     """
 
-    def __init__(self, ruta_modelo: str = "modelos_ml/modelo_cnn_severidad.h5"):
+    def __init__(
+        self,
+        ruta_modelo: str = "modelos_ml/modelo_cnn_severidad.h5",
+        backend: Optional[str] = None,
+        ruta_tflite: str = "modelos_ml/modelo_cnn_severidad_int8.tflite"
+    ):
         """
         Inicializa el clasificador CNN.
 
         Args:
             ruta_modelo: Ruta al modelo entrenado (.h5)
+            backend: 'keras' (float32, TensorFlow completo) o 'tflite'
+                (int8, intérprete TFLite) (default: CNN_BACKEND o 'keras')
+            ruta_tflite: Ruta al modelo cuantizado por
+                notebooks/exportar_tflite.py
 
         Raises:
             ImportError: Si TensorFlow no está instalado
-            FileNotFoundError: Si el modelo no existe (se creará uno nuevo)
+            ValueError: Si el backend no existe
+            FileNotFoundError: Si el backend es tflite y el modelo no existe
+                (con keras se crea una arquitectura nueva)
         """
-        if not TENSORFLOW_AVAILABLE:
-            raise ImportError(
-                "TensorFlow no está instalado. "
-                "Instala con: pip install tensorflow==2.15.0"
+        if backend is None:
+            backend = os.getenv('CNN_BACKEND', 'keras')
+        backend = backend.lower()
+        if backend not in BACKENDS:
+            raise ValueError(
+                f"Backend CNN inválido: {backend}. Opciones: {BACKENDS}"
             )
 
-        self.ruta_base = Path(__file__).parent.parent.parent / ruta_modelo
+        raiz = Path(__file__).parent.parent.parent
+        self.ruta_base = raiz / ruta_modelo
+        self.ruta_tflite = raiz / ruta_tflite
+        self.backend = backend
         self.modelo = None
         self.clases = ['critico', 'alto', 'medio', 'bajo']
         self.img_size = (224, 224)
+        self._inferencia = None
+
+        # El intérprete TFLite no es thread-safe
+        self._interprete = None
+        self._lock_interprete = threading.Lock()
 
-        self._cargar_o_crear_modelo()
+        # Desglose del tiempo de arranque (ms)
+        self.tiempos_carga: Dict[str, float] = {
+            'importar_tensorflow_ms': _importar_tensorflow()
+        }
+
+        inicio = time.perf_counter()
+        if backend == 'tflite':
+            self._cargar_tflite()
+        else:
+            self._cargar_o_crear_modelo()
+            self._construir_inferencia()
+        self.tiempos_carga['cargar_modelo_ms'] = (time.perf_counter() - inicio) * 1000
+
+        self.tiempos_carga['calentar_ms'] = self.calentar()
+        print(f"✓ Inferencia CNN ({backend}) calentada en "
+              f"{self.tiempos_carga['calentar_ms']:.0f} ms")
+
+        # Predicciones por contenido de imagen, válidas solo para este modelo
+        self.version_modelo = self._calcular_version_modelo()
+        self.cache = CachePredicciones(self.version_modelo)
+
+    def _calcular_version_modelo(self) -> str:
+        """
+        Identifica el modelo cargado (backend + archivo + tamaño + mtime).
+
+        Reentrenar o reexportar cambia tamaño/mtime y con ello la versión,
+        así la caché nunca mezcla predicciones de modelos distintos.
+
+        Returns:
+            String de versión, p.ej. 'keras:modelo_cnn_severidad.h5:9412368:1718...'
+        """
+        ruta = self.ruta_tflite if self.backend == 'tflite' else self.ruta_base
+        if not ruta.exists():
+            # Arquitectura sin entrenar: pesos aleatorios propios de esta instancia
+            return f"{self.backend}:sin_entrenar:{id(self)}"
+        info = ruta.stat()
+        return f"{self.backend}:{ruta.name}:{info.st_size}:{info.st_mtime_ns}"
 
     def _cargar_o_crear_modelo(self) -> None:
         """
@@ -82,7 +170,7 @@ class ClasificadorImagenes:
         """
         try:
             # Intentar cargar modelo pre-entrenado
-            self.modelo = load_model(self.ruta_base)
+            self.modelo = keras.models.load_model(self.ruta_base)
             print(f"✓ Modelo CNN cargado desde: {self.ruta_base}")
         except (FileNotFoundError, OSError):
             # Si no existe, crear arquitectura nueva
@@ -91,7 +179,62 @@ class ClasificadorImagenes:
             self.modelo = self._crear_arquitectura_cnn()
             print("  ✓ Arquitectura creada. Ejecuta el script de entrenamiento.")
 
-    def _crear_arquitectura_cnn(self) -> Model:
+    def _cargar_tflite(self) -> None:
+        """
+        Carga el modelo cuantizado en el intérprete TFLite.
+
+        Raises:
+            FileNotFoundError: Si no se exportó el modelo
+        """
+        if not self.ruta_tflite.exists():
+            raise FileNotFoundError(
+                f"No se encontró {self.ruta_tflite}. "
+                "Ejecuta notebooks/exportar_tflite.py primero."
+            )
+
+        self._interprete = tf.lite.Interpreter(
+            model_path=str(self.ruta_tflite),
+            num_threads=int(os.getenv('CNN_HILOS', os.cpu_count() or 1))
+        )
+        self._interprete.allocate_tensors()
+        print(f"✓ Modelo CNN TFLite cargado desde: {self.ruta_tflite}")
+
+    def _construir_inferencia(self) -> None:
+        """
+        Envuelve la llamada directa al modelo en un tf.function con firma fija.
+
+        keras.Model.predict arma un adaptador de datos y un iterador en
+        cada llamada; para lotes de 1 a pocas imágenes ese armado cuesta más
+        que la red. Con la firma fija (batch variable, 224x224x3 uint8)
+        el grafo se traza una sola vez y se reutiliza para cualquier lote.
+        La normalización [0, 255] → [0, 1] va dentro del grafo, así la
+        imagen viaja como uint8 (4 veces menos memoria que float32).
+        """
+        modelo = self.modelo
+
+        @tf.function(
+            input_signature=[
+                tf.TensorSpec(shape=(None, 224, 224, 3), dtype=tf.uint8)
+            ]
+        )
+        def inferencia(imagenes):
+            normalizadas = tf.cast(imagenes, tf.float32) * (1.0 / 255.0)
+            return modelo(normalizadas, training=False)
+
+        self._inferencia = inferencia
+
+    def calentar(self) -> float:
+        """
+        Ejecuta una inferencia de prueba para trazar el grafo al arrancar.
+
+        Returns:
+            Milisegundos que tomó la primera llamada (trazado incluido)
+        """
+        inicio = time.perf_counter()
+        self.predecir_lote(np.zeros((1, 224, 224, 3), dtype=np.uint8))
+        return (time.perf_counter() - inicio) * 1000
+
+    def _crear_arquitectura_cnn(self) -> Any:
         """
         Crea arquitectura CNN con Transfer Learning (MobileNetV2).
 
@@ -109,7 +252,7 @@ class ClasificadorImagenes:
             >>> modelo.summary()
         """
         # Base pre-entrenada (Transfer Learning)
-        base_model = MobileNetV2(
+        base_model = keras.applications.MobileNetV2(
             weights='imagenet',
             include_top=False,
             input_shape=(224, 224, 3)
@@ -120,13 +263,15 @@ class ClasificadorImagenes:
 
         # Agregar capas personalizadas
         x = base_model.output
-        x = GlobalAveragePooling2D()(x)
-        x = Dense(128, activation='relu', name='dense_features')(x)
-        x = Dropout(0.5, name='dropout')(x)
-        predictions = Dense(4, activation='softmax', name='predicciones')(x)
+        x = keras.layers.GlobalAveragePooling2D()(x)
+        x = keras.layers.Dense(128, activation='relu', name='dense_features')(x)
+        x = keras.layers.Dropout(0.5, name='dropout')(x)
+        predictions = keras.layers.Dense(
+            4, activation='softmax', name='predicciones'
+        )(x)
 
         # Crear modelo completo
-        modelo = Model(inputs=base_model.input, outputs=predictions)
+        modelo = keras.Model(inputs=base_model.input, outputs=predictions)
 
         # Compilar
         modelo.compile(
@@ -165,52 +310,159 @@ class ClasificadorImagenes:
             >>> print(f"Confianza: {probs['alto']:.2%}")
             Confianza: 87.34%
         """
-        # Decodificar y preprocesar imagen
-        img_array = self._decodificar_imagen_base64(imagen_base64)
+        return self.predecir_bytes(decodificar_base64(imagen_base64))
 
-        # Predecir con el modelo
-        predicciones = self.modelo.predict(img_array, verbose=0)[0]
+    def predecir_bytes(self, datos: bytes) -> Tuple[str, Dict[str, float]]:
+        """
+        Predice la severidad desde los bytes crudos, pasando por la caché.
 
-        # Obtener clase con mayor probabilidad
-        idx_max = np.argmax(predicciones)
-        severidad = self.clases[idx_max]
+        Si la misma imagen ya se evaluó con este modelo se evita
+        decodificarla y correr la red.
 
-        # Crear diccionario de probabilidades
-        probabilidades = {
-            clase: float(prob)
-            for clase, prob in zip(self.clases, predicciones)
-        }
+        Args:
+            datos: Bytes del archivo de imagen (JPEG/PNG)
 
-        return severidad, probabilidades
+        Returns:
+            Tupla (severidad_predicha, probabilidades)
 
-    def predecir_desde_archivo(
-        self,
-        ruta_imagen: str
-    ) -> Tuple[str, Dict[str, float]]:
+        Raises:
+            ValueError: Si la imagen no puede decodificarse o excede los límites
         """
-        Predice severidad desde archivo de imagen (útil para pruebas).
+        clave = self.cache.clave(datos)
+        predicciones = self.cache.obtener(clave)
+        if predicciones is None:
+            imagen = self.preparar_imagen_bytes(datos)
+            predicciones = self.predecir_lote(imagen[np.newaxis])[0]
+            self.cache.guardar(clave, predicciones)
+
+        return self.interpretar(predicciones)
+
+    def predecir_lote(self, imagenes: np.ndarray) -> np.ndarray:
+        """
+        Ejecuta el modelo sobre un lote de imágenes ya preprocesadas.
+
+        Es el único punto donde se invoca la red; lo usan predecir,
+        predecir_desde_archivo y el servidor de inferencia por lotes.
+        Llama al grafo trazado (sin keras predict ni dropout activo).
 
         Args:
-            ruta_imagen: Ruta al archivo de imagen
+            imagenes: Array (N, 224, 224, 3) uint8 en [0, 255]; también
+                acepta float en [0, 1] (se convierte a uint8)
 
         Returns:
-            Tupla (severidad, probabilidades)
+            Array (N, 4) con las probabilidades en el orden de self.clases
 
         Example:
-            >>> severidad, probs = clasificador.predecir_desde_archivo(
-            ...     "datos/imagenes_entrenamiento/critico/quemadura.jpg"
-            ... )
+            >>> lote = np.stack([img1, img2])
+            >>> clasificador.predecir_lote(lote).shape
+            (2, 4)
+        """
+        if imagenes.dtype != np.uint8:
+            imagenes = np.clip(np.rint(imagenes * 255.0), 0, 255).astype(np.uint8)
+
+        if self.backend == 'tflite':
+            return self._predecir_lote_tflite(imagenes)
+
+        return self._inferencia(tf.convert_to_tensor(imagenes)).numpy()
+
+    def _predecir_lote_tflite(self, imagenes: np.ndarray) -> np.ndarray:
+        """
+        Ejecuta el intérprete TFLite imagen por imagen.
+
+        El intérprete queda con batch 1: en CPU el modelo int8 gana poco
+        con lotes y redimensionar tensores en cada llamada cuesta más.
+
+        Args:
+            imagenes: Array (N, 224, 224, 3) uint8
+
+        Returns:
+            Array (N, 4) float32 con las probabilidades
+        """
+        with self._lock_interprete:
+            entrada = self._interprete.get_input_details()[0]
+            salida = self._interprete.get_output_details()[0]
+
+            # Si la entrada cuantizada es exactamente pixel/255, los bytes
+            # de la imagen ya son el tensor de entrada
+            escala, cero = entrada['quantization']
+            directo = (
+                entrada['dtype'] == np.uint8
+                and cero == 0 and abs(escala * 255.0 - 1.0) < 1e-6
+            )
+
+            resultados = np.empty((len(imagenes), len(self.clases)), dtype=np.float32)
+            for i, imagen in enumerate(imagenes):
+                if directo:
+                    tensor = imagen[np.newaxis]
+                else:
+                    tensor = self._cuantizar(
+                        imagen[np.newaxis].astype(np.float32) / 255.0, entrada
+                    )
+                self._interprete.set_tensor(entrada['index'], tensor)
+                self._interprete.invoke()
+                resultados[i] = self._descuantizar(
+                    self._interprete.get_tensor(salida['index'])[0], salida
+                )
+            return resultados
+
+    @staticmethod
+    def _cuantizar(valores: np.ndarray, detalle: Dict[str, Any]) -> np.ndarray:
+        """Convierte float al tipo del tensor de entrada (q = x / escala + cero)."""
+        tipo = detalle['dtype']
+        if tipo == np.float32:
+            return valores.astype(np.float32, copy=False)
+
+        escala, cero = detalle['quantization']
+        limites = np.iinfo(tipo)
+        return np.clip(
+            np.round(valores / escala + cero), limites.min, limites.max
+        ).astype(tipo)
+
+    @staticmethod
+    def _descuantizar(valores: np.ndarray, detalle: Dict[str, Any]) -> np.ndarray:
+        """Convierte la salida cuantizada a float (x = (q - cero) * escala)."""
+        if detalle['dtype'] == np.float32:
+            return valores
+
+        escala, cero = detalle['quantization']
+        return (valores.astype(np.float32) - cero) * escala
+
+    def predecir_lote_keras(self, imagenes: np.ndarray) -> np.ndarray:
+        """
+        Igual que predecir_lote pero con keras.Model.predict.
+
+        Se conserva como referencia para benchmarks y verificación.
+
+        Args:
+            imagenes: Array (N, 224, 224, 3) uint8
+
+        Returns:
+            Array (N, 4) con las probabilidades
+        """
+        normalizadas = imagenes.astype(np.float32)
+        normalizadas *= 1.0 / 255.0
+        return self.modelo.predict(
+            normalizadas, batch_size=len(imagenes), verbose=0
+        )
+
+    def interpretar(
+        self,
+        predicciones: np.ndarray
+    ) -> Tuple[str, Dict[str, float]]:
         """
-        # Leer y preprocesar imagen
-        img = Image.open(ruta_imagen).convert('RGB')
-        img_array = self._preprocesar_imagen_pil(img)
+        Convierte la salida del modelo para una imagen en (severidad, probabilidades).
 
-        # Predecir
-        predicciones = self.modelo.predict(img_array, verbose=0)[0]
+        Args:
+            predicciones: Array (4,) de probabilidades
 
+        Returns:
+            Tupla (severidad_predicha, probabilidades)
+        """
+        # Obtener clase con mayor probabilidad
         idx_max = np.argmax(predicciones)
         severidad = self.clases[idx_max]
 
+        # Crear diccionario de probabilidades
         probabilidades = {
             clase: float(prob)
             for clase, prob in zip(self.clases, predicciones)
@@ -218,61 +470,58 @@ class ClasificadorImagenes:
 
         return severidad, probabilidades
 
-    def _decodificar_imagen_base64(self, imagen_base64: str) -> np.ndarray:
+    def preparar_imagen(self, imagen_base64: str) -> np.ndarray:
         """
-        Decodifica imagen de base64 a array NumPy preprocesado.
+        Decodifica y preprocesa una imagen base64 sin dimensión batch.
 
         Args:
-            imagen_base64: String base64 de la imagen
+            imagen_base64: Imagen codificada en base64
 
         Returns:
-            Array NumPy (1, 224, 224, 3) normalizado
+            Array (224, 224, 3) uint8, listo para apilar en un lote
 
         Raises:
             ValueError: Si la imagen no puede decodificarse
         """
-        try:
-            # Decodificar base64
-            img_data = base64.b64decode(imagen_base64)
-            img = Image.open(BytesIO(img_data)).convert('RGB')
-
-            # Preprocesar
-            return self._preprocesar_imagen_pil(img)
-
-        except Exception as e:
-            raise ValueError(
-                f"Error al decodificar imagen base64: {str(e)}"
-            ) from e
+        return self.preparar_imagen_bytes(decodificar_base64(imagen_base64))
 
-    def _preprocesar_imagen_pil(self, img: Image.Image) -> np.ndarray:
+    def preparar_imagen_bytes(self, datos: bytes) -> np.ndarray:
         """
-        Preprocesa imagen PIL a formato requerido por el modelo.
+        Decodifica y preprocesa los bytes crudos de una imagen (JPEG/PNG).
 
-        Pasos:
-        1. Redimensionar a 224x224
-        2. Convertir a array NumPy
-        3. Normalizar [0, 255] → [0, 1]
-        4. Expandir dimensión batch
+        Evita el paso por base64 cuando la imagen llega como archivo.
 
         Args:
-            img: Objeto PIL Image
+            datos: Bytes del archivo de imagen
 
         Returns:
-            Array NumPy (1, 224, 224, 3) en rango [0, 1]
+            Array (224, 224, 3) uint8, listo para apilar en un lote
+
+        Raises:
+            ValueError: Si la imagen no puede decodificarse o excede los límites
         """
-        # Redimensionar
-        img = img.resize(self.img_size)
+        return decodificar_imagen(datos)
 
-        # Convertir a array
-        img_array = img_to_array(img)
+    def predecir_desde_archivo(
+        self,
+        ruta_imagen: str
+    ) -> Tuple[str, Dict[str, float]]:
+        """
+        Predice severidad desde archivo de imagen (útil para pruebas).
 
-        # Normalizar a [0, 1]
-        img_array = img_array / 255.0
+        Args:
+            ruta_imagen: Ruta al archivo de imagen
 
-        # Expandir dimensión batch (1, 224, 224, 3)
-        img_array = np.expand_dims(img_array, axis=0)
+        Returns:
+            Tupla (severidad, probabilidades)
 
-        return img_array
+        Example:
+            >>> severidad, probs = clasificador.predecir_desde_archivo(
+            ...     "datos/imagenes_entrenamiento/critico/quemadura.jpg"
+            ... )
+        """
+        with open(ruta_imagen, 'rb') as archivo:
+            return self.predecir_bytes(archivo.read())
 
     def obtener_info_modelo(self) -> Dict[str, Any]:
         """
@@ -286,6 +535,16 @@ class ClasificadorImagenes:
             >>> print(info['total_parametros'])
             2,257,984
         """
+        if self.backend == 'tflite':
+            return {
+                'arquitectura': 'MobileNetV2 + Transfer Learning (TFLite int8)',
+                'backend': self.backend,
+                'clases': self.clases,
+                'tamano_mb': round(self.ruta_tflite.stat().st_size / 1e6, 2),
+                'input_shape': (224, 224, 3),
+                'ruta_modelo': str(self.ruta_tflite)
+            }
+
         if self.modelo is None:
             return {"error": "Modelo no cargado"}
 
@@ -297,6 +556,7 @@ class ClasificadorImagenes:
 
         return {
             'arquitectura': 'MobileNetV2 + Transfer Learning',
+            'backend': self.backend,
             'clases': self.clases,
             'total_parametros': int(total_params),
             'parametros_entrenables': int(trainable_params),
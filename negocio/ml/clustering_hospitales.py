@@ -5,11 +5,35 @@ Responsabilidad: Agrupar hospitales por especialidades y recomendar según neces
 Estándares: PEP 8, Type hints, Docstrings, SOLID
 """
 
-from typing import Dict, List, Tuple, Any
+from typing import Dict, List, Tuple, Any, Mapping, NamedTuple, Optional, Union
+from types import MappingProxyType
+from datetime import datetime, timezone
+import os
 import joblib
 import numpy as np
+import pandas as pd
 from pathlib import Path
 
+from datos.modelos.especialidades import (
+    ESPECIALIDAD_PRINCIPAL,
+    ESPECIALIDADES_POR_INCIDENTE,
+)
+
+
+# Clave de la tabla de rutas para tipos de incidente desconocidos
+TIPO_DESCONOCIDO = '*'
+
+# Ruta: clusters ordenados de mejor a peor con su puntaje
+RutaClusters = Tuple[Tuple[int, float], ...]
+
+
+class EstadoClusters(NamedTuple):
+    """Modelo, info y tabla de rutas que siempre se reemplazan juntos."""
+
+    modelo_kmeans: Any
+    cluster_info: Dict[int, Dict[str, Any]]
+    tabla_rutas: Mapping[str, RutaClusters]
+
 
 class ClusteringHospitales:
     """
@@ -32,19 +56,34 @@ class ClusteringHospitales:
             ruta_modelos: Directorio donde están los modelos entrenados
         """
         self.ruta_base = Path(__file__).parent.parent.parent / ruta_modelos
-        self.modelo_kmeans = None
         self.especialidades_list = None
-        self.cluster_info = None
+        self._estado: Optional[EstadoClusters] = None
         self._cargar_modelos()
 
+    @property
+    def modelo_kmeans(self) -> Any:
+        """Modelo K-means vigente."""
+        return self._estado.modelo_kmeans
+
+    @property
+    def cluster_info(self) -> Dict[int, Dict[str, Any]]:
+        """Info de clusters vigente {cluster_id: {'especialidades', 'hospitales'}}."""
+        return self._estado.cluster_info
+
+    @property
+    def tabla_rutas(self) -> Mapping[str, RutaClusters]:
+        """Tabla de rutas vigente."""
+        return self._estado.tabla_rutas
+
     def _cargar_modelos(self) -> None:
         """Carga modelo K-means y metadatos desde disco."""
         try:
-            self.modelo_kmeans = joblib.load(self.ruta_base / "modelo_kmeans.pkl")
+            modelo_kmeans = joblib.load(self.ruta_base / "modelo_kmeans.pkl")
             self.especialidades_list = joblib.load(
                 self.ruta_base / "especialidades_list.pkl"
             )
-            self.cluster_info = joblib.load(self.ruta_base / "cluster_info.pkl")
+            cluster_info = joblib.load(self.ruta_base / "cluster_info.pkl")
+            self.actualizar_clusters(modelo_kmeans, cluster_info)
             print(f"Modelo K-means cargado desde: {self.ruta_base}")
         except FileNotFoundError as e:
             raise FileNotFoundError(
@@ -92,6 +131,81 @@ class ClusteringHospitales:
 
         return int(cluster)
 
+    def predecir_clusters_lote(
+        self,
+        especialidades: Union[np.ndarray, pd.DataFrame, List[Dict[str, int]]]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Predice el cluster de muchos hospitales con una sola llamada a K-means.
+
+        Args:
+            especialidades: Cualquiera de estos formatos:
+                - Matriz (H, 8) 0/1 en el orden de especialidades_list
+                - DataFrame con una columna 0/1 por especialidad
+                  (hospitales_con_clusters.csv) o con la columna
+                  'especialidades' como texto "general,trauma" (hospitales.csv)
+                - Lista de dicts {especialidad: 0/1}
+
+        Returns:
+            Tupla (clusters, distancias):
+                - clusters: Array (H,) con el cluster de cada hospital
+                - distancias: Array (H, K) con la distancia a cada centroide;
+                  distancias[i, clusters[i]] es la del cluster asignado y la
+                  diferencia con el segundo más cercano sirve como confianza
+
+        Example:
+            >>> df = pd.read_csv('archivos_csv/hospitales.csv')
+            >>> clusters, distancias = clusterer.predecir_clusters_lote(df)
+            >>> clusters[:5]
+            array([2, 1, 3, 1, 3])
+        """
+        X = self.matriz_especialidades(especialidades)
+        if len(X) == 0:
+            return np.empty(0, dtype=np.int64), np.empty((0, 0))
+
+        # transform da todas las distancias; el argmin es lo que haría predict
+        distancias = self.modelo_kmeans.transform(X)
+        clusters = distancias.argmin(axis=1)
+        return clusters, distancias
+
+    def matriz_especialidades(
+        self,
+        especialidades: Union[np.ndarray, pd.DataFrame, List[Dict[str, int]]]
+    ) -> np.ndarray:
+        """
+        Convierte especialidades de hospitales en la matriz de features de K-means.
+
+        Args:
+            especialidades: Mismos formatos que predecir_clusters_lote
+
+        Returns:
+            Matriz (H, 8) float64 en el orden de especialidades_list
+        """
+        if isinstance(especialidades, pd.DataFrame):
+            if set(self.especialidades_list).issubset(especialidades.columns):
+                return especialidades[self.especialidades_list].to_numpy(
+                    dtype=np.float64
+                )
+            # Formato hospitales.csv: "general,toxicologia,neurologia"
+            dummies = (
+                especialidades['especialidades'].fillna('')
+                .str.replace(' ', '', regex=False)
+                .str.get_dummies(sep=',')
+            )
+            return dummies.reindex(
+                columns=self.especialidades_list, fill_value=0
+            ).to_numpy(dtype=np.float64)
+
+        if isinstance(especialidades, np.ndarray):
+            return especialidades.astype(np.float64, copy=False).reshape(
+                -1, len(self.especialidades_list)
+            )
+
+        return np.array([
+            [hospital.get(esp, 0) for esp in self.especialidades_list]
+            for hospital in especialidades
+        ], dtype=np.float64).reshape(-1, len(self.especialidades_list))
+
     def obtener_cluster_por_tipo_emergencia(
         self,
         tipo_emergencia: str
@@ -111,42 +225,178 @@ class ClusteringHospitales:
             >>> print(f"Cluster recomendado: {cluster}")
             Cluster recomendado: 2
         """
-        # Mapeo de tipo de emergencia a especialidad requerida
-        mapeo_especialidad = {
-            'problema_cardiaco': 'cardiologia',
-            'problema_respiratorio': 'general',
-            'quemadura': 'quemados',
-            'fractura': 'ortopedia',
-            'alergia_severa': 'general',
-            'dolor_abdominal': 'general',
-            'caida': 'ortopedia',
-            'herida_punzante': 'trauma',
-            'accidente_auto': 'trauma',
-            'intoxicacion': 'toxicologia'
-        }
-
-        especialidad_requerida = mapeo_especialidad.get(
-            tipo_emergencia,
-            'general'
+        return self.obtener_clusters_rankeados(tipo_emergencia)[0][0]
+
+    def obtener_clusters_rankeados(self, tipo_emergencia: str) -> RutaClusters:
+        """
+        Obtiene los clusters ordenados de mejor a peor para un tipo de emergencia.
+
+        Consulta la tabla de rutas precalculada: una sola búsqueda en dict.
+        El primero es el que devuelve obtener_cluster_por_tipo_emergencia;
+        los siguientes son alternativas de respaldo cuando los primeros no
+        tienen hospitales disponibles (ver _construir_tabla_rutas).
+
+        Args:
+            tipo_emergencia: Tipo de incidente
+
+        Returns:
+            Tupla de (cluster_id, puntaje) en orden de preferencia
+
+        Example:
+            >>> clusterer.obtener_clusters_rankeados('quemadura')
+            ((2, 12.0), (0, 4.5), (3, 0.5), (1, 0.0))
+        """
+        ruta = self.tabla_rutas.get(tipo_emergencia)
+        if ruta is None:
+            ruta = self.tabla_rutas[TIPO_DESCONOCIDO]
+        return ruta
+
+    def obtener_tabla_rutas(self) -> Mapping[str, RutaClusters]:
+        """
+        Obtiene la tabla de rutas tipo de incidente → clusters rankeados.
+
+        Returns:
+            Mapping de solo lectura (la clave '*' cubre tipos desconocidos)
+        """
+        return self.tabla_rutas
+
+    def actualizar_clusters(
+        self,
+        modelo_kmeans: Any,
+        cluster_info: Dict[int, Dict[str, Any]]
+    ) -> None:
+        """
+        Reemplaza el modelo y la info de clusters, reconstruyendo la tabla de rutas.
+
+        La tabla nueva se construye antes del reemplazo y los tres objetos
+        se publican con una sola asignación, de modo que las solicitudes en
+        curso ven el estado anterior o el nuevo, nunca uno a medias.
+
+        Args:
+            modelo_kmeans: Modelo K-means ya entrenado
+            cluster_info: Dict {cluster_id: {'especialidades', 'hospitales'}}
+        """
+        self._estado = EstadoClusters(
+            modelo_kmeans=modelo_kmeans,
+            cluster_info=cluster_info,
+            tabla_rutas=self._construir_tabla_rutas(cluster_info)
         )
 
-        # Buscar cluster con mayor proporción de esa especialidad
-        mejor_cluster = 0
-        mejor_score = 0
+    def guardar_modelos(self, directorio: Optional[Path] = None) -> Path:
+        """
+        Escribe el modelo y la info vigentes como una versión aparte.
+
+        Los pickles de modelos_ml (los del notebook, versionados en git) no
+        se tocan: cada llamada crea modelos_ml/reclustering/<fecha UTC>/ con
+        modelo_kmeans.pkl, cluster_info.pkl y especialidades_list.pkl, que
+        se carga con ClusteringHospitales('modelos_ml/reclustering/<fecha>').
 
-        for cluster_id, info in self.cluster_info.items():
-            if especialidad_requerida in info['especialidades']:
-                # Este cluster tiene la especialidad requerida
-                # Dar mayor peso si es la especialidad dominante
-                score = len(info['especialidades'])  # Más especialidades = más completo
-                if info['especialidades'][0] == especialidad_requerida:
-                    score += 10  # Bonus si es la principal
+        Cada archivo se escribe primero como temporal y luego se renombra,
+        así nunca se carga un pickle a medio escribir.
 
-                if score > mejor_score:
-                    mejor_score = score
-                    mejor_cluster = cluster_id
+        Args:
+            directorio: Destino (default: una versión nueva en
+                modelos_ml/reclustering/)
+
+        Returns:
+            Directorio escrito
+        """
+        if directorio is None:
+            version = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+            directorio = self.ruta_base / "reclustering" / version
+        directorio = Path(directorio)
+        directorio.mkdir(parents=True, exist_ok=True)
+
+        estado = self._estado
+        for nombre, objeto in [
+            ("modelo_kmeans.pkl", estado.modelo_kmeans),
+            ("cluster_info.pkl", estado.cluster_info),
+            ("especialidades_list.pkl", self.especialidades_list),
+        ]:
+            destino = directorio / nombre
+            temporal = destino.with_suffix(".pkl.tmp")
+            joblib.dump(objeto, temporal)
+            os.replace(temporal, destino)
+        return directorio
+
+    def _construir_tabla_rutas(
+        self,
+        cluster_info: Dict[int, Dict[str, Any]]
+    ) -> Mapping[str, RutaClusters]:
+        """
+        Precalcula el ranking de clusters para cada tipo de incidente.
+
+        El primer cluster es siempre el del criterio original: entre los que
+        contienen la especialidad principal, el de mayor puntaje base
+        (cantidad de especialidades del cluster, +10 si es su especialidad
+        dominante), ante empate el de menor id, y el cluster 0 si ninguno
+        la contiene. Los demás son respaldo: primero los que contienen la
+        especialidad principal y luego el resto, cada grupo de mayor a
+        menor puntaje con +0.5 por cada especialidad preferida del
+        incidente.
 
-        return mejor_cluster
+        Args:
+            cluster_info: Dict {cluster_id: {'especialidades', 'hospitales'}}
+
+        Returns:
+            Mapping de solo lectura tipo_incidente → ruta
+        """
+        incidentes = dict(ESPECIALIDADES_POR_INCIDENTE)
+        incidentes[TIPO_DESCONOCIDO] = (['general'], [])
+
+        tabla: Dict[str, RutaClusters] = {}
+
+        for tipo, (requeridas, preferidas) in incidentes.items():
+            principal = requeridas[0]
+            con_especialidad = []   # (cluster_id, puntaje base, bonus)
+            respaldo = []           # (cluster_id, bonus)
+
+            for cluster_id, info in sorted(cluster_info.items()):
+                especialidades = info['especialidades']
+                bonus = 0.5 * sum(
+                    1 for esp in preferidas if esp in especialidades
+                )
+
+                if principal in especialidades:
+                    # Más especialidades = más completo
+                    base = len(especialidades)
+                    if especialidades[0] == principal:
+                        base += 10  # Bonus si es la principal
+                    con_especialidad.append((int(cluster_id), float(base), bonus))
+                else:
+                    respaldo.append((int(cluster_id), float(bonus)))
+
+            # Clusters recorridos por id y sorted estable: ante empate gana
+            # el de menor id
+            if con_especialidad:
+                primero = max(con_especialidad, key=lambda c: c[1])[0]
+            else:
+                primero = 0
+            ruta = [
+                (cluster_id, base + bonus) for cluster_id, base, bonus
+                in sorted(con_especialidad, key=lambda c: -(c[1] + c[2]))
+            ] + sorted(respaldo, key=lambda c: -c[1])
+
+            ruta.sort(key=lambda c: c[0] != primero)
+            tabla[tipo] = tuple(ruta) if ruta else ((0, 0.0),)
+
+        return MappingProxyType(tabla)
+
+    def obtener_especialidad_requerida(self, tipo_emergencia: str) -> str:
+        """
+        Obtiene la especialidad que requiere un tipo de emergencia.
+
+        Args:
+            tipo_emergencia: Tipo de incidente
+
+        Returns:
+            Nombre de la especialidad ('general' si el tipo no es conocido)
+
+        Example:
+            >>> clusterer.obtener_especialidad_requerida('quemadura')
+            'quemados'
+        """
+        return ESPECIALIDAD_PRINCIPAL.get(tipo_emergencia, 'general')
 
     def filtrar_hospitales_por_cluster(
         self,
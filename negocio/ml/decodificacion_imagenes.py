@@ -0,0 +1,111 @@
+"""
+Decodificación rápida de imágenes para la CNN.
+Capa: NEGOCIO / ML
+Responsabilidad: Convertir bytes de una foto (JPEG/PNG) en el tensor uint8
+(224, 224, 3) que consume el clasificador, con el menor trabajo posible.
+Estándares: PEP 8, Type hints, Docstrings
+
+Pipeline:
+    1. Rechazar por tamaño en bytes y por dimensiones leídas del encabezado,
+       antes de decodificar un solo pixel.
+    2. JPEG: modo draft, el decodificador escala por 1/2, 1/4 u 1/8 al
+       decodificar y entrega la menor resolución que sigue siendo >= 224.
+       Una foto de 12 MP se decodifica a ~500x375 en vez de 4000x3000.
+    3. Redimensionar (bilineal) a 224x224 y copiar a un buffer uint8.
+    4. La normalización a [0, 1] ocurre dentro del grafo del modelo.
+"""
+
+from typing import Optional, Tuple
+from io import BytesIO
+import base64
+import os
+import numpy as np
+from PIL import Image
+
+
+# Límites de entrada (configurables por entorno)
+MAX_BYTES = int(os.getenv('CNN_MAX_BYTES_IMAGEN', 15 * 1024 * 1024))
+MAX_PIXELES = int(os.getenv('CNN_MAX_PIXELES_IMAGEN', 50_000_000))
+
+TAMANO_ENTRADA = (224, 224)
+
+
+def decodificar_imagen(
+    datos: bytes,
+    destino: Optional[np.ndarray] = None,
+    tamano: Tuple[int, int] = TAMANO_ENTRADA
+) -> np.ndarray:
+    """
+    Decodifica una imagen y la deja lista para el modelo.
+
+    Args:
+        datos: Bytes del archivo (JPEG, PNG, ...)
+        destino: Buffer uint8 (alto, ancho, 3) donde escribir el resultado;
+            si es None se crea uno nuevo
+        tamano: (ancho, alto) de salida
+
+    Returns:
+        Array uint8 (alto, ancho, 3) con valores en [0, 255]
+        (el mismo objeto que destino si se pasó)
+
+    Raises:
+        ValueError: Si la imagen excede los límites o no puede decodificarse
+
+    Example:
+        >>> with open('foto.jpg', 'rb') as f:
+        ...     imagen = decodificar_imagen(f.read())
+        >>> imagen.shape, imagen.dtype
+        ((224, 224, 3), dtype('uint8'))
+    """
+    if len(datos) > MAX_BYTES:
+        raise ValueError(
+            f"Imagen demasiado grande: {len(datos)} bytes (máximo {MAX_BYTES})"
+        )
+
+    try:
+        # Image.open solo lee el encabezado; los pixeles aún no se decodifican
+        img = Image.open(BytesIO(datos))
+        ancho, alto = img.size
+        if ancho * alto > MAX_PIXELES:
+            raise ValueError(
+                f"Imagen demasiado grande: {ancho}x{alto} (máximo {MAX_PIXELES} pixeles)"
+            )
+
+        if img.format == 'JPEG':
+            img.draft('RGB', tamano)
+        if img.mode != 'RGB':
+            img = img.convert('RGB')
+        img = img.resize(tamano, Image.BILINEAR)
+    except ValueError:
+        raise
+    except Exception as e:
+        raise ValueError(f"Error al decodificar imagen: {str(e)}") from e
+
+    if destino is None:
+        return np.asarray(img, dtype=np.uint8)
+
+    destino[...] = np.asarray(img, dtype=np.uint8)
+    return destino
+
+
+def decodificar_base64(imagen_base64: str) -> bytes:
+    """
+    Decodifica base64 validando el tamaño antes de reservar memoria.
+
+    Args:
+        imagen_base64: Imagen codificada en base64
+
+    Returns:
+        Bytes de la imagen
+
+    Raises:
+        ValueError: Si excede MAX_BYTES o el base64 es inválido
+    """
+    # 4 caracteres base64 codifican 3 bytes
+    if len(imagen_base64) * 3 // 4 > MAX_BYTES:
+        raise ValueError(f"Imagen demasiado grande (máximo {MAX_BYTES} bytes)")
+
+    try:
+        return base64.b64decode(imagen_base64)
+    except Exception as e:
+        raise ValueError(f"Base64 inválido: {str(e)}") from e
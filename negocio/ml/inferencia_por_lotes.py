@@ -0,0 +1,275 @@
+"""
+Servidor de inferencia por lotes dinámicos para el clasificador CNN.
+Capa: NEGOCIO / ML
+Responsabilidad: Agrupar solicitudes concurrentes de imágenes en lotes y
+ejecutar la red una sola vez por lote.
+Estándares: PEP 8, Type hints, Docstrings, SOLID
+
+Funcionamiento:
+    1. Cada solicitud preprocesa su imagen en su propio hilo y encola el
+       tensor (224, 224, 3) junto con un Future. Las imágenes que ya están
+       en la caché del clasificador no se encolan.
+    2. Un hilo trabajador toma la primera solicitud y sigue juntando hasta
+       completar max_lote o hasta que pasen espera_ms milisegundos.
+    3. El lote se ejecuta con ClasificadorImagenes.predecir_lote y cada fila
+       de la salida se entrega al Future de quien la pidió.
+"""
+
+from typing import Dict, Tuple, Any, List, Optional
+from concurrent.futures import Future
+import os
+import queue
+import threading
+import time
+import numpy as np
+
+from negocio.ml.clasificador_imagenes import ClasificadorImagenes
+from negocio.ml.decodificacion_imagenes import decodificar_base64
+
+
+# Marca de fin para el hilo trabajador
+_FIN = object()
+
+# Entrada de la red (ver ClasificadorImagenes.predecir_lote)
+FORMA_IMAGEN = (224, 224, 3)
+
+
+class InferenciaPorLotes:
+    """
+    Front-end de lotes dinámicos alrededor de ClasificadorImagenes.
+
+    Con una sola solicitud en vuelo la latencia extra es a lo sumo
+    espera_ms; con muchas, el costo fijo de cada llamada a la red se
+    reparte entre todo el lote.
+
+    Principios SOLID:
+    - SRP: Solo agrupa solicitudes y reparte resultados
+    - DIP: Depende de ClasificadorImagenes.predecir_lote
+    """
+
+    def __init__(
+        self,
+        clasificador: ClasificadorImagenes,
+        max_lote: Optional[int] = None,
+        espera_ms: Optional[float] = None
+    ):
+        """
+        Inicializa el servidor (el hilo no arranca hasta iniciar()).
+
+        Args:
+            clasificador: Clasificador CNN ya cargado
+            max_lote: Máximo de imágenes por lote
+                (default: CNN_MAX_LOTE o 16)
+            espera_ms: Tiempo máximo para completar un lote
+                (default: CNN_ESPERA_MS o 5)
+        """
+        if max_lote is None:
+            max_lote = int(os.getenv('CNN_MAX_LOTE', 16))
+        if espera_ms is None:
+            espera_ms = float(os.getenv('CNN_ESPERA_MS', 5))
+
+        self.clasificador = clasificador
+        self.max_lote = max(1, max_lote)
+        self.espera_ms = max(0.0, espera_ms)
+
+        self._cola: "queue.Queue[Any]" = queue.Queue()
+        # Lote preasignado: el hilo trabajador copia aquí cada imagen
+        # en vez de reservar un array nuevo por lote con np.stack
+        self._buffer = np.empty((self.max_lote, *FORMA_IMAGEN), dtype=np.uint8)
+        self._hilo: Optional[threading.Thread] = None
+        self._activo = False
+
+        self._lotes = 0
+        self._imagenes = 0
+
+    def iniciar(self) -> None:
+        """Arranca el hilo trabajador (idempotente)."""
+        if self._activo:
+            return
+        self._activo = True
+        self._hilo = threading.Thread(
+            target=self._ciclo, name="inferencia-cnn", daemon=True
+        )
+        self._hilo.start()
+
+    def detener(self, timeout: float = 5.0) -> None:
+        """Procesa lo ya encolado y detiene el hilo trabajador."""
+        if not self._activo:
+            return
+        self._activo = False
+        self._cola.put(_FIN)
+        if self._hilo is not None:
+            self._hilo.join(timeout)
+            self._hilo = None
+
+    def enviar(self, imagen: np.ndarray) -> "Future[np.ndarray]":
+        """
+        Encola una imagen preprocesada.
+
+        Args:
+            imagen: Array (224, 224, 3) uint8
+
+        Returns:
+            Future que se resuelve con el array (4,) de probabilidades
+
+        Raises:
+            ValueError: Si la imagen no es (224, 224, 3) uint8
+            RuntimeError: Si el servidor no está iniciado
+        """
+        # Se valida aquí, en el hilo del llamador: una imagen mal formada
+        # no debe llegar al lote compartido
+        if (not isinstance(imagen, np.ndarray) or imagen.shape != FORMA_IMAGEN
+                or imagen.dtype != np.uint8):
+            raise ValueError(
+                f"Se esperaba una imagen {FORMA_IMAGEN} uint8, se recibió "
+                f"{getattr(imagen, 'shape', type(imagen).__name__)} "
+                f"{getattr(imagen, 'dtype', '')}".rstrip()
+            )
+        if not self._activo:
+            raise RuntimeError("El servidor de inferencia por lotes no está iniciado")
+
+        futuro: "Future[np.ndarray]" = Future()
+        self._cola.put((imagen, futuro))
+        return futuro
+
+    def predecir(
+        self,
+        imagen_base64: str,
+        timeout: Optional[float] = None
+    ) -> Tuple[str, Dict[str, float]]:
+        """
+        Predice la severidad de una imagen pasando por el lote compartido.
+
+        Misma interfaz que ClasificadorImagenes.predecir.
+
+        Args:
+            imagen_base64: Imagen codificada en base64
+            timeout: Segundos máximos de espera del resultado
+
+        Returns:
+            Tupla (severidad_predicha, probabilidades)
+
+        Raises:
+            ValueError: Si la imagen no puede decodificarse
+            concurrent.futures.TimeoutError: Si vence el timeout
+
+        Example:
+            >>> servidor = InferenciaPorLotes(clasificador)
+            >>> servidor.iniciar()
+            >>> servidor.predecir(imagen_b64)
+            ('alto', {'critico': 0.08, 'alto': 0.81, 'medio': 0.09, 'bajo': 0.02})
+        """
+        return self.predecir_bytes(decodificar_base64(imagen_base64), timeout)
+
+    def predecir_bytes(
+        self,
+        datos: bytes,
+        timeout: Optional[float] = None
+    ) -> Tuple[str, Dict[str, float]]:
+        """
+        Igual que predecir pero con los bytes crudos de la imagen.
+
+        Consulta primero la caché del clasificador; solo las imágenes
+        nuevas se decodifican y ocupan lugar en un lote. La caché se llena
+        cuando el lote termina, aunque este llamador ya haya dejado de
+        esperar: un reintento tras un timeout no vuelve a correr la red.
+
+        Args:
+            datos: Bytes del archivo de imagen (JPEG/PNG)
+            timeout: Segundos máximos de espera del resultado
+
+        Returns:
+            Tupla (severidad_predicha, probabilidades)
+        """
+        cache = self.clasificador.cache
+        clave = cache.clave(datos)
+        predicciones = cache.obtener(clave)
+        if predicciones is None:
+            imagen = self.clasificador.preparar_imagen_bytes(datos)
+            futuro = self.enviar(imagen)
+            futuro.add_done_callback(
+                lambda terminado: self._guardar_en_cache(clave, terminado)
+            )
+            predicciones = futuro.result(timeout)
+
+        return self.clasificador.interpretar(predicciones)
+
+    def _guardar_en_cache(self, clave: Tuple[str, bytes], futuro: Future) -> None:
+        """Guarda el resultado de un Future terminado (ignora cancelados y errores)."""
+        if futuro.cancelled() or futuro.exception() is not None:
+            return
+        self.clasificador.cache.guardar(clave, futuro.result())
+
+    def obtener_estadisticas(self) -> Dict[str, Any]:
+        """
+        Obtiene contadores del servidor.
+
+        Returns:
+            Dict con lotes ejecutados, imágenes y tamaño promedio de lote
+        """
+        return {
+            'max_lote': self.max_lote,
+            'espera_ms': self.espera_ms,
+            'lotes': self._lotes,
+            'imagenes': self._imagenes,
+            'tamano_promedio_lote': round(self._imagenes / self._lotes, 2)
+            if self._lotes else 0.0,
+            'en_cola': self._cola.qsize()
+        }
+
+    def _ciclo(self) -> None:
+        """Bucle del hilo trabajador."""
+        while True:
+            primero = self._cola.get()
+            if primero is _FIN:
+                return
+
+            lote = [primero]
+            terminar = False
+            limite = time.monotonic() + self.espera_ms / 1000
+
+            while len(lote) < self.max_lote:
+                restante = limite - time.monotonic()
+                try:
+                    if restante > 0:
+                        item = self._cola.get(timeout=restante)
+                    else:
+                        # Vencida la espera, solo tomar lo que ya llegó
+                        item = self._cola.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _FIN:
+                    terminar = True
+                    break
+                lote.append(item)
+
+            self._ejecutar_lote(lote)
+            if terminar:
+                return
+
+    def _ejecutar_lote(self, lote: List[Tuple[np.ndarray, Future]]) -> None:
+        """Corre la red sobre el lote y entrega cada fila a su Future."""
+        # Descartar solicitudes canceladas antes de gastar cómputo en ellas
+        vigentes = [
+            (imagen, futuro) for imagen, futuro in lote
+            if futuro.set_running_or_notify_cancel()
+        ]
+        if not vigentes:
+            return
+
+        # Cualquier fallo, también al copiar al buffer, se entrega a los
+        # Futures del lote y el hilo sigue atendiendo los siguientes
+        try:
+            lote_buffer = self._buffer[:len(vigentes)]
+            for i, (imagen, _) in enumerate(vigentes):
+                lote_buffer[i] = imagen
+            predicciones = self.clasificador.predecir_lote(lote_buffer)
+        except Exception as e:
+            for _, futuro in vigentes:
+                futuro.set_exception(e)
+            return
+
+        self._lotes += 1
+        self._imagenes += len(vigentes)
+        for (_, futuro), fila in zip(vigentes, predicciones):
+            futuro.set_result(fila)
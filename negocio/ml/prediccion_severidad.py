@@ -11,6 +11,15 @@ import numpy as np
 import pandas as pd
 from pathlib import Path
 
+from datos.modelos.validacion_pacientes import validar_lote, validar_registro
+
+
+# Etiquetas que emite el modelo (classes_ del Random Forest, sin tilde)
+SEVERIDADES = ('critico', 'alto', 'medio', 'bajo')
+
+# Severidades que requieren traslado a un hospital
+SEVERIDADES_TRASLADO = ('critico', 'alto')
+
 
 class PredictorSeveridad:
     """
@@ -36,6 +45,16 @@ class PredictorSeveridad:
         self.features_list = None
         self._cargar_modelos()
 
+        # Categorías que los encoders saben codificar
+        self.dominios = {
+            'sexo': frozenset(self.encoder_sexo.classes_),
+            'tipo_incidente': frozenset(self.encoder_tipo_incidente.classes_)
+        }
+
+        # Identifica el modelo cargado (para puntuaciones por lote)
+        info = (self.ruta_base / "modelo_severidad.pkl").stat()
+        self.version_modelo = f"random_forest:{info.st_size}:{info.st_mtime_ns}"
+
     def _cargar_modelos(self) -> None:
         """Carga modelo Random Forest y encoders desde disco."""
         try:
@@ -52,6 +71,15 @@ class PredictorSeveridad:
                 f"Ejecuta el notebook de entrenamiento primero."
             ) from e
 
+        # Traslado y asignación comparan contra SEVERIDADES: un modelo con
+        # otras etiquetas (p.ej. 'crítico') dejaría pacientes sin atender
+        clases = set(self.modelo.classes_)
+        if clases != set(SEVERIDADES):
+            raise ValueError(
+                f"Clases del modelo {sorted(clases)} no coinciden con "
+                f"SEVERIDADES {sorted(SEVERIDADES)}"
+            )
+
     def predecir(
         self,
         datos_paciente: Dict[str, Any]
@@ -75,11 +103,11 @@ class PredictorSeveridad:
 
         Returns:
             Tupla (severidad_predicha, probabilidades)
-            - severidad_predicha: str ('crítico', 'alto', 'medio', 'bajo')
+            - severidad_predicha: str ('critico', 'alto', 'medio', 'bajo')
             - probabilidades: Dict[str, float] con probabilidad por clase
 
         Raises:
-            ValueError: Si faltan datos requeridos
+            ValueError: Si faltan datos requeridos o hay valores imposibles
 
         Example:
             >>> predictor = PredictorSeveridad()
@@ -93,10 +121,10 @@ class PredictorSeveridad:
             ... }
             >>> severidad, probs = predictor.predecir(datos)
             >>> print(f"Severidad: {severidad}")
-            Severidad: crítico
+            Severidad: critico
         """
-        # Validar datos
-        self._validar_datos(datos_paciente)
+        # Validar y limpiar datos
+        datos_paciente = self._validar_datos(datos_paciente)
 
         # Preprocesar datos
         X = self._preprocesar_datos(datos_paciente)
@@ -113,29 +141,94 @@ class PredictorSeveridad:
 
         return severidad, probabilidades
 
-    def _validar_datos(self, datos: Dict[str, Any]) -> None:
+    def predecir_lote(
+        self,
+        lista_datos: List[Dict[str, Any]]
+    ) -> List[Tuple[str, Dict[str, float]]]:
         """
-        Valida que los datos del paciente estén completos.
+        Predice la severidad de varios pacientes en una sola llamada al modelo.
+
+        Valida y codifica todos los registros, arma un único DataFrame y
+        ejecuta un solo predict_proba, evitando el costo fijo por llamada
+        de scikit-learn cuando llegan muchos pacientes a la vez.
 
         Args:
-            datos: Datos del paciente
+            lista_datos: Lista de diccionarios con el mismo formato que predecir()
+
+        Returns:
+            Lista de tuplas (severidad_predicha, probabilidades), en el
+            mismo orden que la entrada
 
         Raises:
-            ValueError: Si falta algún campo requerido
+            ValueError: Si algún paciente tiene datos incompletos o imposibles
+
+        Example:
+            >>> resultados = predictor.predecir_lote([datos_1, datos_2])
+            >>> [severidad for severidad, _ in resultados]
+            ['critico', 'medio']
         """
-        campos_requeridos = [
-            'edad', 'presion_sistolica', 'presion_diastolica',
-            'frecuencia_cardiaca', 'frecuencia_respiratoria',
-            'temperatura', 'saturacion_oxigeno', 'nivel_dolor',
-            'tiempo_desde_incidente', 'sexo', 'tipo_incidente'
-        ]
+        if not lista_datos:
+            return []
 
-        faltantes = [campo for campo in campos_requeridos if campo not in datos]
+        resultado = validar_lote(pd.DataFrame(lista_datos), dominios=self.dominios)
+        if not resultado.validos.all():
+            invalidos = np.flatnonzero(~resultado.validos)
+            raise ValueError("; ".join(
+                f"Paciente {i}: {resultado.errores.iloc[i]}" for i in invalidos
+            ))
 
-        if faltantes:
-            raise ValueError(
-                f"Faltan campos requeridos: {', '.join(faltantes)}"
+        severidades, probs_matriz = self.predecir_dataframe(resultado.datos)
+        clases = self.modelo.classes_
+
+        return [
+            (
+                severidad,
+                {clase: float(prob) for clase, prob in zip(clases, probs)}
             )
+            for severidad, probs in zip(severidades, probs_matriz)
+        ]
+
+    def predecir_dataframe(self, df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Predice un DataFrame de pacientes sin armar diccionarios por fila.
+
+        Pensado para puntuaciones masivas: el llamador ya validó las
+        filas con validar_lote y recibe arrays para escribir directamente
+        a Parquet o MongoDB.
+
+        Args:
+            df: Una fila por paciente con las columnas de predecir()
+
+        Returns:
+            Tupla (severidades (N,), probabilidades (N, clases)) con las
+            columnas de probabilidad en el orden de self.modelo.classes_
+
+        Raises:
+            ValueError: Si sexo o tipo_incidente tienen valores desconocidos
+        """
+        X = self._preprocesar_lote(df)
+
+        # Una sola inferencia para todo el lote
+        probs_matriz = self.modelo.predict_proba(X)
+        severidades = self.modelo.classes_[np.argmax(probs_matriz, axis=1)]
+
+        return severidades, probs_matriz
+
+    def _validar_datos(self, datos: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Valida los datos del paciente contra los rangos y los encoders.
+
+        Args:
+            datos: Datos del paciente
+
+        Returns:
+            Copia limpia (números coercionados, saturación y dolor
+            recortados a su escala, categorías normalizadas)
+
+        Raises:
+            ValueError: Si falta algún campo o tiene un valor imposible
+        """
+        return validar_registro(datos, dominios=self.dominios)
 
     def _preprocesar_datos(self, datos: Dict[str, Any]) -> pd.DataFrame:
         """
@@ -163,6 +256,25 @@ class PredictorSeveridad:
 
         return X
 
+    def _preprocesar_lote(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Preprocesa un lote de pacientes codificando columnas completas.
+
+        Args:
+            df: DataFrame con una fila por paciente
+
+        Returns:
+            DataFrame con una fila por paciente y features en orden correcto
+        """
+        df = df.copy()
+
+        df['sexo_encoded'] = self.encoder_sexo.transform(df['sexo'])
+        df['tipo_incidente_encoded'] = self.encoder_tipo_incidente.transform(
+            df['tipo_incidente']
+        )
+
+        return df[self.features_list]
+
     def obtener_features_importantes(self, top_n: int = 10) -> List[Tuple[str, float]]:
         """
         Obtiene las features más importantes del modelo.
@@ -0,0 +1,312 @@
+"""
+Re-clustering de hospitales en línea.
+Capa: NEGOCIO / ML
+Responsabilidad: Mantener los clusters de hospitales al día sin volver a
+ejecutar el notebook de K-means: asignar cluster a los hospitales nuevos y
+re-entrenar periódicamente en segundo plano.
+Estándares: PEP 8, Type hints, Docstrings, SOLID
+
+Flujo:
+    1. Cada RECLUSTERING_INTERVALO_ASIGNACION segundos se asigna cluster a
+       los hospitales que no lo tienen (una sola predicción en lote con el
+       modelo vigente). Este servicio no inserta hospitales (llegan por
+       datos/scripts o directo a MongoDB con cluster nulo), así que un
+       hospital nuevo tarda a lo sumo un intervalo en entrar a las
+       recomendaciones.
+    2. Cada RECLUSTERING_INTERVALO_REENTRENAMIENTO segundos se re-entrena
+       MiniBatchKMeans partiendo de los centroides vigentes, se reemplaza el
+       estado en memoria de forma atómica y solo las asignaciones que
+       cambiaron se escriben en MongoDB en un único bulk_write. Los
+       pickles de modelos_ml no se modifican; con
+       RECLUSTERING_GUARDAR_MODELOS=true cada modelo nuevo se guarda además
+       como una versión en modelos_ml/reclustering/.
+
+Al reiniciar, el clusterer vuelve a cargar los pickles del notebook pero
+MongoDB conserva los clusters del último re-entrenamiento. Por eso
+iniciar() re-entrena una vez antes de arrancar el hilo: modelo, tabla de
+rutas y clusters de MongoDB vuelven a coincidir antes de atender
+solicitudes, sin esperar un intervalo completo.
+"""
+
+from typing import Dict, List, Any, Optional
+import os
+import threading
+import time
+import numpy as np
+from sklearn.cluster import MiniBatchKMeans
+
+from negocio.ml.clustering_hospitales import ClusteringHospitales
+from datos.repositorios.repositorio_hospitales import RepositorioHospitales
+from datos.repositorios.registro_hospitales import RegistroHospitales
+
+
+# Una especialidad caracteriza al cluster si la tiene más de la mitad
+# de sus hospitales (mismo criterio que notebooks/entrenar_kmeans.ipynb)
+UMBRAL_ESPECIALIDAD_CLUSTER = 0.5
+
+
+class ReclusteringHospitales:
+    """
+    Subsistema de re-clustering incremental de hospitales.
+
+    El re-entrenamiento se inicializa con los centroides actuales (n_init=1),
+    así cada cluster conserva su número y la tabla de rutas sigue siendo
+    comparable entre versiones.
+
+    Principios SOLID:
+    - SRP: Solo mantiene actualizados los clusters de hospitales
+    - DIP: Depende de ClusteringHospitales y RepositorioHospitales
+    """
+
+    def __init__(
+        self,
+        clusterer: ClusteringHospitales,
+        repositorio: RepositorioHospitales,
+        registro: Optional[RegistroHospitales] = None,
+        intervalo_asignacion: Optional[float] = None,
+        intervalo_reentrenamiento: Optional[float] = None,
+        guardar_modelos: Optional[bool] = None
+    ):
+        """
+        Inicializa el subsistema (el hilo no arranca hasta iniciar()).
+
+        Args:
+            clusterer: Clusterer cuyo estado se reemplaza
+            repositorio: Repositorio de hospitales
+            registro: Registro columnar a invalidar tras cada cambio
+            intervalo_asignacion: Segundos entre asignaciones de pendientes
+                (default: RECLUSTERING_INTERVALO_ASIGNACION o 60)
+            intervalo_reentrenamiento: Segundos entre re-entrenamientos
+                (default: RECLUSTERING_INTERVALO_REENTRENAMIENTO o 3600)
+            guardar_modelos: Si True, guarda cada modelo re-entrenado como
+                versión en modelos_ml/reclustering/
+                (default: RECLUSTERING_GUARDAR_MODELOS o False)
+        """
+        self.clusterer = clusterer
+        self.repositorio = repositorio
+        self.registro = registro
+
+        if intervalo_asignacion is None:
+            intervalo_asignacion = float(
+                os.getenv('RECLUSTERING_INTERVALO_ASIGNACION', 60)
+            )
+        if intervalo_reentrenamiento is None:
+            intervalo_reentrenamiento = float(
+                os.getenv('RECLUSTERING_INTERVALO_REENTRENAMIENTO', 3600)
+            )
+        if guardar_modelos is None:
+            guardar_modelos = os.getenv(
+                'RECLUSTERING_GUARDAR_MODELOS', 'false'
+            ).lower() == 'true'
+
+        self.intervalo_asignacion = intervalo_asignacion
+        self.intervalo_reentrenamiento = intervalo_reentrenamiento
+        self.guardar_modelos = guardar_modelos
+
+        # Serializa asignación y re-entrenamiento (hilo y llamadas manuales)
+        self._lock = threading.Lock()
+        self._detener = threading.Event()
+        self._hilo: Optional[threading.Thread] = None
+
+    def asignar_hospital(self, hospital: Dict[str, Any]) -> int:
+        """
+        Asigna y persiste el cluster de un hospital nuevo o modificado.
+
+        Para quien inserte o edite un hospital y no quiera esperar al
+        sondeo de asignar_pendientes (ej: un script de carga con acceso al
+        servicio). Ninguna ruta de este servicio inserta hospitales.
+
+        Args:
+            hospital: Documento con hospital_id y especialidades
+
+        Returns:
+            Cluster asignado
+
+        Example:
+            >>> reclustering.asignar_hospital(nuevo_hospital)
+            2
+        """
+        cluster = self.clusterer.predecir_cluster(hospital['especialidades'])
+        self.repositorio.actualizar_cluster(hospital['hospital_id'], cluster)
+        self._invalidar_registro()
+        return cluster
+
+    def asignar_pendientes(self) -> Dict[str, int]:
+        """
+        Asigna cluster a todos los hospitales que no tienen uno.
+
+        Returns:
+            Dict {hospital_id: cluster} de los hospitales asignados
+        """
+        with self._lock:
+            pendientes = self.repositorio.obtener_sin_cluster()
+            if not pendientes:
+                return {}
+
+            clusters, _ = self.clusterer.predecir_clusters_lote(
+                [h.get('especialidades', {}) for h in pendientes]
+            )
+            asignaciones = {
+                h['hospital_id']: int(cluster)
+                for h, cluster in zip(pendientes, clusters)
+            }
+            self.repositorio.actualizar_clusters_masivo(asignaciones)
+            self._invalidar_registro()
+            return asignaciones
+
+    def reentrenar(self) -> Dict[str, int]:
+        """
+        Re-entrena K-means con todos los hospitales y publica el resultado.
+
+        Returns:
+            Dict {hospital_id: cluster} solo con las asignaciones que cambiaron
+
+        Example:
+            >>> cambios = reclustering.reentrenar()
+            >>> cambios
+            {'HOSP031': 1}
+        """
+        with self._lock:
+            hospitales = self.repositorio.obtener_todos()
+            modelo_actual = self.clusterer.modelo_kmeans
+            n_clusters = modelo_actual.n_clusters
+            if len(hospitales) < n_clusters:
+                return {}
+
+            especialidades_list = self.clusterer.especialidades_list
+            X = self.clusterer.matriz_especialidades(
+                [h.get('especialidades', {}) for h in hospitales]
+            )
+
+            modelo = MiniBatchKMeans(
+                n_clusters=n_clusters,
+                init=modelo_actual.cluster_centers_,
+                n_init=1,
+                batch_size=min(1024, len(hospitales)),
+                random_state=42
+            ).fit(X)
+            etiquetas = modelo.labels_
+
+            ids = [h['hospital_id'] for h in hospitales]
+            cluster_info = self._construir_cluster_info(
+                X, etiquetas, ids, especialidades_list, n_clusters
+            )
+            self.clusterer.actualizar_clusters(modelo, cluster_info)
+            if self.guardar_modelos:
+                self.clusterer.guardar_modelos()
+
+            cambios = {
+                hospital_id: int(cluster)
+                for hospital_id, cluster, h in zip(ids, etiquetas, hospitales)
+                if h.get('cluster') != int(cluster)
+            }
+            if cambios:
+                self.repositorio.actualizar_clusters_masivo(cambios)
+                self._invalidar_registro()
+            return cambios
+
+    @staticmethod
+    def _construir_cluster_info(
+        X: np.ndarray,
+        etiquetas: np.ndarray,
+        ids: List[str],
+        especialidades_list: List[str],
+        n_clusters: int
+    ) -> Dict[int, Dict[str, Any]]:
+        """
+        Arma cluster_info con el mismo formato que genera el notebook.
+
+        Args:
+            X: Matriz (H, 8) de especialidades 0/1
+            etiquetas: Cluster de cada hospital
+            ids: hospital_id de cada fila
+            especialidades_list: Nombre de cada columna de X
+            n_clusters: Cantidad de clusters
+
+        Returns:
+            Dict {cluster_id: {'especialidades': [...], 'hospitales': [...]}}
+        """
+        cluster_info = {}
+        for cluster_id in range(n_clusters):
+            filas = np.nonzero(etiquetas == cluster_id)[0]
+            if len(filas):
+                proporciones = X[filas].mean(axis=0)
+            else:
+                proporciones = np.zeros(len(especialidades_list))
+            cluster_info[cluster_id] = {
+                'especialidades': [
+                    esp for esp, proporcion in zip(especialidades_list, proporciones)
+                    if proporcion > UMBRAL_ESPECIALIDAD_CLUSTER
+                ],
+                'hospitales': sorted(ids[fila] for fila in filas)
+            }
+        return cluster_info
+
+    def iniciar(self) -> None:
+        """
+        Sincroniza el modelo con MongoDB y arranca el hilo de fondo (idempotente).
+
+        El primer re-entrenamiento corre en el llamador: al volver, el
+        cluster_info en memoria describe los mismos clusters que tienen
+        los hospitales en MongoDB. Si falla (ej: MongoDB caído), el hilo lo
+        reintenta en su primer ciclo.
+        """
+        if self._hilo is not None and self._hilo.is_alive():
+            return
+
+        sincronizado = True
+        try:
+            cambios = self.reentrenar()
+            print(f"Re-clustering: modelo sincronizado con MongoDB, "
+                  f"{len(cambios)} hospitales cambiaron de cluster")
+        except Exception as e:
+            print(f"Error sincronizando re-clustering: {e}")
+            sincronizado = False
+
+        self._detener.clear()
+        self._hilo = threading.Thread(
+            target=self._ciclo, args=(sincronizado,),
+            name="reclustering-hospitales", daemon=True
+        )
+        self._hilo.start()
+
+    def detener(self, timeout: float = 5.0) -> None:
+        """Detiene el hilo de fondo y espera a que termine."""
+        self._detener.set()
+        if self._hilo is not None:
+            self._hilo.join(timeout)
+            self._hilo = None
+
+    def _ciclo(self, sincronizado: bool = True) -> None:
+        """
+        Bucle del hilo: asigna pendientes y re-entrena cuando corresponde.
+
+        Args:
+            sincronizado: Si iniciar() ya re-entrenó; si no, el primer
+                ciclo re-entrena
+        """
+        proximo_reentrenamiento = time.monotonic()
+        if sincronizado:
+            proximo_reentrenamiento += self.intervalo_reentrenamiento
+
+        while not self._detener.wait(self.intervalo_asignacion):
+            try:
+                asignados = self.asignar_pendientes()
+                if asignados:
+                    print(f"Re-clustering: {len(asignados)} hospitales nuevos asignados")
+
+                if time.monotonic() >= proximo_reentrenamiento:
+                    cambios = self.reentrenar()
+                    print(f"Re-clustering: modelo actualizado, "
+                          f"{len(cambios)} hospitales cambiaron de cluster")
+                    proximo_reentrenamiento = (
+                        time.monotonic() + self.intervalo_reentrenamiento
+                    )
+            except Exception as e:
+                # Un fallo (ej: MongoDB caído) no debe matar el hilo
+                print(f"Error en re-clustering: {e}")
+
+    def _invalidar_registro(self) -> None:
+        """Fuerza que el registro columnar relea los clusters."""
+        if self.registro is not None:
+            self.registro.invalidar()
@@ -4,5 +4,7 @@ Orquesta modelos ML y repositorios de datos.
 """
 
 from .servicio_decision import ServicioDecision
+from .asignador_hospitales import AsignadorHospitales
+from .evaluacion_progresiva import EvaluacionProgresiva
 
-__all__ = ['ServicioDecision']
+__all__ = ['ServicioDecision', 'AsignadorHospitales', 'EvaluacionProgresiva']
@@ -0,0 +1,372 @@
+"""
+Asignación de camas para incidentes con múltiples víctimas.
+Capa: NEGOCIO / SERVICIOS
+Responsabilidad: Repartir pacientes entre hospitales respetando capacidad
+y especialidad, minimizando la distancia total recorrida.
+Estándares: PEP 8, Type hints, Docstrings, SOLID
+
+A diferencia de recomendar_hospitales (que mira cada paciente por separado
+y manda a todos al hospital más cercano), aquí se resuelve un problema de
+asignación con capacidades: cada hospital recibe como máximo
+capacidad.maxima - capacidad.actual pacientes.
+"""
+
+from typing import Dict, List, Any, Optional
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+
+from negocio.ml.prediccion_severidad import SEVERIDADES_TRASLADO
+from negocio.servicios.servicio_decision import ServicioDecision
+from datos.repositorios.registro_hospitales import ColumnasHospitales
+
+
+# Costo usado para pares paciente-cama no permitidos
+COSTO_PROHIBIDO = 1e9
+
+# Orden de atención: primero se reparten las camas entre los críticos.
+# Mismas etiquetas que emite el modelo ('critico', sin tilde)
+NIVELES_PRIORIDAD = SEVERIDADES_TRASLADO
+
+# Km extra que "cuesta" cada especialidad preferida que le falta al hospital
+PENALIZACION_PREFERIDA_KM = 1.0
+
+
+class AsignadorHospitales:
+    """
+    Motor de asignación de pacientes a hospitales con capacidad limitada.
+
+    Se apoya en ServicioDecision para evaluar severidad (Random Forest) y en
+    su registro columnar para obtener los hospitales disponibles.
+
+    Principios SOLID:
+    - SRP: Solo asigna pacientes a camas
+    - OCP: Extensible para otros algoritmos (resolver_optimo / resolver_greedy)
+    - DIP: Depende de ServicioDecision, no de MongoDB directamente
+    """
+
+    def __init__(self, servicio: ServicioDecision):
+        """
+        Inicializa el asignador.
+
+        Args:
+            servicio: Servicio de decisión ya inicializado
+        """
+        self.servicio = servicio
+
+    def asignar(
+        self,
+        lista_pacientes: List[Dict[str, Any]],
+        ubicaciones: List[Dict[str, float]],
+        metodo: str = 'optimo'
+    ) -> Dict[str, Any]:
+        """
+        Asigna un hospital a cada paciente que requiere traslado.
+
+        Flujo:
+        1. Evaluar severidad de todo el lote (Random Forest)
+        2. Tomar hospitales con capacidad del registro y calcular distancias
+        3. Por nivel de severidad (crítico → alto), asignar primero exigiendo
+           las especialidades requeridas y luego, para los que quedaron sin
+           cama, sin exigirlas. Las preferidas suman una penalización en km
+        4. Descontar capacidad entre niveles
+
+        Args:
+            lista_pacientes: Lista de datos de pacientes
+            ubicaciones: Ubicación de cada paciente, o una sola para todos
+            metodo: 'optimo' (mínimo costo) o 'greedy' (más cercano disponible)
+
+        Returns:
+            Dict con asignaciones por paciente y resumen del reparto
+
+        Raises:
+            ValueError: Si el método no existe o no coinciden las ubicaciones
+
+        Example:
+            >>> asignador = AsignadorHospitales(servicio)
+            >>> resultado = asignador.asignar(pacientes, [{'latitud': -17.78,
+            ...                                            'longitud': -63.18}])
+            >>> resultado['total_asignados']
+            24
+        """
+        if metodo not in ('optimo', 'greedy'):
+            raise ValueError(f"Método de asignación desconocido: {metodo}")
+
+        if len(ubicaciones) == 1:
+            ubicaciones = ubicaciones * len(lista_pacientes)
+
+        if len(ubicaciones) != len(lista_pacientes):
+            raise ValueError(
+                f"Se recibieron {len(lista_pacientes)} pacientes y "
+                f"{len(ubicaciones)} ubicaciones"
+            )
+
+        resolver = (
+            self.resolver_optimo if metodo == 'optimo' else self.resolver_greedy
+        )
+
+        # 1. Evaluar severidad de todo el lote
+        evaluaciones = self.servicio.evaluar_pacientes_lote(lista_pacientes)
+
+        # 2. Hospitales disponibles como columnas del registro
+        tabla = self.servicio.registro_hospitales.obtener()
+        filas = np.nonzero(tabla.disponibles())[0]
+        capacidades = tabla.camas_libres[filas].astype(np.int64)
+
+        origenes = np.array([
+            [u['latitud'], u['longitud']] for u in ubicaciones
+        ], dtype=float).reshape(-1, 2)
+        distancias = self.servicio.calcular_matriz_distancias(
+            origenes, tabla.coordenadas[filas]
+        )
+
+        # Matrices paciente × hospital con operaciones de bits:
+        # ¿tiene todas las requeridas? ¿cuántas preferidas le faltan?
+        mascaras = np.array([
+            self.servicio.obtener_mascaras_paciente(datos)
+            for datos in lista_pacientes
+        ], dtype=np.uint16).reshape(-1, 2)
+        requeridas = mascaras[:, 0:1]
+        preferidas = mascaras[:, 1:2]
+        especialidades = tabla.especialidades[filas][np.newaxis, :]
+
+        cumple_especialidad = (especialidades & requeridas) == requeridas
+        faltan_preferidas = (
+            np.bitwise_count(preferidas)
+            - np.bitwise_count(especialidades & preferidas)
+        )
+        costos = distancias + PENALIZACION_PREFERIDA_KM * faltan_preferidas
+
+        # 3. Asignar por nivel de severidad
+        asignacion = np.full(len(lista_pacientes), -1, dtype=np.int64)
+        especialidad_cumplida = np.zeros(len(lista_pacientes), dtype=bool)
+
+        for nivel in NIVELES_PRIORIDAD:
+            indices = np.array([
+                i for i, e in enumerate(evaluaciones) if e['severidad'] == nivel
+            ], dtype=np.int64)
+            if len(indices) == 0:
+                continue
+
+            # 3a. Exigiendo especialidad
+            resultado = resolver(
+                costos[indices],
+                capacidades,
+                cumple_especialidad[indices]
+            )
+            asignados = resultado >= 0
+            asignacion[indices[asignados]] = resultado[asignados]
+            especialidad_cumplida[indices[asignados]] = True
+            capacidades -= np.bincount(
+                resultado[asignados], minlength=len(filas)
+            )
+
+            # 3b. Sin cama: relajar especialidad
+            pendientes = indices[~asignados]
+            if len(pendientes) > 0:
+                resultado = resolver(
+                    costos[pendientes],
+                    capacidades,
+                    np.ones((len(pendientes), len(filas)), dtype=bool)
+                )
+                asignados = resultado >= 0
+                asignacion[pendientes[asignados]] = resultado[asignados]
+                capacidades -= np.bincount(
+                    resultado[asignados], minlength=len(filas)
+                )
+
+        return self._armar_resultado(
+            evaluaciones, tabla, filas, distancias,
+            asignacion, especialidad_cumplida, metodo
+        )
+
+    @staticmethod
+    def resolver_optimo(
+        distancias: np.ndarray,
+        capacidades: np.ndarray,
+        factibles: np.ndarray
+    ) -> np.ndarray:
+        """
+        Asignación de mínima distancia total con capacidades por hospital.
+
+        Se reduce a un problema de asignación (Hungarian / Jonker-Volgenant)
+        expandiendo cada hospital en tantas "camas" como pueda recibir. Para
+        que la matriz sea pequeña, cada paciente solo considera sus hospitales
+        más cercanos hasta acumular capacidad para todo el lote: cualquier
+        hospital más lejano nunca mejora la solución, porque dentro de ese
+        conjunto siempre queda una cama libre más cercana.
+
+        Args:
+            distancias: Array (P, H) de costos (km, con penalizaciones)
+            capacidades: Array (H,) con camas libres por hospital
+            factibles: Array (P, H) booleano, True si el par es permitido
+
+        Returns:
+            Array (P,) con el índice de hospital asignado o -1 si no hay cama
+
+        Example:
+            >>> AsignadorHospitales.resolver_optimo(
+            ...     np.array([[1.0, 2.0], [1.5, 5.0]]),
+            ...     np.array([1, 1]),
+            ...     np.ones((2, 2), dtype=bool)
+            ... )
+            array([1, 0])
+
+            (El greedy enviaría al paciente 1 a 5 km; aquí el total es 3.5 km)
+        """
+        n_pacientes, n_hospitales = distancias.shape
+        asignacion = np.full(n_pacientes, -1, dtype=np.int64)
+        capacidades = np.maximum(capacidades, 0)
+
+        if n_pacientes == 0 or n_hospitales == 0 or capacidades.sum() == 0:
+            return asignacion
+
+        costos = np.where(
+            factibles & (capacidades > 0)[np.newaxis, :],
+            distancias,
+            np.inf
+        )
+
+        # 1. Poda: hospitales candidatos de cada paciente
+        k = min(n_hospitales, n_pacientes)
+        if k < n_hospitales:
+            cercanos = np.argpartition(costos, k - 1, axis=1)[:, :k]
+        else:
+            cercanos = np.tile(np.arange(n_hospitales), (n_pacientes, 1))
+        orden = np.argsort(
+            np.take_along_axis(costos, cercanos, axis=1), axis=1
+        )
+        cercanos = np.take_along_axis(cercanos, orden, axis=1)
+
+        costos_cercanos = np.take_along_axis(costos, cercanos, axis=1)
+        cap_cercanos = np.where(
+            np.isfinite(costos_cercanos), capacidades[cercanos], 0
+        )
+        cap_previa = np.cumsum(cap_cercanos, axis=1) - cap_cercanos
+        candidatos = (cap_previa < n_pacientes) & np.isfinite(costos_cercanos)
+
+        filas, posiciones = np.nonzero(candidatos)
+        columnas_hosp = cercanos[filas, posiciones]
+        if len(columnas_hosp) == 0:
+            return asignacion
+
+        # 2. Expandir cada hospital candidato en camas
+        hosp_unicos, inverso, pacientes_por_hosp = np.unique(
+            columnas_hosp, return_inverse=True, return_counts=True
+        )
+        camas = np.minimum(capacidades[hosp_unicos], pacientes_por_hosp)
+        hosp_de_cama = np.repeat(hosp_unicos, camas)
+
+        matriz = np.full(
+            (n_pacientes, len(hosp_unicos)), COSTO_PROHIBIDO
+        )
+        matriz[filas, inverso] = costos[filas, columnas_hosp]
+        matriz = np.repeat(matriz, camas, axis=1)
+
+        # 3. Resolver asignación
+        filas_asig, camas_asig = linear_sum_assignment(matriz)
+        validas = matriz[filas_asig, camas_asig] < COSTO_PROHIBIDO
+        asignacion[filas_asig[validas]] = hosp_de_cama[camas_asig[validas]]
+
+        return asignacion
+
+    @staticmethod
+    def resolver_greedy(
+        distancias: np.ndarray,
+        capacidades: np.ndarray,
+        factibles: np.ndarray
+    ) -> np.ndarray:
+        """
+        Línea base: cada paciente, en orden, toma el hospital más cercano
+        que todavía tenga cama.
+
+        Args:
+            distancias: Array (P, H) de costos (km, con penalizaciones)
+            capacidades: Array (H,) con camas libres por hospital
+            factibles: Array (P, H) booleano, True si el par es permitido
+
+        Returns:
+            Array (P,) con el índice de hospital asignado o -1 si no hay cama
+        """
+        n_pacientes = distancias.shape[0]
+        asignacion = np.full(n_pacientes, -1, dtype=np.int64)
+        restantes = np.maximum(capacidades, 0).copy()
+
+        for p in range(n_pacientes):
+            costos = np.where(factibles[p] & (restantes > 0), distancias[p], np.inf)
+            if costos.size == 0:
+                continue
+            mejor = int(np.argmin(costos))
+            if np.isfinite(costos[mejor]):
+                asignacion[p] = mejor
+                restantes[mejor] -= 1
+
+        return asignacion
+
+    def _armar_resultado(
+        self,
+        evaluaciones: List[Dict[str, Any]],
+        tabla: ColumnasHospitales,
+        filas: np.ndarray,
+        distancias: np.ndarray,
+        asignacion: np.ndarray,
+        especialidad_cumplida: np.ndarray,
+        metodo: str
+    ) -> Dict[str, Any]:
+        """
+        Construye la respuesta del asignador.
+
+        Args:
+            evaluaciones: Evaluaciones de severidad por paciente
+            tabla: Instantánea del registro de hospitales
+            filas: Filas de la tabla usadas como columnas de la matriz
+            distancias: Matriz (P, H) de distancias
+            asignacion: Índice de columna por paciente (-1 = sin cama)
+            especialidad_cumplida: Si el hospital asignado tiene la especialidad
+            metodo: Método utilizado
+
+        Returns:
+            Dict con asignaciones y resumen
+        """
+        ocupadas = np.bincount(asignacion[asignacion >= 0], minlength=len(filas))
+        disponibilidades = tabla.disponibilidad_porcentaje(filas)
+
+        asignaciones = []
+        distancia_total = 0.0
+        sin_cama = 0
+
+        for i, evaluacion in enumerate(evaluaciones):
+            hospital: Optional[Dict[str, Any]] = None
+            j = int(asignacion[i])
+
+            if j >= 0:
+                distancia = round(float(distancias[i, j]), 2)
+                distancia_total += distancia
+                hospital = tabla.materializar(
+                    int(filas[j]),
+                    distancia_km=distancia,
+                    disponibilidad_porcentaje=float(disponibilidades[j]),
+                    asignados_en_lote=int(ocupadas[j])
+                )
+            elif evaluacion['requiere_traslado']:
+                sin_cama += 1
+
+            asignaciones.append({
+                'indice': i,
+                'evaluacion': evaluacion,
+                'hospital': hospital,
+                'especialidad_cumplida': bool(especialidad_cumplida[i])
+            })
+
+        total_asignados = int((asignacion >= 0).sum())
+
+        return {
+            'asignaciones': asignaciones,
+            'metodo': metodo,
+            'total_asignados': total_asignados,
+            'sin_cama': sin_cama,
+            'distancia_total_km': round(distancia_total, 2),
+            'mensaje': (
+                f'{total_asignados} pacientes asignados, '
+                f'{sin_cama} sin cama disponible.'
+            )
+        }
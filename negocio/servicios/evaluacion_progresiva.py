@@ -0,0 +1,297 @@
+"""
+Evaluación híbrida progresiva: respuesta inmediata por signos vitales y
+refinamiento con la CNN publicado después.
+Capa: NEGOCIO / SERVICIOS
+Responsabilidad: Dar un evaluacion_id con el resultado del Random Forest,
+completar la fusión con la imagen en segundo plano, guardarla y avisar a
+los suscriptores.
+Estándares: PEP 8, Type hints, Docstrings, SOLID
+
+Flujo:
+    1. iniciar(): lanza la CNN en el ejecutor del servicio, corre el Random
+       Forest y retorna de inmediato con estado 'pendiente' (o 'completa' si
+       no hay imagen o la CNN no está disponible).
+    2. Al terminar la CNN, un callback del Future fusiona ambas
+       predicciones, marca la evaluación como 'completa' y la entrega a cada
+       suscriptor en su propio event loop.
+    3. obtener() consulta la evaluación en memoria o en MongoDB.
+"""
+
+from typing import Dict, List, Any, Optional, Tuple, AsyncGenerator
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timezone
+import asyncio
+import os
+import threading
+import uuid
+
+from negocio.servicios.servicio_decision import ServicioDecision
+from datos.repositorios.repositorio_evaluaciones import RepositorioEvaluaciones
+
+
+class EvaluacionProgresiva:
+    """
+    Evaluaciones híbridas en dos etapas (preliminar → completa).
+
+    Las evaluaciones recientes se mantienen en memoria (acotadas por
+    EVALUACIONES_MAX_MEMORIA) para responder suscripciones y consultas sin
+    ir a la base; la persistencia en MongoDB ocurre en un hilo aparte, fuera
+    del camino de la respuesta.
+
+    Principios SOLID:
+    - SRP: Solo coordina el ciclo de vida de evaluaciones progresivas
+    - DIP: Depende de ServicioDecision y RepositorioEvaluaciones
+    """
+
+    def __init__(
+        self,
+        servicio: ServicioDecision,
+        repositorio: Optional[RepositorioEvaluaciones] = None,
+        max_memoria: Optional[int] = None
+    ):
+        """
+        Inicializa el coordinador.
+
+        Args:
+            servicio: Servicio de decisión ya inicializado
+            repositorio: Repositorio de evaluaciones (None = solo memoria)
+            max_memoria: Evaluaciones recientes retenidas en memoria
+                (default: EVALUACIONES_MAX_MEMORIA o 10000)
+        """
+        if max_memoria is None:
+            max_memoria = int(os.getenv('EVALUACIONES_MAX_MEMORIA', 10000))
+
+        self.servicio = servicio
+        self.repositorio = repositorio
+        self.max_memoria = max(1, max_memoria)
+
+        self._evaluaciones: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._suscriptores: Dict[str, List[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = {}
+        self._lock = threading.Lock()
+
+        # Un solo hilo: las escrituras de una evaluación quedan en orden
+        self._ejecutor_persistencia = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="persistencia-evaluaciones"
+        )
+
+    def iniciar(
+        self,
+        datos_paciente: Dict[str, Any],
+        imagen_base64: Optional[str] = None,
+        imagen_bytes: Optional[bytes] = None
+    ) -> Dict[str, Any]:
+        """
+        Evalúa por signos vitales y deja la CNN corriendo en segundo plano.
+
+        Args:
+            datos_paciente: Datos del paciente (signos vitales, etc.)
+            imagen_base64: Imagen en base64 (opcional)
+            imagen_bytes: Imagen como bytes crudos (opcional)
+
+        Returns:
+            Evaluación 'solo_vitales' con evaluacion_id y estado
+            ('pendiente' si la CNN todavía está corriendo)
+
+        Example:
+            >>> preliminar = progresiva.iniciar(datos, imagen_bytes=foto)
+            >>> preliminar['estado'], preliminar['metodo']
+            ('pendiente', 'solo_vitales')
+        """
+        evaluacion_id = uuid.uuid4().hex
+        tiene_imagen = bool(imagen_base64) or bool(imagen_bytes)
+
+        futuro_imagen = self.servicio.lanzar_evaluacion_imagen(
+            imagen_base64, imagen_bytes
+        )
+        severidad_vitales, probs_vitales = self.servicio.predictor.predecir(
+            datos_paciente
+        )
+        preliminar = self.servicio.completar_evaluacion_hibrida(
+            datos_paciente, severidad_vitales, probs_vitales, None,
+            con_imagen=tiene_imagen and futuro_imagen is None
+        )
+
+        documento = {
+            'evaluacion_id': evaluacion_id,
+            'estado': 'pendiente' if futuro_imagen is not None else 'completa',
+            'creado_en': datetime.now(timezone.utc),
+            'completado_en': None,
+            'datos_paciente': datos_paciente,
+            'preliminar': preliminar,
+            'resultado': preliminar
+        }
+        if futuro_imagen is None:
+            documento['completado_en'] = documento['creado_en']
+
+        with self._lock:
+            self._recordar(documento)
+        self._persistir(documento)
+
+        if futuro_imagen is not None:
+            # Se ejecuta en el hilo que resuelve la CNN (o aquí si ya terminó)
+            futuro_imagen.add_done_callback(
+                lambda futuro: self._completar(
+                    evaluacion_id, datos_paciente,
+                    severidad_vitales, probs_vitales, futuro
+                )
+            )
+
+        return self._vista(documento)
+
+    def obtener(self, evaluacion_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Obtiene el estado actual de una evaluación.
+
+        Args:
+            evaluacion_id: ID devuelto por iniciar()
+
+        Returns:
+            Resultado (final o preliminar) con evaluacion_id y estado,
+            o None si no existe
+        """
+        with self._lock:
+            documento = self._evaluaciones.get(evaluacion_id)
+        if documento is None and self.repositorio is not None:
+            documento = self.repositorio.obtener_por_id(evaluacion_id)
+        return self._vista(documento) if documento else None
+
+    async def suscribir(self, evaluacion_id: str) -> AsyncGenerator[Dict[str, Any], None]:
+        """
+        Espera el resultado final de una evaluación.
+
+        Emite una sola vez, cuando la evaluación pasa a 'completa' (o de
+        inmediato si ya lo estaba), y termina.
+
+        Args:
+            evaluacion_id: ID devuelto por iniciar()
+
+        Yields:
+            Resultado final con evaluacion_id y estado 'completa'
+
+        Raises:
+            ValueError: Si la evaluación no existe
+        """
+        cola: asyncio.Queue = asyncio.Queue()
+        suscripcion = (asyncio.get_running_loop(), cola)
+
+        with self._lock:
+            documento = self._evaluaciones.get(evaluacion_id)
+            pendiente = documento is not None and documento['estado'] == 'pendiente'
+            if pendiente:
+                self._suscriptores.setdefault(evaluacion_id, []).append(suscripcion)
+
+        if not pendiente:
+            if documento is None and self.repositorio is not None:
+                documento = await asyncio.to_thread(
+                    self.repositorio.obtener_por_id, evaluacion_id
+                )
+            if documento is None:
+                raise ValueError(f"Evaluación no encontrada: {evaluacion_id}")
+            # Pendiente solo en MongoDB (otra réplica o memoria desalojada):
+            # se entrega lo último guardado
+            yield self._vista(documento)
+            return
+
+        try:
+            yield await cola.get()
+        finally:
+            with self._lock:
+                restantes = self._suscriptores.get(evaluacion_id, [])
+                if suscripcion in restantes:
+                    restantes.remove(suscripcion)
+                if not restantes:
+                    self._suscriptores.pop(evaluacion_id, None)
+
+    def cerrar(self) -> None:
+        """Termina las escrituras pendientes en MongoDB."""
+        self._ejecutor_persistencia.shutdown(wait=True)
+
+    def _completar(
+        self,
+        evaluacion_id: str,
+        datos_paciente: Dict[str, Any],
+        severidad_vitales: str,
+        probs_vitales: Dict[str, float],
+        futuro_imagen: Future
+    ) -> None:
+        """Fusiona con la CNN, guarda y publica (callback del Future)."""
+        # El Future ya terminó: timeout=0 solo distingue éxito de error
+        resultado = self.servicio.completar_evaluacion_hibrida(
+            datos_paciente, severidad_vitales, probs_vitales, futuro_imagen,
+            timeout=0
+        )
+
+        cierre = {
+            'estado': 'completa',
+            'completado_en': datetime.now(timezone.utc),
+            'resultado': resultado
+        }
+
+        with self._lock:
+            # Si fue desalojada de memoria, en memoria queda solo lo mínimo;
+            # MongoDB conserva el resto porque se actualiza solo el cierre
+            documento = {
+                **self._evaluaciones.get(evaluacion_id, {'evaluacion_id': evaluacion_id}),
+                **cierre
+            }
+            self._recordar(documento)
+            suscriptores = self._suscriptores.pop(evaluacion_id, [])
+
+        vista = self._vista(documento)
+        for loop, cola in suscriptores:
+            try:
+                loop.call_soon_threadsafe(cola.put_nowait, vista)
+            except RuntimeError:
+                # El event loop del suscriptor ya cerró
+                pass
+
+        self._persistir(documento, cierre)
+
+    def _recordar(self, documento: Dict[str, Any]) -> None:
+        """Guarda en memoria desalojando la más antigua (requiere _lock)."""
+        self._evaluaciones[documento['evaluacion_id']] = documento
+        self._evaluaciones.move_to_end(documento['evaluacion_id'])
+        while len(self._evaluaciones) > self.max_memoria:
+            self._evaluaciones.popitem(last=False)
+
+    def _persistir(
+        self,
+        documento: Dict[str, Any],
+        cierre: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """
+        Encola la escritura en MongoDB sin bloquear al llamador.
+
+        Args:
+            documento: Evaluación en memoria
+            cierre: Campos de cierre; si se indican, solo se actualizan esos
+                (documento puede ser el mínimo rearmado tras un desalojo)
+        """
+        if self.repositorio is None:
+            return
+
+        def guardar() -> None:
+            try:
+                if cierre is None:
+                    self.repositorio.guardar(dict(documento))
+                else:
+                    self.repositorio.completar(documento['evaluacion_id'], dict(cierre))
+            except Exception as e:
+                print(f"Advertencia: no se pudo guardar la evaluación "
+                      f"{documento['evaluacion_id']} - {str(e)}")
+
+        try:
+            self._ejecutor_persistencia.submit(guardar)
+        except RuntimeError:
+            # Ejecutor cerrado (apagado del servidor)
+            pass
+
+    @staticmethod
+    def _vista(documento: Dict[str, Any]) -> Dict[str, Any]:
+        """Resultado de la evaluación con evaluacion_id y estado."""
+        return {
+            **documento['resultado'],
+            'evaluacion_id': documento['evaluacion_id'],
+            'estado': documento['estado']
+        }
@@ -6,20 +6,22 @@ Estándares: PEP 8, Type hints, Docstrings, SOLID
 """
 
 from typing import Dict, List, Tuple, Any, Optional
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FuturoTimeout
 from pymongo.database import Database
 import math
+import os
+import threading
+import time
+import numpy as np
 
-from negocio.ml.prediccion_severidad import PredictorSeveridad
+from negocio.ml.prediccion_severidad import PredictorSeveridad, SEVERIDADES_TRASLADO
 from negocio.ml.clustering_hospitales import ClusteringHospitales
 from datos.repositorios.repositorio_hospitales import RepositorioHospitales
-
-# Importación condicional de CNN (Deep Learning)
-try:
-    from negocio.ml.clasificador_imagenes import ClasificadorImagenes
-    CNN_DISPONIBLE = True
-except (ImportError, Exception) as e:
-    CNN_DISPONIBLE = False
-    print(f"⚠ CNN no disponible: {str(e)}")
+from datos.repositorios.registro_hospitales import (
+    RegistroHospitales,
+    ColumnasHospitales,
+)
+from datos.modelos.especialidades import BIT_ESPECIALIDAD, mascaras_incidente
 
 
 class ServicioDecision:
@@ -37,26 +39,129 @@ class ServicioDecision:
     - DIP: Depende de abstracciones (PredictorSeveridad, ClusteringHospitales)
     """
 
-    def __init__(self, base_datos: Database):
+    def __init__(self, base_datos: Database, cargar_cnn: bool = True):
         """
         Inicializa servicio con modelos ML y repositorios.
 
         Args:
             base_datos: Instancia de MongoDB Database
+            cargar_cnn: Si True, carga la CNN antes de retornar. El servidor
+                usa False y luego iniciar_carga_cnn() para no bloquear el
+                arranque con TensorFlow
         """
+        # Desglose del tiempo de arranque por componente (ms)
+        self.tiempos_arranque: Dict[str, float] = {}
+
+        inicio = time.perf_counter()
         self.predictor = PredictorSeveridad()
+        self.tiempos_arranque['random_forest_ms'] = (time.perf_counter() - inicio) * 1000
+
+        inicio = time.perf_counter()
         self.clusterer = ClusteringHospitales()
+        self.tiempos_arranque['kmeans_ms'] = (time.perf_counter() - inicio) * 1000
+
         self.repo_hospitales = RepositorioHospitales(base_datos)
+        self.registro_hospitales = RegistroHospitales(self.repo_hospitales)
+
+        # CNN (Deep Learning): se publica recién cuando está lista
+        self.clasificador_imagenes = None
+        self.inferencia_imagenes = None
+        self.estado_cnn = 'no_iniciada'
+        self.error_cnn: Optional[str] = None
+        self.cnn_lista = threading.Event()
+
+        # Evaluación híbrida: la rama CNN corre en paralelo al Random Forest
+        # y se descarta si no responde dentro de CNN_TIMEOUT_MS
+        self.timeout_cnn_ms = float(os.getenv('CNN_TIMEOUT_MS', 1500))
+        self._ejecutor_imagenes = ThreadPoolExecutor(
+            max_workers=int(os.getenv('CNN_HILOS_EVALUACION', 8)),
+            thread_name_prefix="evaluacion-cnn"
+        )
 
-        # Inicializar CNN (Deep Learning) si está disponible
-        if CNN_DISPONIBLE:
-            try:
-                self.clasificador_imagenes = ClasificadorImagenes()
-            except Exception as e:
-                self.clasificador_imagenes = None
-                print(f"Advertencia: CNN no pudo cargarse - {str(e)}")
-        else:
-            self.clasificador_imagenes = None
+        if cargar_cnn:
+            self.cargar_cnn()
+
+    def iniciar_carga_cnn(self) -> None:
+        """
+        Carga la CNN en un hilo de fondo.
+
+        Mientras tanto las evaluaciones con imagen responden 'solo_vitales'.
+        CNN_HABILITADO=false deja la CNN deshabilitada.
+        """
+        if self.estado_cnn != 'no_iniciada':
+            return
+        if os.getenv('CNN_HABILITADO', 'true').lower() != 'true':
+            self.estado_cnn = 'deshabilitada'
+            return
+
+        self.estado_cnn = 'cargando'
+        threading.Thread(
+            target=self.cargar_cnn, name="carga-cnn", daemon=True
+        ).start()
+
+    def cargar_cnn(self) -> bool:
+        """
+        Importa TensorFlow, carga y calienta la CNN, y la publica.
+
+        Returns:
+            True si la CNN quedó disponible
+        """
+        self.estado_cnn = 'cargando'
+        inicio = time.perf_counter()
+        try:
+            # Import diferido: TensorFlow solo se carga aquí
+            from negocio.ml.clasificador_imagenes import ClasificadorImagenes
+            from negocio.ml.inferencia_por_lotes import InferenciaPorLotes
+
+            clasificador = ClasificadorImagenes()
+            # Solicitudes concurrentes comparten una llamada a la red
+            inferencia = InferenciaPorLotes(clasificador)
+            inferencia.iniciar()
+        except Exception as e:
+            self.estado_cnn = 'no_disponible'
+            self.error_cnn = str(e)
+            print(f"Advertencia: CNN no pudo cargarse - {str(e)}")
+            return False
+
+        for componente, ms in clasificador.tiempos_carga.items():
+            self.tiempos_arranque[f'cnn_{componente}'] = ms
+        self.tiempos_arranque['cnn_total_ms'] = (time.perf_counter() - inicio) * 1000
+
+        # El batcher se publica antes que el clasificador: quien ve el
+        # clasificador (chequeo de disponibilidad) ya puede usar el batcher
+        self.inferencia_imagenes = inferencia
+        self.clasificador_imagenes = clasificador
+        self.estado_cnn = 'lista'
+        self.cnn_lista.set()
+        return True
+
+    def obtener_estado_cnn(self) -> Dict[str, Any]:
+        """
+        Obtiene el estado de disponibilidad de la evaluación por imagen.
+
+        Returns:
+            Dict con estado ('no_iniciada', 'cargando', 'lista',
+            'no_disponible' o 'deshabilitada'), lista, error y, con la CNN
+            cargada, las métricas de la caché de predicciones
+
+        Example:
+            >>> servicio.obtener_estado_cnn()
+            {'estado': 'cargando', 'lista': False, 'error': None}
+        """
+        estado = {
+            'estado': self.estado_cnn,
+            'lista': self.cnn_lista.is_set(),
+            'error': self.error_cnn
+        }
+        if self.clasificador_imagenes is not None:
+            estado['cache'] = self.clasificador_imagenes.cache.obtener_estadisticas()
+        return estado
+
+    def cerrar(self) -> None:
+        """Detiene los hilos de fondo del servicio."""
+        self._ejecutor_imagenes.shutdown(wait=False, cancel_futures=True)
+        if self.inferencia_imagenes is not None:
+            self.inferencia_imagenes.detener()
 
     def evaluar_paciente(
         self,
@@ -87,17 +192,69 @@ class ServicioDecision:
             ... }
             >>> resultado = servicio.evaluar_paciente(datos)
             >>> resultado['severidad']
-            'crítico'
+            'critico'
             >>> resultado['requiere_traslado']
             True
         """
         # 1. Predecir severidad con Random Forest
         severidad, probabilidades = self.predictor.predecir(datos_paciente)
 
-        # 2. Determinar si requiere traslado
-        requiere_traslado = severidad in ['crítico', 'alto']
+        return self._armar_evaluacion(datos_paciente, severidad, probabilidades)
+
+    def evaluar_pacientes_lote(
+        self,
+        lista_pacientes: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Evalúa varios pacientes con una sola inferencia del Random Forest.
+
+        Pensado para incidentes con múltiples víctimas, donde llegan
+        decenas de pacientes de una misma ubicación.
+
+        Args:
+            lista_pacientes: Lista de datos de pacientes
+
+        Returns:
+            Lista de evaluaciones, en el mismo orden que la entrada
+
+        Example:
+            >>> evaluaciones = servicio.evaluar_pacientes_lote([datos_1, datos_2])
+            >>> [e['severidad'] for e in evaluaciones]
+            ['critico', 'bajo']
+        """
+        predicciones = self.predictor.predecir_lote(lista_pacientes)
+
+        return [
+            self._armar_evaluacion(datos, severidad, probabilidades)
+            for datos, (severidad, probabilidades) in zip(
+                lista_pacientes, predicciones
+            )
+        ]
+
+    def _armar_evaluacion(
+        self,
+        datos_paciente: Dict[str, Any],
+        severidad: str,
+        probabilidades: Dict[str, float]
+    ) -> Dict[str, Any]:
+        """
+        Construye el dict de evaluación a partir de una predicción.
+
+        Única regla de traslado del servicio: las rutas híbridas y por lote
+        parten de este dict.
 
-        # 3. Calcular confianza de la predicción
+        Args:
+            datos_paciente: Datos del paciente evaluado
+            severidad: Severidad predicha
+            probabilidades: Probabilidades por clase
+
+        Returns:
+            Dict con severidad, probabilidades, confianza y traslado
+        """
+        # Determinar si requiere traslado
+        requiere_traslado = severidad in SEVERIDADES_TRASLADO
+
+        # Calcular confianza de la predicción
         max_prob = max(probabilidades.values())
 
         return {
@@ -119,8 +276,9 @@ class ServicioDecision:
 
         Flujo:
         1. Predecir severidad (Random Forest)
-        2. Determinar cluster adecuado (K-means)
-        3. Filtrar hospitales del cluster con capacidad
+        2. Obtener clusters rankeados para el incidente (K-means)
+        3. Filtrar hospitales del mejor cluster con capacidad y especialidad,
+           pasando al siguiente cluster del ranking si no hay
         4. Calcular distancias GPS
         5. Ordenar y retornar TOP N
 
@@ -143,74 +301,276 @@ class ServicioDecision:
             >>> recomendacion['hospitales_recomendados'][0]['distancia_km']
             2.3
         """
-        # 1. Evaluar severidad
-        evaluacion = self.evaluar_paciente(datos_paciente)
-
-        # 2. Si no requiere traslado, retornar evaluación sin hospitales
-        if not evaluacion['requiere_traslado']:
-            return {
-                'evaluacion': evaluacion,
-                'hospitales_recomendados': [],
-                'mensaje': 'Severidad baja/media. Atención in situ recomendada.'
-            }
-
-        # 3. Determinar cluster adecuado usando K-means
-        tipo_emergencia = datos_paciente.get('tipo_incidente', 'general')
-        cluster_objetivo = self.clusterer.obtener_cluster_por_tipo_emergencia(
-            tipo_emergencia
-        )
+        return self.recomendar_hospitales_lote(
+            [datos_paciente],
+            [ubicacion_paciente],
+            top_n
+        )[0]
 
-        # 4. Obtener especialidades del cluster
-        especialidades_cluster = self.clusterer.obtener_especialidades_cluster(
-            cluster_objetivo
-        )
+    def recomendar_hospitales_lote(
+        self,
+        lista_pacientes: List[Dict[str, Any]],
+        ubicaciones: List[Dict[str, float]],
+        top_n: int = 5
+    ) -> List[Dict[str, Any]]:
+        """
+        Recomienda hospitales para varios pacientes en una sola pasada.
 
-        # 5. Consultar hospitales del cluster con capacidad disponible
-        hospitales_disponibles = self.repo_hospitales.obtener_por_cluster(
-            cluster=cluster_objetivo,
-            capacidad_disponible=True
-        )
+        Ejecuta una única predicción vectorizada de severidad, consulta los
+        hospitales de cada cluster una sola vez y calcula las distancias
+        como una matriz pacientes × hospitales.
+
+        Args:
+            lista_pacientes: Lista de datos de pacientes
+            ubicaciones: Ubicación de cada paciente. Si se envía una sola,
+                se usa para todos (incidente en un único lugar)
+            top_n: Número de hospitales a recomendar por paciente
+
+        Returns:
+            Lista de recomendaciones, en el mismo orden que la entrada
+
+        Raises:
+            ValueError: Si la cantidad de ubicaciones no coincide
+
+        Example:
+            >>> recomendaciones = servicio.recomendar_hospitales_lote(
+            ...     [datos_1, datos_2],
+            ...     [{'latitud': -17.78, 'longitud': -63.18}]
+            ... )
+            >>> len(recomendaciones)
+            2
+        """
+        if len(ubicaciones) == 1:
+            ubicaciones = ubicaciones * len(lista_pacientes)
+
+        if len(ubicaciones) != len(lista_pacientes):
+            raise ValueError(
+                f"Se recibieron {len(lista_pacientes)} pacientes y "
+                f"{len(ubicaciones)} ubicaciones"
+            )
+
+        # 1. Evaluar severidad de todo el lote
+        evaluaciones = self.evaluar_pacientes_lote(lista_pacientes)
+
+        resultados: List[Optional[Dict[str, Any]]] = [None] * len(lista_pacientes)
+
+        # 2. Pacientes sin traslado no necesitan hospitales
+        #    Los demás se agrupan por cluster objetivo (K-means) y
+        #    especialidades requeridas
+        grupos: Dict[Tuple[str, int], List[int]] = {}
+        for i, evaluacion in enumerate(evaluaciones):
+            if not evaluacion['requiere_traslado']:
+                resultados[i] = {
+                    'evaluacion': evaluacion,
+                    'hospitales_recomendados': [],
+                    'mensaje': 'Severidad baja/media. Atención in situ recomendada.'
+                }
+                continue
+
+            tipo_emergencia = lista_pacientes[i].get('tipo_incidente', 'general')
+            requerida, _ = self.obtener_mascaras_paciente(lista_pacientes[i])
+            grupos.setdefault((tipo_emergencia, requerida), []).append(i)
+
+        # 3. Una instantánea columnar y una matriz de distancias por grupo
+        tabla = self.registro_hospitales.obtener()
+        disponibles = tabla.disponibles()
+
+        for (tipo_emergencia, requerida), indices in grupos.items():
+            # Clusters rankeados desde la tabla de rutas (una búsqueda)
+            ranking = [
+                cluster for cluster, _ in
+                self.clusterer.obtener_clusters_rankeados(tipo_emergencia)
+            ]
+
+            filas, cluster_utilizado = self._seleccionar_candidatos(
+                tabla, disponibles, ranking, requerida
+            )
+            especialidades_cluster = self.clusterer.obtener_especialidades_cluster(
+                ranking[0] if cluster_utilizado is None else cluster_utilizado
+            )
 
-        # 6. Si no hay hospitales en el cluster, buscar en todos
-        if not hospitales_disponibles:
-            hospitales_disponibles = self.repo_hospitales.obtener_disponibles()
-            cluster_objetivo = None  # Indica que se buscó en todos
-
-        # 7. Calcular distancias GPS para cada hospital
-        for hospital in hospitales_disponibles:
-            distancia = self._calcular_distancia_haversine(
-                ubicacion_paciente['latitud'],
-                ubicacion_paciente['longitud'],
-                hospital['ubicacion']['latitud'],
-                hospital['ubicacion']['longitud']
+            origenes = np.array([
+                [ubicaciones[i]['latitud'], ubicaciones[i]['longitud']]
+                for i in indices
+            ], dtype=float)
+            distancias = self.calcular_matriz_distancias(
+                origenes, tabla.coordenadas[filas]
             )
-            hospital['distancia_km'] = round(distancia, 2)
 
-            # Calcular disponibilidad porcentual
-            capacidad_actual = hospital['capacidad']['actual']
-            capacidad_maxima = hospital['capacidad']['maxima']
-            disponibilidad = (
-                (capacidad_maxima - capacidad_actual) / capacidad_maxima * 100
+            # TOP N por fila sin ordenar la matriz completa
+            top = self._indices_top_n(distancias, top_n)
+            disponibilidades = tabla.disponibilidad_porcentaje(filas)
+
+            for fila_lote, i in enumerate(indices):
+                # Solo los ganadores se materializan como dict
+                top_hospitales = [
+                    tabla.materializar(
+                        int(filas[j]),
+                        distancia_km=round(float(distancias[fila_lote, j]), 2),
+                        disponibilidad_porcentaje=float(disponibilidades[j])
+                    )
+                    for j in top[fila_lote]
+                ]
+
+                resultados[i] = {
+                    'evaluacion': evaluaciones[i],
+                    'cluster_utilizado': cluster_utilizado,
+                    'especialidades_cluster': especialidades_cluster,
+                    'hospitales_recomendados': top_hospitales,
+                    'total_disponibles': len(filas),
+                    'mensaje': f'Se encontraron {len(top_hospitales)} hospitales adecuados.'
+                }
+
+        return resultados
+
+    def _seleccionar_candidatos(
+        self,
+        tabla: ColumnasHospitales,
+        disponibles: np.ndarray,
+        ranking: List[int],
+        requerida: int
+    ) -> Tuple[np.ndarray, Optional[int]]:
+        """
+        Elige las filas candidatas recorriendo los clusters rankeados.
+
+        Orden de búsqueda:
+        1. Primer cluster del ranking con hospitales disponibles que tengan
+           las especialidades requeridas
+        2. Todos los disponibles con las especialidades requeridas
+        3. Primer cluster del ranking con hospitales disponibles
+        4. Todos los disponibles
+
+        Args:
+            tabla: Instantánea del registro
+            disponibles: Máscara de hospitales con capacidad
+            ranking: Clusters de mejor a peor
+            requerida: Máscara de especialidades requeridas
+
+        Returns:
+            Tupla (filas, cluster_utilizado); cluster None si se buscó en todos
+        """
+        # Candidatos con las especialidades requeridas (índice invertido)
+        filas_requeridas = tabla.filas_con_especialidades(requerida)
+        filas_requeridas = filas_requeridas[disponibles[filas_requeridas]]
+
+        if len(filas_requeridas) > 0:
+            clusters_requeridas = tabla.cluster[filas_requeridas]
+            for cluster in ranking:
+                filas = filas_requeridas[clusters_requeridas == cluster]
+                if len(filas) > 0:
+                    return filas, cluster
+            return filas_requeridas, None
+
+        # Ningún hospital cumple: volver al filtro solo por cluster
+        for cluster in ranking:
+            filas = np.nonzero(disponibles & (tabla.cluster == cluster))[0]
+            if len(filas) > 0:
+                return filas, cluster
+
+        return np.nonzero(disponibles)[0], None
+
+    def obtener_mascaras_paciente(
+        self,
+        datos_paciente: Dict[str, Any]
+    ) -> Tuple[int, int]:
+        """
+        Máscaras de especialidades requeridas y preferidas de un paciente.
+
+        Combina el tipo de incidente con especialidades_requeridas
+        (opcional) para casos mixtos, ej: quemaduras + trauma.
+
+        Args:
+            datos_paciente: Datos del paciente
+
+        Returns:
+            Tupla (mascara_requerida, mascara_preferida)
+
+        Example:
+            >>> servicio.obtener_mascaras_paciente({
+            ...     'tipo_incidente': 'accidente_auto',
+            ...     'especialidades_requeridas': ['quemados']
+            ... })
+            (34, 24)
+        """
+        return mascaras_incidente(
+            [datos_paciente.get('tipo_incidente', 'general')],
+            datos_paciente.get('especialidades_requeridas') or []
+        )
+
+    @staticmethod
+    def _indices_top_n(distancias: np.ndarray, top_n: int) -> np.ndarray:
+        """
+        Índices de las top_n columnas más cercanas de cada fila, ordenados.
+
+        Usa argpartition para no ordenar todos los hospitales.
+
+        Args:
+            distancias: Matriz (P, H) de distancias
+            top_n: Cantidad de columnas por fila
+
+        Returns:
+            Array (P, min(top_n, H)) de índices de columna
+        """
+        k = max(0, min(top_n, distancias.shape[1]))
+        if k == 0:
+            return np.empty((distancias.shape[0], 0), dtype=np.int64)
+
+        if k < distancias.shape[1]:
+            candidatos = np.argpartition(distancias, k - 1, axis=1)[:, :k]
+        else:
+            candidatos = np.tile(
+                np.arange(distancias.shape[1]), (distancias.shape[0], 1)
             )
-            hospital['disponibilidad_porcentaje'] = round(disponibilidad, 1)
 
-        # 8. Ordenar por distancia (más cercano primero)
-        hospitales_ordenados = sorted(
-            hospitales_disponibles,
-            key=lambda h: h['distancia_km']
+        orden = np.argsort(
+            np.take_along_axis(distancias, candidatos, axis=1),
+            axis=1,
+            kind='stable'
         )
+        return np.take_along_axis(candidatos, orden, axis=1)
 
-        # 9. Seleccionar TOP N
-        top_hospitales = hospitales_ordenados[:top_n]
+    @staticmethod
+    def calcular_matriz_distancias(
+        origenes: np.ndarray,
+        destinos: np.ndarray
+    ) -> np.ndarray:
+        """
+        Calcula distancias Haversine entre todos los orígenes y destinos.
 
-        return {
-            'evaluacion': evaluacion,
-            'cluster_utilizado': cluster_objetivo,
-            'especialidades_cluster': especialidades_cluster,
-            'hospitales_recomendados': top_hospitales,
-            'total_disponibles': len(hospitales_disponibles),
-            'mensaje': f'Se encontraron {len(top_hospitales)} hospitales adecuados.'
-        }
+        Versión vectorizada de _calcular_distancia_haversine.
+
+        Args:
+            origenes: Array (P, 2) con [latitud, longitud] en grados
+            destinos: Array (H, 2) con [latitud, longitud] en grados
+
+        Returns:
+            Array (P, H) con distancias en kilómetros
+
+        Example:
+            >>> ServicioDecision.calcular_matriz_distancias(
+            ...     np.array([[-12.0464, -77.0428]]),
+            ...     np.array([[-12.1191, -77.0383]])
+            ... ).round(2)
+            array([[8.09]])
+        """
+        # Radio de la Tierra en km
+        R = 6371.0
+
+        lat1 = np.radians(origenes[:, 0])[:, np.newaxis]
+        lon1 = np.radians(origenes[:, 1])[:, np.newaxis]
+        lat2 = np.radians(destinos[:, 0])[np.newaxis, :]
+        lon2 = np.radians(destinos[:, 1])[np.newaxis, :]
+
+        dlat = lat2 - lat1
+        dlon = lon2 - lon1
+
+        a = (
+            np.sin(dlat / 2)**2 +
+            np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2)**2
+        )
+        c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+        return R * c
 
     def _calcular_distancia_haversine(
         self,
@@ -281,6 +641,19 @@ class ServicioDecision:
         """
         return self.clusterer.obtener_info_clusters()
 
+    def obtener_tabla_rutas(self) -> Dict[str, Tuple[Tuple[int, float], ...]]:
+        """
+        Obtiene la tabla de rutas tipo de incidente → clusters rankeados.
+
+        Returns:
+            Dict {tipo_incidente: ((cluster_id, puntaje), ...)}
+
+        Example:
+            >>> servicio.obtener_tabla_rutas()['quemadura'][0]
+            (2, 12.0)
+        """
+        return dict(self.clusterer.obtener_tabla_rutas())
+
     def obtener_hospitales_por_especialidad(
         self,
         especialidad: str
@@ -299,19 +672,20 @@ class ServicioDecision:
             >>> len(hospitales)
             12
         """
-        todos_hospitales = self.repo_hospitales.obtener_todos()
+        bit = BIT_ESPECIALIDAD.get(especialidad, 0)
+        if bit == 0:
+            return []
 
-        hospitales_con_especialidad = [
-            hospital for hospital in todos_hospitales
-            if hospital['especialidades'].get(especialidad) == 1
-        ]
+        tabla = self.registro_hospitales.obtener()
+        filas = np.nonzero(tabla.especialidades & bit)[0]
 
-        return hospitales_con_especialidad
+        return [tabla.materializar(int(fila)) for fila in filas]
 
     def evaluar_paciente_con_imagen(
         self,
         datos_paciente: Dict[str, Any],
-        imagen_base64: Optional[str] = None
+        imagen_base64: Optional[str] = None,
+        imagen_bytes: Optional[bytes] = None
     ) -> Dict[str, Any]:
         """
         Evalúa paciente combinando Random Forest (vitales) + CNN (imagen visual).
@@ -320,14 +694,18 @@ class ServicioDecision:
         para una evaluación más completa y precisa.
 
         Flujo:
-        1. Evaluación por signos vitales (Random Forest)
-        2. Si hay imagen, evaluación visual (CNN - Deep Learning)
-        3. Fusión de predicciones con pesos ponderados
+        1. Si hay imagen, evaluación visual (CNN - Deep Learning) en un hilo
+           del ejecutor
+        2. En paralelo, evaluación por signos vitales (Random Forest)
+        3. Fusión de predicciones con pesos ponderados; si la CNN no responde
+           dentro de CNN_TIMEOUT_MS se usan solo los signos vitales
         4. Decisión final combinada
 
         Args:
             datos_paciente: Datos del paciente (signos vitales, edad, etc.)
             imagen_base64: Imagen de la herida/quemadura en base64 (opcional)
+            imagen_bytes: La misma imagen como bytes crudos (opcional, evita
+                base64 cuando llega como archivo o cuerpo binario)
 
         Returns:
             Dict con:
@@ -357,55 +735,105 @@ class ServicioDecision:
             >>> resultado['metodo']
             'solo_vitales'
         """
-        # 1. Evaluación por signos vitales (Random Forest)
+        tiene_imagen = bool(imagen_base64) or bool(imagen_bytes)
+        limite = time.monotonic() + self.timeout_cnn_ms / 1000
+
+        # 1. Lanzar decodificación + CNN en otro hilo; la latencia total
+        # queda acotada por la rama más lenta, no por la suma de ambas
+        futuro_imagen = self.lanzar_evaluacion_imagen(imagen_base64, imagen_bytes)
+
+        # 2. Evaluación por signos vitales (Random Forest) en este hilo
         severidad_vitales, probs_vitales = self.predictor.predecir(datos_paciente)
 
-        # 2. Si NO hay imagen o CNN no disponible, solo usar Random Forest
-        if not imagen_base64 or self.clasificador_imagenes is None:
-            return {
-                'severidad': severidad_vitales,
-                'probabilidades': probs_vitales,
-                'confianza': round(max(probs_vitales.values()) * 100, 2),
-                'requiere_traslado': severidad_vitales in ['crítico', 'alto'],
-                'tipo_incidente': datos_paciente.get('tipo_incidente', 'desconocido'),
-                'metodo': 'solo_vitales',
-                'severidad_vitales': severidad_vitales,
-                'severidad_imagen': None
-            }
-
-        # 3. Evaluación visual con CNN (Deep Learning)
+        # 3. Esperar la CNN solo hasta el límite configurado y fusionar
+        return self.completar_evaluacion_hibrida(
+            datos_paciente, severidad_vitales, probs_vitales, futuro_imagen,
+            timeout=max(0.0, limite - time.monotonic()),
+            con_imagen=tiene_imagen
+        )
+
+    def lanzar_evaluacion_imagen(
+        self,
+        imagen_base64: Optional[str] = None,
+        imagen_bytes: Optional[bytes] = None
+    ) -> "Optional[Future[Tuple[str, Dict[str, float]]]]":
+        """
+        Encola decodificación + CNN de una imagen en el ejecutor del servicio.
+
+        Args:
+            imagen_base64: Imagen en base64 (opcional)
+            imagen_bytes: Imagen como bytes crudos (opcional)
+
+        Returns:
+            Future con (severidad_imagen, probabilidades_imagen), o None si
+            no hay imagen o la CNN no está disponible
+        """
+        if not (imagen_base64 or imagen_bytes) or self.clasificador_imagenes is None:
+            return None
+        return self._ejecutor_imagenes.submit(
+            self._predecir_imagen, self.inferencia_imagenes,
+            imagen_base64, imagen_bytes
+        )
+
+    def completar_evaluacion_hibrida(
+        self,
+        datos_paciente: Dict[str, Any],
+        severidad_vitales: str,
+        probs_vitales: Dict[str, float],
+        futuro_imagen: "Optional[Future[Tuple[str, Dict[str, float]]]]",
+        timeout: Optional[float] = None,
+        con_imagen: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Fusiona la predicción de vitales con la de imagen, o cae a solo vitales.
+
+        Args:
+            datos_paciente: Datos del paciente evaluado
+            severidad_vitales: Severidad predicha por Random Forest
+            probs_vitales: Probabilidades de Random Forest
+            futuro_imagen: Resultado de lanzar_evaluacion_imagen
+            timeout: Segundos máximos de espera de la CNN (None = sin límite)
+            con_imagen: Si se recibió imagen (para informar por qué no se usó
+                cuando futuro_imagen es None)
+
+        Returns:
+            Dict con metodo 'hibrido' o 'solo_vitales' (con error_cnn si
+            había imagen y no pudo usarse)
+        """
+        # Si NO hay imagen o CNN no disponible, solo usar Random Forest
+        if futuro_imagen is None:
+            return self._resultado_solo_vitales(
+                datos_paciente, severidad_vitales, probs_vitales,
+                error_cnn=(self.error_cnn or f"CNN {self.estado_cnn}")
+                if con_imagen else None
+            )
+
         try:
-            severidad_imagen, probs_imagen = self.clasificador_imagenes.predecir(
-                imagen_base64
+            severidad_imagen, probs_imagen = futuro_imagen.result(timeout=timeout)
+        except FuturoTimeout:
+            # Si la imagen ya entró a un lote, su resultado queda en la caché
+            # de la CNN al terminar; si el hilo aún no empezó, se descarta
+            futuro_imagen.cancel()
+            return self._resultado_solo_vitales(
+                datos_paciente, severidad_vitales, probs_vitales,
+                error_cnn=f"CNN excedió el límite de {self.timeout_cnn_ms:.0f} ms"
             )
         except Exception as e:
             # Si falla CNN, usar solo Random Forest
             print(f"Error en CNN: {str(e)}")
-            return {
-                'severidad': severidad_vitales,
-                'probabilidades': probs_vitales,
-                'confianza': round(max(probs_vitales.values()) * 100, 2),
-                'requiere_traslado': severidad_vitales in ['crítico', 'alto'],
-                'tipo_incidente': datos_paciente.get('tipo_incidente', 'desconocido'),
-                'metodo': 'solo_vitales',
-                'severidad_vitales': severidad_vitales,
-                'severidad_imagen': None,
-                'error_cnn': str(e)
-            }
-
-        # 4. Fusión de predicciones (60% vitales + 40% imagen)
+            return self._resultado_solo_vitales(
+                datos_paciente, severidad_vitales, probs_vitales,
+                error_cnn=str(e) or type(e).__name__
+            )
+
+        # Fusión de predicciones (60% vitales + 40% imagen)
         severidad_final, probs_finales = self._fusionar_predicciones(
-            severidad_vitales, probs_vitales,
-            severidad_imagen, probs_imagen,
-            peso=0.6, peso_imagen=0.4
+            severidad_vitales, probs_vitales, 0.6,
+            severidad_imagen, probs_imagen, 0.4
         )
 
         return {
-            'severidad': severidad_final,
-            'probabilidades': probs_finales,
-            'confianza': round(max(probs_finales.values()) * 100, 2),
-            'requiere_traslado': severidad_final in ['crítico', 'alto'],
-            'tipo_incidente': datos_paciente.get('tipo_incidente', 'desconocido'),
+            **self._armar_evaluacion(datos_paciente, severidad_final, probs_finales),
             'metodo': 'hibrido',
             'severidad_vitales': severidad_vitales,
             'severidad_imagen': severidad_imagen,
@@ -413,6 +841,55 @@ class ServicioDecision:
             'confianza_imagen': round(max(probs_imagen.values()) * 100, 2)
         }
 
+    def _predecir_imagen(
+        self,
+        inferencia: Any,
+        imagen_base64: Optional[str],
+        imagen_bytes: Optional[bytes]
+    ) -> Tuple[str, Dict[str, float]]:
+        """
+        Decodifica la imagen y la evalúa con la CNN (corre en el ejecutor).
+
+        El mismo límite de tiempo se aplica a la espera del lote para que
+        un hilo del ejecutor no quede bloqueado indefinidamente.
+
+        Returns:
+            Tupla (severidad_imagen, probabilidades_imagen)
+        """
+        timeout = self.timeout_cnn_ms / 1000
+        if imagen_bytes:
+            return inferencia.predecir_bytes(imagen_bytes, timeout)
+        return inferencia.predecir(imagen_base64, timeout)
+
+    def _resultado_solo_vitales(
+        self,
+        datos_paciente: Dict[str, Any],
+        severidad_vitales: str,
+        probs_vitales: Dict[str, float],
+        error_cnn: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Construye la respuesta de evaluación sin componente visual.
+
+        Args:
+            datos_paciente: Datos del paciente evaluado
+            severidad_vitales: Severidad predicha por Random Forest
+            probs_vitales: Probabilidades de Random Forest
+            error_cnn: Motivo por el que no se usó la imagen (si había una)
+
+        Returns:
+            Dict con metodo 'solo_vitales'
+        """
+        resultado = {
+            **self._armar_evaluacion(datos_paciente, severidad_vitales, probs_vitales),
+            'metodo': 'solo_vitales',
+            'severidad_vitales': severidad_vitales,
+            'severidad_imagen': None
+        }
+        if error_cnn is not None:
+            resultado['error_cnn'] = error_cnn
+        return resultado
+
     def _fusionar_predicciones(
         self,
         sev_vitales: str,
@@ -0,0 +1,315 @@
+"""
+Entrenamiento en dos etapas de la CNN de severidad (backbone congelado).
+Como MobileNetV2 está congelado, su salida para una imagen no cambia entre
+épocas: se calcula una sola vez y la cabeza Dense(128) → Dropout → Dense(4)
+se entrena sobre esos embeddings en segundos.
+
+Etapas:
+    1. Embeddings: pasa cada imagen una vez por el backbone (+ copias con
+       augmentation fija, opcional) y guarda los vectores de 1280 valores
+       del GlobalAveragePooling en .npy mapeados a memoria.
+    2. Cabeza: entrena las capas densas sobre los embeddings.
+    3. Ensamble: copia los pesos de la cabeza a la arquitectura completa y
+       guarda el .h5 que carga ClasificadorImagenes.
+
+Uso:
+    python notebooks/entrenar_cnn_embeddings.py
+    python notebooks/entrenar_cnn_embeddings.py --copias 4 --epochs 100
+    python notebooks/entrenar_cnn_embeddings.py --almacen   # lee shards
+
+Outputs:
+    - modelos_ml/modelo_cnn_severidad.h5 (modelo completo)
+    - modelos_ml/cache_embeddings/ (embeddings reutilizables entre corridas)
+
+Estándares: PEP 8, Type hints, Docstrings
+"""
+
+import os
+os.environ['TF_CPP_MIN_LOG_LEVEL'] = '2'  # Reducir logs de TensorFlow
+
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+import tensorflow as tf
+from tensorflow import keras
+from tensorflow.keras.models import Model
+from tensorflow.keras.layers import Dense, Dropout, GlobalAveragePooling2D, Input
+from tensorflow.keras.callbacks import EarlyStopping
+
+# Agregar rutas al path
+ruta_raiz = Path(__file__).parent.parent
+sys.path.append(str(ruta_raiz))
+
+from datos.repositorios.almacen_imagenes import (
+    AlmacenImagenes,
+    DIRECTORIO_ALMACEN,
+    huella_split,
+    listar_clases,
+    listar_split,
+)
+from entrenar_cnn_severidad import (
+    crear_arquitectura_cnn,
+    crear_aumentacion,
+    crear_dataset,
+    crear_dataset_almacen,
+    SEMILLA,
+)
+
+# Crea el dataset (sin barajar) de un split, con o sin augmentation
+FabricaDataset = Callable[[Optional[keras.Sequential]], tf.data.Dataset]
+
+
+RUTA_MODELO = Path('modelos_ml/modelo_cnn_severidad.h5')
+DIRECTORIO_EMBEDDINGS = Path('modelos_ml/cache_embeddings')
+DIMENSION_EMBEDDING = 1280
+
+
+def crear_extractor(modelo: Model) -> Model:
+    """
+    Recorta la arquitectura completa en la salida del GlobalAveragePooling.
+
+    Usar el mismo modelo (en vez de un MobileNetV2 nuevo) garantiza que los
+    embeddings salen exactamente del backbone que se va a guardar.
+
+    Args:
+        modelo: Modelo de crear_arquitectura_cnn()
+
+    Returns:
+        Modelo imagen (224, 224, 3) en [0, 1] → vector de 1280
+    """
+    pooling = next(
+        capa for capa in modelo.layers
+        if isinstance(capa, GlobalAveragePooling2D)
+    )
+    return Model(inputs=modelo.input, outputs=pooling.output)
+
+
+def extraer_embeddings(
+    extractor: Model,
+    crear_ds: FabricaDataset,
+    etiquetas_split: np.ndarray,
+    ruta: Path,
+    copias: int,
+    forzar: bool = False
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Calcula (o reutiliza) los embeddings de un split en un .npy en disco.
+
+    El archivo se escribe lote a lote con open_memmap, sin juntar todo el
+    split en memoria. Si ya existe con la misma huella se reutiliza.
+
+    Args:
+        extractor: Modelo de crear_extractor()
+        crear_ds: Fábrica del dataset del split, en orden fijo
+        etiquetas_split: Etiqueta de cada imagen, en el mismo orden
+        ruta: Archivo .npy de salida (las etiquetas van al lado)
+        copias: Copias adicionales con augmentation fija por imagen
+        forzar: Recalcular aunque exista
+
+    Returns:
+        Tupla (embeddings (N, 1280) mapeado a memoria, etiquetas (N,))
+    """
+    ruta_etiquetas = ruta.with_name(ruta.stem + '_etiquetas.npy')
+    if ruta.exists() and ruta_etiquetas.exists() and not forzar:
+        print(f"   [OK] Reutilizando {ruta.name}")
+        return np.load(ruta, mmap_mode='r'), np.load(ruta_etiquetas)
+
+    total = len(etiquetas_split) * (1 + copias)
+
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    temporal = ruta.with_suffix('.tmp.npy')
+    embeddings = np.lib.format.open_memmap(
+        temporal, mode='w+', dtype=np.float32, shape=(total, DIMENSION_EMBEDDING)
+    )
+
+    # Copia 0 sin augmentation; copia k con su propia semilla fija
+    pasadas = [None] + [crear_aumentacion(SEMILLA + k) for k in range(1, copias + 1)]
+    inicio = time.perf_counter()
+    fila = 0
+    for aumentacion in pasadas:
+        for imagenes, _ in crear_ds(aumentacion):
+            lote = extractor(imagenes, training=False).numpy()
+            embeddings[fila:fila + len(lote)] = lote
+            fila += len(lote)
+
+    embeddings.flush()
+    del embeddings
+    os.replace(temporal, ruta)
+    np.save(ruta_etiquetas, np.tile(etiquetas_split, 1 + copias))
+
+    segundos = time.perf_counter() - inicio
+    print(f"   [OK] {ruta.name}: {total} embeddings en {segundos:.1f} s "
+          f"({total / segundos:.1f} img/s)")
+
+    return np.load(ruta, mmap_mode='r'), np.load(ruta_etiquetas)
+
+
+def crear_cabeza(num_clases: int) -> Model:
+    """
+    Crea la cabeza clasificadora sobre embeddings.
+
+    Debe coincidir capa a capa con la de crear_arquitectura_cnn() para
+    poder copiar los pesos.
+
+    Args:
+        num_clases: Cantidad de clases
+
+    Returns:
+        Modelo compilado (1280,) → (num_clases,)
+    """
+    entrada = Input(shape=(DIMENSION_EMBEDDING,))
+    x = Dense(128, activation='relu')(entrada)
+    x = Dropout(0.5)(x)
+    salida = Dense(num_clases, activation='softmax')(x)
+
+    cabeza = Model(inputs=entrada, outputs=salida)
+    cabeza.compile(
+        optimizer=keras.optimizers.Adam(learning_rate=0.001),
+        loss='sparse_categorical_crossentropy',
+        metrics=['accuracy']
+    )
+    return cabeza
+
+
+def copiar_cabeza(cabeza: Model, modelo: Model) -> None:
+    """
+    Copia los pesos de las capas Dense de la cabeza al modelo completo.
+
+    Args:
+        cabeza: Cabeza entrenada
+        modelo: Modelo de crear_arquitectura_cnn()
+
+    Raises:
+        ValueError: Si las capas densas no coinciden
+    """
+    densas_cabeza: List[Dense] = [c for c in cabeza.layers if isinstance(c, Dense)]
+    densas_modelo: List[Dense] = [c for c in modelo.layers if isinstance(c, Dense)]
+
+    if len(densas_cabeza) != len(densas_modelo):
+        raise ValueError("La cabeza y el modelo tienen distinta cantidad de capas Dense")
+
+    for origen, destino in zip(densas_cabeza, densas_modelo):
+        destino.set_weights(origen.get_weights())
+
+
+def main():
+    """Función principal de entrenamiento en dos etapas."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument(
+        '--copias', type=int, default=0,
+        help='Copias con augmentation fija por imagen de entrenamiento (default: 0)'
+    )
+    parser.add_argument('--epochs', type=int, default=100)
+    parser.add_argument('--batch-size', type=int, default=64,
+                        help='Lote del backbone al extraer (default: 64)')
+    parser.add_argument('--forzar', action='store_true',
+                        help='Recalcular embeddings aunque existan')
+    parser.add_argument(
+        '--almacen', type=Path, nargs='?', const=DIRECTORIO_ALMACEN,
+        help='Leer del almacén de shards (default: datos/imagenes_preprocesadas)'
+    )
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("ENTRENAMIENTO CNN EN DOS ETAPAS (EMBEDDINGS + CABEZA)")
+    print("=" * 70)
+
+    modelo = crear_arquitectura_cnn()
+    extractor = crear_extractor(modelo)
+
+    # Cada split: (fábrica de dataset, etiquetas, huella para la caché)
+    if args.almacen:
+        almacen = AlmacenImagenes(args.almacen)
+        clases = almacen.clases
+        splits = {}
+        for subset in ('entrenamiento', 'validacion'):
+            inicio, fin = almacen.rango(subset)
+            splits[subset] = (
+                lambda aum, subset=subset: crear_dataset_almacen(
+                    almacen, subset, args.batch_size,
+                    entrenar=aum is not None, aumentacion=aum, barajar=False
+                ),
+                almacen.etiquetas[inicio:fin],
+                almacen.manifiesto['huella']
+            )
+    else:
+        clases = listar_clases()
+        splits = {}
+        for subset, pares in zip(('entrenamiento', 'validacion'), listar_split()):
+            splits[subset] = (
+                lambda aum, pares=pares: crear_dataset(
+                    pares, len(clases), args.batch_size,
+                    entrenar=aum is not None, aumentacion=aum, barajar=False
+                ),
+                np.array([indice for _, indice in pares], dtype=np.int64),
+                huella_split(pares)
+            )
+
+    print("\n[2/5] Extrayendo embeddings del backbone...")
+    crear_ds, etiquetas, huella = splits['entrenamiento']
+    x_train, y_train = extraer_embeddings(
+        extractor, crear_ds, etiquetas,
+        DIRECTORIO_EMBEDDINGS / f"entrenamiento_{huella}_c{args.copias}.npy",
+        args.copias, args.forzar
+    )
+    crear_ds, etiquetas, huella = splits['validacion']
+    x_val, y_val = extraer_embeddings(
+        extractor, crear_ds, etiquetas,
+        DIRECTORIO_EMBEDDINGS / f"validacion_{huella}.npy",
+        0, args.forzar
+    )
+
+    print(f"\n[3/5] Entrenando cabeza ({len(x_train)} embeddings)...")
+    cabeza = crear_cabeza(len(clases))
+    inicio = time.perf_counter()
+    historial = cabeza.fit(
+        x_train, y_train,
+        validation_data=(x_val, y_val),
+        epochs=args.epochs,
+        batch_size=256,
+        shuffle=True,
+        callbacks=[EarlyStopping(
+            monitor='val_loss', patience=10, restore_best_weights=True
+        )],
+        verbose=0
+    )
+    loss, accuracy = cabeza.evaluate(x_val, y_val, verbose=0)
+    print(f"   [OK] {len(historial.history['loss'])} épocas en "
+          f"{time.perf_counter() - inicio:.1f} s")
+    print(f"   [OK] Validación: loss {loss:.4f}, accuracy {accuracy:.4%}")
+
+    print("\n[4/5] Copiando pesos al modelo completo...")
+    copiar_cabeza(cabeza, modelo)
+
+    # Control: el modelo completo debe reproducir la cabeza sobre imágenes reales
+    imagenes, _ = next(iter(splits['validacion'][0](None)))
+    diferencia = np.abs(
+        modelo(imagenes, training=False).numpy()
+        - cabeza(np.asarray(x_val[:len(imagenes)]), training=False).numpy()
+    ).max()
+    print(f"   [OK] Diferencia máxima modelo completo vs cabeza: {diferencia:.2e}")
+
+    print("\n[5/5] Guardando modelo...")
+    RUTA_MODELO.parent.mkdir(exist_ok=True)
+    modelo.save(RUTA_MODELO)
+    (DIRECTORIO_EMBEDDINGS / 'ultimo_entrenamiento.json').write_text(json.dumps({
+        'clases': clases,
+        'copias': args.copias,
+        'embeddings_entrenamiento': len(x_train),
+        'val_accuracy': float(accuracy),
+        'val_loss': float(loss)
+    }, indent=2))
+    print(f"   [OK] Guardado en: {RUTA_MODELO}")
+
+    print("\n" + "=" * 70)
+    print("[DONE] ENTRENAMIENTO COMPLETADO")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,10 +4,24 @@ Entrena modelo de Deep Learning con Transfer Learning (MobileNetV2).
 
 Uso:
     python notebooks/entrenar_cnn_severidad.py
+    python notebooks/entrenar_cnn_severidad.py --benchmark   # solo imágenes/s
+    python notebooks/entrenar_cnn_severidad.py --pipeline generador
+
+Pipeline de datos (tf.data):
+    - Decodificación + resize a 224x224 en paralelo (map con AUTOTUNE)
+    - Caché en disco local del dataset ya redimensionado (uint8): desde la
+      segunda época no se vuelve a leer ni decodificar ningún JPEG
+    - Augmentation vectorizada por lote con capas de Keras
+    - prefetch(AUTOTUNE) para solapar entrada y entrenamiento
+    - Split 80/20 determinista (almacen_imagenes.listar_split), el mismo
+      que usaba flow_from_directory
+    - --almacen: lee tensores ya decodificados del almacén de shards
+      (datos/scripts/preprocesar_imagenes.py) en vez de los JPEG
 
 Outputs:
     - modelos_ml/modelo_cnn_severidad.h5 (modelo entrenado)
     - modelos_ml/historial_entrenamiento.png (gráficas)
+    - modelos_ml/cache_tfdata/ (caché del dataset redimensionado)
 
 Estándares: PEP 8, Type hints, Docstrings
 """
@@ -15,10 +29,15 @@ Estándares: PEP 8, Type hints, Docstrings
 import os
 os.environ['TF_CPP_MIN_LOG_LEVEL'] = '2'  # Reducir logs de TensorFlow
 
+import sys
+import time
+import argparse
 from pathlib import Path
+from typing import Iterable, Optional, Tuple
 import matplotlib.pyplot as plt
 import numpy as np
 
+import tensorflow as tf
 from tensorflow import keras
 from tensorflow.keras.applications import MobileNetV2
 from tensorflow.keras.models import Model
@@ -26,6 +45,24 @@ from tensorflow.keras.layers import Dense, GlobalAveragePooling2D, Dropout
 from tensorflow.keras.preprocessing.image import ImageDataGenerator
 from tensorflow.keras.callbacks import ModelCheckpoint, EarlyStopping, ReduceLROnPlateau
 
+# Agregar rutas al path
+ruta_raiz = Path(__file__).parent.parent
+sys.path.append(str(ruta_raiz))
+
+from datos.repositorios.almacen_imagenes import (
+    AlmacenImagenes,
+    DIRECTORIO_ALMACEN,
+    huella_split,
+    listar_clases,
+    listar_split,
+    Split,
+)
+
+
+TAMANO_IMAGEN = (224, 224)
+DIRECTORIO_CACHE = Path('modelos_ml/cache_tfdata')
+SEMILLA = 42
+
 
 def crear_arquitectura_cnn() -> Model:
     """
@@ -68,9 +105,208 @@ def crear_arquitectura_cnn() -> Model:
     return modelo
 
 
+def _decodificar(ruta: tf.Tensor, etiqueta: tf.Tensor) -> Tuple[tf.Tensor, tf.Tensor]:
+    """Lee, decodifica y redimensiona una imagen a (224, 224, 3) uint8."""
+    imagen = tf.io.decode_image(
+        tf.io.read_file(ruta), channels=3, expand_animations=False
+    )
+    # Bilineal, igual que el servicio (decodificacion_imagenes)
+    imagen = tf.image.resize(imagen, TAMANO_IMAGEN, method='bilinear')
+    imagen = tf.cast(tf.round(imagen), tf.uint8)
+    imagen.set_shape((*TAMANO_IMAGEN, 3))
+    return imagen, etiqueta
+
+
+def crear_aumentacion(semilla: int = SEMILLA) -> keras.Sequential:
+    """
+    Augmentation equivalente a la del ImageDataGenerator, aplicada por lote.
+
+    RandomBrightness es aditivo (±20% del rango) en lugar del factor
+    multiplicativo [0.8, 1.2] del generador; el efecto es comparable.
+
+    Args:
+        semilla: Semilla de las transformaciones aleatorias
+
+    Returns:
+        Modelo secuencial que recibe lotes float32 en [0, 255]
+    """
+    return keras.Sequential([
+        keras.layers.RandomFlip('horizontal', seed=semilla),
+        keras.layers.RandomRotation(20 / 360, seed=semilla),
+        keras.layers.RandomTranslation(0.2, 0.2, seed=semilla),
+        keras.layers.RandomZoom(0.2, seed=semilla),
+        keras.layers.RandomBrightness(0.2, value_range=(0, 255), seed=semilla),
+    ], name='aumentacion')
+
+
+def crear_dataset(
+    pares: Split,
+    num_clases: int,
+    batch_size: int,
+    entrenar: bool,
+    directorio_cache: Optional[Path] = DIRECTORIO_CACHE,
+    aumentacion: Optional[keras.Sequential] = None,
+    barajar: Optional[bool] = None
+) -> tf.data.Dataset:
+    """
+    Arma el tf.data.Dataset de un split.
+
+    Args:
+        pares: Pares (ruta, indice_clase) de listar_split()
+        num_clases: Cantidad de clases (para one-hot)
+        batch_size: Tamaño del batch
+        entrenar: Si True, baraja y aplica augmentation
+        directorio_cache: Dónde cachear las imágenes redimensionadas
+            (None = sin caché, decodifica en cada época)
+        aumentacion: Capas de augmentation (solo si entrenar)
+        barajar: Barajar los ejemplos (default: igual que entrenar)
+
+    Returns:
+        Dataset de lotes (imagenes float32 en [0, 1], etiquetas one-hot)
+    """
+    rutas = [str(ruta) for ruta, _ in pares]
+    etiquetas = [indice for _, indice in pares]
+
+    ds = tf.data.Dataset.from_tensor_slices((rutas, etiquetas))
+    ds = ds.map(_decodificar, num_parallel_calls=tf.data.AUTOTUNE)
+
+    if directorio_cache is not None:
+        # La huella en el nombre invalida la caché si cambian las imágenes
+        directorio_cache.mkdir(parents=True, exist_ok=True)
+        nombre = f"{'entrenamiento' if entrenar else 'validacion'}_{huella_split(pares)}"
+        ds = ds.cache(str(directorio_cache / nombre))
+
+    if entrenar if barajar is None else barajar:
+        ds = ds.shuffle(len(pares), seed=SEMILLA, reshuffle_each_iteration=True)
+
+    ds = ds.batch(batch_size)
+    return _preparar_lotes(ds, num_clases, aumentacion if entrenar else None)
+
+
+def crear_dataset_almacen(
+    almacen: AlmacenImagenes,
+    subset: str,
+    batch_size: int,
+    entrenar: bool,
+    aumentacion: Optional[keras.Sequential] = None,
+    barajar: Optional[bool] = None
+) -> tf.data.Dataset:
+    """
+    Arma el tf.data.Dataset de un subset del almacén de shards.
+
+    Se barajan solo los índices; cada lote se lee de los shards mapeados
+    a memoria sin decodificar nada.
+
+    Args:
+        almacen: Almacén abierto
+        subset: 'entrenamiento' o 'validacion'
+        batch_size: Tamaño del batch
+        entrenar: Si True, baraja y aplica augmentation
+        aumentacion: Capas de augmentation (solo si entrenar)
+        barajar: Barajar los ejemplos (default: igual que entrenar)
+
+    Returns:
+        Dataset de lotes (imagenes float32 en [0, 1], etiquetas one-hot)
+    """
+    inicio, fin = almacen.rango(subset)
+    forma = tuple(almacen.manifiesto['forma_imagen'])
+
+    def leer(indices: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        return almacen.leer(indices), almacen.etiquetas[indices]
+
+    def leer_lote(indices):
+        imagenes, etiquetas = tf.numpy_function(
+            leer, [indices], (tf.uint8, tf.int64)
+        )
+        imagenes.set_shape((None, *forma))
+        etiquetas.set_shape((None,))
+        return imagenes, etiquetas
+
+    ds = tf.data.Dataset.range(inicio, fin)
+    if entrenar if barajar is None else barajar:
+        ds = ds.shuffle(fin - inicio, seed=SEMILLA, reshuffle_each_iteration=True)
+    ds = ds.batch(batch_size).map(leer_lote, num_parallel_calls=tf.data.AUTOTUNE)
+
+    return _preparar_lotes(
+        ds, len(almacen.clases), aumentacion if entrenar else None
+    )
+
+
+def _preparar_lotes(
+    ds: tf.data.Dataset,
+    num_clases: int,
+    aumentacion: Optional[keras.Sequential]
+) -> tf.data.Dataset:
+    """Augmentation opcional, normalización a [0, 1], one-hot y prefetch."""
+    def preparar(imagenes, etiquetas):
+        imagenes = tf.cast(imagenes, tf.float32)
+        if aumentacion is not None:
+            imagenes = aumentacion(imagenes, training=True)
+        imagenes = imagenes * (1.0 / 255.0)
+        return imagenes, tf.one_hot(etiquetas, num_clases)
+
+    ds = ds.map(preparar, num_parallel_calls=tf.data.AUTOTUNE)
+    return ds.prefetch(tf.data.AUTOTUNE)
+
+
+def cargar_datos_tf(
+    batch_size: int = 32,
+    directorio_cache: Optional[Path] = DIRECTORIO_CACHE,
+    almacen: Optional[AlmacenImagenes] = None
+) -> Tuple[tf.data.Dataset, tf.data.Dataset]:
+    """
+    Carga los datos con el pipeline tf.data.
+
+    Args:
+        batch_size: Tamaño del batch
+        directorio_cache: Caché en disco (None = sin caché)
+        almacen: Si se pasa, lee del almacén de shards (ignora la caché)
+
+    Returns:
+        Tupla (train_ds, val_ds)
+    """
+    print("\n[2/5] Cargando datasets (tf.data)...")
+
+    if almacen is not None:
+        train_ds = crear_dataset_almacen(
+            almacen, 'entrenamiento', batch_size, entrenar=True,
+            aumentacion=crear_aumentacion()
+        )
+        val_ds = crear_dataset_almacen(almacen, 'validacion', batch_size, entrenar=False)
+        for subset in ('entrenamiento', 'validacion'):
+            inicio, fin = almacen.rango(subset)
+            print(f"   [OK] Imágenes de {subset}: {fin - inicio}")
+        print(f"   [OK] Clases: {almacen.clases}")
+        print(f"   [OK] Almacén: {almacen.directorio}")
+        return train_ds, val_ds
+
+    clases = listar_clases()
+    entrenamiento, validacion = listar_split()
+
+    train_ds = crear_dataset(
+        entrenamiento, len(clases), batch_size, entrenar=True,
+        directorio_cache=directorio_cache, aumentacion=crear_aumentacion()
+    )
+    val_ds = crear_dataset(
+        validacion, len(clases), batch_size, entrenar=False,
+        directorio_cache=directorio_cache
+    )
+
+    print(f"   [OK] Imágenes de entrenamiento: {len(entrenamiento)}")
+    print(f"   [OK] Imágenes de validación: {len(validacion)}")
+    print(f"   [OK] Clases: {clases}")
+    if directorio_cache is not None:
+        print(f"   [OK] Caché: {directorio_cache}")
+
+    return train_ds, val_ds
+
+
 def cargar_datos(batch_size: int = 32):
     """
-    Carga y preprocesa datos de entrenamiento.
+    Carga y preprocesa datos con ImageDataGenerator (pipeline anterior).
+
+    Se conserva para comparar throughput (--benchmark) y reproducir
+    entrenamientos previos (--pipeline generador).
 
     Args:
         batch_size: Tamaño del batch
@@ -243,8 +479,112 @@ def graficar_historial(history):
     plt.close()
 
 
+def medir_throughput(
+    lotes: Iterable,
+    cantidad_lotes: int,
+    lotes_calentamiento: int = 2
+) -> float:
+    """
+    Mide imágenes por segundo recorriendo un pipeline de entrada.
+
+    Args:
+        lotes: Dataset o generador que produce (imagenes, etiquetas)
+        cantidad_lotes: Lotes medidos
+        lotes_calentamiento: Lotes descartados al inicio
+
+    Returns:
+        Imágenes por segundo
+    """
+    iterador = iter(lotes)
+    for _ in range(lotes_calentamiento):
+        next(iterador)
+
+    imagenes = 0
+    inicio = time.perf_counter()
+    for _ in range(cantidad_lotes):
+        x, _ = next(iterador)
+        imagenes += len(x)
+    return imagenes / (time.perf_counter() - inicio)
+
+
+def comparar_pipelines(
+    batch_size: int = 32,
+    cantidad_lotes: int = 50,
+    almacen: Optional[AlmacenImagenes] = None
+) -> None:
+    """
+    Reporta imágenes/s del generador contra tf.data (sin y con caché, y
+    desde el almacén de shards si se pasa).
+
+    La caché se llena con una pasada completa antes de medirla, igual que
+    ocurre en la primera época de un entrenamiento.
+    """
+    print("\n[BENCHMARK] Pipeline de entrada (split de entrenamiento)...")
+
+    clases = listar_clases()
+    entrenamiento, _ = listar_split()
+    aumentacion = crear_aumentacion()
+    cantidad_lotes = min(cantidad_lotes, len(entrenamiento) // batch_size - 2)
+
+    train_gen, _ = cargar_datos(batch_size)
+    resultados = {'ImageDataGenerator': medir_throughput(train_gen, cantidad_lotes)}
+
+    resultados['tf.data (sin caché)'] = medir_throughput(
+        crear_dataset(entrenamiento, len(clases), batch_size, True,
+                      directorio_cache=None, aumentacion=aumentacion),
+        cantidad_lotes
+    )
+
+    con_cache = crear_dataset(entrenamiento, len(clases), batch_size, True,
+                              aumentacion=aumentacion)
+    for _ in con_cache:  # primera época: llena la caché
+        pass
+    resultados['tf.data (con caché)'] = medir_throughput(con_cache, cantidad_lotes)
+
+    if almacen is not None:
+        resultados['tf.data (almacén)'] = medir_throughput(
+            crear_dataset_almacen(almacen, 'entrenamiento', batch_size, True,
+                                  aumentacion=aumentacion),
+            cantidad_lotes
+        )
+
+    base = resultados['ImageDataGenerator']
+    print(f"\n   {'Pipeline':>22s} | {'img/s':>8s} | {'Mejora':>7s}")
+    print("   " + "-" * 44)
+    for nombre, velocidad in resultados.items():
+        print(f"   {nombre:>22s} | {velocidad:8.1f} | {velocidad / base:6.1f}x")
+    print(f"\n   [OK] {cantidad_lotes} lotes de {batch_size} por pipeline")
+
+
 def main():
     """Función principal de entrenamiento."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument(
+        '--pipeline', choices=('tfdata', 'generador'), default='tfdata',
+        help='Pipeline de entrada (default: tfdata)'
+    )
+    parser.add_argument('--epochs', type=int, default=20)
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument(
+        '--sin-cache', action='store_true',
+        help='No cachear en disco el dataset redimensionado'
+    )
+    parser.add_argument(
+        '--almacen', type=Path, nargs='?', const=DIRECTORIO_ALMACEN,
+        help='Leer del almacén de shards (default: datos/imagenes_preprocesadas)'
+    )
+    parser.add_argument(
+        '--benchmark', action='store_true',
+        help='Solo comparar imágenes/s del generador contra tf.data'
+    )
+    args = parser.parse_args()
+
+    almacen = AlmacenImagenes(args.almacen) if args.almacen else None
+
+    if args.benchmark:
+        comparar_pipelines(args.batch_size, almacen=almacen)
+        return
+
     print("=" * 70)
     print("ENTRENAMIENTO DE CNN PARA CLASIFICACIÓN DE SEVERIDAD MÉDICA")
     print("=" * 70)
@@ -256,14 +596,21 @@ def main():
     modelo = crear_arquitectura_cnn()
 
     # 2. Cargar datos
-    train_gen, val_gen = cargar_datos(batch_size=32)
+    if args.pipeline == 'generador':
+        train_gen, val_gen = cargar_datos(batch_size=args.batch_size)
+    else:
+        train_gen, val_gen = cargar_datos_tf(
+            batch_size=args.batch_size,
+            directorio_cache=None if args.sin_cache else DIRECTORIO_CACHE,
+            almacen=almacen
+        )
 
     # 3. Entrenar
     history = entrenar_modelo(
         modelo,
         train_gen,
         val_gen,
-        epochs=20  # Puedes ajustar según necesidad
+        epochs=args.epochs
     )
 
     # 4. Evaluar
@@ -0,0 +1,540 @@
+"""
+Entrenamiento reproducible del Random Forest de severidad.
+Búsqueda de hiperparámetros por successive halving en un pool de procesos,
+midiendo accuracy, latencia de inferencia y tamaño de cada candidato, y
+elección del mejor modelo Pareto dentro de un presupuesto de latencia.
+
+Etapas:
+    1. Datos: emergencia_pacientes (Parquet tipado) → validar_lote →
+       split 80/20 estratificado (el 20% solo se usa para el reporte).
+    2. Pliegues: K-fold estratificado sobre el 80%, guardado en
+       modelos_ml/cache_rf/ y reutilizado entre corridas con los mismos
+       datos y semilla. Cada trabajador lo carga una sola vez.
+    3. Successive halving: todos los candidatos arrancan con una fracción
+       de cada pliegue; en cada ronda pasa 1/factor (priorizando los que
+       cumplen la latencia) con factor veces más datos, hasta la ronda
+       final con los pliegues completos.
+    4. Finalistas: se reentrenan con todo el 80% y se mide latencia (un
+       paciente y lote) ya sin el pool en marcha. Se elige el de mayor
+       accuracy de validación cruzada entre los no dominados (accuracy,
+       latencia, tamaño) que cumplen el presupuesto.
+    5. Guardado: los mismos archivos que carga PredictorSeveridad.
+
+Uso:
+    python notebooks/entrenar_random_forest.py
+    python notebooks/entrenar_random_forest.py --latencia-max-ms 5 --procesos 8
+    python notebooks/entrenar_random_forest.py --candidatos 81 --destino /tmp/rf
+
+Outputs:
+    - modelos_ml/modelo_severidad.pkl, encoder_sexo.pkl,
+      encoder_tipo_incidente.pkl, features_list.pkl
+    - modelos_ml/reporte_random_forest.json (todas las rondas y finalistas)
+    - modelos_ml/cache_rf/ (pliegues reutilizables entre corridas)
+
+Estándares: PEP 8, Type hints, Docstrings
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import pickle
+import hashlib
+import argparse
+from pathlib import Path
+from datetime import datetime, timezone
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import (
+    ParameterSampler,
+    StratifiedKFold,
+    train_test_split,
+)
+from sklearn.preprocessing import LabelEncoder
+
+# Agregar rutas al path
+ruta_raiz = Path(__file__).parent.parent
+sys.path.append(str(ruta_raiz))
+
+from datos.modelos.validacion_pacientes import validar_lote
+from datos.repositorios.repositorio_tablas import RepositorioTablas
+from negocio.ml.prediccion_severidad import SEVERIDADES
+
+
+SEMILLA = 42
+DIRECTORIO_MODELOS = ruta_raiz / 'modelos_ml'
+DIRECTORIO_CACHE = DIRECTORIO_MODELOS / 'cache_rf'
+
+# Mismo orden que el notebook original (features_list.pkl)
+FEATURES = [
+    'edad', 'presion_sistolica', 'presion_diastolica',
+    'frecuencia_cardiaca', 'frecuencia_respiratoria', 'temperatura',
+    'saturacion_oxigeno', 'nivel_dolor', 'tiempo_desde_incidente',
+    'sexo_encoded', 'tipo_incidente_encoded'
+]
+
+# Configuración del notebook; siempre entra como candidato 0 de referencia
+PARAMETROS_BASE = {
+    'n_estimators': 100,
+    'max_depth': 10,
+    'min_samples_split': 5,
+    'min_samples_leaf': 2,
+    'max_features': 'sqrt',
+    'class_weight': None,
+}
+
+ESPACIO_BUSQUEDA = {
+    'n_estimators': [25, 50, 100, 200, 300],
+    'max_depth': [6, 8, 10, 14, 20, None],
+    'min_samples_split': [2, 5, 10],
+    'min_samples_leaf': [1, 2, 4, 8],
+    'max_features': ['sqrt', 'log2', 0.5],
+    'class_weight': [None, 'balanced', 'balanced_subsample'],
+}
+
+TAMANO_LOTE = 256           # Filas del lote en la medición de latencia
+REPETICIONES_LATENCIA = 30
+
+# Pliegues del proceso trabajador (cargados una vez por _iniciar_trabajador)
+_PLIEGUES: Dict[str, np.ndarray] = {}
+
+
+def cargar_datos(
+    tablas: Optional[RepositorioTablas] = None
+) -> Tuple[pd.DataFrame, pd.Series, LabelEncoder, LabelEncoder, int, int]:
+    """
+    Lee, valida y codifica emergencia_pacientes.
+
+    Los registros sin severidad se descartan aparte de los inválidos; si
+    ninguno la tiene (ej: tabla exportada desde MongoDB) no se entrena.
+
+    Args:
+        tablas: Repositorio de tablas (default: archivos_parquet/)
+
+    Returns:
+        Tupla (X con FEATURES, y, encoder_sexo, encoder_tipo_incidente,
+        registros descartados por validación, registros sin severidad)
+
+    Raises:
+        ValueError: Si la tabla no tiene etiquetas o alguna no está en
+            SEVERIDADES
+    """
+    tablas = tablas or RepositorioTablas()
+    df = tablas.leer(
+        'emergencia_pacientes',
+        columnas=[f for f in FEATURES if not f.endswith('_encoded')]
+        + ['sexo', 'tipo_incidente', 'severidad']
+    )
+    resultado = validar_lote(df)
+    etiquetados = resultado.validos & df['severidad'].notna().to_numpy()
+    if not etiquetados.any():
+        ruta = tablas.ruta('emergencia_pacientes')
+        raise ValueError(
+            f"{ruta} no tiene severidad (origen: {tablas.origen(ruta) or 'desconocido'}). "
+            f"Si es una exportación de MongoDB, regenerarla desde el CSV: "
+            f"python datos/scripts/convertir_a_parquet.py --tablas emergencia_pacientes"
+        )
+
+    df = resultado.datos[etiquetados].reset_index(drop=True)
+    desconocidas = set(df['severidad'].astype(str)) - set(SEVERIDADES)
+    if desconocidas:
+        raise ValueError(
+            f"Severidades desconocidas en emergencia_pacientes: {sorted(desconocidas)} "
+            f"(se esperaba {list(SEVERIDADES)})"
+        )
+
+    encoder_sexo = LabelEncoder()
+    encoder_tipo_incidente = LabelEncoder()
+    df['sexo_encoded'] = encoder_sexo.fit_transform(df['sexo'])
+    df['tipo_incidente_encoded'] = encoder_tipo_incidente.fit_transform(df['tipo_incidente'])
+
+    X = df[FEATURES].astype(np.float64)
+    y = df['severidad'].astype(str)
+    return (X, y, encoder_sexo, encoder_tipo_incidente,
+            int((~resultado.validos).sum()), int((resultado.validos & ~etiquetados).sum()))
+
+
+def orden_estratificado(indices: np.ndarray, y: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """
+    Baraja indices de modo que cualquier prefijo conserve las proporciones de clase.
+
+    Así una ronda con n muestras toma indices[:n] sin volver a estratificar.
+    """
+    indices = rng.permutation(indices)
+    clases = y[indices]
+    posicion = np.empty(len(indices))
+    for clase in np.unique(clases):
+        mascara = clases == clase
+        posicion[mascara] = (np.arange(mascara.sum()) + 0.5) / mascara.sum()
+    return indices[np.argsort(posicion, kind='stable')]
+
+
+def preparar_pliegues(X: np.ndarray, y: np.ndarray, pliegues: int, semilla: int) -> Path:
+    """
+    Guarda X, y y los índices de cada pliegue en la caché (si no existen).
+
+    Args:
+        X: Features (N, F) float64
+        y: Clases codificadas (N,)
+        pliegues: Cantidad de pliegues
+        semilla: Semilla de StratifiedKFold y del orden de submuestreo
+
+    Returns:
+        Ruta del .npz (el nombre lleva la huella de datos, pliegues y semilla)
+    """
+    huella = hashlib.blake2b(digest_size=8)
+    huella.update(np.ascontiguousarray(X).tobytes())
+    huella.update(np.ascontiguousarray(y).tobytes())
+    huella.update(f"{pliegues}:{semilla}".encode())
+    ruta = DIRECTORIO_CACHE / f"pliegues_{huella.hexdigest()}.npz"
+    if ruta.exists():
+        return ruta
+
+    rng = np.random.default_rng(semilla)
+    divisor = StratifiedKFold(n_splits=pliegues, shuffle=True, random_state=semilla)
+    arreglos = {'X': X, 'y': y}
+    for k, (entrenamiento, validacion) in enumerate(divisor.split(X, y)):
+        arreglos[f"entrenamiento_{k}"] = orden_estratificado(entrenamiento, y, rng)
+        arreglos[f"validacion_{k}"] = validacion
+
+    DIRECTORIO_CACHE.mkdir(parents=True, exist_ok=True)
+    temporal = ruta.with_name(f".{ruta.stem}.tmp.npz")
+    np.savez(temporal, **arreglos)
+    os.replace(temporal, ruta)
+    return ruta
+
+
+def _iniciar_trabajador(ruta_pliegues: str) -> None:
+    """Carga los pliegues una sola vez por proceso."""
+    with np.load(ruta_pliegues) as archivo:
+        _PLIEGUES.update({clave: archivo[clave] for clave in archivo.files})
+
+
+def medir_latencias(modelo: RandomForestClassifier, X: Any) -> Tuple[float, float]:
+    """
+    Mediana de predict_proba para un paciente y para un lote.
+
+    Args:
+        modelo: Modelo entrenado
+        X: Al menos TAMANO_LOTE filas (ndarray o DataFrame)
+
+    Returns:
+        Tupla (ms por llamada con 1 fila, ms por llamada con TAMANO_LOTE filas)
+    """
+    uno = X[:1]
+    lote = X[:TAMANO_LOTE]
+    modelo.predict_proba(uno)  # Calentamiento
+
+    tiempos_uno, tiempos_lote = [], []
+    for _ in range(REPETICIONES_LATENCIA):
+        inicio = time.perf_counter()
+        modelo.predict_proba(uno)
+        tiempos_uno.append(time.perf_counter() - inicio)
+    for _ in range(max(3, REPETICIONES_LATENCIA // 10)):
+        inicio = time.perf_counter()
+        modelo.predict_proba(lote)
+        tiempos_lote.append(time.perf_counter() - inicio)
+
+    return float(np.median(tiempos_uno) * 1e3), float(np.median(tiempos_lote) * 1e3)
+
+
+def tamano_mb(modelo: RandomForestClassifier) -> float:
+    """Tamaño serializado del modelo en MB."""
+    return len(pickle.dumps(modelo, protocol=pickle.HIGHEST_PROTOCOL)) / 1e6
+
+
+def _evaluar(tarea: Tuple[int, Dict[str, Any], int, int, bool]) -> Dict[str, Any]:
+    """
+    Entrena un candidato en un pliegue y lo evalúa (en un proceso trabajador).
+
+    Args:
+        tarea: (candidato, parámetros, pliegue, muestras, medir) donde medir
+            indica si además se mide latencia y tamaño
+
+    Returns:
+        Dict con candidato, pliegue, accuracy y, si se pidió, latencias y tamaño
+    """
+    candidato, parametros, pliegue, muestras, medir = tarea
+    X, y = _PLIEGUES['X'], _PLIEGUES['y']
+    entrenamiento = _PLIEGUES[f"entrenamiento_{pliegue}"][:muestras]
+    validacion = _PLIEGUES[f"validacion_{pliegue}"]
+
+    modelo = RandomForestClassifier(**parametros, n_jobs=1)
+    modelo.fit(X[entrenamiento], y[entrenamiento])
+
+    resultado = {
+        'candidato': candidato,
+        'pliegue': pliegue,
+        'accuracy': float((modelo.predict(X[validacion]) == y[validacion]).mean())
+    }
+    if medir:
+        resultado['latencia_uno_ms'], resultado['latencia_lote_ms'] = medir_latencias(
+            modelo, X[validacion]
+        )
+        resultado['tamano_mb'] = tamano_mb(modelo)
+    return resultado
+
+
+def generar_candidatos(cantidad: int, semilla: int) -> List[Dict[str, Any]]:
+    """
+    Candidato base del notebook más cantidad - 1 muestreados del espacio.
+
+    Los parámetros incluyen random_state para que cada ajuste sea
+    reproducible sin importar en qué proceso corra.
+    """
+    muestreados = ParameterSampler(ESPACIO_BUSQUEDA, n_iter=cantidad - 1, random_state=semilla)
+    return [
+        {**parametros, 'random_state': semilla}
+        for parametros in [PARAMETROS_BASE, *muestreados]
+    ]
+
+
+def successive_halving(
+    candidatos: List[Dict[str, Any]],
+    ruta_pliegues: Path,
+    pliegues: int,
+    muestras_pliegue: int,
+    factor: int,
+    finalistas: int,
+    latencia_max_ms: float,
+    procesos: Optional[int]
+) -> Tuple[List[int], List[Dict[str, Any]]]:
+    """
+    Ejecuta las rondas de successive halving en un pool de procesos.
+
+    Args:
+        candidatos: Parámetros de cada candidato
+        ruta_pliegues: Caché de preparar_pliegues
+        pliegues: Cantidad de pliegues
+        muestras_pliegue: Filas de entrenamiento del pliegue más chico
+        factor: Reducción de candidatos (y aumento de datos) por ronda
+        finalistas: Candidatos mínimos que llegan a la ronda final
+        latencia_max_ms: Presupuesto de latencia (prioriza al promover)
+        procesos: Procesos del pool (None = todos los núcleos)
+
+    Returns:
+        Tupla (índices de los finalistas, registro de cada ronda)
+    """
+    rondas = max(1, math.floor(math.log(max(len(candidatos) / finalistas, 1), factor)) + 1)
+    vivos = list(range(len(candidatos)))
+    historial = []
+
+    with ProcessPoolExecutor(
+        max_workers=procesos,
+        initializer=_iniciar_trabajador,
+        initargs=(str(ruta_pliegues),)
+    ) as pool:
+        for ronda in range(rondas):
+            muestras = max(
+                2 * factor, round(muestras_pliegue / factor ** (rondas - 1 - ronda))
+            )
+            print(f"   Ronda {ronda + 1}/{rondas}: {len(vivos)} candidatos, "
+                  f"{muestras} muestras por pliegue")
+
+            tareas = [
+                (c, candidatos[c], k, muestras, k == 0)
+                for c in vivos for k in range(pliegues)
+            ]
+            por_candidato: Dict[int, Dict[str, Any]] = {
+                c: {'candidato': c, 'parametros': candidatos[c], 'accuracies': []}
+                for c in vivos
+            }
+            for resultado in pool.map(_evaluar, tareas):
+                registro = por_candidato[resultado.pop('candidato')]
+                resultado.pop('pliegue')
+                registro['accuracies'].append(resultado.pop('accuracy'))
+                registro.update(resultado)
+
+            registros = []
+            for registro in por_candidato.values():
+                accuracies = registro.pop('accuracies')
+                registro['accuracy'] = float(np.mean(accuracies))
+                registro['accuracy_std'] = float(np.std(accuracies))
+                registros.append(registro)
+            historial.append({'ronda': ronda + 1, 'muestras': muestras, 'candidatos': registros})
+
+            if ronda < rondas - 1:
+                # Primero los que cumplen el presupuesto, luego por accuracy
+                registros.sort(key=lambda r: (
+                    r['latencia_uno_ms'] > latencia_max_ms, -r['accuracy'], r['latencia_uno_ms']
+                ))
+                promovidos = max(finalistas, math.ceil(len(vivos) / factor))
+                vivos = [r['candidato'] for r in registros[:promovidos]]
+
+    return vivos, historial
+
+
+def frente_pareto(registros: List[Dict[str, Any]]) -> List[bool]:
+    """
+    Marca los registros no dominados en (accuracy ↑, latencia ↓, tamaño ↓).
+
+    Returns:
+        Lista paralela a registros, True si ninguno otro lo domina
+    """
+    def domina(a: Dict[str, Any], b: Dict[str, Any]) -> bool:
+        no_peor = (
+            a['accuracy'] >= b['accuracy']
+            and a['latencia_uno_ms'] <= b['latencia_uno_ms']
+            and a['tamano_mb'] <= b['tamano_mb']
+        )
+        mejor = (
+            a['accuracy'] > b['accuracy']
+            or a['latencia_uno_ms'] < b['latencia_uno_ms']
+            or a['tamano_mb'] < b['tamano_mb']
+        )
+        return no_peor and mejor
+
+    return [not any(domina(otro, r) for otro in registros if otro is not r) for r in registros]
+
+
+def elegir(
+    registros: List[Dict[str, Any]],
+    latencia_max_ms: float,
+    tamano_max_mb: Optional[float]
+) -> Dict[str, Any]:
+    """
+    Elige el finalista Pareto de mayor accuracy dentro del presupuesto.
+
+    Si ninguno lo cumple, el de menor latencia del frente.
+    """
+    frente = [r for r, en_frente in zip(registros, frente_pareto(registros)) if en_frente]
+    for registro in registros:
+        registro['pareto'] = any(registro is r for r in frente)
+
+    dentro = [
+        r for r in frente
+        if r['latencia_uno_ms'] <= latencia_max_ms
+        and (tamano_max_mb is None or r['tamano_mb'] <= tamano_max_mb)
+    ]
+    if not dentro:
+        print(f"   [!] Ningún finalista cumple {latencia_max_ms} ms; "
+              f"se elige el más rápido del frente")
+        return min(frente, key=lambda r: r['latencia_uno_ms'])
+    return max(dentro, key=lambda r: (r['accuracy'], -r['latencia_uno_ms']))
+
+
+def guardar_artefactos(destino: Path, artefactos: Dict[str, Any]) -> None:
+    """Escribe cada .pkl a un temporal y lo reemplaza de una vez."""
+    destino.mkdir(parents=True, exist_ok=True)
+    for nombre, objeto in artefactos.items():
+        temporal = destino / f".{nombre}.tmp"
+        joblib.dump(objeto, temporal)
+        os.replace(temporal, destino / nombre)
+
+
+def main():
+    """Función principal de entrenamiento con búsqueda de hiperparámetros."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--candidatos', type=int, default=36)
+    parser.add_argument('--factor', type=int, default=3,
+                        help='Reducción de candidatos por ronda (default: 3)')
+    parser.add_argument('--finalistas', type=int, default=4,
+                        help='Candidatos mínimos en la ronda final (default: 4)')
+    parser.add_argument('--pliegues', type=int, default=5)
+    parser.add_argument('--latencia-max-ms', type=float, default=10.0,
+                        help='Presupuesto de predict_proba con 1 paciente (default: 10)')
+    parser.add_argument('--tamano-max-mb', type=float, default=None)
+    parser.add_argument('--procesos', type=int, default=None,
+                        help='Procesos del pool (default: todos los núcleos)')
+    parser.add_argument('--semilla', type=int, default=SEMILLA)
+    parser.add_argument('--destino', type=Path, default=DIRECTORIO_MODELOS)
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("ENTRENAMIENTO RANDOM FOREST (SUCCESSIVE HALVING + LATENCIA)")
+    print("=" * 70)
+    inicio = time.perf_counter()
+
+    print("\n[1/5] Cargando y validando datos...")
+    X, y, encoder_sexo, encoder_tipo_incidente, descartados, sin_severidad = cargar_datos()
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=0.2, random_state=args.semilla, stratify=y
+    )
+    clases, y_codigos = np.unique(y_train.to_numpy(), return_inverse=True)
+    print(f"   [OK] {len(X)} pacientes ({descartados} descartados por validación, "
+          f"{sin_severidad} sin severidad), "
+          f"{len(X_train)} entrenamiento / {len(X_test)} prueba")
+
+    print("\n[2/5] Preparando pliegues...")
+    ruta_pliegues = preparar_pliegues(
+        X_train.to_numpy(), y_codigos, args.pliegues, args.semilla
+    )
+    muestras_pliegue = len(X_train) - math.ceil(len(X_train) / args.pliegues)
+    print(f"   [OK] {args.pliegues} pliegues en {ruta_pliegues.name}")
+
+    print("\n[3/5] Successive halving...")
+    candidatos = generar_candidatos(args.candidatos, args.semilla)
+    finalistas, historial = successive_halving(
+        candidatos, ruta_pliegues, args.pliegues, muestras_pliegue,
+        args.factor, args.finalistas, args.latencia_max_ms, args.procesos
+    )
+
+    print(f"\n[4/5] Midiendo {len(finalistas)} finalistas con todo el entrenamiento...")
+    ultima_ronda = {r['candidato']: r for r in historial[-1]['candidatos']}
+    registros, modelos = [], {}
+    for candidato in finalistas:
+        # n_jobs=1: una sola fila no compensa repartir árboles en hilos
+        modelo = RandomForestClassifier(**candidatos[candidato], n_jobs=1)
+        modelo.fit(X_train, y_train)
+        latencia_uno, latencia_lote = medir_latencias(modelo, X_test)
+        registros.append({
+            'candidato': candidato,
+            'parametros': candidatos[candidato],
+            'accuracy': ultima_ronda[candidato]['accuracy'],
+            'accuracy_std': ultima_ronda[candidato]['accuracy_std'],
+            'accuracy_prueba': float((modelo.predict(X_test) == y_test).mean()),
+            'latencia_uno_ms': latencia_uno,
+            'latencia_lote_ms': latencia_lote,
+            'tamano_mb': tamano_mb(modelo)
+        })
+        modelos[candidato] = modelo
+
+    elegido = elegir(registros, args.latencia_max_ms, args.tamano_max_mb)
+
+    print(f"\n   {'Cand':>4s} | {'CV acc':>7s} | {'Prueba':>7s} | {'1 fila':>8s} | "
+          f"{'Lote':>8s} | {'Tamaño':>8s} | Pareto")
+    print("   " + "-" * 66)
+    for r in sorted(registros, key=lambda r: -r['accuracy']):
+        marca = '*' if r is elegido else ('si' if r['pareto'] else '')
+        print(f"   {r['candidato']:>4d} | {r['accuracy']:7.4f} | {r['accuracy_prueba']:7.4f} | "
+              f"{r['latencia_uno_ms']:6.2f}ms | {r['latencia_lote_ms']:6.2f}ms | "
+              f"{r['tamano_mb']:6.2f}MB | {marca}")
+    print(f"\n   [OK] Elegido: candidato {elegido['candidato']} {elegido['parametros']}")
+
+    print("\n[5/5] Guardando modelo y encoders...")
+    guardar_artefactos(args.destino, {
+        'modelo_severidad.pkl': modelos[elegido['candidato']],
+        'encoder_sexo.pkl': encoder_sexo,
+        'encoder_tipo_incidente.pkl': encoder_tipo_incidente,
+        'features_list.pkl': list(FEATURES)
+    })
+    (args.destino / 'reporte_random_forest.json').write_text(json.dumps({
+        'fecha': datetime.now(timezone.utc).isoformat(),
+        'semilla': args.semilla,
+        'pliegues': ruta_pliegues.name,
+        'pacientes': len(X),
+        'descartados_validacion': descartados,
+        'descartados_sin_severidad': sin_severidad,
+        'clases': clases.tolist(),
+        'latencia_max_ms': args.latencia_max_ms,
+        'tamano_max_mb': args.tamano_max_mb,
+        'rondas': historial,
+        'finalistas': registros,
+        'elegido': elegido['candidato'],
+        'segundos': time.perf_counter() - inicio
+    }, indent=2, default=str))
+    print(f"   [OK] Guardado en: {args.destino}")
+
+    print("\n" + "=" * 70)
+    print("[DONE] ENTRENAMIENTO COMPLETADO")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
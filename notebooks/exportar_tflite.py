@@ -0,0 +1,276 @@
+"""
+Script de exportación de la CNN de severidad a TFLite cuantizado (int8).
+Convierte modelos_ml/modelo_cnn_severidad.h5 con cuantización post-entrenamiento
+usando un dataset representativo de datos/imagenes_entrenamiento, y compara
+accuracy y latencia contra el modelo Keras original.
+
+Uso:
+    python notebooks/exportar_tflite.py
+    python notebooks/exportar_tflite.py --muestras 300 --sin-reporte
+    python notebooks/exportar_tflite.py --almacen   # lee shards preprocesados
+
+Outputs:
+    - modelos_ml/modelo_cnn_severidad_int8.tflite (modelo cuantizado)
+    - modelos_ml/reporte_tflite.json (accuracy vs latencia)
+
+Para servir con el modelo cuantizado: CNN_BACKEND=tflite
+
+Estándares: PEP 8, Type hints, Docstrings
+"""
+
+import os
+os.environ['TF_CPP_MIN_LOG_LEVEL'] = '2'  # Reducir logs de TensorFlow
+
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import tensorflow as tf
+
+# Agregar rutas al path
+ruta_raiz = Path(__file__).parent.parent
+sys.path.append(str(ruta_raiz))
+
+from negocio.ml.clasificador_imagenes import ClasificadorImagenes
+from negocio.ml.decodificacion_imagenes import decodificar_imagen
+from datos.repositorios.almacen_imagenes import (
+    AlmacenImagenes,
+    DIRECTORIO_ALMACEN,
+    listar_split,
+)
+
+
+RUTA_H5 = 'modelos_ml/modelo_cnn_severidad.h5'
+RUTA_TFLITE = 'modelos_ml/modelo_cnn_severidad_int8.tflite'
+RUTA_REPORTE = ruta_raiz / 'modelos_ml' / 'reporte_tflite.json'
+
+# Lee las imágenes de ciertas posiciones de un split → (n, 224, 224, 3) uint8
+LectorImagenes = Callable[[np.ndarray], np.ndarray]
+
+
+def cargar_imagen(ruta: Path) -> np.ndarray:
+    """Carga una imagen como array (224, 224, 3) uint8, igual que el servicio."""
+    return decodificar_imagen(ruta.read_bytes())
+
+
+def abrir_split(
+    subset: str,
+    almacen: Optional[AlmacenImagenes] = None
+) -> Tuple[LectorImagenes, np.ndarray]:
+    """
+    Prepara la lectura de un split desde el almacén o desde los archivos.
+
+    Con almacén las imágenes ya están decodificadas (lectura mapeada a
+    memoria); sin él se decodifica cada archivo al leerlo.
+
+    Args:
+        subset: 'entrenamiento' o 'validacion'
+        almacen: Almacén de shards (None = leer las imágenes originales)
+
+    Returns:
+        Tupla (lector, etiquetas) con una etiqueta por posición del split
+    """
+    if almacen is not None:
+        inicio, fin = almacen.rango(subset)
+        return (
+            lambda posiciones: almacen.leer(inicio + np.asarray(posiciones)),
+            almacen.etiquetas[inicio:fin]
+        )
+
+    entrenamiento, validacion = listar_split()
+    pares = entrenamiento if subset == 'entrenamiento' else validacion
+    return (
+        lambda posiciones: np.stack([cargar_imagen(pares[i][0]) for i in posiciones]),
+        np.array([indice for _, indice in pares], dtype=np.int64)
+    )
+
+
+def dataset_representativo(
+    leer: LectorImagenes,
+    total: int,
+    muestras: int,
+    semilla: int = 42
+):
+    """
+    Crea el generador que usa el conversor para calibrar rangos int8.
+
+    Args:
+        leer: Lector del split de entrenamiento (de abrir_split)
+        total: Imágenes en el split
+        muestras: Cantidad de imágenes de calibración
+        semilla: Semilla del muestreo
+
+    Returns:
+        Función generadora compatible con TFLiteConverter
+    """
+    rng = np.random.default_rng(semilla)
+    elegidas = rng.choice(total, size=min(muestras, total), replace=False)
+
+    def generador() -> Iterator[List[np.ndarray]]:
+        for i in elegidas:
+            # El modelo Keras recibe float en [0, 1]
+            imagen = leer([i])
+            yield [imagen.astype(np.float32) / 255.0]
+
+    return generador
+
+
+def exportar(muestras: int, almacen: Optional[AlmacenImagenes] = None) -> Path:
+    """
+    Convierte el modelo .h5 a TFLite con cuantización entera completa.
+
+    Pesos y activaciones quedan en int8; la entrada es uint8 (píxeles
+    normalizados cuantizados) y la salida float32.
+
+    Args:
+        muestras: Imágenes del dataset representativo
+        almacen: Almacén de shards (None = leer las imágenes originales)
+
+    Returns:
+        Ruta del archivo .tflite
+    """
+    print("\n[1/3] Cargando modelo Keras...")
+    modelo = tf.keras.models.load_model(ruta_raiz / RUTA_H5)
+
+    leer, etiquetas = abrir_split('entrenamiento', almacen)
+    print(f"   [OK] {len(etiquetas)} imágenes de entrenamiento, "
+          f"{min(muestras, len(etiquetas))} para calibración")
+
+    print("\n[2/3] Convirtiendo a TFLite int8...")
+    conversor = tf.lite.TFLiteConverter.from_keras_model(modelo)
+    conversor.optimizations = [tf.lite.Optimize.DEFAULT]
+    conversor.representative_dataset = dataset_representativo(
+        leer, len(etiquetas), muestras
+    )
+    conversor.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    conversor.inference_input_type = tf.uint8
+    conversor.inference_output_type = tf.float32
+
+    ruta = ruta_raiz / RUTA_TFLITE
+    ruta.write_bytes(conversor.convert())
+
+    tamano_h5 = (ruta_raiz / RUTA_H5).stat().st_size / 1e6
+    print(f"   [OK] Guardado en: {ruta}")
+    print(f"   [OK] Tamaño: {tamano_h5:.1f} MB (.h5) -> {ruta.stat().st_size / 1e6:.1f} MB")
+
+    return ruta
+
+
+def evaluar(
+    clasificador: ClasificadorImagenes,
+    leer: LectorImagenes,
+    etiquetas: np.ndarray,
+    repeticiones_latencia: int = 100
+) -> Tuple[Dict[str, float], np.ndarray]:
+    """
+    Mide accuracy en validación y latencia por imagen (batch 1).
+
+    Returns:
+        Tupla (metricas, predicciones) con las clases predichas por imagen
+    """
+    predicciones = np.empty(len(etiquetas), dtype=np.int64)
+
+    for inicio in range(0, len(etiquetas), 32):
+        lote = leer(np.arange(inicio, min(inicio + 32, len(etiquetas))))
+        predicciones[inicio:inicio + len(lote)] = (
+            clasificador.predecir_lote(lote).argmax(axis=1)
+        )
+
+    imagen = leer([0])
+    latencias = []
+    for _ in range(repeticiones_latencia):
+        t0 = time.perf_counter()
+        clasificador.predecir_lote(imagen)
+        latencias.append((time.perf_counter() - t0) * 1000)
+
+    return {
+        'accuracy': float((predicciones == etiquetas).mean()),
+        'latencia_p50_ms': float(np.percentile(latencias, 50)),
+        'latencia_p99_ms': float(np.percentile(latencias, 99)),
+    }, predicciones
+
+
+def reporte(almacen: Optional[AlmacenImagenes] = None) -> Dict[str, Dict[str, float]]:
+    """
+    Compara el modelo Keras float32 contra el TFLite int8.
+
+    Args:
+        almacen: Almacén de shards (None = leer las imágenes originales)
+
+    Returns:
+        Dict {backend: métricas} más la concordancia entre ambos
+    """
+    print("\n[3/3] Comparando accuracy y latencia (split de validación)...")
+    leer, etiquetas = abrir_split('validacion', almacen)
+
+    resultados = {}
+    predicciones = {}
+    for backend, ruta in [('keras', RUTA_H5), ('tflite', RUTA_TFLITE)]:
+        clasificador = ClasificadorImagenes(backend=backend)
+        resultados[backend], predicciones[backend] = evaluar(
+            clasificador, leer, etiquetas
+        )
+        resultados[backend]['tamano_mb'] = round(
+            (ruta_raiz / ruta).stat().st_size / 1e6, 2
+        )
+
+    resultados['concordancia'] = float(
+        (predicciones['keras'] == predicciones['tflite']).mean()
+    )
+
+    print(f"\n   {'Backend':>8s} | {'Accuracy':>8s} | {'p50':>8s} | "
+          f"{'p99':>8s} | {'Tamaño':>8s}")
+    print("   " + "-" * 52)
+    for backend in ('keras', 'tflite'):
+        m = resultados[backend]
+        print(f"   {backend:>8s} | {m['accuracy']:8.2%} | "
+              f"{m['latencia_p50_ms']:6.1f}ms | {m['latencia_p99_ms']:6.1f}ms | "
+              f"{m['tamano_mb']:6.1f}MB")
+    print(f"\n   [OK] Concordancia keras vs tflite: {resultados['concordancia']:.2%}")
+    print(f"   [OK] {len(etiquetas)} imágenes de validación")
+
+    RUTA_REPORTE.write_text(json.dumps(resultados, indent=2))
+    print(f"   [OK] Reporte guardado en: {RUTA_REPORTE}")
+
+    return resultados
+
+
+def main():
+    """Función principal de exportación."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument(
+        '--muestras', type=int, default=200,
+        help='Imágenes del dataset representativo (default: 200)'
+    )
+    parser.add_argument(
+        '--sin-reporte', action='store_true',
+        help='Solo exportar, sin comparar contra Keras'
+    )
+    parser.add_argument(
+        '--almacen', type=Path, nargs='?', const=DIRECTORIO_ALMACEN,
+        help='Leer del almacén de shards (default: datos/imagenes_preprocesadas)'
+    )
+    args = parser.parse_args()
+    almacen = AlmacenImagenes(args.almacen) if args.almacen else None
+
+    print("=" * 70)
+    print("EXPORTACIÓN DE CNN A TFLITE INT8")
+    print("=" * 70)
+
+    exportar(args.muestras, almacen)
+    if not args.sin_reporte:
+        reporte(almacen)
+
+    print("\n" + "=" * 70)
+    print("[DONE] EXPORTACIÓN COMPLETADA")
+    print("=" * 70)
+    print("\nPara usarlo en el servicio: CNN_BACKEND=tflite")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
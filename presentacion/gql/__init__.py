@@ -9,9 +9,11 @@ from .tipos import (
     UbicacionInput,
     RecomendacionHospitales,
     EvaluacionPaciente,
+    EvaluacionHibrida,
     Hospital,
     InfoCluster,
     EstadisticasSistema,
+    AsignacionMasiva,
 )
 
 __all__ = [
@@ -20,7 +22,9 @@ __all__ = [
     'UbicacionInput',
     'RecomendacionHospitales',
     'EvaluacionPaciente',
+    'EvaluacionHibrida',
     'Hospital',
     'InfoCluster',
     'EstadisticasSistema',
+    'AsignacionMasiva',
 ]
@@ -1,17 +1,22 @@
 """
 Schema GraphQL principal.
 Capa: PRESENTACION
-Responsabilidad: Definir Queries y Mutations de la API.
+Responsabilidad: Definir Queries, Mutations y Subscriptions de la API.
 Estándares: PEP 8, Type hints, Docstrings
 """
 
-from typing import List, Optional
+from typing import AsyncGenerator, List, Optional
+import asyncio
 import strawberry
+from strawberry.file_uploads import Upload
 from strawberry.types import Info
 
+from negocio.ml.decodificacion_imagenes import MAX_BYTES
+
 from .tipos import (
     RecomendacionHospitales,
     EvaluacionPaciente,
+    EvaluacionHibrida,
     InfoCluster,
     DatosPacienteInput,
     UbicacionInput,
@@ -20,6 +25,10 @@ from .tipos import (
     Hospital,
     Capacidad,
     Ubicacion,
+    AsignacionPaciente,
+    AsignacionMasiva,
+    ClusterPuntuado,
+    RutaIncidente,
 )
 
 
@@ -28,6 +37,109 @@ def get_servicio_decision(info: Info):
     return info.context["servicio_decision"]
 
 
+def get_evaluacion_progresiva(info: Info):
+    """Obtiene el coordinador de evaluaciones progresivas del contexto."""
+    return info.context["evaluacion_progresiva"]
+
+
+def _convertir_datos_paciente(datos_paciente: DatosPacienteInput) -> dict:
+    """Convierte el input GraphQL de paciente al dict del servicio."""
+    return {
+        'edad': datos_paciente.edad,
+        'sexo': datos_paciente.sexo,
+        'presion_sistolica': datos_paciente.presion_sistolica,
+        'presion_diastolica': datos_paciente.presion_diastolica,
+        'frecuencia_cardiaca': datos_paciente.frecuencia_cardiaca,
+        'frecuencia_respiratoria': datos_paciente.frecuencia_respiratoria,
+        'temperatura': datos_paciente.temperatura,
+        'saturacion_oxigeno': datos_paciente.saturacion_oxigeno,
+        'nivel_dolor': datos_paciente.nivel_dolor,
+        'tipo_incidente': datos_paciente.tipo_incidente,
+        'tiempo_desde_incidente': datos_paciente.tiempo_desde_incidente,
+        'especialidades_requeridas': datos_paciente.especialidades_requeridas,
+    }
+
+
+def _convertir_ubicacion(ubicacion: UbicacionInput) -> dict:
+    """Convierte el input GraphQL de ubicación al dict del servicio."""
+    return {
+        'latitud': ubicacion.latitud,
+        'longitud': ubicacion.longitud
+    }
+
+
+def _convertir_evaluacion(evaluacion: dict) -> EvaluacionPaciente:
+    """Convierte la evaluación del servicio a tipo GraphQL."""
+    probs = evaluacion['probabilidades']
+    return EvaluacionPaciente(
+        severidad=evaluacion['severidad'],
+        probabilidades=ProbabilidadSeveridad(
+            critico=probs.get('critico', probs.get('crítico', 0.0)),
+            alto=probs.get('alto', 0.0),
+            medio=probs.get('medio', 0.0),
+            bajo=probs.get('bajo', 0.0)
+        ),
+        confianza=evaluacion['confianza'],
+        requiere_traslado=evaluacion['requiere_traslado'],
+        tipo_incidente=evaluacion['tipo_incidente']
+    )
+
+
+def _convertir_evaluacion_hibrida(evaluacion: dict) -> EvaluacionHibrida:
+    """Convierte la evaluación híbrida (vitales + imagen) a tipo GraphQL."""
+    base = _convertir_evaluacion(evaluacion)
+    return EvaluacionHibrida(
+        severidad=base.severidad,
+        probabilidades=base.probabilidades,
+        confianza=base.confianza,
+        requiere_traslado=base.requiere_traslado,
+        tipo_incidente=base.tipo_incidente,
+        metodo=evaluacion['metodo'],
+        severidad_vitales=evaluacion['severidad_vitales'],
+        severidad_imagen=evaluacion.get('severidad_imagen'),
+        confianza_vitales=evaluacion.get('confianza_vitales'),
+        confianza_imagen=evaluacion.get('confianza_imagen'),
+        error_cnn=evaluacion.get('error_cnn'),
+        evaluacion_id=evaluacion.get('evaluacion_id'),
+        estado=evaluacion.get('estado')
+    )
+
+
+def _convertir_hospital(h: dict) -> Hospital:
+    """Convierte un hospital del servicio a tipo GraphQL."""
+    return Hospital(
+        hospital_id=h['hospital_id'],
+        nombre=h['nombre'],
+        ubicacion=Ubicacion(
+            latitud=h['ubicacion']['latitud'],
+            longitud=h['ubicacion']['longitud']
+        ),
+        capacidad=Capacidad(
+            actual=h['capacidad']['actual'],
+            maxima=h['capacidad']['maxima'],
+            disponibilidad_porcentaje=h.get('disponibilidad_porcentaje', 0.0)
+        ),
+        nivel=h['nivel'],
+        distancia_km=h.get('distancia_km'),
+        disponibilidad_porcentaje=h.get('disponibilidad_porcentaje')
+    )
+
+
+def _convertir_recomendacion(recomendacion: dict) -> RecomendacionHospitales:
+    """Convierte la recomendación del servicio a tipo GraphQL."""
+    return RecomendacionHospitales(
+        evaluacion=_convertir_evaluacion(recomendacion['evaluacion']),
+        cluster_utilizado=recomendacion.get('cluster_utilizado'),
+        especialidades_cluster=recomendacion.get('especialidades_cluster', []),
+        hospitales_recomendados=[
+            _convertir_hospital(h)
+            for h in recomendacion['hospitales_recomendados']
+        ],
+        total_disponibles=recomendacion.get('total_disponibles', 0),
+        mensaje=recomendacion['mensaje']
+    )
+
+
 @strawberry.type
 class Query:
     """Queries disponibles en la API GraphQL."""
@@ -76,38 +188,112 @@ class Query:
         """
         servicio = get_servicio_decision(info)
 
-        # Convertir input a dict
-        datos_dict = {
-            'edad': datos_paciente.edad,
-            'sexo': datos_paciente.sexo,
-            'presion_sistolica': datos_paciente.presion_sistolica,
-            'presion_diastolica': datos_paciente.presion_diastolica,
-            'frecuencia_cardiaca': datos_paciente.frecuencia_cardiaca,
-            'frecuencia_respiratoria': datos_paciente.frecuencia_respiratoria,
-            'temperatura': datos_paciente.temperatura,
-            'saturacion_oxigeno': datos_paciente.saturacion_oxigeno,
-            'nivel_dolor': datos_paciente.nivel_dolor,
-            'tipo_incidente': datos_paciente.tipo_incidente,
-            'tiempo_desde_incidente': datos_paciente.tiempo_desde_incidente,
-        }
-
         # Evaluar con servicio de negocio
-        evaluacion = servicio.evaluar_paciente(datos_dict)
+        evaluacion = servicio.evaluar_paciente(
+            _convertir_datos_paciente(datos_paciente)
+        )
 
         # Convertir a tipo GraphQL
-        probs = evaluacion['probabilidades']
-        return EvaluacionPaciente(
-            severidad=evaluacion['severidad'],
-            probabilidades=ProbabilidadSeveridad(
-                critico=probs.get('critico', probs.get('crítico', 0.0)),
-                alto=probs.get('alto', 0.0),
-                medio=probs.get('medio', 0.0),
-                bajo=probs.get('bajo', 0.0)
-            ),
-            confianza=evaluacion['confianza'],
-            requiere_traslado=evaluacion['requiere_traslado'],
-            tipo_incidente=evaluacion['tipo_incidente']
-        )
+        return _convertir_evaluacion(evaluacion)
+
+    @strawberry.field
+    def evaluar_paciente_con_imagen(
+        self,
+        info: Info,
+        datos_paciente: DatosPacienteInput,
+        imagen_base64: Optional[str] = None,
+        progresiva: bool = False
+    ) -> EvaluacionHibrida:
+        """
+        Evalúa un paciente combinando signos vitales e imagen en base64.
+
+        Variante para clientes que solo pueden enviar JSON: el base64 infla
+        la imagen un 33% y obliga a parsearla dentro del JSON. Para fotos de
+        cámara conviene la mutation evaluarPacienteConImagenArchivo
+        (multipart) o el endpoint binario POST /evaluacion/imagen.
+
+        Con progresiva=true responde de inmediato con el resultado de signos
+        vitales, evaluacionId y estado 'pendiente'; la fusión con la CNN
+        llega por la subscription evaluacionRefinada(evaluacionId) y queda
+        disponible en obtenerEvaluacion(evaluacionId).
+
+        Args:
+            datos_paciente: Datos del paciente (signos vitales, etc.)
+            imagen_base64: Foto de la herida/quemadura en base64 (opcional)
+            progresiva: Responder sin esperar a la CNN
+
+        Returns:
+            EvaluacionHibrida con la severidad fusionada y el detalle por modelo
+        """
+        datos = _convertir_datos_paciente(datos_paciente)
+
+        if progresiva:
+            evaluacion = get_evaluacion_progresiva(info).iniciar(
+                datos, imagen_base64=imagen_base64
+            )
+        else:
+            evaluacion = get_servicio_decision(info).evaluar_paciente_con_imagen(
+                datos, imagen_base64=imagen_base64
+            )
+
+        return _convertir_evaluacion_hibrida(evaluacion)
+
+    @strawberry.field
+    def obtener_evaluacion(
+        self,
+        info: Info,
+        evaluacion_id: str
+    ) -> Optional[EvaluacionHibrida]:
+        """
+        Consulta una evaluación progresiva por su ID.
+
+        Args:
+            evaluacion_id: ID devuelto con progresiva=true
+
+        Returns:
+            Resultado final si ya está 'completa', el preliminar si sigue
+            'pendiente', o null si no existe
+        """
+        evaluacion = get_evaluacion_progresiva(info).obtener(evaluacion_id)
+        return _convertir_evaluacion_hibrida(evaluacion) if evaluacion else None
+
+    @strawberry.field
+    def evaluar_pacientes_lote(
+        self,
+        info: Info,
+        datos_pacientes: List[DatosPacienteInput]
+    ) -> List[EvaluacionPaciente]:
+        """
+        Evalúa la severidad de varios pacientes en una sola solicitud.
+
+        Útil en incidentes con múltiples víctimas: el Random Forest se
+        ejecuta una sola vez sobre todo el lote.
+
+        Args:
+            datos_pacientes: Lista de datos de pacientes
+
+        Returns:
+            Lista de EvaluacionPaciente en el mismo orden que la entrada
+
+        Example (GraphQL):
+            query {
+              evaluarPacientesLote(datosPacientes: [
+                { edad: 68, sexo: "M", ... tipoIncidente: "accidente_auto" }
+                { edad: 34, sexo: "F", ... tipoIncidente: "fractura" }
+              ]) {
+                severidad
+                confianza
+                requiereTraslado
+              }
+            }
+        """
+        servicio = get_servicio_decision(info)
+
+        evaluaciones = servicio.evaluar_pacientes_lote([
+            _convertir_datos_paciente(datos) for datos in datos_pacientes
+        ])
+
+        return [_convertir_evaluacion(e) for e in evaluaciones]
 
     @strawberry.field
     def recomendar_hospitales(
@@ -171,76 +357,127 @@ class Query:
         """
         servicio = get_servicio_decision(info)
 
-        # Convertir inputs a dicts
-        datos_dict = {
-            'edad': datos_paciente.edad,
-            'sexo': datos_paciente.sexo,
-            'presion_sistolica': datos_paciente.presion_sistolica,
-            'presion_diastolica': datos_paciente.presion_diastolica,
-            'frecuencia_cardiaca': datos_paciente.frecuencia_cardiaca,
-            'frecuencia_respiratoria': datos_paciente.frecuencia_respiratoria,
-            'temperatura': datos_paciente.temperatura,
-            'saturacion_oxigeno': datos_paciente.saturacion_oxigeno,
-            'nivel_dolor': datos_paciente.nivel_dolor,
-            'tipo_incidente': datos_paciente.tipo_incidente,
-            'tiempo_desde_incidente': datos_paciente.tiempo_desde_incidente,
-        }
-
-        ubicacion_dict = {
-            'latitud': ubicacion_paciente.latitud,
-            'longitud': ubicacion_paciente.longitud
-        }
-
         # Obtener recomendación del servicio
         recomendacion = servicio.recomendar_hospitales(
-            datos_dict,
-            ubicacion_dict,
+            _convertir_datos_paciente(datos_paciente),
+            _convertir_ubicacion(ubicacion_paciente),
             top_n
         )
 
-        # Convertir evaluación
-        probs_rec = recomendacion['evaluacion']['probabilidades']
-        evaluacion = EvaluacionPaciente(
-            severidad=recomendacion['evaluacion']['severidad'],
-            probabilidades=ProbabilidadSeveridad(
-                critico=probs_rec.get('critico', probs_rec.get('crítico', 0.0)),
-                alto=probs_rec.get('alto', 0.0),
-                medio=probs_rec.get('medio', 0.0),
-                bajo=probs_rec.get('bajo', 0.0)
-            ),
-            confianza=recomendacion['evaluacion']['confianza'],
-            requiere_traslado=recomendacion['evaluacion']['requiere_traslado'],
-            tipo_incidente=recomendacion['evaluacion']['tipo_incidente']
+        return _convertir_recomendacion(recomendacion)
+
+    @strawberry.field
+    def recomendar_hospitales_lote(
+        self,
+        info: Info,
+        datos_pacientes: List[DatosPacienteInput],
+        ubicaciones_pacientes: List[UbicacionInput],
+        top_n: int = 5
+    ) -> List[RecomendacionHospitales]:
+        """
+        Recomienda hospitales para varios pacientes en una sola solicitud.
+
+        Se ejecuta una predicción vectorizada y una matriz de distancias
+        por cluster en lugar de N consultas independientes.
+
+        Args:
+            datos_pacientes: Lista de datos de pacientes
+            ubicaciones_pacientes: Ubicación de cada paciente, o una sola
+                ubicación compartida por todos
+            top_n: Número de hospitales a recomendar por paciente
+
+        Returns:
+            Lista de RecomendacionHospitales en el mismo orden que la entrada
+
+        Example (GraphQL):
+            query {
+              recomendarHospitalesLote(
+                datosPacientes: [{ ... }, { ... }]
+                ubicacionesPacientes: [{ latitud: -17.78, longitud: -63.18 }]
+                topN: 3
+              ) {
+                evaluacion { severidad }
+                hospitalesRecomendados { hospitalId distanciaKm }
+              }
+            }
+        """
+        servicio = get_servicio_decision(info)
+
+        recomendaciones = servicio.recomendar_hospitales_lote(
+            [_convertir_datos_paciente(datos) for datos in datos_pacientes],
+            [_convertir_ubicacion(u) for u in ubicaciones_pacientes],
+            top_n
         )
 
-        # Convertir hospitales
-        hospitales = []
-        for h in recomendacion['hospitales_recomendados']:
-            hospital = Hospital(
-                hospital_id=h['hospital_id'],
-                nombre=h['nombre'],
-                ubicacion=Ubicacion(
-                    latitud=h['ubicacion']['latitud'],
-                    longitud=h['ubicacion']['longitud']
-                ),
-                capacidad=Capacidad(
-                    actual=h['capacidad']['actual'],
-                    maxima=h['capacidad']['maxima'],
-                    disponibilidad_porcentaje=h.get('disponibilidad_porcentaje', 0.0)
-                ),
-                nivel=h['nivel'],
-                distancia_km=h.get('distancia_km'),
-                disponibilidad_porcentaje=h.get('disponibilidad_porcentaje')
-            )
-            hospitales.append(hospital)
-
-        return RecomendacionHospitales(
-            evaluacion=evaluacion,
-            cluster_utilizado=recomendacion.get('cluster_utilizado'),
-            especialidades_cluster=recomendacion.get('especialidades_cluster', []),
-            hospitales_recomendados=hospitales,
-            total_disponibles=recomendacion['total_disponibles'],
-            mensaje=recomendacion['mensaje']
+        return [_convertir_recomendacion(r) for r in recomendaciones]
+
+    @strawberry.field
+    def asignar_hospitales_masivo(
+        self,
+        info: Info,
+        datos_pacientes: List[DatosPacienteInput],
+        ubicaciones_pacientes: List[UbicacionInput],
+        metodo: str = "optimo"
+    ) -> AsignacionMasiva:
+        """
+        Reparte pacientes de un incidente masivo entre hospitales.
+
+        A diferencia de recomendarHospitalesLote, respeta la capacidad libre
+        de cada hospital y minimiza la distancia total, dando prioridad a
+        los pacientes críticos.
+
+        Args:
+            datos_pacientes: Lista de datos de pacientes
+            ubicaciones_pacientes: Ubicación de cada paciente, o una sola
+            metodo: 'optimo' (mínimo costo) o 'greedy' (más cercano)
+
+        Returns:
+            AsignacionMasiva con el hospital de cada paciente
+
+        Example (GraphQL):
+            query {
+              asignarHospitalesMasivo(
+                datosPacientes: [{ ... }, { ... }]
+                ubicacionesPacientes: [{ latitud: -17.78, longitud: -63.18 }]
+              ) {
+                totalAsignados
+                sinCama
+                distanciaTotalKm
+                asignaciones {
+                  indice
+                  evaluacion { severidad }
+                  hospital { hospitalId nombre distanciaKm }
+                  especialidadCumplida
+                }
+              }
+            }
+        """
+        asignador = info.context["asignador_hospitales"]
+
+        resultado = asignador.asignar(
+            [_convertir_datos_paciente(datos) for datos in datos_pacientes],
+            [_convertir_ubicacion(u) for u in ubicaciones_pacientes],
+            metodo
+        )
+
+        return AsignacionMasiva(
+            asignaciones=[
+                AsignacionPaciente(
+                    indice=a['indice'],
+                    evaluacion=_convertir_evaluacion(a['evaluacion']),
+                    hospital=(
+                        _convertir_hospital(a['hospital'])
+                        if a['hospital'] else None
+                    ),
+                    especialidad_cumplida=a['especialidad_cumplida']
+                )
+                for a in resultado['asignaciones']
+            ],
+            metodo=resultado['metodo'],
+            total_asignados=resultado['total_asignados'],
+            sin_cama=resultado['sin_cama'],
+            distancia_total_km=resultado['distancia_total_km'],
+            mensaje=resultado['mensaje']
         )
 
     @strawberry.field
@@ -276,6 +513,35 @@ class Query:
 
         return resultado
 
+    @strawberry.field
+    def tabla_rutas_clusters(self, info: Info) -> List[RutaIncidente]:
+        """
+        Obtiene la tabla precalculada tipo de incidente → clusters rankeados.
+
+        Returns:
+            Lista de RutaIncidente ('*' corresponde a tipos desconocidos)
+
+        Example (GraphQL):
+            query {
+              tablaRutasClusters {
+                tipoIncidente
+                clusters { clusterId puntaje }
+              }
+            }
+        """
+        servicio = get_servicio_decision(info)
+
+        return [
+            RutaIncidente(
+                tipo_incidente=tipo,
+                clusters=[
+                    ClusterPuntuado(cluster_id=cluster_id, puntaje=puntaje)
+                    for cluster_id, puntaje in ruta
+                ]
+            )
+            for tipo, ruta in servicio.obtener_tabla_rutas().items()
+        ]
+
     @strawberry.field
     def estadisticas_sistema(self, info: Info) -> EstadisticasSistema:
         """
@@ -296,22 +562,117 @@ class Query:
         """
         servicio = get_servicio_decision(info)
 
-        # Obtener todos los hospitales
-        repo = servicio.repo_hospitales
-        todos_hospitales = repo.obtener_todos()
-        disponibles = repo.obtener_disponibles()
+        # Obtener todos los hospitales (instantánea columnar)
+        tabla = servicio.registro_hospitales.obtener()
 
         # Obtener clusters
         clusters_info = servicio.obtener_estadisticas_clusters()
 
         return EstadisticasSistema(
-            total_hospitales=len(todos_hospitales),
-            hospitales_disponibles=len(disponibles),
+            total_hospitales=len(tabla),
+            hospitales_disponibles=int(tabla.disponibles().sum()),
             clusters_activos=len(clusters_info),
             modelos_cargados=True
         )
 
 
+@strawberry.type
+class Mutation:
+    """Mutations disponibles en la API GraphQL."""
+
+    @strawberry.mutation
+    async def evaluar_paciente_con_imagen_archivo(
+        self,
+        info: Info,
+        datos_paciente: DatosPacienteInput,
+        imagen: Upload,
+        progresiva: bool = False
+    ) -> EvaluacionHibrida:
+        """
+        Evalúa un paciente con la foto subida como archivo (multipart).
+
+        La imagen llega como parte binaria del request (GraphQL multipart
+        request spec), sin base64: se lee con un tope de MAX_BYTES y los
+        bytes van directo al decodificador.
+
+        Args:
+            datos_paciente: Datos del paciente (signos vitales, etc.)
+            imagen: Archivo de imagen (JPEG/PNG)
+            progresiva: Responder sin esperar a la CNN (ver
+                evaluarPacienteConImagen)
+
+        Returns:
+            EvaluacionHibrida con la severidad fusionada y el detalle por modelo
+
+        Raises:
+            ValueError: Si la imagen supera MAX_BYTES
+
+        Example (curl):
+            curl http://localhost:8002/graphql \\
+              -F operations='{"query": "mutation($d: DatosPacienteInput!, $f: Upload!) { evaluarPacienteConImagenArchivo(datosPaciente: $d, imagen: $f) { severidad metodo } }", "variables": {"d": {...}, "f": null}}' \\
+              -F map='{"0": ["variables.f"]}' \\
+              -F 0=@herida.jpg
+        """
+        servicio = get_servicio_decision(info)
+
+        # Leer un byte más que el máximo basta para detectar el exceso
+        # sin cargar en memoria un archivo arbitrariamente grande
+        datos = await imagen.read(MAX_BYTES + 1)
+        if len(datos) > MAX_BYTES:
+            raise ValueError(f"Imagen demasiado grande (máximo {MAX_BYTES} bytes)")
+
+        # Decodificación + CNN son CPU: fuera del event loop
+        if progresiva:
+            evaluacion = await asyncio.to_thread(
+                get_evaluacion_progresiva(info).iniciar,
+                _convertir_datos_paciente(datos_paciente),
+                imagen_bytes=datos
+            )
+        else:
+            evaluacion = await asyncio.to_thread(
+                servicio.evaluar_paciente_con_imagen,
+                _convertir_datos_paciente(datos_paciente),
+                imagen_bytes=datos
+            )
+
+        return _convertir_evaluacion_hibrida(evaluacion)
+
+
+@strawberry.type
+class Subscription:
+    """Subscriptions disponibles en la API GraphQL (websockets)."""
+
+    @strawberry.subscription
+    async def evaluacion_refinada(
+        self,
+        info: Info,
+        evaluacion_id: str
+    ) -> AsyncGenerator[EvaluacionHibrida, None]:
+        """
+        Entrega la evaluación fusionada con la CNN cuando está lista.
+
+        Emite una vez (estado 'completa') y cierra. Si la evaluación ya
+        estaba completa, emite de inmediato.
+
+        Args:
+            evaluacion_id: ID devuelto con progresiva=true
+
+        Example (GraphQL, ws://localhost:8002/graphql):
+            subscription {
+              evaluacionRefinada(evaluacionId: "9f2c...") {
+                severidad
+                metodo
+                severidadImagen
+                estado
+              }
+            }
+        """
+        async for evaluacion in get_evaluacion_progresiva(info).suscribir(
+            evaluacion_id
+        ):
+            yield _convertir_evaluacion_hibrida(evaluacion)
+
+
 # ============================================================================
 # APOLLO FEDERATION SCHEMA
 # ============================================================================
@@ -322,6 +683,8 @@ class Query:
 
 schema = strawberry.federation.Schema(
     query=Query,
+    mutation=Mutation,
+    subscription=Subscription,
     enable_federation_2=True,
     types=[
         # Importar entities para que Apollo Gateway las descubra
@@ -31,6 +31,26 @@ class EvaluacionPaciente:
     tipo_incidente: str
 
 
+@strawberry.type
+class EvaluacionHibrida:
+    """Evaluación combinada de signos vitales (Random Forest) e imagen (CNN)."""
+
+    severidad: str
+    probabilidades: ProbabilidadSeveridad
+    confianza: float
+    requiere_traslado: bool
+    tipo_incidente: str
+    metodo: str
+    severidad_vitales: str
+    severidad_imagen: Optional[str] = None
+    confianza_vitales: Optional[float] = None
+    confianza_imagen: Optional[float] = None
+    error_cnn: Optional[str] = None
+    # Solo en modo progresivo: 'pendiente' hasta que llega la CNN, 'completa' después
+    evaluacion_id: Optional[str] = None
+    estado: Optional[str] = None
+
+
 @strawberry.type
 class Capacidad:
     """Capacidad de un hospital."""
@@ -73,6 +93,28 @@ class RecomendacionHospitales:
     mensaje: str
 
 
+@strawberry.type
+class AsignacionPaciente:
+    """Hospital asignado a un paciente dentro de un incidente masivo."""
+
+    indice: int
+    evaluacion: EvaluacionPaciente
+    especialidad_cumplida: bool
+    hospital: Optional[Hospital] = None
+
+
+@strawberry.type
+class AsignacionMasiva:
+    """Reparto de pacientes entre hospitales respetando capacidad."""
+
+    asignaciones: List[AsignacionPaciente]
+    metodo: str
+    total_asignados: int
+    sin_cama: int
+    distancia_total_km: float
+    mensaje: str
+
+
 @strawberry.type
 class InfoCluster:
     """Información de un cluster de hospitales."""
@@ -83,6 +125,22 @@ class InfoCluster:
     hospitales_ids: List[str]
 
 
+@strawberry.type
+class ClusterPuntuado:
+    """Cluster con su puntaje dentro de una ruta."""
+
+    cluster_id: int
+    puntaje: float
+
+
+@strawberry.type
+class RutaIncidente:
+    """Clusters rankeados para un tipo de incidente."""
+
+    tipo_incidente: str
+    clusters: List[ClusterPuntuado]
+
+
 @strawberry.input
 class DatosPacienteInput:
     """Datos de entrada de un paciente para evaluación."""
@@ -98,6 +156,7 @@ class DatosPacienteInput:
     nivel_dolor: int
     tipo_incidente: str
     tiempo_desde_incidente: int
+    especialidades_requeridas: Optional[List[str]] = None
 
 
 @strawberry.input
@@ -5,12 +5,16 @@ Responsabilidad: Exponer API GraphQL para el microservicio.
 Estándares: PEP 8, Type hints, Docstrings
 """
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from pydantic import BaseModel
 from strawberry.fastapi import GraphQLRouter
 from contextlib import asynccontextmanager
+from typing import Optional
 import sys
 import os
+import time
 from dotenv import load_dotenv
 
 # Cargar variables de entorno
@@ -21,11 +25,20 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from datos.configuracion.conexion_mongodb import ConexionMongoDB
 from negocio.servicios.servicio_decision import ServicioDecision
+from negocio.servicios.asignador_hospitales import AsignadorHospitales
+from negocio.servicios.evaluacion_progresiva import EvaluacionProgresiva
+from datos.repositorios.repositorio_evaluaciones import RepositorioEvaluaciones
+from negocio.ml.reclustering_hospitales import ReclusteringHospitales
+from negocio.ml.decodificacion_imagenes import MAX_BYTES
 from presentacion.gql.schema import schema
 
 
 # Variables globales para el contexto
 servicio_decision = None
+asignador_hospitales = None
+evaluacion_progresiva = None
+reclustering_hospitales = None
+tiempos_arranque = {}
 
 
 @asynccontextmanager
@@ -35,25 +48,50 @@ async def lifespan(app: FastAPI):
 
     Inicializa servicios al arrancar y limpia al cerrar.
     """
-    global servicio_decision
+    global servicio_decision, asignador_hospitales, reclustering_hospitales
+    global evaluacion_progresiva
 
     # Startup: Inicializar servicios
     print("\n" + "=" * 60)
     print("INICIANDO MICROSERVICIO DE DECISION MEDICA")
     print("=" * 60)
 
+    inicio_arranque = time.perf_counter()
+
     print("\n[1/3] Conectando a MongoDB...")
+    inicio = time.perf_counter()
     conexion = ConexionMongoDB()
     # Usar variables de entorno para la conexión
     db = conexion.conectar()
+    tiempos_arranque['mongodb_ms'] = (time.perf_counter() - inicio) * 1000
     print("   # MongoDB conectado")
 
     print("\n[2/3] Cargando modelos ML...")
-    servicio_decision = ServicioDecision(db)
+    # La CNN (TensorFlow) se carga en segundo plano para no demorar el arranque
+    servicio_decision = ServicioDecision(db, cargar_cnn=False)
+    asignador_hospitales = AsignadorHospitales(servicio_decision)
+    repo_evaluaciones = RepositorioEvaluaciones(db)
+    repo_evaluaciones.crear_indices()
+    evaluacion_progresiva = EvaluacionProgresiva(servicio_decision, repo_evaluaciones)
     print("   # Random Forest cargado")
     print("   # K-means cargado")
 
+    servicio_decision.iniciar_carga_cnn()
+    print(f"   # CNN: {servicio_decision.estado_cnn} (en segundo plano)")
+
+    reclustering_hospitales = ReclusteringHospitales(
+        servicio_decision.clusterer,
+        servicio_decision.repo_hospitales,
+        servicio_decision.registro_hospitales
+    )
+    if os.getenv('RECLUSTERING_HABILITADO', 'true').lower() == 'true':
+        reclustering_hospitales.iniciar()
+        print("   # Re-clustering en segundo plano iniciado")
+
+    tiempos_arranque['hasta_listo_ms'] = (time.perf_counter() - inicio_arranque) * 1000
+
     print("\n[3/3] Servidor GraphQL listo")
+    print(f"   # Arranque en {tiempos_arranque['hasta_listo_ms']:.0f} ms")
     print("=" * 60)
 
     # Obtener puerto de variable de entorno
@@ -67,6 +105,10 @@ async def lifespan(app: FastAPI):
     yield
 
     # Shutdown: Limpiar recursos
+    reclustering_hospitales.detener()
+    servicio_decision.cerrar()
+    evaluacion_progresiva.cerrar()
+
     print("\n" + "=" * 60)
     print("CERRANDO MICROSERVICIO")
     print("=" * 60 + "\n")
@@ -98,7 +140,9 @@ async def get_context():
     Inyecta el servicio de decisión en el contexto.
     """
     return {
-        "servicio_decision": servicio_decision
+        "servicio_decision": servicio_decision,
+        "asignador_hospitales": asignador_hospitales,
+        "evaluacion_progresiva": evaluacion_progresiva
     }
 
 
@@ -106,7 +150,7 @@ async def get_context():
 graphql_app = GraphQLRouter(
     schema,
     context_getter=get_context,
-    graphiql=True  # Habilita GraphiQL IDE
+    graphiql=True  # Habilita GraphiQL IDE; subscriptions por websocket en /graphql
 )
 
 # Montar router GraphQL
@@ -126,26 +170,131 @@ async def root():
         "version": "1.0.0",
         "graphql_endpoint": "/graphql",
         "graphiql_ide": "/graphql (navegador)",
+        "evaluacion_imagen_endpoint": "POST /evaluacion/imagen (cuerpo binario)",
         "estado": "activo",
         "ml_models": {
             "random_forest": "Cargado",
-            "kmeans": "Cargado"
+            "kmeans": "Cargado",
+            "cnn": servicio_decision.estado_cnn if servicio_decision else "no_iniciada"
         }
     }
 
 
+class DatosPacienteConsulta(BaseModel):
+    """Signos vitales del paciente como query params de /evaluacion/imagen."""
+
+    edad: int
+    sexo: str
+    presion_sistolica: float
+    presion_diastolica: float
+    frecuencia_cardiaca: int
+    frecuencia_respiratoria: int
+    temperatura: float
+    saturacion_oxigeno: float
+    nivel_dolor: int
+    tipo_incidente: str
+    tiempo_desde_incidente: int
+    especialidades_requeridas: Optional[str] = None  # separadas por coma
+
+
+async def _leer_cuerpo_limitado(request: Request) -> bytes:
+    """
+    Lee el cuerpo del request por partes cortando en MAX_BYTES.
+
+    Rechaza primero por Content-Length (sin leer nada) y, si el cliente
+    no lo envía o miente, al superar el límite mientras llega el stream.
+
+    Raises:
+        HTTPException: 413 si la imagen excede MAX_BYTES, 400 si está vacía
+    """
+    largo = request.headers.get('content-length')
+    if largo is not None and largo.isdigit() and int(largo) > MAX_BYTES:
+        raise HTTPException(413, f"Imagen demasiado grande (máximo {MAX_BYTES} bytes)")
+
+    cuerpo = bytearray()
+    async for parte in request.stream():
+        cuerpo += parte
+        if len(cuerpo) > MAX_BYTES:
+            raise HTTPException(413, f"Imagen demasiado grande (máximo {MAX_BYTES} bytes)")
+
+    if not cuerpo:
+        raise HTTPException(400, "El cuerpo debe contener la imagen (JPEG/PNG)")
+    return bytes(cuerpo)
+
+
+@app.post("/evaluacion/imagen")
+async def evaluar_con_imagen(
+    request: Request,
+    datos: DatosPacienteConsulta = Depends(),
+    progresiva: bool = False
+):
+    """
+    Evaluación híbrida (vitales + CNN) con la imagen como cuerpo binario.
+
+    Alternativa sin base64 ni multipart a la query evaluarPacienteConImagen:
+    el cuerpo es el archivo tal cual (Content-Type: image/jpeg) y los signos
+    vitales van como query params. Con progresiva=true responde sin esperar
+    a la CNN (ver EvaluacionProgresiva).
+
+    Returns:
+        Mismo dict que ServicioDecision.evaluar_paciente_con_imagen
+
+    Raises:
+        HTTPException: 422 con el motivo si los signos vitales no pasan la
+            validación o la imagen no puede decodificarse
+
+    Example:
+        curl -X POST --data-binary @herida.jpg -H "Content-Type: image/jpeg" \\
+          "http://localhost:8002/evaluacion/imagen?edad=45&sexo=M&..."
+    """
+    if servicio_decision is None:
+        raise HTTPException(503, "Servicio iniciando")
+
+    imagen = await _leer_cuerpo_limitado(request)
+
+    datos_paciente = datos.model_dump()
+    if datos_paciente['especialidades_requeridas']:
+        datos_paciente['especialidades_requeridas'] = [
+            e.strip() for e in datos_paciente['especialidades_requeridas'].split(',')
+        ]
+
+    # Decodificación + CNN son CPU: fuera del event loop
+    evaluar = (
+        evaluacion_progresiva.iniciar if progresiva
+        else servicio_decision.evaluar_paciente_con_imagen
+    )
+    try:
+        return await run_in_threadpool(evaluar, datos_paciente, imagen_bytes=imagen)
+    except ValueError as e:
+        # Error del cliente (datos o imagen inválidos), no del servidor
+        raise HTTPException(422, str(e)) from e
+
+
 @app.get("/health")
 async def health_check():
     """
     Health check endpoint.
 
     Returns:
-        Estado de salud del servicio
+        Estado de salud del servicio. evaluacion_imagen.lista indica si
+        la CNN ya está disponible; arranque_ms desglosa el tiempo de
+        carga por componente.
     """
+    if servicio_decision is None:
+        return {"status": "starting"}
+
     return {
         "status": "healthy",
         "database": "connected",
-        "ml_models": "loaded"
+        "ml_models": "loaded",
+        "evaluacion_imagen": servicio_decision.obtener_estado_cnn(),
+        "arranque_ms": {
+            componente: round(ms, 1)
+            for componente, ms in {
+                **tiempos_arranque,
+                **servicio_decision.tiempos_arranque
+            }.items()
+        }
     }
 
 
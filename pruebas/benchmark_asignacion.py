@@ -0,0 +1,137 @@
+"""
+Benchmark del asignador de camas para incidentes masivos.
+Compara la asignación óptima (mínimo costo con capacidades) contra la
+línea base greedy (cada paciente al hospital más cercano con cama).
+No requiere MongoDB: usa hospitales y pacientes sintéticos.
+
+Uso:
+    python pruebas/benchmark_asignacion.py
+Estándares: PEP 8, Type hints
+"""
+
+import sys
+import time
+from pathlib import Path
+from typing import Tuple
+
+import numpy as np
+
+# Agregar rutas al path
+ruta_base = Path(__file__).parent.parent
+sys.path.append(str(ruta_base))
+
+from negocio.servicios.servicio_decision import ServicioDecision
+from negocio.servicios.asignador_hospitales import AsignadorHospitales
+
+
+# Zona aproximada de Santa Cruz de la Sierra (igual que hospitales.csv)
+LATITUD = (-17.90, -17.70)
+LONGITUD = (-63.28, -63.08)
+
+ESCENARIOS = [
+    # (pacientes, hospitales, focos del incidente)
+    (50, 30, 1),
+    (200, 500, 1),
+    (300, 2000, 3),
+    (500, 5000, 10),
+]
+
+
+def imprimir_separador(titulo: str = "") -> None:
+    """Imprime separador visual."""
+    print("\n" + "=" * 70)
+    if titulo:
+        print(f" {titulo}")
+        print("=" * 70)
+
+
+def generar_escenario(
+    n_pacientes: int,
+    n_hospitales: int,
+    n_focos: int,
+    semilla: int = 42
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Genera un incidente sintético.
+
+    Returns:
+        Tupla (distancias, capacidades, factibles)
+    """
+    rng = np.random.default_rng(semilla)
+
+    hospitales = np.column_stack([
+        rng.uniform(*LATITUD, n_hospitales),
+        rng.uniform(*LONGITUD, n_hospitales)
+    ])
+    capacidades = rng.integers(0, 8, n_hospitales)
+
+    # Pacientes agrupados alrededor de pocos focos (choque, derrumbe)
+    focos = np.column_stack([
+        rng.uniform(*LATITUD, n_focos),
+        rng.uniform(*LONGITUD, n_focos)
+    ])
+    foco_paciente = rng.integers(0, n_focos, n_pacientes)
+    pacientes = focos[foco_paciente] + rng.normal(0, 0.002, (n_pacientes, 2))
+
+    distancias = ServicioDecision.calcular_matriz_distancias(pacientes, hospitales)
+
+    # ~60% de hospitales tienen la especialidad requerida
+    factibles = rng.random((n_pacientes, n_hospitales)) < 0.6
+
+    return distancias, capacidades, factibles
+
+
+def medir(resolver, distancias, capacidades, factibles, repeticiones: int = 3):
+    """Ejecuta un resolver varias veces y retorna (mejor_tiempo_ms, asignacion)."""
+    tiempos = []
+    asignacion = None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        asignacion = resolver(distancias, capacidades, factibles)
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return min(tiempos), asignacion
+
+
+def resumir(asignacion: np.ndarray, distancias: np.ndarray) -> Tuple[int, float]:
+    """Retorna (pacientes_asignados, distancia_total_km)."""
+    asignados = asignacion >= 0
+    filas = np.nonzero(asignados)[0]
+    total = float(distancias[filas, asignacion[asignados]].sum())
+    return int(asignados.sum()), total
+
+
+def main() -> None:
+    """Ejecuta todos los escenarios."""
+    imprimir_separador("BENCHMARK ASIGNACION MASIVA: OPTIMO vs GREEDY")
+
+    print(f"\n{'Escenario':>18s} | {'Metodo':>7s} | {'Tiempo':>9s} | "
+          f"{'Asignados':>9s} | {'Dist. total':>11s} | {'Promedio':>8s}")
+    print("-" * 78)
+
+    for n_pacientes, n_hospitales, n_focos in ESCENARIOS:
+        distancias, capacidades, factibles = generar_escenario(
+            n_pacientes, n_hospitales, n_focos
+        )
+        etiqueta = f"{n_pacientes}p x {n_hospitales}h"
+
+        for nombre, resolver in [
+            ('optimo', AsignadorHospitales.resolver_optimo),
+            ('greedy', AsignadorHospitales.resolver_greedy),
+        ]:
+            tiempo_ms, asignacion = medir(
+                resolver, distancias, capacidades, factibles
+            )
+            asignados, total = resumir(asignacion, distancias)
+            promedio = total / asignados if asignados else 0.0
+
+            print(f"{etiqueta:>18s} | {nombre:>7s} | {tiempo_ms:7.1f}ms | "
+                  f"{asignados:9d} | {total:9.1f}km | {promedio:6.2f}km")
+
+    print("\n" + "=" * 70)
+    print(" El greedy nunca mejora la distancia total del óptimo;")
+    print(" la diferencia crece cuando los hospitales cercanos se saturan.")
+    print("=" * 70 + "\n")
+
+
+if __name__ == "__main__":
+    main()
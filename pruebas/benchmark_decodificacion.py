@@ -0,0 +1,170 @@
+"""
+Benchmark de decodificación de imágenes para la CNN, por etapa.
+Compara el pipeline original (decodificación completa + resize por defecto +
+float32 / 255) contra el rápido (JPEG draft + resize bilineal a uint8).
+No requiere TensorFlow ni MongoDB.
+
+Uso:
+    python pruebas/benchmark_decodificacion.py --imagenes ruta/fotos_12mp
+    python pruebas/benchmark_decodificacion.py   # foto sintética 4000x3000
+Estándares: PEP 8, Type hints
+"""
+
+import sys
+import time
+import base64
+import argparse
+from io import BytesIO
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import numpy as np
+from PIL import Image
+
+# Agregar rutas al path
+ruta_base = Path(__file__).parent.parent
+sys.path.append(str(ruta_base))
+
+from negocio.ml.decodificacion_imagenes import TAMANO_ENTRADA, decodificar_base64
+
+
+def imprimir_separador(titulo: str = "") -> None:
+    """Imprime separador visual."""
+    print("\n" + "=" * 70)
+    if titulo:
+        print(f" {titulo}")
+        print("=" * 70)
+
+
+def foto_sintetica(ancho: int = 4000, alto: int = 3000) -> bytes:
+    """Genera un JPEG de 12 MP con gradientes y ruido (comprime como una foto)."""
+    rng = np.random.default_rng(42)
+    y, x = np.mgrid[0:alto, 0:ancho].astype(np.float32)
+    base = np.stack([
+        128 + 100 * np.sin(x / 300),
+        128 + 100 * np.cos(y / 250),
+        128 + 60 * np.sin((x + y) / 400)
+    ], axis=-1)
+    pixeles = np.clip(base + rng.normal(0, 12, base.shape), 0, 255).astype(np.uint8)
+    buffer = BytesIO()
+    Image.fromarray(pixeles).save(buffer, format='JPEG', quality=90)
+    return buffer.getvalue()
+
+
+def etapas_original(imagen_base64: str) -> Dict[str, float]:
+    """Pipeline previo: b64decode, decodificación completa, resize, float32 / 255."""
+    tiempos = {}
+    t = time.perf_counter()
+
+    datos = base64.b64decode(imagen_base64)
+    tiempos['base64'] = time.perf_counter() - t; t = time.perf_counter()
+
+    img = Image.open(BytesIO(datos)).convert('RGB')
+    tiempos['decodificar'] = time.perf_counter() - t; t = time.perf_counter()
+
+    img = img.resize(TAMANO_ENTRADA)
+    tiempos['redimensionar'] = time.perf_counter() - t; t = time.perf_counter()
+
+    arreglo = np.asarray(img, dtype=np.float32)
+    arreglo = arreglo / 255.0
+    arreglo = np.expand_dims(arreglo, axis=0)
+    tiempos['a_tensor'] = time.perf_counter() - t
+
+    return tiempos
+
+
+def etapas_rapido(imagen_base64: str, destino: np.ndarray) -> Dict[str, float]:
+    """Pipeline nuevo, mismas etapas que decodificar_imagen()."""
+    tiempos = {}
+    t = time.perf_counter()
+
+    datos = decodificar_base64(imagen_base64)
+    tiempos['base64'] = time.perf_counter() - t; t = time.perf_counter()
+
+    img = Image.open(BytesIO(datos))
+    img.draft('RGB', TAMANO_ENTRADA)
+    img = img.convert('RGB')
+    tiempos['decodificar'] = time.perf_counter() - t; t = time.perf_counter()
+
+    img = img.resize(TAMANO_ENTRADA, Image.BILINEAR)
+    tiempos['redimensionar'] = time.perf_counter() - t; t = time.perf_counter()
+
+    destino[...] = np.asarray(img, dtype=np.uint8)
+    tiempos['a_tensor'] = time.perf_counter() - t
+
+    return tiempos
+
+
+def promedio_ms(medir: Callable[[], Dict[str, float]], repeticiones: int) -> Dict[str, float]:
+    """Promedia cada etapa en milisegundos."""
+    acumulado: Dict[str, List[float]] = {}
+    for _ in range(repeticiones):
+        for etapa, segundos in medir().items():
+            acumulado.setdefault(etapa, []).append(segundos * 1000)
+    return {etapa: float(np.mean(valores)) for etapa, valores in acumulado.items()}
+
+
+def main() -> None:
+    """Ejecuta el benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark de decodificación")
+    parser.add_argument('--imagenes', type=Path, help='Directorio con fotos JPEG')
+    parser.add_argument('--repeticiones', type=int, default=10)
+    args = parser.parse_args()
+
+    if args.imagenes:
+        fotos = [
+            p.read_bytes() for p in sorted(args.imagenes.iterdir())
+            if p.suffix.lower() in ('.jpg', '.jpeg')
+        ]
+        origen = str(args.imagenes)
+    else:
+        fotos = [foto_sintetica()]
+        origen = "sintética 4000x3000"
+
+    if not fotos:
+        print("No se encontraron fotos JPEG")
+        return
+
+    imprimir_separador("BENCHMARK DECODIFICACION DE IMAGENES")
+    print(f"Fotos: {len(fotos)} ({origen}), "
+          f"{np.mean([len(f) for f in fotos]) / 1e6:.1f} MB promedio")
+
+    destino = np.empty((*TAMANO_ENTRADA[::-1], 3), dtype=np.uint8)
+    codificadas = [base64.b64encode(f).decode() for f in fotos]
+
+    resultados = {}
+    for nombre, medir in [
+        ('original', lambda b64: etapas_original(b64)),
+        ('rapido', lambda b64: etapas_rapido(b64, destino)),
+    ]:
+        por_foto = [
+            promedio_ms(lambda: medir(b64), args.repeticiones)
+            for b64 in codificadas
+        ]
+        resultados[nombre] = {
+            etapa: float(np.mean([p[etapa] for p in por_foto]))
+            for etapa in por_foto[0]
+        }
+
+    etapas = list(resultados['original'])
+    print(f"\n{'Etapa':>14s} | {'Original':>10s} | {'Rápido':>10s} | {'Mejora':>7s}")
+    print("-" * 52)
+    for etapa in etapas + ['total']:
+        if etapa == 'total':
+            print("-" * 52)
+            antes = sum(resultados['original'].values())
+            despues = sum(resultados['rapido'].values())
+        else:
+            antes = resultados['original'][etapa]
+            despues = resultados['rapido'][etapa]
+        print(f"{etapa:>14s} | {antes:8.2f}ms | {despues:8.2f}ms | "
+              f"{antes / despues if despues else float('inf'):6.1f}x")
+
+    print("\n" + "=" * 70)
+    print(" El tensor rápido es uint8 (150 KB) y se normaliza dentro del modelo;")
+    print(" el original es float32 (600 KB) normalizado en NumPy.")
+    print("=" * 70 + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""
+Benchmark de inferencia CNN.
+1. Ruta por solicitud: keras predict() vs grafo trazado (tf.function),
+   incluyendo predecir (base64) y predecir_desde_archivo.
+2. Concurrencia: llamada directa vs lotes dinámicos, latencia p50/p99 y
+   throughput con distintos niveles de concurrencia.
+Requiere TensorFlow y modelos_ml/modelo_cnn_severidad.h5 (o la arquitectura
+sin entrenar, que cuesta lo mismo). No requiere MongoDB.
+
+Uso:
+    python pruebas/benchmark_inferencia_cnn.py
+Estándares: PEP 8, Type hints
+"""
+
+import sys
+import time
+import tempfile
+import base64
+from io import BytesIO
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Tuple
+
+import numpy as np
+from PIL import Image
+
+# Agregar rutas al path
+ruta_base = Path(__file__).parent.parent
+sys.path.append(str(ruta_base))
+
+from negocio.ml.clasificador_imagenes import ClasificadorImagenes
+from negocio.ml.inferencia_por_lotes import InferenciaPorLotes
+
+
+CONCURRENCIAS = [1, 4, 16, 32]
+SOLICITUDES_POR_NIVEL = 128
+CONFIGURACIONES_LOTE = [
+    # (max_lote, espera_ms)
+    (8, 2.0),
+    (16, 5.0),
+    (32, 10.0),
+]
+
+
+def imprimir_separador(titulo: str = "") -> None:
+    """Imprime separador visual."""
+    print("\n" + "=" * 70)
+    if titulo:
+        print(f" {titulo}")
+        print("=" * 70)
+
+
+def generar_imagenes(cantidad: int, semilla: int = 42) -> List[str]:
+    """Genera imágenes JPEG aleatorias codificadas en base64."""
+    rng = np.random.default_rng(semilla)
+    imagenes = []
+    for _ in range(cantidad):
+        pixeles = rng.integers(0, 256, (480, 640, 3), dtype=np.uint8)
+        buffer = BytesIO()
+        Image.fromarray(pixeles).save(buffer, format='JPEG', quality=85)
+        imagenes.append(base64.b64encode(buffer.getvalue()).decode())
+    return imagenes
+
+
+def medir(
+    predecir: Callable[[str], Tuple[str, dict]],
+    imagenes: List[str],
+    concurrencia: int
+) -> Tuple[float, float, float]:
+    """
+    Lanza todas las solicitudes con N hilos cliente.
+
+    Returns:
+        Tupla (p50_ms, p99_ms, imagenes_por_segundo)
+    """
+    def solicitud(imagen: str) -> float:
+        inicio = time.perf_counter()
+        predecir(imagen)
+        return (time.perf_counter() - inicio) * 1000
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrencia) as ejecutor:
+        latencias = np.array(list(ejecutor.map(solicitud, imagenes)))
+    total = time.perf_counter() - inicio
+
+    return (
+        float(np.percentile(latencias, 50)),
+        float(np.percentile(latencias, 99)),
+        len(imagenes) / total
+    )
+
+
+def latencias_ms(funcion: Callable[[], object], repeticiones: int) -> np.ndarray:
+    """Ejecuta funcion N veces en serie y retorna cada latencia en ms."""
+    latencias = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        latencias.append((time.perf_counter() - inicio) * 1000)
+    return np.array(latencias)
+
+
+def comparar_rutas(
+    clasificador: ClasificadorImagenes,
+    imagenes: List[str],
+    repeticiones: int = 50
+) -> None:
+    """Compara keras predict() contra el grafo trazado, en serie."""
+    imprimir_separador("RUTA POR SOLICITUD (1 hilo)")
+
+    print(f"\n{'Ruta':>28s} | {'Lote':>4s} | {'p50':>9s} | {'p99':>9s}")
+    print("-" * 60)
+
+    for tamano in (1, 4, 16):
+        lote = np.stack([
+            clasificador.preparar_imagen(imagen) for imagen in imagenes[:tamano]
+        ])
+        for nombre, funcion in [
+            ('keras predict()', clasificador.predecir_lote_keras),
+            ('tf.function', clasificador.predecir_lote),
+        ]:
+            lat = latencias_ms(lambda: funcion(lote), repeticiones)
+            print(f"{nombre:>28s} | {tamano:>4d} | {np.percentile(lat, 50):7.1f}ms | "
+                  f"{np.percentile(lat, 99):7.1f}ms")
+
+        diferencia = np.abs(
+            clasificador.predecir_lote_keras(lote) - clasificador.predecir_lote(lote)
+        ).max()
+        print(f"{'diferencia máxima':>28s} | {tamano:>4d} | {diferencia:.2e}")
+
+    # Extremo a extremo: decodificación + preprocesamiento + red
+    with tempfile.NamedTemporaryFile(suffix='.jpg', delete=False) as archivo:
+        archivo.write(base64.b64decode(imagenes[0]))
+    for nombre, funcion in [
+        ('predecir (base64)', lambda: clasificador.predecir(imagenes[0])),
+        ('predecir_desde_archivo', lambda: clasificador.predecir_desde_archivo(
+            archivo.name
+        )),
+    ]:
+        lat = latencias_ms(funcion, repeticiones)
+        print(f"{nombre:>28s} | {1:>4d} | {np.percentile(lat, 50):7.1f}ms | "
+              f"{np.percentile(lat, 99):7.1f}ms")
+    Path(archivo.name).unlink()
+
+
+def imprimir_fila(etiqueta: str, concurrencia: int, resultado) -> None:
+    """Imprime una fila de la tabla de resultados."""
+    p50, p99, throughput = resultado
+    print(f"{etiqueta:>18s} | {concurrencia:>5d} | {p50:8.1f}ms | "
+          f"{p99:8.1f}ms | {throughput:8.1f} img/s")
+
+
+def main() -> None:
+    """Ejecuta el benchmark completo."""
+    imprimir_separador("BENCHMARK INFERENCIA CNN")
+
+    clasificador = ClasificadorImagenes()
+    imagenes = generar_imagenes(SOLICITUDES_POR_NIVEL)
+
+    # Calentar keras predict (el grafo trazado ya se calentó al construir)
+    clasificador.predecir_lote_keras(
+        clasificador.preparar_imagen(imagenes[0])[np.newaxis]
+    )
+
+    comparar_rutas(clasificador, imagenes)
+
+    imprimir_separador("CONCURRENCIA: DIRECTO vs LOTES DINAMICOS")
+    print(f"\n{'Modo':>18s} | {'Hilos':>5s} | {'p50':>10s} | "
+          f"{'p99':>10s} | {'Throughput':>12s}")
+    print("-" * 70)
+
+    for concurrencia in CONCURRENCIAS:
+        imprimir_fila(
+            "directo", concurrencia,
+            medir(clasificador.predecir, imagenes, concurrencia)
+        )
+
+        for max_lote, espera_ms in CONFIGURACIONES_LOTE:
+            servidor = InferenciaPorLotes(clasificador, max_lote, espera_ms)
+            servidor.iniciar()
+            resultado = medir(servidor.predecir, imagenes, concurrencia)
+            servidor.detener()
+
+            etiqueta = f"lote {max_lote}/{espera_ms:g}ms"
+            imprimir_fila(etiqueta, concurrencia, resultado)
+            promedio = servidor.obtener_estadisticas()['tamano_promedio_lote']
+            print(f"{'':>18s} |       | lote promedio: {promedio}")
+        print("-" * 70)
+
+    print("\n" + "=" * 70)
+    print(" Con 1 hilo los lotes solo agregan espera_ms de latencia;")
+    print(" la ganancia aparece cuando hay solicitudes concurrentes.")
+    print("=" * 70 + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Benchmark de carga de tablas: CSV sin tipos vs Parquet tipado.
+Mide lo que hacen los notebooks y cargar_datos_iniciales.py: leer
+emergencia_pacientes completo y solo las columnas del entrenamiento RF.
+No requiere MongoDB.
+
+Uso:
+    python pruebas/benchmark_tablas.py                 # CSV real (2000 filas)
+    python pruebas/benchmark_tablas.py --filas 1000000 # CSV replicado
+Estándares: PEP 8, Type hints
+"""
+
+import sys
+import time
+import argparse
+import tempfile
+from pathlib import Path
+from typing import Callable, List
+
+import numpy as np
+import pandas as pd
+
+# Agregar rutas al path
+ruta_base = Path(__file__).parent.parent
+sys.path.append(str(ruta_base))
+
+from datos.repositorios.repositorio_tablas import DIRECTORIO_CSV, RepositorioTablas
+
+TABLA = 'emergencia_pacientes'
+
+# Columnas del entrenamiento RF (notebooks/entrenar_random_forest.ipynb)
+COLUMNAS_RF = [
+    'edad', 'sexo', 'presion_sistolica', 'presion_diastolica',
+    'frecuencia_cardiaca', 'frecuencia_respiratoria', 'temperatura',
+    'saturacion_oxigeno', 'tipo_incidente', 'nivel_dolor',
+    'tiempo_desde_incidente', 'severidad'
+]
+
+
+def imprimir_separador(titulo: str = "") -> None:
+    """Imprime separador visual."""
+    print("\n" + "=" * 70)
+    if titulo:
+        print(f" {titulo}")
+        print("=" * 70)
+
+
+def replicar_csv(origen: Path, destino: Path, filas: int) -> None:
+    """Escribe un CSV de `filas` filas repitiendo el original (ids únicos)."""
+    df = pd.read_csv(origen)
+    copias = -(-filas // len(df))
+    grande = pd.concat([df] * copias, ignore_index=True).iloc[:filas]
+    grande['paciente_id'] = [f"PAC{i:08d}" for i in range(1, filas + 1)]
+    grande.to_csv(destino, index=False)
+
+
+def mediana_ms(leer: Callable[[], pd.DataFrame], repeticiones: int) -> tuple:
+    """Mediana de tiempo (ms) y memoria del DataFrame resultante (MB)."""
+    tiempos: List[float] = []
+    for _ in range(repeticiones):
+        t = time.perf_counter()
+        df = leer()
+        tiempos.append((time.perf_counter() - t) * 1000)
+    return float(np.median(tiempos)), df.memory_usage(deep=True).sum() / 1e6
+
+
+def main() -> None:
+    """Ejecuta el benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark de carga CSV vs Parquet")
+    parser.add_argument('--filas', type=int, help='Replicar el CSV hasta N filas')
+    parser.add_argument('--repeticiones', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temporal:
+        temporal = Path(temporal)
+        if args.filas:
+            directorio_csv = temporal / 'csv'
+            directorio_csv.mkdir()
+            replicar_csv(DIRECTORIO_CSV / f"{TABLA}.csv", directorio_csv / f"{TABLA}.csv",
+                         args.filas)
+        else:
+            directorio_csv = DIRECTORIO_CSV
+
+        ruta_csv = directorio_csv / f"{TABLA}.csv"
+        tablas = RepositorioTablas(directorio=temporal / 'parquet', directorio_csv=directorio_csv)
+
+        t = time.perf_counter()
+        ruta_parquet = tablas.desde_csv(TABLA)
+        conversion_ms = (time.perf_counter() - t) * 1000
+
+        imprimir_separador("BENCHMARK CARGA DE TABLAS")
+        print(f"Tabla: {TABLA}, {len(tablas.leer(TABLA, columnas=['edad'])):,} filas")
+        print(f"CSV: {ruta_csv.stat().st_size / 1e6:.2f} MB | "
+              f"Parquet zstd: {ruta_parquet.stat().st_size / 1e6:.2f} MB | "
+              f"conversión: {conversion_ms:.0f} ms")
+
+        casos = [
+            ('CSV sin tipos', lambda: pd.read_csv(ruta_csv)),
+            ('CSV con fechas', lambda: pd.read_csv(ruta_csv, parse_dates=['timestamp'])),
+            ('CSV usecols RF', lambda: pd.read_csv(ruta_csv, usecols=COLUMNAS_RF)),
+            ('Parquet completo', lambda: tablas.leer(TABLA)),
+            ('Parquet columnas RF', lambda: tablas.leer(TABLA, columnas=COLUMNAS_RF)),
+        ]
+
+        base_ms = None
+        print(f"\n{'Lectura':>20s} | {'Tiempo':>10s} | {'Memoria':>9s} | {'Mejora':>7s}")
+        print("-" * 57)
+        for nombre, leer in casos:
+            ms, mb = mediana_ms(leer, args.repeticiones)
+            base_ms = base_ms or ms
+            print(f"{nombre:>20s} | {ms:8.1f}ms | {mb:6.1f} MB | {base_ms / ms:6.1f}x")
+
+    print("\n" + "=" * 70)
+    print(" Parquet incluye el chequeo de vigencia contra el CSV (un stat).")
+    print(" Las categóricas (sexo, tipo_incidente, severidad) llegan como category.")
+    print("=" * 70 + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Fixtures compartidas de las pruebas automáticas (pytest).
+Prueba: Servicios de negocio sin MongoDB ni TensorFlow
+Estándares: PEP 8, Type hints
+
+Uso:
+    python -m pytest pruebas
+"""
+
+import sys
+import copy
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+import pytest
+
+# Agregar rutas al path
+ruta_base = Path(__file__).parent.parent
+sys.path.append(str(ruta_base))
+
+from datos.modelos.especialidades import ESPECIALIDADES
+from datos.modelos.schemas import HospitalSchema
+from negocio.ml.prediccion_severidad import SEVERIDADES
+from negocio.servicios.servicio_decision import ServicioDecision
+
+# Paciente válido; las pruebas cambian solo lo que necesitan
+PACIENTE_BASE: Dict[str, Any] = {
+    'edad': 58,
+    'sexo': 'M',
+    'presion_sistolica': 85,
+    'presion_diastolica': 50,
+    'frecuencia_cardiaca': 135,
+    'frecuencia_respiratoria': 30,
+    'temperatura': 36.2,
+    'saturacion_oxigeno': 86,
+    'tipo_incidente': 'problema_cardiaco',
+    'nivel_dolor': 9,
+    'tiempo_desde_incidente': 15
+}
+
+UBICACION = {'latitud': -17.78, 'longitud': -63.18}
+
+
+class ColeccionFalsa:
+    """Colección en memoria con el subconjunto de pymongo que usan los repositorios."""
+
+    def __init__(self, documentos: Optional[List[Dict[str, Any]]] = None):
+        self.documentos = [copy.deepcopy(d) for d in documentos or []]
+
+    @staticmethod
+    def _coincide(documento: Dict[str, Any], filtro: Dict[str, Any]) -> bool:
+        """Igualdad campo a campo (un campo ausente equivale a None)."""
+        return all(documento.get(campo) == valor for campo, valor in filtro.items())
+
+    def find(self, filtro: Optional[Dict[str, Any]] = None, proyeccion: Any = None):
+        return [copy.deepcopy(d) for d in self.documentos
+                if self._coincide(d, filtro or {})]
+
+    def find_one(self, filtro: Optional[Dict[str, Any]] = None, proyeccion: Any = None):
+        encontrados = self.find(filtro)
+        return encontrados[0] if encontrados else None
+
+    def _buscar_o_insertar(self, filtro: Dict[str, Any], upsert: bool) -> Optional[Dict[str, Any]]:
+        for documento in self.documentos:
+            if self._coincide(documento, filtro):
+                return documento
+        if not upsert:
+            return None
+        self.documentos.append(dict(filtro))
+        return self.documentos[-1]
+
+    def replace_one(self, filtro: Dict[str, Any], reemplazo: Dict[str, Any], upsert: bool = False):
+        documento = self._buscar_o_insertar(filtro, upsert)
+        if documento is not None:
+            documento.clear()
+            documento.update(copy.deepcopy(reemplazo))
+
+    def update_one(self, filtro: Dict[str, Any], cambios: Dict[str, Any], upsert: bool = False):
+        documento = self._buscar_o_insertar(filtro, upsert)
+        if documento is not None:
+            documento.update(copy.deepcopy(cambios['$set']))
+
+
+def hospital(
+    hospital_id: str,
+    latitud: float,
+    longitud: float,
+    camas_libres: int,
+    especialidades: Tuple[str, ...] = ('general',),
+    cluster: Optional[int] = None,
+    capacidad_maxima: int = 10
+) -> Dict[str, Any]:
+    """Documento de hospital con las camas libres pedidas."""
+    return HospitalSchema.crear_documento(
+        hospital_id=hospital_id,
+        nombre=f"Hospital {hospital_id}",
+        latitud=latitud,
+        longitud=longitud,
+        capacidad_actual=capacidad_maxima - camas_libres,
+        capacidad_maxima=capacidad_maxima,
+        tiempo_atencion_promedio=30,
+        tasa_exito=0.9,
+        nivel='III',
+        especialidades={esp: int(esp in especialidades) for esp in ESPECIALIDADES},
+        cluster=cluster
+    )
+
+
+class PredictorFijo:
+    """
+    Sustituto del Random Forest con una severidad conocida.
+
+    Cada paciente puede forzar la suya con la clave '_severidad'.
+    """
+
+    def __init__(self, severidad: str = 'critico'):
+        self.severidad = severidad
+
+    def predecir(self, datos: Dict[str, Any]) -> Tuple[str, Dict[str, float]]:
+        severidad = datos.get('_severidad', self.severidad)
+        resto = 0.1 / (len(SEVERIDADES) - 1)
+        return severidad, {s: 0.9 if s == severidad else resto for s in SEVERIDADES}
+
+    def predecir_lote(self, lista: List[Dict[str, Any]]) -> List[Tuple[str, Dict[str, float]]]:
+        return [self.predecir(datos) for datos in lista]
+
+
+@pytest.fixture(scope="session")
+def hospitales_csv() -> List[Dict[str, Any]]:
+    """Los 30 hospitales de archivos_csv/ con el cluster del K-means entrenado."""
+    from negocio.ml.clustering_hospitales import ClusteringHospitales
+
+    df = pd.read_csv(ruta_base / 'archivos_csv' / 'hospitales.csv')
+    clusters, _ = ClusteringHospitales().predecir_clusters_lote(df)
+
+    return [
+        hospital(
+            fila.hospital_id, fila.latitud, fila.longitud,
+            camas_libres=fila.capacidad_maxima - fila.capacidad_actual,
+            especialidades=tuple(e.strip() for e in fila.especialidades.split(',')),
+            cluster=int(cluster),
+            capacidad_maxima=fila.capacidad_maxima
+        )
+        for fila, cluster in zip(df.itertuples(), clusters)
+    ]
+
+
+@pytest.fixture
+def crear_servicio():
+    """Fábrica de ServicioDecision sobre hospitales en memoria y PredictorFijo."""
+    servicios: List[ServicioDecision] = []
+
+    def fabrica(hospitales: List[Dict[str, Any]], severidad: str = 'critico') -> ServicioDecision:
+        servicio = ServicioDecision({'hospitales': ColeccionFalsa(hospitales)}, cargar_cnn=False)
+        servicio.predictor = PredictorFijo(severidad)
+        servicios.append(servicio)
+        return servicio
+
+    yield fabrica
+
+    for servicio in servicios:
+        servicio.cerrar()
@@ -0,0 +1,106 @@
+"""
+Pruebas del asignador de camas para incidentes masivos.
+Prueba: Prioridad por severidad, capacidades y solver óptimo vs greedy
+Estándares: PEP 8, Type hints
+"""
+
+import numpy as np
+import pytest
+
+from negocio.servicios.asignador_hospitales import AsignadorHospitales
+from pruebas.conftest import PACIENTE_BASE, UBICACION, hospital
+
+
+# Hospitales con cardiología: uno junto al incidente y otro a ~10 km
+CERCANO = hospital('HCERCA', -17.781, -63.181, camas_libres=1,
+                   especialidades=('cardiologia', 'general'))
+LEJANO = hospital('HLEJOS', -17.870, -63.180, camas_libres=1,
+                  especialidades=('cardiologia',))
+
+
+def _paciente(severidad: str) -> dict:
+    return {**PACIENTE_BASE, '_severidad': severidad}
+
+
+def _hospitales_asignados(resultado: dict) -> list:
+    return [
+        a['hospital']['hospital_id'] if a['hospital'] else None
+        for a in resultado['asignaciones']
+    ]
+
+
+@pytest.mark.parametrize("metodo", ['optimo', 'greedy'])
+def test_asigna_paciente_critico(crear_servicio, metodo):
+    asignador = AsignadorHospitales(crear_servicio([CERCANO, LEJANO]))
+
+    resultado = asignador.asignar([_paciente('critico')], [UBICACION], metodo)
+
+    assert resultado['total_asignados'] == 1
+    assert resultado['sin_cama'] == 0
+    assert _hospitales_asignados(resultado) == ['HCERCA']
+    assert resultado['asignaciones'][0]['especialidad_cumplida']
+
+
+def test_criticos_eligen_cama_antes_que_altos(crear_servicio):
+    asignador = AsignadorHospitales(crear_servicio([CERCANO, LEJANO]))
+    pacientes = [_paciente('alto'), _paciente('critico'), _paciente('bajo')]
+
+    resultado = asignador.asignar(pacientes, [UBICACION])
+
+    assert _hospitales_asignados(resultado) == ['HLEJOS', 'HCERCA', None]
+    assert resultado['sin_cama'] == 0
+
+
+def test_cuenta_sin_cama_solo_pacientes_con_traslado(crear_servicio):
+    asignador = AsignadorHospitales(crear_servicio([CERCANO, LEJANO]))
+    pacientes = [_paciente('alto'), _paciente('critico'),
+                 _paciente('critico'), _paciente('medio')]
+
+    resultado = asignador.asignar(pacientes, [UBICACION])
+
+    assert _hospitales_asignados(resultado)[0] is None
+    assert resultado['total_asignados'] == 2
+    assert resultado['sin_cama'] == 1
+
+
+def test_optimo_minimiza_distancia_total():
+    distancias = np.array([[1.0, 2.0], [1.5, 5.0]])
+    capacidades = np.array([1, 1])
+    factibles = np.ones((2, 2), dtype=bool)
+
+    optimo = AsignadorHospitales.resolver_optimo(distancias, capacidades, factibles)
+    greedy = AsignadorHospitales.resolver_greedy(distancias, capacidades, factibles)
+
+    assert optimo.tolist() == [1, 0]
+    assert greedy.tolist() == [0, 1]
+
+
+def test_respeta_capacidades_y_factibilidad():
+    rng = np.random.default_rng(7)
+    distancias = rng.uniform(0.5, 20.0, size=(40, 6))
+    capacidades = np.array([3, 0, 5, 2, 4, 1])
+    factibles = rng.random((40, 6)) < 0.7
+
+    for resolver in (AsignadorHospitales.resolver_optimo,
+                     AsignadorHospitales.resolver_greedy):
+        asignacion = resolver(distancias, capacidades, factibles)
+        asignados = asignacion >= 0
+
+        assert asignados.sum() == capacidades.sum()
+        assert (np.bincount(asignacion[asignados], minlength=6) <= capacidades).all()
+        assert factibles[np.flatnonzero(asignados), asignacion[asignados]].all()
+
+    def total(asignacion):
+        return distancias[np.flatnonzero(asignacion >= 0), asignacion[asignacion >= 0]].sum()
+
+    assert total(AsignadorHospitales.resolver_optimo(distancias, capacidades, factibles)) <= \
+        total(AsignadorHospitales.resolver_greedy(distancias, capacidades, factibles))
+
+
+def test_pares_no_factibles_quedan_sin_cama():
+    distancias = np.array([[1.0, 2.0], [3.0, 4.0]])
+    factibles = np.array([[True, False], [False, False]])
+
+    asignacion = AsignadorHospitales.resolver_optimo(distancias, np.array([2, 2]), factibles)
+
+    assert asignacion.tolist() == [0, -1]
@@ -0,0 +1,95 @@
+"""
+Pruebas de la caché LRU de predicciones CNN.
+Prueba: Claves por contenido y versión, desalojo LRU y concurrencia
+Estándares: PEP 8, Type hints
+"""
+
+import threading
+
+import numpy as np
+
+from negocio.ml.cache_predicciones import CachePredicciones
+
+
+def _prediccion(valor: float) -> np.ndarray:
+    return np.array([valor, 0.0, 0.0, 1.0 - valor], dtype=np.float32)
+
+
+def test_clave_por_contenido_y_version():
+    cache = CachePredicciones('v1', max_entradas=4)
+
+    assert cache.clave(b'foto') == cache.clave(b'foto')
+    assert cache.clave(b'foto') != cache.clave(b'otra')
+    assert cache.clave(b'foto') != CachePredicciones('v2').clave(b'foto')
+
+
+def test_desaloja_la_menos_reciente():
+    cache = CachePredicciones('v1', max_entradas=2)
+    a, b, c = (cache.clave(d) for d in (b'a', b'b', b'c'))
+
+    cache.guardar(a, _prediccion(0.1))
+    cache.guardar(b, _prediccion(0.2))
+    cache.obtener(a)                     # a pasa a ser la más reciente
+    cache.guardar(c, _prediccion(0.3))
+
+    assert cache.obtener(b) is None
+    assert cache.obtener(a) is not None
+    assert cache.obtener(c) is not None
+    assert cache.obtener_estadisticas()['desalojos'] == 1
+
+
+def test_guarda_copia_inmutable():
+    cache = CachePredicciones('v1', max_entradas=2)
+    clave = cache.clave(b'a')
+    lote = np.stack([_prediccion(0.4), _prediccion(0.6)])
+
+    cache.guardar(clave, lote[0])
+    lote[0, 0] = 0.9
+    guardada = cache.obtener(clave)
+
+    assert guardada[0] == np.float32(0.4)
+    assert not guardada.flags.writeable
+
+
+def test_estadisticas_de_aciertos():
+    cache = CachePredicciones('v1', max_entradas=2)
+    clave = cache.clave(b'a')
+
+    cache.obtener(clave)
+    cache.guardar(clave, _prediccion(0.5))
+    cache.obtener(clave)
+    cache.obtener(clave)
+
+    estadisticas = cache.obtener_estadisticas()
+    assert (estadisticas['aciertos'], estadisticas['fallos']) == (2, 1)
+    assert estadisticas['tasa_aciertos'] == round(2 / 3, 4)
+
+
+def test_deshabilitada_no_guarda():
+    cache = CachePredicciones('v1', max_entradas=0)
+    clave = cache.clave(b'a')
+
+    cache.guardar(clave, _prediccion(0.5))
+
+    assert not cache.habilitada
+    assert cache.obtener(clave) is None
+
+
+def test_acceso_concurrente_respeta_el_limite():
+    cache = CachePredicciones('v1', max_entradas=50)
+
+    def trabajar(hilo: int) -> None:
+        for i in range(500):
+            clave = cache.clave(f"{hilo}-{i % 80}".encode())
+            if cache.obtener(clave) is None:
+                cache.guardar(clave, _prediccion(0.5))
+
+    hilos = [threading.Thread(target=trabajar, args=(h,)) for h in range(8)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    estadisticas = cache.obtener_estadisticas()
+    assert estadisticas['entradas'] == 50
+    assert estadisticas['aciertos'] + estadisticas['fallos'] == 8 * 500
@@ -0,0 +1,62 @@
+"""
+Pruebas del clustering de hospitales.
+Prueba: Tabla de rutas tipo de incidente → clusters con el modelo y el
+cluster_info versionados en modelos_ml
+Estándares: PEP 8, Type hints
+"""
+
+import pytest
+
+from datos.modelos.especialidades import ESPECIALIDADES_POR_INCIDENTE
+from negocio.ml.clustering_hospitales import ClusteringHospitales
+
+
+# Cluster que elegía obtener_cluster_por_tipo_emergencia antes de la tabla
+# de rutas, con el cluster_info.pkl del notebook
+PRIMER_CLUSTER = {
+    'problema_cardiaco': 0,
+    'problema_respiratorio': 0,
+    'quemadura': 2,
+    'fractura': 0,
+    'alergia_severa': 0,
+    'dolor_abdominal': 0,
+    'caida': 0,
+    'herida_punzante': 3,
+    'accidente_auto': 3,
+    'intoxicacion': 2,
+    'desconocido': 0,
+}
+
+
+@pytest.fixture(scope="module")
+def clusterer() -> ClusteringHospitales:
+    return ClusteringHospitales()
+
+
+def test_cubre_todos_los_tipos_de_incidente():
+    assert set(PRIMER_CLUSTER) - {'desconocido'} == set(ESPECIALIDADES_POR_INCIDENTE)
+
+
+@pytest.mark.parametrize("tipo, esperado", PRIMER_CLUSTER.items())
+def test_primer_cluster_por_tipo(clusterer, tipo, esperado):
+    ruta = clusterer.obtener_clusters_rankeados(tipo)
+
+    assert clusterer.obtener_cluster_por_tipo_emergencia(tipo) == esperado
+    assert ruta[0][0] == esperado
+    assert sorted(cluster for cluster, _ in ruta) == sorted(clusterer.cluster_info)
+
+
+def test_especialidades_preferidas_solo_ordenan_el_respaldo(clusterer):
+    # Mismo puntaje base para 'general'; el 1 tiene además la preferida
+    # de alergia_severa (toxicologia) pero el primero sigue siendo el 0
+    local = ClusteringHospitales()
+    local.actualizar_clusters(clusterer.modelo_kmeans, {
+        0: {'especialidades': ['general', 'pediatria'], 'hospitales': []},
+        1: {'especialidades': ['general', 'toxicologia'], 'hospitales': []},
+        2: {'especialidades': ['toxicologia'], 'hospitales': []},
+        3: {'especialidades': ['trauma'], 'hospitales': []},
+    })
+
+    assert local.obtener_clusters_rankeados('alergia_severa') == (
+        (0, 12.0), (1, 12.5), (2, 0.5), (3, 0.0)
+    )
@@ -0,0 +1,66 @@
+"""
+Pruebas de la carga de datos del entrenamiento del Random Forest.
+Prueba: Registros sin severidad y tablas sin etiquetas
+Estándares: PEP 8, Type hints
+"""
+
+from typing import Any, Callable
+
+import pandas as pd
+import pytest
+
+from datos.repositorios.repositorio_tablas import DIRECTORIO_CSV, RepositorioTablas
+from notebooks.entrenar_random_forest import FEATURES, cargar_datos
+
+
+@pytest.fixture
+def tablas(tmp_path) -> RepositorioTablas:
+    """Repositorio sobre las 200 primeras filas de emergencia_pacientes.csv."""
+    directorio_csv = tmp_path / 'csv'
+    directorio_csv.mkdir()
+    pd.read_csv(DIRECTORIO_CSV / 'emergencia_pacientes.csv', nrows=200).to_csv(
+        directorio_csv / 'emergencia_pacientes.csv', index=False
+    )
+    return RepositorioTablas(directorio=tmp_path / 'parquet', directorio_csv=directorio_csv)
+
+
+def _cambiar_severidad(tablas: RepositorioTablas, nueva: Callable[[pd.DataFrame], Any]) -> None:
+    ruta = tablas.directorio_csv / 'emergencia_pacientes.csv'
+    df = pd.read_csv(ruta)
+    df['severidad'] = nueva(df)
+    df.to_csv(ruta, index=False)
+
+
+def test_carga_las_etiquetas(tablas):
+    X, y, _, _, descartados, sin_severidad = cargar_datos(tablas)
+
+    assert X.columns.tolist() == FEATURES
+    assert len(X) == len(y) == 200 - descartados
+    assert sin_severidad == 0
+    assert y.notna().all() and set(y) <= {'critico', 'alto', 'medio', 'bajo'}
+
+
+def test_descarta_registros_sin_severidad(tablas):
+    completos = cargar_datos(tablas)[0]
+    _cambiar_severidad(tablas, lambda df: df['severidad'].mask(df.index < 10))
+
+    X, y, _, _, descartados, sin_severidad = cargar_datos(tablas)
+
+    assert 0 < sin_severidad <= 10
+    assert len(X) == len(y) == len(completos) - sin_severidad
+    assert descartados == 200 - len(completos)
+    assert set(y) <= {'critico', 'alto', 'medio', 'bajo'}
+
+
+def test_tabla_sin_etiquetas_no_entrena(tablas):
+    _cambiar_severidad(tablas, lambda df: None)
+
+    with pytest.raises(ValueError, match='no tiene severidad.*convertir_a_parquet'):
+        cargar_datos(tablas)
+
+
+def test_severidad_desconocida(tablas):
+    _cambiar_severidad(tablas, lambda df: 'grave')
+
+    with pytest.raises(ValueError, match="Severidades desconocidas.*grave"):
+        cargar_datos(tablas)
@@ -0,0 +1,82 @@
+"""
+Pruebas del filtrado de hospitales por especialidades.
+Prueba: Máscaras de bits e índice invertido de ColumnasHospitales
+Estándares: PEP 8, Type hints
+"""
+
+import numpy as np
+import pytest
+
+from datos.modelos.especialidades import (
+    BIT_ESPECIALIDAD,
+    ESPECIALIDADES,
+    codificar_especialidades,
+    decodificar_especialidades,
+    mascara_de,
+    mascaras_incidente,
+)
+from datos.repositorios.registro_hospitales import ColumnasHospitales
+from pruebas.conftest import hospital
+
+
+def test_bits_en_orden_de_especialidades_list():
+    assert [BIT_ESPECIALIDAD[e] for e in ESPECIALIDADES] == [1, 2, 4, 8, 16, 32, 64, 128]
+
+
+def test_codificar_y_decodificar_son_inversas():
+    for mascara in range(256):
+        assert codificar_especialidades(decodificar_especialidades(mascara)) == mascara
+
+
+def test_mascara_de_ignora_desconocidas():
+    assert mascara_de(['quemados', 'trauma', 'odontologia']) == 34
+
+
+@pytest.mark.parametrize("tipos, adicionales, esperado", [
+    (['quemadura'], [], (32, 130)),
+    (['quemadura', 'accidente_auto'], [], (34, 152)),
+    (['accidente_auto'], ['quemados'], (34, 24)),
+    (['desconocido'], [], (128, 0)),
+])
+def test_mascaras_incidente(tipos, adicionales, esperado):
+    requerida, preferida = mascaras_incidente(tipos, adicionales)
+
+    assert (requerida, preferida) == esperado
+    assert requerida & preferida == 0
+
+
+@pytest.fixture(scope="module")
+def tabla() -> ColumnasHospitales:
+    """200 hospitales con combinaciones aleatorias de especialidades."""
+    rng = np.random.default_rng(3)
+    return ColumnasHospitales([
+        hospital(f"H{i:03d}", -17.8, -63.2, camas_libres=1,
+                 especialidades=tuple(e for e in ESPECIALIDADES if rng.random() < 0.4))
+        for i in range(200)
+    ])
+
+
+def test_cumplen_especialidades_exige_todas(tabla):
+    requerida = mascara_de(['quemados', 'trauma'])
+
+    esperado = [
+        documento['quemados'] == 1 and documento['trauma'] == 1
+        for documento in (decodificar_especialidades(int(m)) for m in tabla.especialidades)
+    ]
+
+    assert tabla.cumplen_especialidades(requerida).tolist() == esperado
+
+
+@pytest.mark.parametrize("requerida", [0, 1, 34, 128, 130, 255])
+def test_indice_invertido_coincide_con_mascara(tabla, requerida):
+    filas = tabla.filas_con_especialidades(requerida)
+
+    assert filas.tolist() == np.flatnonzero(tabla.cumplen_especialidades(requerida)).tolist()
+
+
+def test_coincidencias_preferidas_cuenta_bits(tabla):
+    preferida = mascara_de(['ortopedia', 'neurologia'])
+
+    conteos = tabla.coincidencias_preferidas(preferida)
+
+    assert conteos.tolist() == [bin(int(m) & preferida).count('1') for m in tabla.especialidades]
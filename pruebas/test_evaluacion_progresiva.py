@@ -0,0 +1,35 @@
+"""
+Pruebas de la evaluación híbrida progresiva.
+Prueba: Cierre de evaluaciones y persistencia en MongoDB
+Estándares: PEP 8, Type hints
+"""
+
+from concurrent.futures import Future
+
+from datos.repositorios.repositorio_evaluaciones import RepositorioEvaluaciones
+from negocio.servicios.evaluacion_progresiva import EvaluacionProgresiva
+from pruebas.conftest import PACIENTE_BASE, ColeccionFalsa, PredictorFijo
+
+
+def test_cierre_tras_desalojo_conserva_preliminar(crear_servicio, hospitales_csv):
+    servicio = crear_servicio(hospitales_csv)
+    lanzados = [Future(), Future()]
+    siguiente = iter(lanzados)
+    servicio.lanzar_evaluacion_imagen = lambda *args: next(siguiente)
+
+    coleccion = ColeccionFalsa()
+    repositorio = RepositorioEvaluaciones({'evaluaciones': coleccion})
+    progresiva = EvaluacionProgresiva(servicio, repositorio, max_memoria=1)
+
+    primera = progresiva.iniciar(dict(PACIENTE_BASE), imagen_bytes=b'foto')
+    progresiva.iniciar(dict(PACIENTE_BASE), imagen_bytes=b'otra')   # desaloja la primera
+
+    lanzados[0].set_result(PredictorFijo('alto').predecir(PACIENTE_BASE))
+    progresiva.cerrar()
+
+    guardado = coleccion.find_one({'evaluacion_id': primera['evaluacion_id']})
+    assert guardado['estado'] == 'completa'
+    assert guardado['resultado']['metodo'] == 'hibrido'
+    assert guardado['preliminar']['metodo'] == 'solo_vitales'
+    assert guardado['datos_paciente'] == PACIENTE_BASE
+    assert guardado['creado_en'] is not None
@@ -0,0 +1,190 @@
+"""
+Pruebas del servidor de inferencia por lotes dinámicos.
+Prueba: Agrupación de solicitudes, reparto de resultados, imágenes mal
+formadas y caché de resultados tardíos
+Estándares: PEP 8, Type hints
+"""
+
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FuturoTimeout
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pytest
+
+from negocio.ml.cache_predicciones import CachePredicciones
+from negocio.ml.inferencia_por_lotes import InferenciaPorLotes
+
+
+class ClasificadorFalso:
+    """
+    Sustituto de ClasificadorImagenes sin TensorFlow.
+
+    La imagen es el primer byte repetido; la red devuelve ese valor como
+    probabilidad de 'critico'. `liberar` permite retener un lote en curso y
+    `error` hace fallar el próximo lote.
+    """
+
+    clases = ['critico', 'alto', 'medio', 'bajo']
+
+    def __init__(self):
+        self.cache = CachePredicciones('prueba', max_entradas=8)
+        self.lotes: List[int] = []
+        self.liberar = threading.Event()
+        self.liberar.set()
+        self.en_red = threading.Event()
+        self.error = None
+
+    def preparar_imagen_bytes(self, datos: bytes) -> np.ndarray:
+        return np.full((224, 224, 3), datos[0], dtype=np.uint8)
+
+    def predecir_lote(self, imagenes: np.ndarray) -> np.ndarray:
+        self.en_red.set()
+        self.liberar.wait(5)
+        if self.error is not None:
+            raise self.error
+        self.lotes.append(len(imagenes))
+        primeros = imagenes[:, 0, 0, 0].astype(np.float32) / 255.0
+        return np.stack([primeros, 1 - primeros, np.zeros_like(primeros),
+                         np.zeros_like(primeros)], axis=1)
+
+    def interpretar(self, predicciones: np.ndarray) -> Tuple[str, Dict[str, float]]:
+        probabilidades = dict(zip(self.clases, map(float, predicciones)))
+        return self.clases[int(np.argmax(predicciones))], probabilidades
+
+
+@pytest.fixture
+def servidor():
+    clasificador = ClasificadorFalso()
+    servidor = InferenciaPorLotes(clasificador, max_lote=4, espera_ms=50)
+    servidor.iniciar()
+    yield servidor
+    clasificador.liberar.set()
+    servidor.detener()
+
+
+def _esperar(condicion, segundos: float = 2.0) -> bool:
+    limite = time.monotonic() + segundos
+    while time.monotonic() < limite:
+        if condicion():
+            return True
+        time.sleep(0.005)
+    return condicion()
+
+
+def _imagen(valor: int) -> np.ndarray:
+    return np.full((224, 224, 3), valor, dtype=np.uint8)
+
+
+def test_agrupa_solicitudes_concurrentes(servidor):
+    futuros = [servidor.enviar(_imagen(valor)) for valor in range(10)]
+
+    resultados = [futuro.result(timeout=2) for futuro in futuros]
+
+    lotes = servidor.clasificador.lotes
+    assert sum(lotes) == 10
+    assert max(lotes) <= servidor.max_lote
+    assert len(lotes) < 10
+    # Cada Future recibe la fila de su propia imagen
+    assert [round(float(r[0]) * 255) for r in resultados] == list(range(10))
+
+
+def test_solicitud_sola_no_espera_mas_que_espera_ms(servidor):
+    inicio = time.monotonic()
+    servidor.enviar(_imagen(1)).result(timeout=2)
+
+    assert time.monotonic() - inicio < 1.0
+    assert servidor.clasificador.lotes == [1]
+
+
+def test_error_de_la_red_llega_a_todo_el_lote(servidor):
+    servidor.clasificador.error = RuntimeError("sin memoria")
+    futuros = [servidor.enviar(_imagen(valor)) for valor in range(3)]
+
+    for futuro in futuros:
+        with pytest.raises(RuntimeError, match="sin memoria"):
+            futuro.result(timeout=2)
+
+
+@pytest.mark.parametrize("imagen", [
+    np.zeros((10, 10, 3), dtype=np.uint8),
+    np.zeros((224, 224, 3), dtype=np.float32),
+    [[0]],
+])
+def test_enviar_rechaza_imagenes_mal_formadas(servidor, imagen):
+    with pytest.raises(ValueError, match="224, 224, 3"):
+        servidor.enviar(imagen)
+
+    assert servidor.enviar(_imagen(51)).result(timeout=2)[0] == pytest.approx(0.2)
+
+
+def test_fallo_al_armar_el_lote_no_detiene_el_hilo(servidor):
+    # Una imagen que no entra en el buffer (sin pasar por la validación)
+    mala: Future = Future()
+    servidor._cola.put((np.zeros((10, 10, 3), dtype=np.uint8), mala))
+
+    with pytest.raises(ValueError):
+        mala.result(timeout=2)
+    assert servidor.enviar(_imagen(51)).result(timeout=2)[0] == pytest.approx(0.2)
+
+
+def test_descarta_solicitudes_canceladas(servidor):
+    clasificador = servidor.clasificador
+    clasificador.liberar.clear()
+    en_curso = servidor.enviar(_imagen(0))
+    assert clasificador.en_red.wait(2)
+
+    cancelada = servidor.enviar(_imagen(1))
+    vigente = servidor.enviar(_imagen(2))
+    cancelada.cancel()
+    clasificador.liberar.set()
+
+    en_curso.result(timeout=2)
+    vigente.result(timeout=2)
+    assert clasificador.lotes == [1, 1]
+    assert servidor.obtener_estadisticas()['imagenes'] == 2
+
+
+def test_enviar_sin_iniciar_falla():
+    with pytest.raises(RuntimeError):
+        InferenciaPorLotes(ClasificadorFalso()).enviar(_imagen(0))
+
+
+def test_detener_procesa_lo_encolado():
+    clasificador = ClasificadorFalso()
+    servidor = InferenciaPorLotes(clasificador, max_lote=4, espera_ms=50)
+    servidor.iniciar()
+    futuros = [servidor.enviar(_imagen(valor)) for valor in range(6)]
+
+    servidor.detener()
+
+    assert all(futuro.done() for futuro in futuros)
+    assert sum(clasificador.lotes) == 6
+
+
+def test_resultado_tardio_queda_en_cache(servidor):
+    clasificador = servidor.clasificador
+    clasificador.liberar.clear()
+
+    with pytest.raises(FuturoTimeout):
+        servidor.predecir_bytes(bytes([230]), timeout=0.01)
+
+    clasificador.liberar.set()
+    assert _esperar(lambda: clasificador.cache.obtener_estadisticas()['entradas'] == 1)
+
+    severidad, _ = servidor.predecir_bytes(bytes([230]), timeout=1)
+
+    assert severidad == 'critico'
+    assert clasificador.lotes == [1]
+
+
+def test_no_guarda_cancelados_ni_errores(servidor):
+    cancelado, fallido = Future(), Future()
+    cancelado.cancel()
+    fallido.set_exception(RuntimeError("red caída"))
+
+    for futuro in (cancelado, fallido):
+        servidor._guardar_en_cache(('prueba', b'x'), futuro)
+
+    assert servidor.clasificador.cache.obtener_estadisticas()['entradas'] == 0
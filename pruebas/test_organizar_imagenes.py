@@ -0,0 +1,122 @@
+"""
+Pruebas del organizador de imágenes de entrenamiento.
+Prueba: Deduplicación por contenido, corridas incrementales y retomar
+tras una interrupción
+Estándares: PEP 8, Type hints
+"""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from datos.scripts import organizar_imagenes
+from datos.scripts.organizar_imagenes import CARPETA_WOUND, NOMBRE_MANIFIESTO, organizar
+
+
+def _imagen(ruta: Path, contenido: bytes, clase_burn: int = None) -> None:
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    ruta.write_bytes(contenido)
+    if clase_burn is not None:
+        ruta.with_suffix('.txt').write_text(f"{clase_burn} 0.5 0.5 0.2 0.2\n")
+
+
+@pytest.fixture
+def origen(tmp_path) -> Path:
+    """
+    Datasets raw de prueba (el contenido es lo único que importa):
+    - quemadura grado 3 repetida en Burns (duplicado, misma severidad)
+    - quemadura grado 1 repetida en Cut (duplicado, severidad distinta)
+    - una imagen de skin_burn sin etiqueta
+    """
+    raw = tmp_path / 'raw'
+    wound = raw / CARPETA_WOUND
+    _imagen(raw / 'skin_burn' / 'b1.jpg', b'grado3', clase_burn=2)
+    _imagen(raw / 'skin_burn' / 'b2.jpg', b'grado1', clase_burn=0)
+    _imagen(raw / 'skin_burn' / 'b3.jpg', b'sin etiqueta')
+    _imagen(wound / 'Burns' / 'w1.jpg', b'grado3')
+    _imagen(wound / 'Cut' / 'c1.jpg', b'grado1')
+    _imagen(wound / 'Cut' / 'c2.jpg', b'corte')
+    _imagen(wound / 'Normal' / 'n1.png', b'piel sana')
+    return raw
+
+
+def _manifiesto(destino: Path) -> dict:
+    return json.loads((destino / NOMBRE_MANIFIESTO).read_text(encoding='utf-8'))['archivos']
+
+
+def test_deduplica_por_contenido(origen, tmp_path):
+    destino = tmp_path / 'entrenamiento'
+
+    estadisticas = organizar('copiar', 2, origen, destino)
+
+    assert estadisticas['sin_etiqueta'] == 1
+    assert estadisticas['duplicadas'] == 2
+    assert estadisticas['conflictos'] == 1
+    assert estadisticas['por_severidad'] == {'critico': 1, 'medio': 1, 'alto': 1, 'bajo': 1}
+
+    archivos = _manifiesto(destino)
+    burns = (CARPETA_WOUND / 'Burns' / 'w1.jpg').as_posix()
+    assert archivos[burns]['duplicado_de'] == 'skin_burn/b1.jpg'
+    assert archivos[burns]['destino'] is None
+    assert (destino / archivos['skin_burn/b1.jpg']['destino']).read_bytes() == b'grado3'
+    assert sorted(p.name for p in destino.glob('*/*')) == [
+        'burn_b1.jpg', 'burn_b2.jpg', 'cut_c2.jpg', 'normal_n1.png'
+    ]
+
+
+def test_segunda_corrida_no_rehace_nada(origen, tmp_path):
+    destino = tmp_path / 'entrenamiento'
+    organizar('copiar', 2, origen, destino)
+
+    estadisticas = organizar('copiar', 2, origen, destino)
+    assert estadisticas['materializadas'] == 0
+
+    (destino / 'bajo' / 'normal_n1.png').unlink()
+    (origen / CARPETA_WOUND / 'Cut' / 'c2.jpg').write_bytes(b'corte editado')
+    estadisticas = organizar('copiar', 2, origen, destino)
+
+    assert estadisticas['materializadas'] == 2
+    assert (destino / 'alto' / 'cut_c2.jpg').read_bytes() == b'corte editado'
+
+
+def test_retoma_tras_interrupcion(origen, tmp_path, monkeypatch):
+    destino = tmp_path / 'entrenamiento'
+    materializar = organizar_imagenes.materializar
+    llamadas = []
+
+    def materializar_con_corte(origen_archivo, destino_archivo, modo):
+        if len(llamadas) == 2:
+            raise KeyboardInterrupt
+        llamadas.append(destino_archivo)
+        return materializar(origen_archivo, destino_archivo, modo)
+
+    monkeypatch.setattr(organizar_imagenes, 'INTERVALO_CHECKPOINT', 1)
+    monkeypatch.setattr(organizar_imagenes, 'materializar', materializar_con_corte)
+    with pytest.raises(KeyboardInterrupt):
+        organizar('copiar', 1, origen, destino)
+
+    # Checkpoint: las 2 materializadas y las 2 duplicadas (sin destino)
+    archivos = _manifiesto(destino)
+    assert sum(1 for f in archivos.values() if f['destino']) == 2
+
+    monkeypatch.setattr(organizar_imagenes, 'materializar', materializar)
+    estadisticas = organizar('copiar', 1, origen, destino)
+
+    assert estadisticas['materializadas'] == 2
+    assert len(list(destino.glob('*/*'))) == 4
+
+
+def test_podar_borra_destinos_huerfanos(origen, tmp_path):
+    destino = tmp_path / 'entrenamiento'
+    organizar('copiar', 2, origen, destino)
+    (origen / CARPETA_WOUND / 'Normal' / 'n1.png').unlink()
+
+    sin_podar = organizar('copiar', 2, origen, destino)
+    assert sin_podar['huerfanos'] == 1
+    assert (destino / 'bajo' / 'normal_n1.png').exists()
+
+    # El huérfano sigue en el manifiesto aunque la corrida anterior no podó
+    podada = organizar('copiar', 2, origen, destino, podar=True)
+    assert podada['huerfanos'] == 1
+    assert not (destino / 'bajo' / 'normal_n1.png').exists()
@@ -0,0 +1,64 @@
+"""
+Pruebas del preprocesado de imágenes a almacén de shards.
+Prueba: Imágenes corruptas omitidas (o abortando con estricto)
+Estándares: PEP 8, Type hints
+"""
+
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+from datos.repositorios.almacen_imagenes import AlmacenImagenes
+from datos.scripts.preprocesar_imagenes import preprocesar
+
+CORRUPTA = 'alto/alto_03.png'
+
+
+@pytest.fixture
+def data_dir(tmp_path) -> Path:
+    """Dos clases de 5 imágenes de color liso (rojo = 10 * número) y una corrupta."""
+    directorio = tmp_path / 'imagenes'
+    for clase in ('alto', 'bajo'):
+        (directorio / clase).mkdir(parents=True)
+        for numero in range(5):
+            rojo = 10 * numero + (100 if clase == 'bajo' else 0)
+            Image.new('RGB', (32, 32), (rojo, 0, 0)).save(
+                directorio / clase / f"{clase}_{numero:02d}.png"
+            )
+    (directorio / CORRUPTA).write_bytes(b'no es una imagen')
+    return directorio
+
+
+def test_omite_imagenes_corruptas(data_dir, tmp_path):
+    destino = tmp_path / 'almacen'
+
+    manifiesto = preprocesar(data_dir, destino, imagenes_por_shard=3, hilos=2)
+    almacen = AlmacenImagenes(destino)
+
+    assert [o['ruta'] for o in manifiesto['omitidas']] == [CORRUPTA]
+    assert len(almacen) == 9
+    assert CORRUPTA not in almacen.rutas
+    assert almacen.rango('entrenamiento') == (0, 7)
+    assert almacen.rango('validacion') == (7, 9)
+
+    # Cada fila conserva su imagen y su etiqueta tras compactar los shards
+    for indice, ruta in enumerate(almacen.rutas):
+        clase, nombre = ruta.split('/')
+        numero = int(nombre[-6:-4])
+        imagen, etiqueta = almacen.obtener(indice)
+        assert etiqueta == almacen.clases.index(clase)
+        assert imagen[0, 0, 0] == 10 * numero + (100 if clase == 'bajo' else 0)
+
+
+def test_estricto_aborta_sin_tocar_almacen(data_dir, tmp_path):
+    destino = tmp_path / 'almacen'
+    (data_dir / CORRUPTA).unlink()
+    preprocesar(data_dir, destino, imagenes_por_shard=3)
+    (data_dir / CORRUPTA).write_bytes(b'no es una imagen')
+
+    with pytest.raises(ValueError, match=CORRUPTA):
+        preprocesar(data_dir, destino, imagenes_por_shard=3, estricto=True)
+
+    assert len(AlmacenImagenes(destino)) == 9
+    assert not destino.with_name('almacen.tmp').exists()
@@ -0,0 +1,113 @@
+"""
+Pruebas del re-clustering de hospitales en línea.
+Prueba: Asignación de pendientes, guardado versionado del modelo y
+sincronización con MongoDB al reiniciar
+Estándares: PEP 8, Type hints
+"""
+
+from typing import Any, Dict, List
+
+import pytest
+
+from negocio.ml.clustering_hospitales import ClusteringHospitales
+from negocio.ml.reclustering_hospitales import ReclusteringHospitales
+from pruebas.conftest import hospital
+
+
+class RepositorioFalso:
+    """Subconjunto de RepositorioHospitales que usa el re-clustering."""
+
+    def __init__(self, hospitales: List[Dict[str, Any]]):
+        self.hospitales = {h['hospital_id']: dict(h) for h in hospitales}
+
+    def obtener_todos(self) -> List[Dict[str, Any]]:
+        return [dict(h) for h in self.hospitales.values()]
+
+    def obtener_sin_cluster(self) -> List[Dict[str, Any]]:
+        return [dict(h) for h in self.hospitales.values() if h.get('cluster') is None]
+
+    def actualizar_clusters_masivo(self, clusters: Dict[str, int]) -> int:
+        for hospital_id, cluster in clusters.items():
+            self.hospitales[hospital_id]['cluster'] = cluster
+        return len(clusters)
+
+
+def _clusters_en_info(clusterer: ClusteringHospitales) -> Dict[str, int]:
+    return {
+        hospital_id: cluster_id
+        for cluster_id, info in clusterer.cluster_info.items()
+        for hospital_id in info['hospitales']
+    }
+
+
+def _clusters_en_repositorio(repositorio: RepositorioFalso) -> Dict[str, int]:
+    return {hospital_id: h['cluster'] for hospital_id, h in repositorio.hospitales.items()}
+
+
+@pytest.fixture
+def repositorio(hospitales_csv) -> RepositorioFalso:
+    hospitales = [dict(h) for h in hospitales_csv]
+    hospitales[0]['cluster'] = None
+    return RepositorioFalso(hospitales)
+
+
+def test_asigna_pendientes_con_el_modelo_vigente(repositorio, hospitales_csv):
+    reclustering = ReclusteringHospitales(ClusteringHospitales(), repositorio)
+
+    asignados = reclustering.asignar_pendientes()
+
+    hospital_id = hospitales_csv[0]['hospital_id']
+    assert asignados == {hospital_id: hospitales_csv[0]['cluster']}
+    assert reclustering.asignar_pendientes() == {}
+
+
+def test_reentrenar_no_modifica_modelos_ml(repositorio, monkeypatch):
+    monkeypatch.delenv('RECLUSTERING_GUARDAR_MODELOS', raising=False)
+    clusterer = ClusteringHospitales()
+    originales = {
+        nombre: (clusterer.ruta_base / nombre).stat().st_mtime_ns
+        for nombre in ('modelo_kmeans.pkl', 'cluster_info.pkl')
+    }
+    reclustering = ReclusteringHospitales(clusterer, repositorio)
+
+    reclustering.reentrenar()
+
+    assert not reclustering.guardar_modelos
+    assert originales == {
+        nombre: (clusterer.ruta_base / nombre).stat().st_mtime_ns for nombre in originales
+    }
+
+
+def test_guardar_modelos_escribe_version_cargable(repositorio, tmp_path):
+    clusterer = ClusteringHospitales()
+    ReclusteringHospitales(clusterer, repositorio).reentrenar()
+
+    directorio = clusterer.guardar_modelos(tmp_path / 'version')
+    recargado = ClusteringHospitales(str(directorio))
+
+    assert sorted(p.name for p in directorio.iterdir()) == [
+        'cluster_info.pkl', 'especialidades_list.pkl', 'modelo_kmeans.pkl'
+    ]
+    assert recargado.cluster_info == clusterer.cluster_info
+
+
+def test_reinicio_tras_reentrenar_vuelve_a_coincidir_con_mongo(repositorio):
+    # Hospitales nuevos de quemados/trauma mueven los clusters al re-entrenar
+    for i in range(15):
+        repositorio.hospitales[f"N{i:02d}"] = hospital(
+            f"N{i:02d}", -17.8, -63.2, camas_libres=1,
+            especialidades=('quemados', 'trauma', 'general')
+        )
+    ReclusteringHospitales(ClusteringHospitales(), repositorio).reentrenar()
+
+    # Reinicio: el clusterer vuelve a los pickles del notebook
+    clusterer = ClusteringHospitales()
+    assert _clusters_en_info(clusterer) != _clusters_en_repositorio(repositorio)
+
+    reclustering = ReclusteringHospitales(
+        clusterer, repositorio, intervalo_asignacion=60, intervalo_reentrenamiento=3600
+    )
+    reclustering.iniciar()
+    reclustering.detener()
+
+    assert _clusters_en_info(clusterer) == _clusters_en_repositorio(repositorio)
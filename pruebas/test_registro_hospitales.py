@@ -0,0 +1,77 @@
+"""
+Pruebas del registro columnar de hospitales.
+Prueba: Columnas, materialización y recarga por TTL / invalidación
+Estándares: PEP 8, Type hints
+"""
+
+import numpy as np
+
+from datos.repositorios.registro_hospitales import ColumnasHospitales, RegistroHospitales
+from pruebas.conftest import hospital
+
+
+HOSPITALES = [
+    hospital('H1', -17.78, -63.18, camas_libres=3, especialidades=('trauma',), cluster=0),
+    hospital('H2', -17.80, -63.20, camas_libres=0, especialidades=('general',), cluster=1),
+    hospital('H3', -17.75, -63.15, camas_libres=10, especialidades=('quemados', 'trauma')),
+]
+
+
+class RepositorioContador:
+    """Repositorio que cuenta las lecturas de la colección."""
+
+    def __init__(self, hospitales):
+        self.hospitales = hospitales
+        self.lecturas = 0
+
+    def obtener_todos(self):
+        self.lecturas += 1
+        return list(self.hospitales)
+
+
+def test_columnas_y_capacidad():
+    tabla = ColumnasHospitales(HOSPITALES)
+
+    assert len(tabla) == 3
+    assert tabla.indice == {'H1': 0, 'H2': 1, 'H3': 2}
+    assert tabla.camas_libres.tolist() == [3, 0, 10]
+    assert tabla.disponibles().tolist() == [True, False, True]
+    assert tabla.disponibilidad_porcentaje(np.array([0, 2])).tolist() == [30.0, 100.0]
+    assert tabla.coordenadas.shape == (3, 2)
+
+
+def test_materializar_reconstruye_el_documento():
+    tabla = ColumnasHospitales(HOSPITALES)
+
+    for fila, documento in enumerate(HOSPITALES):
+        materializado = tabla.materializar(fila, distancia_km=1.5)
+        esperado = {clave: documento[clave] for clave in materializado if clave in documento}
+        assert esperado == {clave: materializado[clave] for clave in esperado}
+        assert materializado['distancia_km'] == 1.5
+
+    assert tabla.materializar(2)['cluster'] is None
+
+
+def test_columnas_de_solo_lectura():
+    tabla = ColumnasHospitales(HOSPITALES)
+
+    assert not tabla.capacidad_actual.flags.writeable
+    assert not tabla.especialidades.flags.writeable
+
+
+def test_registro_recarga_por_ttl_e_invalidacion():
+    repositorio = RepositorioContador(HOSPITALES)
+    registro = RegistroHospitales(repositorio, ttl_segundos=60)
+
+    primera = registro.obtener()
+    assert registro.obtener() is primera
+    assert repositorio.lecturas == 1
+
+    registro.invalidar()
+    assert registro.obtener() is not primera
+    assert repositorio.lecturas == 2
+
+    vencido = RegistroHospitales(repositorio, ttl_segundos=0)
+    vencido.obtener()
+    vencido.obtener()
+    assert repositorio.lecturas == 4
@@ -0,0 +1,126 @@
+"""
+Pruebas del repositorio de tablas Parquet.
+Prueba: Conversión desde CSV, proyección de columnas, regeneración y
+exportación desde MongoDB
+Estándares: PEP 8, Type hints
+"""
+
+import os
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from datos.repositorios.repositorio_tablas import DIRECTORIO_CSV, RepositorioTablas
+from pruebas.conftest import ColeccionFalsa, PACIENTE_BASE, hospital
+
+
+class ColeccionExportable(ColeccionFalsa):
+    """ColeccionFalsa cuyo find devuelve un cursor con batch_size."""
+
+    class _Cursor(list):
+        def batch_size(self, lote: int) -> 'ColeccionExportable._Cursor':
+            return self
+
+    def find(self, filtro=None, proyeccion=None):
+        return self._Cursor(super().find(filtro, proyeccion))
+
+
+@pytest.fixture
+def tablas(tmp_path) -> RepositorioTablas:
+    """Repositorio sobre las 20 primeras filas de cada CSV del proyecto."""
+    directorio_csv = tmp_path / 'csv'
+    directorio_csv.mkdir()
+    for nombre in ('emergencia_pacientes', 'hospitales'):
+        pd.read_csv(DIRECTORIO_CSV / f"{nombre}.csv", nrows=20).to_csv(
+            directorio_csv / f"{nombre}.csv", index=False
+        )
+    return RepositorioTablas(directorio=tmp_path / 'parquet', directorio_csv=directorio_csv)
+
+
+def _envejecer(ruta: Path, segundos: int = 60) -> None:
+    """Atrasa la fecha de modificación de un archivo."""
+    marca = ruta.stat().st_mtime - segundos
+    os.utime(ruta, (marca, marca))
+
+
+def test_ida_y_vuelta_desde_csv(tablas):
+    csv = pd.read_csv(tablas.directorio_csv / 'hospitales.csv')
+
+    df = tablas.leer('hospitales')
+
+    assert tablas.origen(tablas.ruta('hospitales')) == 'csv:hospitales.csv'
+    assert df['nivel'].dtype == 'category'
+    assert str(df['capacidad_actual'].dtype) == 'int32'
+    pd.testing.assert_frame_equal(
+        df.astype({'nivel': str, 'capacidad_actual': 'int64', 'capacidad_maxima': 'int64'}),
+        csv, check_dtype=False
+    )
+
+
+def test_proyeccion_y_filtros(tablas):
+    df = tablas.leer(
+        'emergencia_pacientes', columnas=['edad', 'severidad'],
+        filtros=[('severidad', '==', 'medio')]
+    )
+
+    assert df.columns.tolist() == ['edad', 'severidad']
+    assert str(df['edad'].dtype) == 'int16'
+    assert set(df['severidad']) == {'medio'}
+
+
+def test_celdas_vacias_son_nulas(tablas):
+    ruta_csv = tablas.directorio_csv / 'emergencia_pacientes.csv'
+    df = pd.read_csv(ruta_csv)
+    df.loc[:4, 'severidad'] = None
+    df.to_csv(ruta_csv, index=False)
+
+    severidad = tablas.leer('emergencia_pacientes', columnas=['severidad'])['severidad']
+
+    assert severidad.isna().tolist() == [True] * 5 + [False] * 15
+    assert '' not in severidad.cat.categories
+
+
+def test_regenera_cuando_el_csv_es_mas_nuevo(tablas):
+    _envejecer(tablas.directorio_csv / 'hospitales.csv', segundos=120)
+    ruta = tablas.desde_csv('hospitales')
+    _envejecer(ruta)
+    escrito = ruta.stat().st_mtime_ns
+
+    tablas.leer('hospitales')
+    assert ruta.stat().st_mtime_ns == escrito
+
+    os.utime(tablas.directorio_csv / 'hospitales.csv')
+    tablas.leer('hospitales')
+    assert ruta.stat().st_mtime_ns > escrito
+
+
+def test_exportacion_mongo_no_reemplaza_la_tabla(tablas):
+    db = {'pacientes': ColeccionExportable([{**PACIENTE_BASE, 'paciente_id': 'PAC99999'}])}
+
+    ruta = tablas.desde_mongo('emergencia_pacientes', db)
+
+    assert ruta == tablas.ruta_mongo('emergencia_pacientes')
+    assert not tablas.ruta('emergencia_pacientes').exists()
+    assert tablas.leer('emergencia_pacientes')['severidad'].notna().all()
+
+
+def test_regenera_una_tabla_que_no_salio_del_csv(tablas):
+    # Tabla escrita por una versión anterior que exportaba MongoDB en su lugar
+    db = {'hospitales': ColeccionExportable([hospital('H1', -17.8, -63.2, camas_libres=2)])}
+    tablas.desde_mongo('hospitales', db).replace(tablas.ruta('hospitales'))
+    _envejecer(tablas.directorio_csv / 'hospitales.csv')
+
+    df = tablas.leer('hospitales')
+
+    assert tablas.origen(tablas.ruta('hospitales')) == 'csv:hospitales.csv'
+    assert len(df) == 20
+
+
+def test_sin_parquet_ni_csv(tmp_path):
+    tablas = RepositorioTablas(directorio=tmp_path / 'parquet', directorio_csv=tmp_path)
+
+    with pytest.raises(FileNotFoundError):
+        tablas.leer('hospitales')
+    with pytest.raises(ValueError, match='Tabla desconocida'):
+        tablas.leer('ambulancias')
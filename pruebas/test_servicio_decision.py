@@ -0,0 +1,66 @@
+"""
+Pruebas de la regla de traslado de ServicioDecision.
+Prueba: Severidades del modelo → traslado en las rutas individual, por lote e híbrida
+Estándares: PEP 8, Type hints
+"""
+
+from concurrent.futures import Future
+
+import pytest
+
+from negocio.ml.prediccion_severidad import (
+    PredictorSeveridad, SEVERIDADES, SEVERIDADES_TRASLADO
+)
+from pruebas.conftest import PACIENTE_BASE, UBICACION, PredictorFijo
+
+
+def test_severidades_coinciden_con_clases_del_modelo():
+    predictor = PredictorSeveridad()
+
+    assert set(predictor.modelo.classes_) == set(SEVERIDADES)
+    assert set(SEVERIDADES_TRASLADO) <= set(predictor.modelo.classes_)
+
+
+@pytest.mark.parametrize("severidad", SEVERIDADES)
+def test_traslado_segun_severidad(crear_servicio, hospitales_csv, severidad):
+    servicio = crear_servicio(hospitales_csv, severidad)
+
+    evaluacion = servicio.evaluar_paciente(dict(PACIENTE_BASE))
+
+    assert evaluacion['severidad'] == severidad
+    assert evaluacion['requiere_traslado'] == (severidad in SEVERIDADES_TRASLADO)
+
+
+def test_lote_recomienda_hospitales_a_criticos(crear_servicio, hospitales_csv):
+    servicio = crear_servicio(hospitales_csv)
+    pacientes = [
+        {**PACIENTE_BASE, '_severidad': 'critico'},
+        {**PACIENTE_BASE, '_severidad': 'bajo'},
+    ]
+
+    critico, bajo = servicio.recomendar_hospitales_lote(pacientes, [UBICACION], top_n=3)
+
+    assert critico['evaluacion']['requiere_traslado']
+    assert len(critico['hospitales_recomendados']) == 3
+    assert 'in situ' not in critico['mensaje']
+    assert bajo['hospitales_recomendados'] == []
+
+
+def test_rutas_hibridas_usan_la_misma_regla(crear_servicio, hospitales_csv):
+    servicio = crear_servicio(hospitales_csv)
+    severidad, probabilidades = PredictorFijo('critico').predecir(PACIENTE_BASE)
+
+    solo_vitales = servicio.completar_evaluacion_hibrida(
+        PACIENTE_BASE, severidad, probabilidades, futuro_imagen=None
+    )
+
+    futuro = Future()
+    futuro.set_result((severidad, probabilidades))
+    hibrido = servicio.completar_evaluacion_hibrida(
+        PACIENTE_BASE, severidad, probabilidades, futuro_imagen=futuro
+    )
+
+    assert solo_vitales['metodo'] == 'solo_vitales'
+    assert hibrido['metodo'] == 'hibrido'
+    assert hibrido['severidad'] == 'critico'
+    assert solo_vitales['requiere_traslado'] and hibrido['requiere_traslado']
@@ -0,0 +1,125 @@
+"""
+Pruebas de la validación de pacientes.
+Prueba: Rangos, políticas marcar / recortar, categorías y equivalencia
+entre validar_lote y validar_registro
+Estándares: PEP 8, Type hints
+"""
+
+import pandas as pd
+import pytest
+
+from datos.modelos.validacion_pacientes import validar_lote, validar_registro
+from pruebas.conftest import PACIENTE_BASE
+
+
+def _paciente(**cambios) -> dict:
+    return {**PACIENTE_BASE, **cambios}
+
+
+CASOS = [
+    _paciente(),
+    _paciente(saturacion_oxigeno=104),
+    _paciente(nivel_dolor=-2),
+    _paciente(edad=430),
+    _paciente(edad=None),
+    _paciente(temperatura='alta'),
+    _paciente(sexo=' m ', tipo_incidente=' Problema_Cardiaco'),
+    _paciente(sexo='X'),
+    _paciente(edad=430, tipo_incidente='meteorito'),
+]
+
+
+def test_lote_marca_y_recorta_segun_el_campo():
+    resultado = validar_lote(pd.DataFrame(CASOS))
+
+    assert resultado.validos.tolist() == [True, True, True, False, False, False, True, False, False]
+    assert resultado.recortados.tolist() == [False, True, True] + [False] * 6
+    assert resultado.datos['saturacion_oxigeno'].iloc[1] == 100.0
+    assert resultado.datos['nivel_dolor'].iloc[2] == 0
+    assert resultado.errores.iloc[3] == "edad fuera de rango [0, 120]: 430"
+    assert resultado.errores.iloc[4] == "falta edad"
+    assert resultado.errores.iloc[5] == "temperatura no es numérico: 'alta'"
+    assert resultado.errores.iloc[7] == "sexo desconocido: 'X'"
+    assert resultado.errores.iloc[8] == (
+        "edad fuera de rango [0, 120]: 430; tipo_incidente desconocido: 'meteorito'"
+    )
+    assert resultado.errores[resultado.validos].isna().all()
+
+
+def test_lote_normaliza_tipos_y_conserva_columnas_extra():
+    df = pd.DataFrame(CASOS).assign(paciente_id=range(len(CASOS)))
+
+    datos = validar_lote(df).datos
+
+    assert str(datos['edad'].dtype) == 'Int64'
+    assert datos['temperatura'].dtype == 'float64'
+    assert (datos['sexo'].iloc[6], datos['tipo_incidente'].iloc[6]) == ('M', 'problema_cardiaco')
+    assert datos['paciente_id'].tolist() == list(range(len(CASOS)))
+
+
+def test_lote_politica_marcar_no_recorta():
+    resultado = validar_lote(pd.DataFrame(CASOS[:3]), politica='marcar')
+
+    assert resultado.validos.tolist() == [True, False, False]
+    assert not resultado.recortados.any()
+
+
+def test_lote_columna_ausente_invalida_todo():
+    resultado = validar_lote(pd.DataFrame(CASOS).drop(columns='sexo'))
+
+    assert not resultado.validos.any()
+    assert resultado.errores.str.contains('falta sexo').all()
+
+
+def test_registro_recorta_y_coerciona():
+    limpio = validar_registro(_paciente(saturacion_oxigeno='101', edad=57.6, sexo=' f '))
+
+    assert limpio['saturacion_oxigeno'] == 100.0
+    assert isinstance(limpio['saturacion_oxigeno'], float)
+    assert limpio['edad'] == 58 and isinstance(limpio['edad'], int)
+    assert limpio['sexo'] == 'F'
+
+
+def test_registro_informa_todos_los_problemas():
+    with pytest.raises(ValueError) as error:
+        validar_registro(_paciente(edad=430, temperatura=None, sexo='X'))
+
+    assert str(error.value) == (
+        "Datos de paciente inválidos: edad fuera de rango [0, 120]: 430; "
+        "falta temperatura; sexo desconocido: 'X'"
+    )
+
+
+def test_dominios_propios():
+    dominios = {'tipo_incidente': ('problema_cardiaco',)}
+
+    assert validar_registro(_paciente(), dominios=dominios)['tipo_incidente'] == 'problema_cardiaco'
+    with pytest.raises(ValueError, match='tipo_incidente desconocido'):
+        validar_registro(_paciente(tipo_incidente='quemadura'), dominios=dominios)
+    assert validar_lote(
+        pd.DataFrame([_paciente(tipo_incidente='quemadura')]), dominios=dominios
+    ).validos.tolist() == [False]
+
+
+def test_politica_invalida():
+    with pytest.raises(ValueError, match='Política inválida'):
+        validar_lote(pd.DataFrame(CASOS[:1]), politica='ignorar')
+    with pytest.raises(ValueError, match='Política inválida'):
+        validar_registro(_paciente(), politica='ignorar')
+
+
+@pytest.mark.parametrize("politica", [None, 'marcar', 'recortar'])
+def test_lote_y_registro_coinciden(politica):
+    resultado = validar_lote(pd.DataFrame(CASOS), politica=politica)
+
+    for i, caso in enumerate(CASOS):
+        try:
+            limpio = validar_registro(caso, politica=politica)
+        except ValueError as error:
+            assert not resultado.validos[i]
+            assert str(error) == f"Datos de paciente inválidos: {resultado.errores.iloc[i]}"
+            continue
+
+        assert resultado.validos[i]
+        fila = resultado.datos.iloc[i]
+        assert {campo: fila[campo] for campo in limpio} == limpio